@@ -0,0 +1,111 @@
+"""Add workflow agent association table
+
+Revision ID: 20261018_090000
+Revises: 20250901_203222
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_090000"
+down_revision: Union[str, None] = "20250901_203222"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "workflow_agent_association",
+        sa.Column(
+            "workflow_history_id", postgresql.UUID(as_uuid=True), nullable=False
+        ),
+        sa.Column("agent_id", sa.String(length=255), nullable=False),
+        sa.Column("agent_name", sa.String(length=255), nullable=True),
+        sa.Column("agent_type", sa.String(length=100), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["workflow_history_id"], ["workflow_history.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("workflow_history_id", "agent_id"),
+    )
+    op.create_index(
+        "idx_workflow_agent_agent_time",
+        "workflow_agent_association",
+        ["agent_id", "started_at"],
+        unique=False,
+    )
+
+    # Backfill from the assigned_agents JSON column of existing history
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            """
+            INSERT INTO workflow_agent_association
+                (workflow_history_id, agent_id, agent_name, agent_type, started_at)
+            SELECT wh.id, agent->>'id', agent->>'name', agent->>'type', wh.started_at
+            FROM workflow_history wh,
+                 json_array_elements(wh.assigned_agents) AS agent
+            WHERE json_typeof(wh.assigned_agents) = 'array'
+              AND agent->>'id' IS NOT NULL
+            ON CONFLICT DO NOTHING
+            """
+        )
+    else:
+        _backfill_generic(bind)
+
+
+def _backfill_generic(bind) -> None:
+    history = sa.table(
+        "workflow_history",
+        sa.column("id", postgresql.UUID(as_uuid=True)),
+        sa.column("assigned_agents", sa.JSON()),
+        sa.column("started_at", sa.DateTime(timezone=True)),
+    )
+    association = sa.table(
+        "workflow_agent_association",
+        sa.column("workflow_history_id", postgresql.UUID(as_uuid=True)),
+        sa.column("agent_id", sa.String()),
+        sa.column("agent_name", sa.String()),
+        sa.column("agent_type", sa.String()),
+        sa.column("started_at", sa.DateTime(timezone=True)),
+    )
+
+    rows = []
+    result = bind.execute(
+        sa.select(history.c.id, history.c.assigned_agents, history.c.started_at)
+    )
+    for history_id, agents, started_at in result:
+        seen = set()
+        for agent in agents or []:
+            if not isinstance(agent, dict) or not agent.get("id"):
+                continue
+            if agent["id"] in seen:
+                continue
+            seen.add(agent["id"])
+            rows.append(
+                {
+                    "workflow_history_id": history_id,
+                    "agent_id": str(agent["id"]),
+                    "agent_name": agent.get("name"),
+                    "agent_type": agent.get("type"),
+                    "started_at": started_at,
+                }
+            )
+        if len(rows) >= 1000:
+            bind.execute(association.insert(), rows)
+            rows = []
+    if rows:
+        bind.execute(association.insert(), rows)
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "idx_workflow_agent_agent_time", table_name="workflow_agent_association"
+    )
+    op.drop_table("workflow_agent_association")
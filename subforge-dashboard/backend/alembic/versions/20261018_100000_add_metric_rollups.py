@@ -0,0 +1,76 @@
+"""Add metric rollups table
+
+Existing history is not rolled up here; run ``python rebuild_rollups.py
+--days N`` after upgrading to backfill the buckets.
+
+Revision ID: 20261018_100000
+Revises: 20261018_090000
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_100000"
+down_revision: Union[str, None] = "20261018_090000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metric_rollups",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("granularity", sa.String(length=20), nullable=False),
+        sa.Column("dimension", sa.String(length=50), nullable=False),
+        sa.Column("dimension_value", sa.String(length=255), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("success_count", sa.Integer(), nullable=False),
+        sa.Column("failure_count", sa.Integer(), nullable=False),
+        sa.Column("total_tasks", sa.Integer(), nullable=False),
+        sa.Column("completed_tasks", sa.Integer(), nullable=False),
+        sa.Column("failed_tasks", sa.Integer(), nullable=False),
+        sa.Column("duration_count", sa.Integer(), nullable=False),
+        sa.Column("duration_sum", sa.Float(), nullable=False),
+        sa.Column("duration_sum_sq", sa.Float(), nullable=False),
+        sa.Column("duration_min", sa.Float(), nullable=True),
+        sa.Column("duration_max", sa.Float(), nullable=True),
+        sa.Column("duration_histogram", sa.JSON(), nullable=False),
+        sa.Column("quality_count", sa.Integer(), nullable=False),
+        sa.Column("quality_sum", sa.Float(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "granularity",
+            "dimension",
+            "dimension_value",
+            "bucket_start",
+            name="uq_metric_rollup_bucket",
+        ),
+    )
+    op.create_index(
+        op.f("ix_metric_rollups_id"), "metric_rollups", ["id"], unique=False
+    )
+    op.create_index(
+        "idx_metric_rollup_range",
+        "metric_rollups",
+        ["dimension", "granularity", "bucket_start"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_metric_rollup_range", table_name="metric_rollups")
+    op.drop_index(op.f("ix_metric_rollups_id"), table_name="metric_rollups")
+    op.drop_table("metric_rollups")
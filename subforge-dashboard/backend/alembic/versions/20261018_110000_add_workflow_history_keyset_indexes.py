@@ -0,0 +1,65 @@
+"""Add keyset pagination indexes to workflow history
+
+Revision ID: 20261018_110000
+Revises: 20261018_100000
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_110000"
+down_revision: Union[str, None] = "20261018_100000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEYSET_INDEXES = [
+    ("idx_workflow_history_time_id", ["started_at", "id"]),
+    ("idx_workflow_history_status_time", ["status", "started_at", "id"]),
+    ("idx_workflow_history_project_time", ["project_id", "started_at", "id"]),
+    (
+        "idx_workflow_history_project_status_time",
+        ["project_id", "status", "started_at", "id"],
+    ),
+]
+
+REPLACED_INDEXES = [
+    ("idx_workflow_history_status_time", ["status", "started_at"]),
+    ("idx_workflow_history_project_time", ["project_id", "started_at"]),
+]
+
+
+def upgrade() -> None:
+    # Build without blocking writes to a large history table on PostgreSQL
+    with op.get_context().autocommit_block():
+        for name, _ in REPLACED_INDEXES:
+            op.drop_index(
+                name, table_name="workflow_history", postgresql_concurrently=True
+            )
+        for name, columns in KEYSET_INDEXES:
+            op.create_index(
+                name,
+                "workflow_history",
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in KEYSET_INDEXES:
+            op.drop_index(
+                name, table_name="workflow_history", postgresql_concurrently=True
+            )
+        for name, columns in REPLACED_INDEXES:
+            op.create_index(
+                name,
+                "workflow_history",
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+            )
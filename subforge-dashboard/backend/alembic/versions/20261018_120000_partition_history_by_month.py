@@ -0,0 +1,186 @@
+"""Partition history tables by month
+
+Adds ``workflow_started_at`` to phase and handoff history so every child row
+carries its workflow's partition key. On PostgreSQL, workflow_history and the
+tables referencing it are then rebuilt as RANGE partitioned tables with one
+partition per month (covering existing data plus three months ahead) and a
+DEFAULT partition; keys and indexes are recreated and the child foreign keys
+reference (id, started_at). Other databases keep plain tables.
+
+Revision ID: 20261018_120000
+Revises: 20261018_110000
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from datetime import date, datetime
+from typing import List, Optional, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_120000"
+down_revision: Union[str, None] = "20261018_110000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+# table, partition key, partitioned primary key, original primary key
+TABLES = [
+    ("workflow_history", "started_at", ["id", "started_at"], ["id"]),
+    ("phase_history", "workflow_started_at", ["id", "workflow_started_at"], ["id"]),
+    (
+        "handoff_history",
+        "workflow_started_at",
+        ["id", "workflow_started_at"],
+        ["id"],
+    ),
+    (
+        "workflow_agent_association",
+        "started_at",
+        ["workflow_history_id", "agent_id", "started_at"],
+        ["workflow_history_id", "agent_id"],
+    ),
+]
+
+# table, columns referencing workflow_history, original ON DELETE action
+CHILD_FOREIGN_KEYS = [
+    ("phase_history", ["workflow_history_id", "workflow_started_at"], None),
+    ("handoff_history", ["workflow_history_id", "workflow_started_at"], None),
+    ("workflow_agent_association", ["workflow_history_id", "started_at"], "CASCADE"),
+]
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _months_to_cover(bind) -> List[date]:
+    today = datetime.utcnow().date()
+    oldest = bind.execute(sa.text("SELECT min(started_at) FROM workflow_history"))
+    first = oldest.scalar() or today
+    month = date(first.year, first.month, 1)
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    months = []
+    while month <= last:
+        months.append(month)
+        month = _add_months(month, 1)
+    return months
+
+
+def _index_definitions(bind, table: str) -> List[str]:
+    """CREATE INDEX statements for the non-constraint indexes of a table"""
+    result = bind.execute(
+        sa.text(
+            "SELECT indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = :table "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint "
+            "WHERE conrelid = CAST(:table AS regclass))"
+        ),
+        {"table": table},
+    )
+    # Indexes of a partitioned parent are reported as ON ONLY
+    return [row[0].replace(" ON ONLY ", " ON ") for row in result]
+
+
+def _rebuild(
+    bind, table: str, partition_key: Optional[str], months: List[date]
+) -> List[str]:
+    """Recreate ``table`` (partitioned or plain) holding the same rows"""
+    indexes = _index_definitions(bind, table)
+    old = f"{table}_old"
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+
+    partition_clause = (
+        f" PARTITION BY RANGE ({partition_key})" if partition_key else ""
+    )
+    op.execute(
+        f"CREATE TABLE {table} "
+        f"(LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS){partition_clause}"
+    )
+    if partition_key:
+        for month in months:
+            op.execute(
+                f"CREATE TABLE {table}_p{month.year:04d}{month.month:02d} "
+                f"PARTITION OF {table} FOR VALUES "
+                f"FROM ('{month.isoformat()} 00:00:00+00') "
+                f"TO ('{_add_months(month, 1).isoformat()} 00:00:00+00')"
+            )
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    return indexes
+
+
+def _restore_keys_and_indexes(keys, indexes, on_delete_cascade: bool):
+    for table, primary_key in keys:
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY ({', '.join(primary_key)})")
+    for table_indexes in indexes:
+        for statement in table_indexes:
+            op.execute(statement)
+    for table, columns, original_on_delete in CHILD_FOREIGN_KEYS:
+        if on_delete_cascade:
+            local, remote, on_delete = columns, ["id", "started_at"], "CASCADE"
+        else:
+            local, remote, on_delete = columns[:1], ["id"], original_on_delete
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_workflow_history_fkey "
+            f"FOREIGN KEY ({', '.join(local)}) "
+            f"REFERENCES workflow_history ({', '.join(remote)})"
+            + (f" ON DELETE {on_delete}" if on_delete else "")
+        )
+
+
+def upgrade() -> None:
+    # Children carry their workflow's start time as the partition key
+    for table in ("phase_history", "handoff_history"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(
+                sa.Column("workflow_started_at", sa.DateTime(timezone=True))
+            )
+        op.execute(
+            f"UPDATE {table} SET workflow_started_at = ("
+            f"SELECT started_at FROM workflow_history "
+            f"WHERE workflow_history.id = {table}.workflow_history_id)"
+        )
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column("workflow_started_at", nullable=False)
+
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    months = _months_to_cover(bind)
+    indexes = [
+        _rebuild(bind, table, partition_key, months)
+        for table, partition_key, *_ in TABLES
+    ]
+    # Dropping the old tables also drops the foreign keys between them
+    for table, *_ in reversed(TABLES):
+        op.execute(f"DROP TABLE {table}_old CASCADE")
+    _restore_keys_and_indexes(
+        [(table, partitioned_key) for table, _, partitioned_key, _ in TABLES],
+        indexes,
+        on_delete_cascade=True,
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        indexes = [_rebuild(bind, table, None, []) for table, *_ in TABLES]
+        # Drops the partitions together with each old parent
+        for table, *_ in reversed(TABLES):
+            op.execute(f"DROP TABLE {table}_old CASCADE")
+        _restore_keys_and_indexes(
+            [(table, original_key) for table, _, _, original_key in TABLES],
+            indexes,
+            on_delete_cascade=False,
+        )
+
+    for table in ("handoff_history", "phase_history"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("workflow_started_at")
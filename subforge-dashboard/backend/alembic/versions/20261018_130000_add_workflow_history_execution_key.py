@@ -0,0 +1,34 @@
+"""Add unique execution key to workflow history
+
+Batched history writes upsert on (execution_id, started_at). The key includes
+the partition column so PostgreSQL accepts it on the partitioned table, where
+indexes cannot be built concurrently.
+
+Revision ID: 20261018_130000
+Revises: 20261018_120000
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_130000"
+down_revision: Union[str, None] = "20261018_120000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "uq_workflow_history_execution",
+        "workflow_history",
+        ["execution_id", "started_at"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_workflow_history_execution", table_name="workflow_history")
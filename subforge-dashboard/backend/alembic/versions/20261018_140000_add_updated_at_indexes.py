@@ -0,0 +1,45 @@
+"""Index updated_at on tasks, agents and workflows
+
+The analytics data watermark reads ``max(updated_at)`` of these tables on
+every cached lookup; without an index each read is a full table scan.
+
+Revision ID: 20261018_140000
+Revises: 20261018_130000
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_140000"
+down_revision: Union[str, None] = "20261018_130000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ["tasks", "agents", "workflows"]
+
+
+def upgrade() -> None:
+    # Build without blocking writes to the live tables on PostgreSQL
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                op.f(f"ix_{table}_updated_at"),
+                table,
+                ["updated_at"],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.drop_index(
+                op.f(f"ix_{table}_updated_at"),
+                table_name=table,
+                postgresql_concurrently=True,
+            )
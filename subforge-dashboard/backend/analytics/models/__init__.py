@@ -4,6 +4,7 @@ Machine learning models and analyzers for SubForge dashboard
 """
 
 from .base_analyzer import AnalysisConfig, AnalysisResult, BaseAnalyzer
+from .model_registry import ModelArtifact, ModelRegistry
 from .optimization_engine import (
     OptimizationCategory,
     OptimizationEngine,
@@ -17,6 +18,7 @@ from .performance_analyzer import (
     SystemPerformanceMetrics,
 )
 from .predictive_models import (
+    IncrementalPredictor,
     ModelPerformance,
     PredictionResult,
     SystemLoadPredictor,
@@ -37,6 +39,9 @@ __all__ = [
     "SystemLoadPredictor",
     "PredictionResult",
     "ModelPerformance",
+    "IncrementalPredictor",
+    "ModelRegistry",
+    "ModelArtifact",
     # Optimization engine
     "OptimizationEngine",
     "OptimizationRecommendation",
@@ -7,7 +7,12 @@ import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Hashable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..utils.data_access import data_watermark
+from ..utils.result_cache import analytics_cache
 
 logger = logging.getLogger(__name__)
 
@@ -27,48 +32,86 @@ class BaseAnalyzer(ABC):
     """
     Base class for all analytics components
     Provides common functionality and interface
+
+    Analyzers whose heavy work is pure computation over data they can fetch
+    up front set ``supports_offloading`` and implement ``fetch_inputs`` and
+    ``compute_from_inputs``; an ``AnalysisExecutor`` then runs the
+    computation in a worker process instead of on the event loop.
     """
 
+    supports_offloading = False
+
     def __init__(self, config: Optional[AnalysisConfig] = None):
         self.config = config or AnalysisConfig()
         self.logger = logging.getLogger(self.__class__.__name__)
-        self._cache = {}
-        self._cache_timestamps = {}
+        # Results live in the shared analytics cache under this namespace
+        self._cache = analytics_cache
+        self._cache_namespace = self.__class__.__name__
 
     def _get_cache_key(self, method_name: str, **kwargs) -> str:
         """Generate cache key for method and parameters"""
         params_str = "_".join([f"{k}={v}" for k, v in sorted(kwargs.items())])
         return f"{method_name}_{params_str}"
 
-    def _is_cache_valid(self, cache_key: str) -> bool:
-        """Check if cached result is still valid"""
-        if not self.config.enable_caching:
-            return False
-
-        if cache_key not in self._cache_timestamps:
-            return False
-
-        cache_time = self._cache_timestamps[cache_key]
-        ttl = timedelta(minutes=self.config.cache_ttl_minutes)
+    @property
+    def _cache_ttl_seconds(self) -> float:
+        return self.config.cache_ttl_minutes * 60
 
-        return datetime.utcnow() - cache_time < ttl
-
-    def _set_cache(self, cache_key: str, result: Any) -> None:
+    def _set_cache(
+        self, cache_key: str, result: Any, watermark: Hashable = None
+    ) -> None:
         """Store result in cache"""
         if self.config.enable_caching:
-            self._cache[cache_key] = result
-            self._cache_timestamps[cache_key] = datetime.utcnow()
+            self._cache.set(
+                self._cache_namespace,
+                cache_key,
+                result,
+                ttl=self._cache_ttl_seconds,
+                watermark=watermark,
+            )
 
-    def _get_cache(self, cache_key: str) -> Optional[Any]:
+    def _get_cache(self, cache_key: str, watermark: Hashable = None) -> Optional[Any]:
         """Get result from cache"""
-        if self._is_cache_valid(cache_key):
-            return self._cache.get(cache_key)
-        return None
+        if not self.config.enable_caching:
+            return None
+        return self._cache.get(self._cache_namespace, cache_key, watermark)
+
+    async def analyze_cached(
+        self,
+        db: AsyncSession,
+        watermark: Hashable = None,
+        executor=None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        ``analyze`` through the shared cache
+
+        The result is reused until it expires or the data watermark moves;
+        pass ``watermark`` when the caller has already read it. With an
+        ``executor`` the analysis runs through it (see ``AnalysisExecutor``).
+        """
+
+        def compute():
+            if executor is None:
+                return self.analyze(db, **kwargs)
+            return executor.run(self, db, **kwargs)
+
+        if not self.config.enable_caching:
+            return await compute()
+
+        if watermark is None:
+            watermark = await data_watermark(db)
+        return await self._cache.get_or_compute(
+            self._cache_namespace,
+            self._get_cache_key("analyze", **kwargs),
+            compute,
+            ttl=self._cache_ttl_seconds,
+            watermark=watermark,
+        )
 
     def clear_cache(self) -> None:
         """Clear all cached results"""
-        self._cache.clear()
-        self._cache_timestamps.clear()
+        self._cache.invalidate(self._cache_namespace)
         self.logger.info("Analytics cache cleared")
 
     def _validate_sample_size(
@@ -266,6 +309,21 @@ class BaseAnalyzer(ABC):
         Main analysis method - must be implemented by subclasses
         """
 
+    async def fetch_inputs(self, db: AsyncSession, **kwargs) -> Any:
+        """
+        Load everything ``compute_from_inputs`` needs, as picklable arrays
+        or frames; only called when ``supports_offloading`` is set
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def compute_from_inputs(cls, inputs: Any, **kwargs) -> Dict[str, Any]:
+        """
+        Produce the ``analyze`` result from prefetched inputs without any
+        database access; runs in a worker process
+        """
+        raise NotImplementedError
+
     def get_config(self) -> Dict[str, Any]:
         """Get current configuration"""
         return {
@@ -292,8 +350,8 @@ class BaseAnalyzer(ABC):
         try:
             return {
                 "status": "healthy",
-                "cache_size": len(self._cache),
-                "cache_entries": list(self._cache.keys()),
+                "cache_size": self._cache.size(self._cache_namespace),
+                "cache_entries": self._cache.keys(self._cache_namespace),
                 "config": self.get_config(),
                 "last_check": datetime.utcnow().isoformat(),
             }
@@ -0,0 +1,156 @@
+"""
+Model Registry for SubForge Dashboard
+Versioned on-disk storage for trained predictive models and their feature pipelines
+"""
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelArtifact:
+    """A trained model together with everything needed to use it"""
+
+    name: str
+    version: int
+    # Estimator, fitted scaler, feature columns, category codes, ...
+    bundle: Dict[str, Any]
+    # Latest source row timestamp the model has been trained on
+    training_watermark: Optional[datetime]
+    trained_at: datetime
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class _ManifestEntry:
+    version: int
+    file: str
+    training_watermark: Optional[str]
+    trained_at: str
+    metadata: Dict[str, Any]
+
+
+class ModelRegistry:
+    """
+    Stores model artifacts as ``<root>/<name>/v<version>.joblib``
+
+    ``<root>/<name>/manifest.json`` lists the saved versions with their
+    training watermark and metadata; the highest version is the current one.
+    Artifacts are written to a temporary file and renamed into place, so a
+    crash never leaves a half-written current model. Only the newest
+    ``keep_versions`` artifacts are kept on disk.
+    """
+
+    def __init__(self, root: Path, keep_versions: int = 3):
+        self.root = Path(root)
+        self.keep_versions = keep_versions
+        self.logger = logger
+
+    def save(
+        self,
+        name: str,
+        bundle: Dict[str, Any],
+        training_watermark: Optional[datetime],
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> ModelArtifact:
+        """Persist ``bundle`` as the next version of ``name``"""
+        model_dir = self.root / name
+        model_dir.mkdir(parents=True, exist_ok=True)
+
+        manifest = self._read_manifest(name)
+        version = manifest[-1].version + 1 if manifest else 1
+        artifact = ModelArtifact(
+            name=name,
+            version=version,
+            bundle=bundle,
+            training_watermark=training_watermark,
+            trained_at=datetime.utcnow(),
+            metadata=metadata or {},
+        )
+
+        filename = f"v{version}.joblib"
+        tmp_path = model_dir / f".{filename}.tmp"
+        joblib.dump(bundle, tmp_path)
+        os.replace(tmp_path, model_dir / filename)
+
+        manifest.append(
+            _ManifestEntry(
+                version=version,
+                file=filename,
+                training_watermark=(
+                    training_watermark.isoformat() if training_watermark else None
+                ),
+                trained_at=artifact.trained_at.isoformat(),
+                metadata=artifact.metadata,
+            )
+        )
+        self._prune(name, manifest)
+        self._write_manifest(name, manifest)
+
+        self.logger.info(f"Saved model {name} v{version}")
+        return artifact
+
+    def load_latest(self, name: str) -> Optional[ModelArtifact]:
+        """Newest loadable version of ``name``, or None"""
+        for entry in reversed(self._read_manifest(name)):
+            try:
+                bundle = joblib.load(self.root / name / entry.file)
+            except Exception as e:
+                self.logger.warning(
+                    f"Could not load model {name} v{entry.version}: {e}"
+                )
+                continue
+            return ModelArtifact(
+                name=name,
+                version=entry.version,
+                bundle=bundle,
+                training_watermark=(
+                    datetime.fromisoformat(entry.training_watermark)
+                    if entry.training_watermark
+                    else None
+                ),
+                trained_at=datetime.fromisoformat(entry.trained_at),
+                metadata=entry.metadata,
+            )
+        return None
+
+    def list_versions(self, name: str) -> List[Dict[str, Any]]:
+        return [asdict(entry) for entry in self._read_manifest(name)]
+
+    def _prune(self, name: str, manifest: List[_ManifestEntry]):
+        while len(manifest) > self.keep_versions:
+            entry = manifest.pop(0)
+            try:
+                (self.root / name / entry.file).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _manifest_path(self, name: str) -> Path:
+        return self.root / name / "manifest.json"
+
+    def _read_manifest(self, name: str) -> List[_ManifestEntry]:
+        path = self._manifest_path(name)
+        if not path.exists():
+            return []
+        try:
+            with open(path) as f:
+                return [_ManifestEntry(**entry) for entry in json.load(f)]
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+            return []
+
+    def _write_manifest(self, name: str, manifest: List[_ManifestEntry]):
+        path = self._manifest_path(name)
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump([asdict(entry) for entry in manifest], f, indent=2, default=str)
+        os.replace(tmp_path, path)
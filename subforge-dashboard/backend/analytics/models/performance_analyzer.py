@@ -4,13 +4,15 @@ Analyzes agent performance metrics, task completion rates, and system efficiency
 """
 
 import logging
+from collections import defaultdict
 from dataclasses import asdict, dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from typing import Any, Dict, List, Optional
 
 import numpy as np
 from scipy import stats
-from sqlalchemy import and_, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...app.models.agent import Agent
@@ -82,15 +84,125 @@ class SystemPerformanceMetrics:
     optimization_opportunities: List[Dict[str, Any]]
 
 
+# Columns snapshotted by fetch_inputs; plain namespaces pickle to workers
+AGENT_COLUMNS = (
+    Agent.id,
+    Agent.name,
+    Agent.agent_type,
+    Agent.status,
+    Agent.success_rate,
+    Agent.uptime_percentage,
+)
+TASK_COLUMNS = (
+    Task.assigned_agent_id,
+    Task.status,
+    Task.created_at,
+    Task.actual_duration_minutes,
+    Task.quality_score,
+)
+SYSTEM_METRICS_COLUMNS = (
+    SystemMetrics.cpu_usage_percentage,
+    SystemMetrics.memory_usage_percentage,
+    SystemMetrics.system_load_percentage,
+    SystemMetrics.api_requests_per_minute,
+)
+
+
+def _snapshot(row) -> SimpleNamespace:
+    """Detached, picklable copy of a result row; timestamps as naive UTC"""
+    values = row._asdict()
+    for key, value in values.items():
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            values[key] = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return SimpleNamespace(**values)
+
+
 class PerformanceAnalyzer(BaseAnalyzer):
     """
     Comprehensive performance analyzer for SubForge system
+
+    Agents, the tasks created in the time range and the latest system metrics
+    are fetched in three queries; every score, trend and report is computed
+    from those snapshots, so the computation can run in a worker process.
     """
 
+    supports_offloading = True
+
     def __init__(self):
         super().__init__()
         self.logger = logging.getLogger(__name__)
 
+    async def analyze(
+        self,
+        db: AsyncSession,
+        agent_id: Optional[str] = None,
+        time_range_hours: int = 24,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Main analysis method - full performance report, or one agent's metrics"""
+        inputs = await self.fetch_inputs(
+            db, agent_id=agent_id, time_range_hours=time_range_hours
+        )
+        return self._analyze_inputs(inputs, agent_id, time_range_hours)
+
+    async def fetch_inputs(
+        self,
+        db: AsyncSession,
+        agent_id: Optional[str] = None,
+        time_range_hours: int = 24,
+        include_system: bool = True,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Snapshot agents, tasks in range and the latest system metrics"""
+        start_time = datetime.utcnow() - timedelta(hours=time_range_hours)
+
+        agent_query = select(*AGENT_COLUMNS)
+        task_query = select(*TASK_COLUMNS).where(Task.created_at >= start_time)
+        if agent_id:
+            agent_query = agent_query.where(Agent.id == agent_id)
+            task_query = task_query.where(Task.assigned_agent_id == agent_id)
+
+        agents = [_snapshot(row) for row in await db.execute(agent_query)]
+        tasks = [_snapshot(row) for row in await db.execute(task_query)]
+
+        latest_metrics = None
+        if include_system:
+            result = await db.execute(
+                select(*SYSTEM_METRICS_COLUMNS)
+                .order_by(SystemMetrics.recorded_at.desc())
+                .limit(1)
+            )
+            row = result.first()
+            latest_metrics = _snapshot(row) if row is not None else None
+
+        return {
+            "start_time": start_time,
+            "agents": agents,
+            "tasks": tasks,
+            "latest_metrics": latest_metrics,
+        }
+
+    @classmethod
+    def compute_from_inputs(
+        cls,
+        inputs: Dict[str, Any],
+        agent_id: Optional[str] = None,
+        time_range_hours: int = 24,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        return cls()._analyze_inputs(inputs, agent_id, time_range_hours)
+
+    def _analyze_inputs(
+        self,
+        inputs: Dict[str, Any],
+        agent_id: Optional[str],
+        time_range_hours: int,
+    ) -> Dict[str, Any]:
+        if agent_id is not None:
+            agent_metrics = self._agent_metrics(inputs)
+            return {"agent_metrics": [asdict(metrics) for metrics in agent_metrics]}
+        return self._performance_report(inputs, time_range_hours)
+
     async def analyze_agent_performance(
         self,
         db: AsyncSession,
@@ -109,45 +221,41 @@ class PerformanceAnalyzer(BaseAnalyzer):
             List of agent performance metrics
         """
         try:
-            start_time = datetime.utcnow() - timedelta(hours=time_range_hours)
-
-            # Build query
-            agent_query = select(Agent)
-            if agent_id:
-                agent_query = agent_query.where(Agent.id == agent_id)
-
-            result = await db.execute(agent_query)
-            agents = result.scalars().all()
-
-            performance_metrics = []
-
-            for agent in agents:
-                metrics = await self._analyze_single_agent(db, agent, start_time)
-                performance_metrics.append(metrics)
-
-            # Sort by efficiency score
-            performance_metrics.sort(key=lambda x: x.efficiency_score, reverse=True)
-
-            self.logger.info(
-                f"Analyzed performance for {len(performance_metrics)} agents"
+            inputs = await self.fetch_inputs(
+                db,
+                agent_id=agent_id,
+                time_range_hours=time_range_hours,
+                include_system=False,
             )
-            return performance_metrics
+            return self._agent_metrics(inputs)
 
         except Exception as e:
             self.logger.error(f"Error analyzing agent performance: {e}")
             raise
 
-    async def _analyze_single_agent(
-        self, db: AsyncSession, agent: Agent, start_time: datetime
-    ) -> AgentPerformanceMetrics:
-        """Analyze performance metrics for a single agent"""
+    def _agent_metrics(self, inputs: Dict[str, Any]) -> List[AgentPerformanceMetrics]:
+        """Per-agent metrics from snapshots, best efficiency first"""
+        tasks_by_agent = defaultdict(list)
+        for task in inputs["tasks"]:
+            tasks_by_agent[task.assigned_agent_id].append(task)
 
-        # Get agent tasks in time range
-        task_query = select(Task).where(
-            and_(Task.assigned_agent_id == agent.id, Task.created_at >= start_time)
-        )
-        result = await db.execute(task_query)
-        tasks = result.scalars().all()
+        performance_metrics = [
+            self._analyze_single_agent(
+                agent, tasks_by_agent.get(agent.id, []), inputs["start_time"]
+            )
+            for agent in inputs["agents"]
+        ]
+
+        # Sort by efficiency score
+        performance_metrics.sort(key=lambda x: x.efficiency_score, reverse=True)
+
+        self.logger.info(f"Analyzed performance for {len(performance_metrics)} agents")
+        return performance_metrics
+
+    def _analyze_single_agent(
+        self, agent, tasks: List[Any], start_time: datetime
+    ) -> AgentPerformanceMetrics:
+        """Analyze performance metrics for a single agent from its tasks in range"""
 
         # Calculate basic metrics
         completed_tasks = [t for t in tasks if t.status == "completed"]
@@ -189,7 +297,7 @@ class PerformanceAnalyzer(BaseAnalyzer):
         idle_time_percentage = 100 - agent.uptime_percentage
 
         # Analyze performance trend
-        trend_data = await self._analyze_performance_trend(db, agent.id, start_time)
+        trend_data = self._analyze_performance_trend(completed_tasks, start_time)
 
         return AgentPerformanceMetrics(
             agent_id=str(agent.id),
@@ -213,9 +321,7 @@ class PerformanceAnalyzer(BaseAnalyzer):
             trend_confidence=trend_data["confidence"],
         )
 
-    def _calculate_productivity_score(
-        self, agent: Agent, completed_tasks: List[Task]
-    ) -> float:
+    def _calculate_productivity_score(self, agent, completed_tasks: List[Any]) -> float:
         """Calculate productivity score based on tasks completed and complexity"""
         if not completed_tasks:
             return 0.0
@@ -240,39 +346,34 @@ class PerformanceAnalyzer(BaseAnalyzer):
         """Calculate reliability score based on success rate and uptime"""
         return (success_rate * 0.7) + (uptime_percentage * 0.3)
 
-    async def _analyze_performance_trend(
-        self, db: AsyncSession, agent_id: str, start_time: datetime
+    def _analyze_performance_trend(
+        self, completed_tasks: List[Any], start_time: datetime
     ) -> Dict[str, Any]:
-        """Analyze performance trend for an agent"""
+        """Analyze performance trend for an agent from its completed tasks"""
 
         try:
-            # Get historical performance data
-            intervals = 6  # Analyze in 6 intervals
+            # Count completions in 6 equal intervals up to now
+            intervals = 6
             interval_hours = (
                 (datetime.utcnow() - start_time).total_seconds() / 3600 / intervals
             )
 
-            performance_points = []
-
-            for i in range(intervals):
-                interval_start = start_time + timedelta(hours=i * interval_hours)
-                interval_end = start_time + timedelta(hours=(i + 1) * interval_hours)
-
-                task_query = select(Task).where(
-                    and_(
-                        Task.assigned_agent_id == agent_id,
-                        Task.created_at >= interval_start,
-                        Task.created_at < interval_end,
-                        Task.status == "completed",
-                    )
+            counts = [0] * intervals
+            for task in completed_tasks:
+                if task.created_at is None or interval_hours <= 0:
+                    continue
+                index = int(
+                    (task.created_at - start_time).total_seconds()
+                    / 3600
+                    / interval_hours
                 )
+                if 0 <= index < intervals:
+                    counts[index] += 1
 
-                result = await db.execute(task_query)
-                tasks = result.scalars().all()
-
-                # Simple performance metric: tasks completed per hour
-                performance = len(tasks) / interval_hours if interval_hours > 0 else 0
-                performance_points.append(performance)
+            # Simple performance metric: tasks completed per hour
+            performance_points = [
+                count / interval_hours if interval_hours > 0 else 0 for count in counts
+            ]
 
             if len(performance_points) < 3:
                 return {"trend": "insufficient_data", "confidence": 0.0}
@@ -314,86 +415,73 @@ class PerformanceAnalyzer(BaseAnalyzer):
             System performance metrics
         """
         try:
-            start_time = datetime.utcnow() - timedelta(hours=time_range_hours)
-
-            # Get system data
-            agents_result = await db.execute(select(Agent))
-            agents = agents_result.scalars().all()
-
-            tasks_result = await db.execute(
-                select(Task).where(Task.created_at >= start_time)
-            )
-            tasks = tasks_result.scalars().all()
-
-            # Calculate basic metrics
-            total_agents = len(agents)
-            active_agents = len([a for a in agents if a.status == "active"])
-            total_tasks = len(tasks)
-            completed_tasks = len([t for t in tasks if t.status == "completed"])
+            inputs = await self.fetch_inputs(db, time_range_hours=time_range_hours)
+            return self._system_metrics(inputs)
 
-            # Calculate performance indicators
-            overall_success_rate = (
-                (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-            )
+        except Exception as e:
+            self.logger.error(f"Error analyzing system performance: {e}")
+            raise
 
-            completion_times = [
-                t.actual_duration_minutes
-                for t in tasks
-                if t.actual_duration_minutes is not None and t.status == "completed"
-            ]
-            avg_task_completion_time = (
-                np.mean(completion_times) if completion_times else 0
-            )
+    def _system_metrics(self, inputs: Dict[str, Any]) -> SystemPerformanceMetrics:
+        """System-wide metrics from snapshots"""
+        agents = inputs["agents"]
+        tasks = inputs["tasks"]
 
-            # Calculate system efficiency
-            system_efficiency = self._calculate_system_efficiency(agents, tasks)
+        # Calculate basic metrics
+        total_agents = len(agents)
+        active_agents = len([a for a in agents if a.status == "active"])
+        total_tasks = len(tasks)
+        completed_tasks = len([t for t in tasks if t.status == "completed"])
 
-            # Get latest system metrics for resource utilization
-            latest_metrics_result = await db.execute(
-                select(SystemMetrics)
-                .order_by(SystemMetrics.recorded_at.desc())
-                .limit(1)
-            )
-            latest_metrics = latest_metrics_result.scalar_one_or_none()
+        # Calculate performance indicators
+        overall_success_rate = (
+            (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+        )
 
-            if latest_metrics:
-                cpu_utilization = latest_metrics.cpu_usage_percentage
-                memory_utilization = latest_metrics.memory_usage_percentage
-                system_load = latest_metrics.system_load_percentage
-                network_utilization = latest_metrics.api_requests_per_minute
-            else:
-                cpu_utilization = memory_utilization = system_load = (
-                    network_utilization
-                ) = 0
-
-            # Identify bottlenecks and optimization opportunities
-            bottlenecks = await self._identify_bottlenecks(db, agents, tasks)
-            optimization_opportunities = (
-                await self._identify_optimization_opportunities(db, agents, tasks)
-            )
+        completion_times = [
+            t.actual_duration_minutes
+            for t in tasks
+            if t.actual_duration_minutes is not None and t.status == "completed"
+        ]
+        avg_task_completion_time = np.mean(completion_times) if completion_times else 0
+
+        # Calculate system efficiency
+        system_efficiency = self._calculate_system_efficiency(agents, tasks)
+
+        # Latest system metrics for resource utilization
+        latest_metrics = inputs["latest_metrics"]
+        if latest_metrics:
+            cpu_utilization = latest_metrics.cpu_usage_percentage
+            memory_utilization = latest_metrics.memory_usage_percentage
+            system_load = latest_metrics.system_load_percentage
+            network_utilization = latest_metrics.api_requests_per_minute
+        else:
+            cpu_utilization = memory_utilization = system_load = network_utilization = 0
 
-            return SystemPerformanceMetrics(
-                total_agents=total_agents,
-                active_agents=active_agents,
-                total_tasks=total_tasks,
-                completed_tasks=completed_tasks,
-                system_efficiency=system_efficiency,
-                overall_success_rate=overall_success_rate,
-                avg_task_completion_time=avg_task_completion_time,
-                system_load=system_load,
-                cpu_utilization=cpu_utilization,
-                memory_utilization=memory_utilization,
-                network_utilization=network_utilization,
-                bottlenecks=bottlenecks,
-                optimization_opportunities=optimization_opportunities,
-            )
+        # Identify bottlenecks and optimization opportunities
+        bottlenecks = self._identify_bottlenecks(agents, tasks)
+        optimization_opportunities = self._identify_optimization_opportunities(
+            agents, tasks
+        )
 
-        except Exception as e:
-            self.logger.error(f"Error analyzing system performance: {e}")
-            raise
+        return SystemPerformanceMetrics(
+            total_agents=total_agents,
+            active_agents=active_agents,
+            total_tasks=total_tasks,
+            completed_tasks=completed_tasks,
+            system_efficiency=system_efficiency,
+            overall_success_rate=overall_success_rate,
+            avg_task_completion_time=avg_task_completion_time,
+            system_load=system_load,
+            cpu_utilization=cpu_utilization,
+            memory_utilization=memory_utilization,
+            network_utilization=network_utilization,
+            bottlenecks=bottlenecks,
+            optimization_opportunities=optimization_opportunities,
+        )
 
     def _calculate_system_efficiency(
-        self, agents: List[Agent], tasks: List[Task]
+        self, agents: List[Any], tasks: List[Any]
     ) -> float:
         """Calculate overall system efficiency score"""
         if not agents or not tasks:
@@ -420,8 +508,8 @@ class PerformanceAnalyzer(BaseAnalyzer):
 
         return min(efficiency, 100.0)
 
-    async def _identify_bottlenecks(
-        self, db: AsyncSession, agents: List[Agent], tasks: List[Task]
+    def _identify_bottlenecks(
+        self, agents: List[Any], tasks: List[Any]
     ) -> List[Dict[str, Any]]:
         """Identify system bottlenecks"""
         bottlenecks = []
@@ -473,8 +561,8 @@ class PerformanceAnalyzer(BaseAnalyzer):
 
         return bottlenecks
 
-    async def _identify_optimization_opportunities(
-        self, db: AsyncSession, agents: List[Agent], tasks: List[Task]
+    def _identify_optimization_opportunities(
+        self, agents: List[Any], tasks: List[Any]
     ) -> List[Dict[str, Any]]:
         """Identify optimization opportunities"""
         opportunities = []
@@ -552,60 +640,60 @@ class PerformanceAnalyzer(BaseAnalyzer):
             Comprehensive performance report
         """
         try:
-            # Get all performance data
-            agent_metrics = await self.analyze_agent_performance(
-                db, time_range_hours=time_range_hours
-            )
-            system_metrics = await self.analyze_system_performance(
-                db, time_range_hours=time_range_hours
-            )
-
-            # Generate summary statistics
-            if agent_metrics:
-                top_performers = sorted(
-                    agent_metrics, key=lambda x: x.efficiency_score, reverse=True
-                )[:5]
-                bottom_performers = sorted(
-                    agent_metrics, key=lambda x: x.efficiency_score
-                )[:3]
-                avg_efficiency = np.mean([m.efficiency_score for m in agent_metrics])
-                avg_success_rate = np.mean([m.success_rate for m in agent_metrics])
-            else:
-                top_performers = bottom_performers = []
-                avg_efficiency = avg_success_rate = 0
-
-            # Generate insights
-            insights = self._generate_performance_insights(
-                agent_metrics, system_metrics
-            )
-
-            report = {
-                "report_metadata": {
-                    "generated_at": datetime.utcnow().isoformat(),
-                    "time_range_hours": time_range_hours,
-                    "report_type": "performance_analysis",
-                },
-                "system_overview": asdict(system_metrics),
-                "agent_summary": {
-                    "total_agents_analyzed": len(agent_metrics),
-                    "average_efficiency_score": avg_efficiency,
-                    "average_success_rate": avg_success_rate,
-                    "top_performers": [asdict(agent) for agent in top_performers],
-                    "needs_attention": [asdict(agent) for agent in bottom_performers],
-                },
-                "detailed_agent_metrics": [asdict(agent) for agent in agent_metrics],
-                "insights_and_recommendations": insights,
-                "next_analysis_scheduled": (
-                    datetime.utcnow() + timedelta(hours=1)
-                ).isoformat(),
-            }
-
-            return report
+            inputs = await self.fetch_inputs(db, time_range_hours=time_range_hours)
+            return self._performance_report(inputs, time_range_hours)
 
         except Exception as e:
             self.logger.error(f"Error generating performance report: {e}")
             raise
 
+    def _performance_report(
+        self, inputs: Dict[str, Any], time_range_hours: int
+    ) -> Dict[str, Any]:
+        """Performance report from snapshots"""
+        agent_metrics = self._agent_metrics(inputs)
+        system_metrics = self._system_metrics(inputs)
+
+        # Generate summary statistics
+        if agent_metrics:
+            top_performers = sorted(
+                agent_metrics, key=lambda x: x.efficiency_score, reverse=True
+            )[:5]
+            bottom_performers = sorted(agent_metrics, key=lambda x: x.efficiency_score)[
+                :3
+            ]
+            avg_efficiency = np.mean([m.efficiency_score for m in agent_metrics])
+            avg_success_rate = np.mean([m.success_rate for m in agent_metrics])
+        else:
+            top_performers = bottom_performers = []
+            avg_efficiency = avg_success_rate = 0
+
+        # Generate insights
+        insights = self._generate_performance_insights(agent_metrics, system_metrics)
+
+        report = {
+            "report_metadata": {
+                "generated_at": datetime.utcnow().isoformat(),
+                "time_range_hours": time_range_hours,
+                "report_type": "performance_analysis",
+            },
+            "system_overview": asdict(system_metrics),
+            "agent_summary": {
+                "total_agents_analyzed": len(agent_metrics),
+                "average_efficiency_score": avg_efficiency,
+                "average_success_rate": avg_success_rate,
+                "top_performers": [asdict(agent) for agent in top_performers],
+                "needs_attention": [asdict(agent) for agent in bottom_performers],
+            },
+            "detailed_agent_metrics": [asdict(agent) for agent in agent_metrics],
+            "insights_and_recommendations": insights,
+            "next_analysis_scheduled": (
+                datetime.utcnow() + timedelta(hours=1)
+            ).isoformat(),
+        }
+
+        return report
+
     def _generate_performance_insights(
         self,
         agent_metrics: List[AgentPerformanceMetrics],
@@ -666,4 +754,4 @@ class PerformanceAnalyzer(BaseAnalyzer):
                 "Investigate and improve low-performing agents"
             )
 
-        return insights
\ No newline at end of file
+        return insights
@@ -3,10 +3,13 @@ Predictive Analytics Models for SubForge Dashboard
 Machine learning models for task completion prediction and system load forecasting
 """
 
+import asyncio
+import copy
 import logging
+from abc import abstractmethod
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -15,13 +18,14 @@ from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sqlalchemy import and_, select
+from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...app.models.agent import Agent
 from ...app.models.system_metrics import SystemMetrics
 from ...app.models.task import Task
 from .base_analyzer import BaseAnalyzer
+from .model_registry import ModelRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -49,14 +53,172 @@ class ModelPerformance:
     accuracy_percentage: float
 
 
-class TaskDurationPredictor(BaseAnalyzer):
+def _extend_estimator(
+    model, X: np.ndarray, y: np.ndarray, extra_estimators: int, max_estimators: int
+) -> bool:
+    """
+    Update a fitted estimator with new samples, in place
+
+    Estimators with ``partial_fit`` take the samples directly; forests and
+    boosted ensembles are warm-started with ``extra_estimators`` more trees or
+    stages fitted on the new samples, as long as the ensemble stays within
+    ``max_estimators``. Returns False when the estimator can only be refitted
+    from scratch, which is also the case once an ensemble is full.
+    """
+    if hasattr(model, "partial_fit"):
+        model.partial_fit(X, y)
+        return True
+    if isinstance(model, (RandomForestRegressor, GradientBoostingRegressor)):
+        if model.n_estimators + extra_estimators > max_estimators:
+            return False
+        model.set_params(
+            warm_start=True, n_estimators=model.n_estimators + extra_estimators
+        )
+        model.fit(X, y)
+        return True
+    return False
+
+
+def _latest_timestamp(values) -> Optional[datetime]:
+    """Latest timestamp of a Series or iterable, as a plain datetime"""
+    latest = max((value for value in values if not pd.isna(value)), default=None)
+    return latest.to_pydatetime() if isinstance(latest, pd.Timestamp) else latest
+
+
+class IncrementalPredictor(BaseAnalyzer):
+    """
+    Base class for predictors that persist their models and learn incrementally
+
+    A trained model and its feature pipeline are saved to the ``registry``
+    together with the training watermark, the latest source row timestamp
+    the model has seen, and loaded again by ``load_model`` at startup.
+    ``update_model`` is meant for a background job: it folds rows newer than
+    the watermark into the current model and falls back to a full refit when
+    there is no model yet, the estimator cannot be extended, or the last full
+    fit is older than ``full_refit_interval``. Each update of a tree ensemble
+    adds ``incremental_estimators`` trees, so once it would grow past
+    ``max_estimators`` the model is refitted from scratch on the full
+    history instead, which bounds both the model size and the prediction
+    latency. Requests then only predict.
+    """
+
+    registry_name: str = ""
+
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        super().__init__()
+        self.registry = registry
+        self.model_version = 0
+        self.training_watermark: Optional[datetime] = None
+        self.last_full_fit: Optional[datetime] = None
+        self.full_refit_interval = timedelta(hours=24)
+        self.min_update_samples = 10
+        self.incremental_estimators = 10
+        self.max_estimators = 200
+
+    @abstractmethod
+    def _model_bundle(self) -> Dict[str, Any]:
+        """Everything needed to predict, as persisted in the registry"""
+
+    @abstractmethod
+    def _restore_bundle(self, bundle: Dict[str, Any]):
+        """Inverse of ``_model_bundle``"""
+
+    def load_model(self) -> bool:
+        """Restore the newest persisted model; True when one was found"""
+        if self.registry is None:
+            return False
+        artifact = self.registry.load_latest(self.registry_name)
+        if artifact is None:
+            return False
+
+        self._restore_bundle(artifact.bundle)
+        self.model_version = artifact.version
+        self.training_watermark = artifact.training_watermark
+        self.last_full_fit = artifact.bundle.get("last_full_fit")
+        self.model_trained = True
+        self.logger.info(
+            f"Loaded {self.registry_name} model v{artifact.version} "
+            f"(trained up to {artifact.training_watermark})"
+        )
+        return True
+
+    async def _save_model(self, metadata: Dict[str, Any]):
+        if self.registry is None:
+            return
+        try:
+            artifact = await asyncio.to_thread(
+                self.registry.save,
+                self.registry_name,
+                self._model_bundle(),
+                self.training_watermark,
+                metadata,
+            )
+            self.model_version = artifact.version
+        except Exception as e:
+            self.logger.error(f"Error saving {self.registry_name} model: {e}")
+
+    def _needs_full_refit(self) -> bool:
+        return (
+            not self.model_trained
+            or self.training_watermark is None
+            or self.last_full_fit is None
+            or datetime.utcnow() - self.last_full_fit >= self.full_refit_interval
+        )
+
+    async def _extend_model(
+        self, X_new: np.ndarray, y_new: np.ndarray
+    ) -> Optional[ModelPerformance]:
+        """
+        Fold new samples into a copy of the model and swap it in
+
+        The new samples are scored before the update, so the reported
+        performance is measured on data the model had not seen. Returns None
+        when the estimator cannot be extended or has reached
+        ``max_estimators``.
+        """
+        X_scaled = self.scaler.transform(X_new)
+        predictions = self.model.predict(X_scaled)
+
+        # Predictions keep using the current model while the copy trains
+        model = copy.deepcopy(self.model)
+        extended = await asyncio.to_thread(
+            _extend_estimator,
+            model,
+            X_scaled,
+            y_new,
+            self.incremental_estimators,
+            self.max_estimators,
+        )
+        if not extended:
+            return None
+        self.model = model
+
+        mse = mean_squared_error(y_new, predictions)
+        r2 = r2_score(y_new, predictions)
+        return ModelPerformance(
+            mse=mse,
+            rmse=np.sqrt(mse),
+            r2_score=r2,
+            mean_absolute_error=np.mean(np.abs(y_new - predictions)),
+            accuracy_percentage=max(0, r2 * 100),
+        )
+
+
+class TaskDurationPredictor(IncrementalPredictor):
     """
     Machine learning model to predict task completion times
     Uses historical task data to train predictive models
+
+    Training stays with this instance; ``fetch_inputs`` hands the trained
+    bundle and the pending tasks to ``compute_from_inputs``, which predicts
+    in a worker process.
     """
 
-    def __init__(self):
-        super().__init__()
+    registry_name = "task_duration"
+    supports_offloading = True
+
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        super().__init__(registry)
         self.model = None
         self.scaler = StandardScaler()
         self.feature_columns = [
@@ -73,14 +235,37 @@ class TaskDurationPredictor(BaseAnalyzer):
         ]
         self.model_trained = False
         self.training_history = []
+        # Stable integer codes for categorical features, extended as new
+        # categories appear so incremental updates keep earlier codes
+        self.category_codes: Dict[str, Dict[str, int]] = {
+            "agent_type": {},
+            "task_type": {},
+        }
 
     async def analyze(self, db: AsyncSession, **kwargs) -> Dict[str, Any]:
         """Main analysis method - trains model and generates predictions"""
+        inputs = await self.fetch_inputs(db)
+        return self._analyze_pending(inputs["pending_tasks"])
+
+    async def fetch_inputs(self, db: AsyncSession, **kwargs) -> Dict[str, Any]:
+        """The trained model bundle and the pending tasks to predict"""
         await self.train_model(db)
-        predictions = await self.predict_task_durations(db)
+        return {
+            "bundle": self._model_bundle(),
+            "pending_tasks": await self._pending_tasks(db),
+        }
+
+    @classmethod
+    def compute_from_inputs(cls, inputs: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        predictor = cls()
+        predictor._restore_bundle(inputs["bundle"])
+        predictor.model_trained = True
+        return predictor._analyze_pending(inputs["pending_tasks"])
+
+    def _analyze_pending(self, pending_tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
         return {
             "model_performance": self.get_model_performance(),
-            "predictions": predictions,
+            "predictions": self._predict_pending(pending_tasks),
             "feature_importance": self.get_feature_importance(),
         }
 
@@ -116,90 +301,193 @@ class TaskDurationPredictor(BaseAnalyzer):
                 self.logger.error("No valid features extracted")
                 return self._create_default_model()
 
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
+            # Model selection is CPU-bound; keep it off the event loop
+            scaler, model, best_model_name, performance, training_size = (
+                await asyncio.to_thread(self._fit_best_model, X, y)
             )
+            self.scaler = scaler
+            self.model = model
 
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            self.model_trained = True
+            self.training_watermark = _latest_timestamp(training_data["updated_at"])
+            self.last_full_fit = datetime.utcnow()
+            self._record_training(best_model_name, performance, training_size, "full")
 
-            # Train ensemble model
-            models = {
-                "random_forest": RandomForestRegressor(
-                    n_estimators=100, random_state=42
-                ),
-                "gradient_boosting": GradientBoostingRegressor(
-                    n_estimators=100, random_state=42
-                ),
-                "linear_regression": LinearRegression(),
-            }
+            self.logger.info(
+                f"Model trained successfully. Best model: {best_model_name}, "
+                f"R2 Score: {performance.r2_score:.3f}"
+            )
 
-            model_performances = {}
-            trained_models = {}
+            await self._save_model(self.training_history[-1])
+            return performance
 
-            for name, model in models.items():
-                model.fit(X_train_scaled, y_train)
-                predictions = model.predict(X_test_scaled)
+        except Exception as e:
+            self.logger.error(f"Error training model: {e}")
+            return self._create_default_model()
 
-                mse = mean_squared_error(y_test, predictions)
-                r2 = r2_score(y_test, predictions)
+    def _fit_best_model(self, X: np.ndarray, y: np.ndarray):
+        """Fit the candidate models on a fresh scaler and keep the best one"""
+        # Split data
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42
+        )
 
-                model_performances[name] = {"mse": mse, "r2": r2, "rmse": np.sqrt(mse)}
-                trained_models[name] = model
+        # Scale features
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+
+        # Train ensemble model
+        models = {
+            "random_forest": RandomForestRegressor(n_estimators=100, random_state=42),
+            "gradient_boosting": GradientBoostingRegressor(
+                n_estimators=100, random_state=42
+            ),
+            "linear_regression": LinearRegression(),
+        }
 
-            # Select best performing model
-            best_model_name = max(
-                model_performances.keys(), key=lambda k: model_performances[k]["r2"]
-            )
-            self.model = trained_models[best_model_name]
-
-            # Calculate final performance metrics
-            final_predictions = self.model.predict(X_test_scaled)
-            performance = ModelPerformance(
-                mse=mean_squared_error(y_test, final_predictions),
-                rmse=np.sqrt(mean_squared_error(y_test, final_predictions)),
-                r2_score=r2_score(y_test, final_predictions),
-                mean_absolute_error=np.mean(np.abs(y_test - final_predictions)),
-                accuracy_percentage=max(0, r2_score(y_test, final_predictions) * 100),
-            )
+        model_performances = {}
+        trained_models = {}
 
-            self.model_trained = True
-            self.training_history.append(
-                {
-                    "timestamp": datetime.utcnow(),
-                    "best_model": best_model_name,
-                    "performance": asdict(performance),
-                    "training_size": len(X_train),
-                }
+        for name, model in models.items():
+            model.fit(X_train_scaled, y_train)
+            predictions = model.predict(X_test_scaled)
+
+            mse = mean_squared_error(y_test, predictions)
+            r2 = r2_score(y_test, predictions)
+
+            model_performances[name] = {"mse": mse, "r2": r2, "rmse": np.sqrt(mse)}
+            trained_models[name] = model
+
+        # Select best performing model
+        best_model_name = max(
+            model_performances.keys(), key=lambda k: model_performances[k]["r2"]
+        )
+        best_model = trained_models[best_model_name]
+
+        # Calculate final performance metrics
+        final_predictions = best_model.predict(X_test_scaled)
+        performance = ModelPerformance(
+            mse=mean_squared_error(y_test, final_predictions),
+            rmse=np.sqrt(mean_squared_error(y_test, final_predictions)),
+            r2_score=r2_score(y_test, final_predictions),
+            mean_absolute_error=np.mean(np.abs(y_test - final_predictions)),
+            accuracy_percentage=max(0, r2_score(y_test, final_predictions) * 100),
+        )
+
+        return scaler, best_model, best_model_name, performance, len(X_train)
+
+    def _record_training(
+        self,
+        model_name: str,
+        performance: ModelPerformance,
+        training_size: int,
+        update: str,
+    ):
+        self.training_history.append(
+            {
+                "timestamp": datetime.utcnow(),
+                "best_model": model_name,
+                "performance": asdict(performance),
+                "training_size": training_size,
+                "update": update,
+            }
+        )
+        # Keep the history bounded on a long-running process
+        del self.training_history[:-50]
+
+    async def update_model(self, db: AsyncSession) -> ModelPerformance:
+        """
+        Bring the model up to date with tasks completed since its watermark
+        Run from a background job; falls back to a full refit when needed
+        """
+        try:
+            if self._needs_full_refit():
+                return await self.train_model(db, retrain=True)
+
+            new_data = await self._prepare_training_data(
+                db, since=self.training_watermark
             )
+            if len(new_data) < self.min_update_samples:
+                return self.get_model_performance()
+
+            X, y = self._extract_features_and_target(new_data)
+            if len(X) == 0:
+                return self.get_model_performance()
 
+            performance = await self._extend_model(X, y)
+            if performance is None:
+                return await self.train_model(db, retrain=True)
+
+            self.training_watermark = _latest_timestamp(new_data["updated_at"])
+            self._record_training(
+                (
+                    self.training_history[-1]["best_model"]
+                    if self.training_history
+                    else type(self.model).__name__
+                ),
+                performance,
+                len(X),
+                "incremental",
+            )
             self.logger.info(
-                f"Model trained successfully. Best model: {best_model_name}, "
-                f"R2 Score: {performance.r2_score:.3f}"
+                f"Task duration model updated with {len(X)} new tasks, "
+                f"R2 on them before the update: {performance.r2_score:.3f}"
             )
 
+            await self._save_model(self.training_history[-1])
             return performance
 
         except Exception as e:
-            self.logger.error(f"Error training model: {e}")
-            return self._create_default_model()
+            self.logger.error(f"Error updating task duration model: {e}")
+            return self.get_model_performance()
+
+    def _model_bundle(self) -> Dict[str, Any]:
+        # Copies: the bundle is pickled off the loop while updates go on
+        return {
+            "model": self.model,
+            "scaler": self.scaler,
+            "feature_columns": self.feature_columns,
+            "category_codes": {
+                kind: dict(codes) for kind, codes in self.category_codes.items()
+            },
+            "training_history": list(self.training_history),
+            "last_full_fit": self.last_full_fit,
+        }
 
-    async def _prepare_training_data(self, db: AsyncSession) -> pd.DataFrame:
-        """Prepare training data from database"""
+    def _restore_bundle(self, bundle: Dict[str, Any]):
+        self.model = bundle["model"]
+        self.scaler = bundle["scaler"]
+        self.feature_columns = bundle["feature_columns"]
+        self.category_codes = bundle["category_codes"]
+        self.training_history = list(bundle.get("training_history", []))
+
+    def _category_code(self, kind: str, value: Optional[str], assign: bool) -> int:
+        """Integer code of a categorical value; unseen values get -1 unless assigned"""
+        codes = self.category_codes[kind]
+        if value not in codes:
+            if not assign:
+                return -1
+            codes[value] = len(codes)
+        return codes[value]
+
+    async def _prepare_training_data(
+        self, db: AsyncSession, since: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """Prepare training data from database, only tasks updated after ``since``"""
 
         # Get completed tasks with duration information
+        conditions = [
+            Task.status == "completed",
+            Task.actual_duration_minutes.isnot(None),
+            Task.actual_duration_minutes > 0,
+        ]
+        if since is not None:
+            conditions.append(Task.updated_at > since)
         query = (
             select(Task, Agent)
             .join(Agent, Task.assigned_agent_id == Agent.id)
-            .where(
-                and_(
-                    Task.status == "completed",
-                    Task.actual_duration_minutes.isnot(None),
-                    Task.actual_duration_minutes > 0,
-                )
-            )
+            .where(and_(*conditions))
         )
 
         result = await db.execute(query)
@@ -224,6 +512,7 @@ class TaskDurationPredictor(BaseAnalyzer):
                 "created_at": task.created_at,
                 "started_at": task.started_at,
                 "completed_at": task.completed_at,
+                "updated_at": task.updated_at or task.completed_at,
             }
             data.append(row)
 
@@ -255,9 +544,12 @@ class TaskDurationPredictor(BaseAnalyzer):
             df["task_priority"].map(priority_mapping).fillna(2)
         )
 
-        # One-hot encode agent types and task types (simplified)
-        df["agent_type_encoded"] = pd.Categorical(df["agent_type"]).codes
-        df["task_type_encoded"] = pd.Categorical(df["task_type"]).codes
+        # Encode agent types and task types with codes that stay stable
+        # across retraining and incremental updates
+        for kind in ("agent_type", "task_type"):
+            df[f"{kind}_encoded"] = df[kind].map(
+                lambda value, kind=kind: self._category_code(kind, value, assign=True)
+            )
 
         # Fill missing values
         df["agent_success_rate"] = df["agent_success_rate"].fillna(75.0)
@@ -267,23 +559,7 @@ class TaskDurationPredictor(BaseAnalyzer):
         df["agent_workload"] = df["agent_workload"].fillna(1)
 
         # Extract features
-        feature_data = []
-        for _, row in df.iterrows():
-            features = [
-                row["agent_success_rate"],
-                row["agent_avg_response_time"],
-                row["task_complexity_score"],
-                row["task_priority_encoded"],
-                row["agent_type_encoded"],
-                row["task_type_encoded"],
-                row["estimated_duration"],
-                row["hour_of_day"],
-                row["day_of_week"],
-                row["agent_workload"],
-            ]
-            feature_data.append(features)
-
-        X = np.array(feature_data)
+        X = df[self.feature_columns].to_numpy(dtype=np.float64)
         y = df["actual_duration"].values
 
         return X, y
@@ -299,6 +575,8 @@ class TaskDurationPredictor(BaseAnalyzer):
         self.model.fit(X_dummy_scaled, y_dummy)
 
         self.model_trained = True
+        # Not trained on real data; the next update attempts a full fit
+        self.training_watermark = None
 
         return ModelPerformance(
             mse=100.0,
@@ -320,6 +598,9 @@ class TaskDurationPredictor(BaseAnalyzer):
         Returns:
             Prediction result with confidence interval
         """
+        return self._predict_one(task_features)
+
+    def _predict_one(self, task_features: Dict[str, Any]) -> PredictionResult:
         if not self.model_trained:
             raise ValueError("Model not trained. Call train_model() first.")
 
@@ -388,8 +669,10 @@ class TaskDurationPredictor(BaseAnalyzer):
         """Predict durations for pending tasks"""
         if not self.model_trained:
             await self.train_model(db)
+        return self._predict_pending(await self._pending_tasks(db))
 
-        # Get pending tasks
+    async def _pending_tasks(self, db: AsyncSession) -> List[Dict[str, Any]]:
+        """Pending tasks with their agent's features, as plain dicts"""
         query = (
             select(Task, Agent)
             .join(Agent, Task.assigned_agent_id == Agent.id)
@@ -397,29 +680,52 @@ class TaskDurationPredictor(BaseAnalyzer):
         )
 
         result = await db.execute(query)
-        predictions = []
-
-        for task, agent in result.all():
-            task_features = {
+        return [
+            {
+                "task_id": str(task.id),
+                "task_title": task.title,
+                "agent_name": agent.name,
+                "agent_type": agent.agent_type,
                 "agent_success_rate": agent.success_rate,
                 "agent_avg_response_time": agent.avg_response_time,
+                "task_type": task.task_type or "general",
                 "task_complexity_score": task.complexity_score or 5,
                 "task_priority": task.priority,
-                "agent_type_encoded": hash(agent.agent_type) % 10,  # Simple encoding
-                "task_type_encoded": hash(task.task_type or "general") % 10,
                 "estimated_duration": task.estimated_duration_minutes or 60,
+            }
+            for task, agent in result.all()
+        ]
+
+    def _predict_pending(
+        self, pending_tasks: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        predictions = []
+
+        for task in pending_tasks:
+            task_features = {
+                "agent_success_rate": task["agent_success_rate"],
+                "agent_avg_response_time": task["agent_avg_response_time"],
+                "task_complexity_score": task["task_complexity_score"],
+                "task_priority": task["task_priority"],
+                "agent_type_encoded": self._category_code(
+                    "agent_type", task["agent_type"], assign=False
+                ),
+                "task_type_encoded": self._category_code(
+                    "task_type", task["task_type"], assign=False
+                ),
+                "estimated_duration": task["estimated_duration"],
                 "hour_of_day": datetime.utcnow().hour,
                 "day_of_week": datetime.utcnow().weekday(),
                 "agent_workload": 1,  # Could be calculated from current tasks
             }
 
             try:
-                prediction_result = await self.predict_task_duration(task_features)
+                prediction_result = self._predict_one(task_features)
                 predictions.append(
                     {
-                        "task_id": str(task.id),
-                        "task_title": task.title,
-                        "agent_name": agent.name,
+                        "task_id": task["task_id"],
+                        "task_title": task["task_title"],
+                        "agent_name": task["agent_name"],
                         "predicted_duration_minutes": prediction_result.predicted_value,
                         "confidence": prediction_result.confidence,
                         "prediction_interval": prediction_result.prediction_interval,
@@ -431,7 +737,7 @@ class TaskDurationPredictor(BaseAnalyzer):
                 )
             except Exception as e:
                 self.logger.warning(
-                    f"Failed to predict duration for task {task.id}: {e}"
+                    f"Failed to predict duration for task {task['task_id']}: {e}"
                 )
 
         return predictions
@@ -457,13 +763,19 @@ class TaskDurationPredictor(BaseAnalyzer):
         return importance_dict
 
 
-class SystemLoadPredictor(BaseAnalyzer):
+class SystemLoadPredictor(IncrementalPredictor):
     """
     Machine learning model to predict system load and capacity requirements
+
+    Offloaded like ``TaskDurationPredictor``: the trained bundle and the
+    current system state are the worker's inputs.
     """
 
-    def __init__(self):
-        super().__init__()
+    registry_name = "system_load"
+    supports_offloading = True
+
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        super().__init__(registry)
         self.model = GradientBoostingRegressor(n_estimators=100, random_state=42)
         self.scaler = StandardScaler()
         self.feature_columns = [
@@ -477,15 +789,34 @@ class SystemLoadPredictor(BaseAnalyzer):
             "api_requests_per_minute",
         ]
         self.model_trained = False
+        self.performance: Optional[ModelPerformance] = None
 
     async def analyze(self, db: AsyncSession, **kwargs) -> Dict[str, Any]:
         """Main analysis method"""
-        await self.train_model(db)
-        predictions = await self.predict_system_load(db)
+        inputs = await self.fetch_inputs(db)
+        return self._analyze_state(inputs["system_state"])
+
+    async def fetch_inputs(self, db: AsyncSession, **kwargs) -> Dict[str, Any]:
+        """The trained model bundle and the current system state"""
+        if not self.model_trained:
+            await self.train_model(db)
+        return {
+            "bundle": self._model_bundle(),
+            "system_state": await self._get_current_system_state(db),
+        }
+
+    @classmethod
+    def compute_from_inputs(cls, inputs: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        predictor = cls()
+        predictor._restore_bundle(inputs["bundle"])
+        predictor.model_trained = True
+        return predictor._analyze_state(inputs["system_state"])
+
+    def _analyze_state(self, system_state: Dict[str, Any]) -> Dict[str, Any]:
         return {
-            "load_predictions": predictions,
-            "capacity_recommendations": await self.generate_capacity_recommendations(
-                db
+            "load_predictions": self._predict_load(system_state),
+            "capacity_recommendations": self._capacity_recommendations(
+                self._predict_load(system_state, 72)  # 3 days ahead
             ),
         }
 
@@ -511,32 +842,119 @@ class SystemLoadPredictor(BaseAnalyzer):
             if len(X) == 0:
                 return self._create_default_load_model()
 
-            # Train model
-            X_scaled = self.scaler.fit_transform(X)
-            self.model.fit(X_scaled, y)
-
-            # Calculate performance (simple validation)
-            predictions = self.model.predict(X_scaled)
-            mse = mean_squared_error(y, predictions)
-            r2 = r2_score(y, predictions)
+            # Train a fresh model off the event loop
+            scaler, model, performance = await asyncio.to_thread(
+                self._fit_load_model, X, y
+            )
+            self.scaler = scaler
+            self.model = model
 
             self.model_trained = True
-
-            performance = ModelPerformance(
-                mse=mse,
-                rmse=np.sqrt(mse),
-                r2_score=r2,
-                mean_absolute_error=np.mean(np.abs(y - predictions)),
-                accuracy_percentage=max(0, r2 * 100),
+            self.performance = performance
+            self.training_watermark = _latest_timestamp(
+                metric.recorded_at for metric in metrics
             )
+            self.last_full_fit = datetime.utcnow()
 
-            self.logger.info(f"System load model trained. R2: {r2:.3f}")
+            self.logger.info(
+                f"System load model trained. R2: {performance.r2_score:.3f}"
+            )
+            await self._save_model(
+                {
+                    "performance": asdict(performance),
+                    "training_size": len(X),
+                    "update": "full",
+                }
+            )
             return performance
 
         except Exception as e:
             self.logger.error(f"Error training system load model: {e}")
             return self._create_default_load_model()
 
+    def _fit_load_model(self, X: np.ndarray, y: np.ndarray):
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+        model = GradientBoostingRegressor(n_estimators=100, random_state=42)
+        model.fit(X_scaled, y)
+
+        # Calculate performance (simple validation)
+        predictions = model.predict(X_scaled)
+        mse = mean_squared_error(y, predictions)
+        r2 = r2_score(y, predictions)
+
+        performance = ModelPerformance(
+            mse=mse,
+            rmse=np.sqrt(mse),
+            r2_score=r2,
+            mean_absolute_error=np.mean(np.abs(y - predictions)),
+            accuracy_percentage=max(0, r2 * 100),
+        )
+        return scaler, model, performance
+
+    async def update_model(self, db: AsyncSession) -> ModelPerformance:
+        """
+        Bring the model up to date with metrics recorded since its watermark
+        Run from a background job; falls back to a full refit when needed
+        """
+        try:
+            if self._needs_full_refit():
+                return await self.train_model(db)
+
+            result = await db.execute(
+                select(SystemMetrics)
+                .where(SystemMetrics.recorded_at > self.training_watermark)
+                .order_by(SystemMetrics.recorded_at)
+            )
+            metrics = result.scalars().all()
+            if len(metrics) < self.min_update_samples:
+                return self.performance
+
+            X, y = self._prepare_load_training_data(metrics)
+            if len(X) == 0:
+                return self.performance
+
+            performance = await self._extend_model(X, y)
+            if performance is None:
+                return await self.train_model(db)
+
+            self.performance = performance
+            self.training_watermark = _latest_timestamp(
+                metric.recorded_at for metric in metrics
+            )
+            self.logger.info(
+                f"System load model updated with {len(X)} new samples, "
+                f"R2 on them before the update: {performance.r2_score:.3f}"
+            )
+            await self._save_model(
+                {
+                    "performance": asdict(performance),
+                    "training_size": len(X),
+                    "update": "incremental",
+                }
+            )
+            return performance
+
+        except Exception as e:
+            self.logger.error(f"Error updating system load model: {e}")
+            return self.performance
+
+    def _model_bundle(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "scaler": self.scaler,
+            "feature_columns": self.feature_columns,
+            "performance": asdict(self.performance) if self.performance else None,
+            "last_full_fit": self.last_full_fit,
+        }
+
+    def _restore_bundle(self, bundle: Dict[str, Any]):
+        self.model = bundle["model"]
+        self.scaler = bundle["scaler"]
+        self.feature_columns = bundle["feature_columns"]
+        if bundle.get("performance"):
+            self.performance = ModelPerformance(**bundle["performance"])
+
     def _prepare_load_training_data(
         self, metrics: List[SystemMetrics]
     ) -> Tuple[np.ndarray, np.ndarray]:
@@ -574,6 +992,8 @@ class SystemLoadPredictor(BaseAnalyzer):
         self.model.fit(X_dummy_scaled, y_dummy)
 
         self.model_trained = True
+        # Not trained on real data; the next update attempts a full fit
+        self.training_watermark = None
 
         return ModelPerformance(50.0, 7.07, 0.5, 5.0, 50.0)
 
@@ -587,7 +1007,11 @@ class SystemLoadPredictor(BaseAnalyzer):
 
         # Get current system state
         current_metrics = await self._get_current_system_state(db)
+        return self._predict_load(current_metrics, hours_ahead)
 
+    def _predict_load(
+        self, current_metrics: Dict[str, Any], hours_ahead: int = 24
+    ) -> List[Dict[str, Any]]:
         predictions = []
         base_time = datetime.utcnow()
 
@@ -636,20 +1060,20 @@ class SystemLoadPredictor(BaseAnalyzer):
         metrics_result = await db.execute(metrics_query)
         latest_metrics = metrics_result.scalar_one_or_none()
 
-        # Get current agent counts
-        agents_query = select(Agent)
-        agents_result = await db.execute(agents_query)
-        agents = agents_result.scalars().all()
-
-        # Get current task counts
-        tasks_query = select(Task)
-        tasks_result = await db.execute(tasks_query)
-        tasks = tasks_result.scalars().all()
+        # Get current agent and task counts
+        counts_result = await db.execute(
+            select(
+                select(func.count()).where(Agent.status == "active").scalar_subquery(),
+                select(func.count()).select_from(Task).scalar_subquery(),
+                select(func.count()).where(Task.status == "pending").scalar_subquery(),
+            )
+        )
+        active_agents, total_tasks, pending_tasks = counts_result.one()
 
         return {
-            "active_agents": len([a for a in agents if a.status == "active"]),
-            "total_tasks": len(tasks),
-            "pending_tasks": len([t for t in tasks if t.status == "pending"]),
+            "active_agents": active_agents,
+            "total_tasks": total_tasks,
+            "pending_tasks": pending_tasks,
             "cpu_usage": latest_metrics.cpu_usage_percentage if latest_metrics else 50,
             "memory_usage": (
                 latest_metrics.memory_usage_percentage if latest_metrics else 40
@@ -666,7 +1090,11 @@ class SystemLoadPredictor(BaseAnalyzer):
 
         # Get load predictions
         load_predictions = await self.predict_system_load(db, 72)  # 3 days ahead
+        return self._capacity_recommendations(load_predictions)
 
+    def _capacity_recommendations(
+        self, load_predictions: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
         recommendations = []
 
         # Check for high load periods
@@ -719,4 +1147,4 @@ class SystemLoadPredictor(BaseAnalyzer):
                     }
                 )
 
-        return recommendations
\ No newline at end of file
+        return recommendations
@@ -3,7 +3,12 @@ Analytics Processors Module
 Data processing and analysis components for SubForge dashboard
 """
 
-from .data_aggregator import AggregatedMetrics, DataAggregator, MetricWindow
+from .data_aggregator import (
+    AggregatedMetrics,
+    DataAggregator,
+    MetricWindow,
+    WindowStats,
+)
 from .insight_generator import (
     ActionType,
     Insight,
@@ -25,6 +30,7 @@ __all__ = [
     # Data aggregation
     "DataAggregator",
     "MetricWindow",
+    "WindowStats",
     "AggregatedMetrics",
     # Trend analysis
     "TrendAnalyzer",
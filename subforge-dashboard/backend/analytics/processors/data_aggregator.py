@@ -6,30 +6,116 @@ Processes and aggregates real-time metrics from agent activities
 import asyncio
 import logging
 from collections import defaultdict, deque
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from itertools import islice
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
-from sqlalchemy import and_, desc, select
+from sqlalchemy import desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...app.models.agent import Agent
 from ...app.models.system_metrics import SystemMetrics
 from ...app.models.task import Task
+from ...app.services.rollups import RollupStats, rollup_service
 from ..models.base_analyzer import BaseAnalyzer
+from ..utils.data_access import (
+    SYSTEM_METRICS_HISTORY,
+    TASK_HISTORY,
+    ColumnFrame,
+    analytics_data,
+    bucket_totals,
+    frame_length,
+)
+from ..utils.streaming_stats import QuantileSketch, RunningMoments
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class WindowStats:
+    """Running statistics of one metric window, mergeable across windows"""
+
+    moments: RunningMoments
+    sketch: QuantileSketch
+    min: float = 0.0
+    max: float = 0.0
+
+    def copy(self) -> "WindowStats":
+        return WindowStats(self.moments.copy(), self.sketch.copy(), self.min, self.max)
+
+    def merge(self, other: "WindowStats") -> "WindowStats":
+        """
+        Statistics over the points of both windows
+
+        Always a new object: the inputs may be a window's live statistics.
+        """
+        if other.moments.count == 0:
+            return self.copy()
+        if self.moments.count == 0:
+            return other.copy()
+        return WindowStats(
+            moments=self.moments.merge(other.moments),
+            sketch=self.sketch.merge(other.sketch),
+            min=min(self.min, other.min),
+            max=max(self.max, other.max),
+        )
+
+    def to_dict(self) -> Dict[str, float]:
+        if self.moments.count == 0:
+            return {"count": 0, "avg": 0, "min": 0, "max": 0, "std": 0}
+
+        p50, p95, p99 = self.sketch.quantiles((0.5, 0.95, 0.99))
+        return {
+            "count": self.moments.count,
+            "avg": self.moments.mean,
+            "min": self.min,
+            "max": self.max,
+            "std": self.moments.std,
+            "sum": self.moments.total,
+            # Sketch estimates, clamped to the exact extremes
+            "p50": min(max(p50, self.min), self.max),
+            "p95": min(max(p95, self.min), self.max),
+            "p99": min(max(p99, self.min), self.max),
+        }
+
+
 @dataclass
 class MetricWindow:
-    """Time window for metric aggregation"""
+    """
+    Time window for metric aggregation
+
+    Points leave the window strictly oldest first, so the statistics are kept
+    up to date as points come and go: Welford moments for mean and variance,
+    monotonic deques of (sequence, value) candidates for min and max, and a
+    quantile sketch for percentiles. ``get_stats`` therefore costs the same
+    regardless of how many points the window holds.
+    """
 
     window_size_minutes: int
     data_points: deque
     timestamps: deque
     max_points: int = 1000
+    _moments: RunningMoments = field(
+        default_factory=RunningMoments, init=False, repr=False
+    )
+    _sketch: QuantileSketch = field(
+        default_factory=QuantileSketch, init=False, repr=False
+    )
+    _min_candidates: deque = field(default_factory=deque, init=False, repr=False)
+    _max_candidates: deque = field(default_factory=deque, init=False, repr=False)
+    # Sequence numbers of the next point to add and of the oldest point held
+    _next_seq: int = field(default=0, init=False, repr=False)
+    _head_seq: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        # Account for points the window was constructed with
+        points = list(zip(self.timestamps, self.data_points))
+        self.timestamps.clear()
+        self.data_points.clear()
+        for timestamp, value in points:
+            self._append(value, timestamp)
 
     def add_point(self, value: float, timestamp: datetime = None):
         """Add a data point to the window"""
@@ -38,31 +124,124 @@ class MetricWindow:
         # Remove old points outside window
         cutoff_time = timestamp - timedelta(minutes=self.window_size_minutes)
         while self.timestamps and self.timestamps[0] < cutoff_time:
-            self.timestamps.popleft()
-            self.data_points.popleft()
+            self._evict_oldest()
 
         # Add new point
-        self.data_points.append(value)
-        self.timestamps.append(timestamp)
+        self._append(value, timestamp)
 
         # Limit total points for memory management
         while len(self.data_points) > self.max_points:
-            self.data_points.popleft()
-            self.timestamps.popleft()
+            self._evict_oldest()
+
+    def _append(self, value: float, timestamp: datetime):
+        value = float(value)
+        self.data_points.append(value)
+        self.timestamps.append(timestamp)
+        self._moments.add(value)
+        self._sketch.add(value)
+
+        seq = self._next_seq
+        self._next_seq += 1
+        while self._min_candidates and self._min_candidates[-1][1] >= value:
+            self._min_candidates.pop()
+        self._min_candidates.append((seq, value))
+        while self._max_candidates and self._max_candidates[-1][1] <= value:
+            self._max_candidates.pop()
+        self._max_candidates.append((seq, value))
+
+    def _evict_oldest(self):
+        value = self.data_points.popleft()
+        self.timestamps.popleft()
+        self._moments.remove(value)
+        self._sketch.remove(value)
+
+        if self._min_candidates and self._min_candidates[0][0] == self._head_seq:
+            self._min_candidates.popleft()
+        if self._max_candidates and self._max_candidates[0][0] == self._head_seq:
+            self._max_candidates.popleft()
+        self._head_seq += 1
+
+    def stats(self) -> WindowStats:
+        """
+        Current running statistics, to merge with other windows
+
+        Shares the window's live moments and sketch; read or merge it, but
+        copy it to keep it past the next ``add_point``.
+        """
+        if not self.data_points:
+            return WindowStats(RunningMoments(), QuantileSketch())
+        return WindowStats(
+            moments=self._moments,
+            sketch=self._sketch,
+            min=self._min_candidates[0][1],
+            max=self._max_candidates[0][1],
+        )
 
     def get_stats(self) -> Dict[str, float]:
         """Get statistics for current window"""
-        if not self.data_points:
-            return {"count": 0, "avg": 0, "min": 0, "max": 0, "std": 0}
+        return self.stats().to_dict()
+
+    def merge(self, other: "MetricWindow") -> WindowStats:
+        """Combined statistics of this window and another, e.g. of another agent"""
+        return self.stats().merge(other.stats())
+
+
+# SystemMetrics columns averaged by the daily and weekly aggregates
+_HISTORICAL_METRIC_COLUMNS = (
+    "cpu_usage_percentage",
+    "memory_usage_percentage",
+    "system_load_percentage",
+    "overall_success_rate",
+    "uptime_percentage",
+)
+
+
+def _iso_week(day: date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
 
-        values = list(self.data_points)
+
+@dataclass
+class _PeriodTotals:
+    """Additive metric, task and workflow totals of one day or week"""
+
+    sums: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    tasks: int = 0
+    completed_tasks: int = 0
+    failed_tasks: int = 0
+    workflows: RollupStats = field(default_factory=RollupStats)
+
+    def merge(self, other: "_PeriodTotals"):
+        for column, total in other.sums.items():
+            self.sums[column] += total
+            self.counts[column] += other.counts[column]
+        self.tasks += other.tasks
+        self.completed_tasks += other.completed_tasks
+        self.failed_tasks += other.failed_tasks
+        self.workflows.merge(other.workflows)
+
+    def mean(self, column: str) -> float:
+        count = self.counts.get(column, 0)
+        return self.sums[column] / count if count else 0
+
+    def summary(self) -> Dict[str, Any]:
         return {
-            "count": len(values),
-            "avg": np.mean(values),
-            "min": np.min(values),
-            "max": np.max(values),
-            "std": np.std(values),
-            "sum": np.sum(values),
+            "system_metrics": {
+                "avg_cpu_usage": self.mean("cpu_usage_percentage"),
+                "avg_memory_usage": self.mean("memory_usage_percentage"),
+                "avg_system_load": self.mean("system_load_percentage"),
+                "avg_success_rate": self.mean("overall_success_rate"),
+            },
+            "task_metrics": {
+                "total_tasks": self.tasks,
+                "completed_tasks": self.completed_tasks,
+                "failed_tasks": self.failed_tasks,
+                "completion_rate": (
+                    (self.completed_tasks / self.tasks * 100) if self.tasks > 0 else 0
+                ),
+            },
+            "workflow_metrics": self.workflows.summary(),
         }
 
 
@@ -344,163 +523,106 @@ class DataAggregator(BaseAnalyzer):
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(days=days_back)
 
-            # Get historical data
-            historical_metrics = await self._get_historical_system_metrics(
-                db, start_time, end_time
+            # Get historical data as column arrays
+            window = timedelta(days=days_back)
+            historical_metrics = await analytics_data.load(
+                db, SYSTEM_METRICS_HISTORY, window, now=end_time
             )
-            historical_tasks = await self._get_historical_tasks(
-                db, start_time, end_time
+            historical_tasks = await analytics_data.load(
+                db, TASK_HISTORY, window, now=end_time
+            )
+            # Workflow figures come from pre-aggregated daily buckets
+            workflow_rollups = await rollup_service.get_buckets(
+                db, "workflow_type", start_time, end_time, granularity="day"
             )
 
             # Generate daily, weekly aggregations
             daily_aggregates = await self._aggregate_by_day(
-                historical_metrics, historical_tasks
+                historical_metrics, historical_tasks, workflow_rollups
             )
             weekly_aggregates = await self._aggregate_by_week(
-                historical_metrics, historical_tasks
+                historical_metrics, historical_tasks, workflow_rollups
             )
 
             return {
                 "daily": daily_aggregates,
                 "weekly": weekly_aggregates,
                 "period": f"{days_back} days",
-                "total_data_points": len(historical_metrics),
+                "total_data_points": frame_length(historical_metrics),
             }
 
         except Exception as e:
             self.logger.error(f"Error in historical aggregation: {e}")
             return {}
 
+    def _daily_totals(
+        self, metrics: ColumnFrame, tasks: ColumnFrame
+    ) -> Dict[date, _PeriodTotals]:
+        """Per-day sums of the historical metric and task columns"""
+        days = defaultdict(_PeriodTotals)
+
+        buckets, _, totals = bucket_totals(
+            metrics["recorded_at"],
+            "D",
+            **{column: metrics[column] for column in _HISTORICAL_METRIC_COLUMNS},
+        )
+        for index, day in enumerate(buckets.tolist()):
+            for column, (sums, counts) in totals.items():
+                days[day].sums[column] += float(sums[index])
+                days[day].counts[column] += int(counts[index])
+
+        statuses = tasks["status"]
+        buckets, counts, totals = bucket_totals(
+            tasks["created_at"],
+            "D",
+            completed=statuses == "completed",
+            failed=statuses == "failed",
+        )
+        for index, day in enumerate(buckets.tolist()):
+            days[day].tasks += int(counts[index])
+            days[day].completed_tasks += int(totals["completed"][0][index])
+            days[day].failed_tasks += int(totals["failed"][0][index])
+
+        return days
+
     async def _aggregate_by_day(
-        self, metrics: List[SystemMetrics], tasks: List[Task]
+        self,
+        metrics: ColumnFrame,
+        tasks: ColumnFrame,
+        workflow_rollups: List[Tuple[Any, RollupStats]] = (),
     ) -> List[Dict[str, Any]]:
         """Aggregate metrics by day"""
 
-        # Group by day
-        daily_groups = defaultdict(lambda: {"metrics": [], "tasks": []})
-
-        for metric in metrics:
-            if metric.recorded_at:
-                day_key = metric.recorded_at.date()
-                daily_groups[day_key]["metrics"].append(metric)
-
-        for task in tasks:
-            if task.created_at:
-                day_key = task.created_at.date()
-                daily_groups[day_key]["tasks"].append(task)
-
-        # Calculate daily aggregates
-        daily_aggregates = []
-        for day, data in sorted(daily_groups.items()):
-            day_metrics = data["metrics"]
-            day_tasks = data["tasks"]
-
-            # Calculate averages for the day
-            if day_metrics:
-                avg_cpu = np.mean([m.cpu_usage_percentage for m in day_metrics])
-                avg_memory = np.mean([m.memory_usage_percentage for m in day_metrics])
-                avg_load = np.mean([m.system_load_percentage for m in day_metrics])
-                avg_success_rate = np.mean(
-                    [m.overall_success_rate for m in day_metrics]
-                )
-            else:
-                avg_cpu = avg_memory = avg_load = avg_success_rate = 0
-
-            # Task statistics
-            completed_tasks = len([t for t in day_tasks if t.status == "completed"])
-            failed_tasks = len([t for t in day_tasks if t.status == "failed"])
-            total_tasks = len(day_tasks)
-
-            daily_aggregates.append(
-                {
-                    "date": day.isoformat(),
-                    "system_metrics": {
-                        "avg_cpu_usage": avg_cpu,
-                        "avg_memory_usage": avg_memory,
-                        "avg_system_load": avg_load,
-                        "avg_success_rate": avg_success_rate,
-                    },
-                    "task_metrics": {
-                        "total_tasks": total_tasks,
-                        "completed_tasks": completed_tasks,
-                        "failed_tasks": failed_tasks,
-                        "completion_rate": (
-                            (completed_tasks / total_tasks * 100)
-                            if total_tasks > 0
-                            else 0
-                        ),
-                    },
-                }
-            )
+        daily_groups = self._daily_totals(metrics, tasks)
+        for bucket, stats in workflow_rollups:
+            daily_groups[bucket.bucket_start.date()].workflows.merge(stats)
 
-        return daily_aggregates
+        return [
+            {"date": day.isoformat(), **totals.summary()}
+            for day, totals in sorted(daily_groups.items())
+        ]
 
     async def _aggregate_by_week(
-        self, metrics: List[SystemMetrics], tasks: List[Task]
+        self,
+        metrics: ColumnFrame,
+        tasks: ColumnFrame,
+        workflow_rollups: List[Tuple[Any, RollupStats]] = (),
     ) -> List[Dict[str, Any]]:
         """Aggregate metrics by week"""
 
-        # Group by week
-        weekly_groups = defaultdict(lambda: {"metrics": [], "tasks": []})
-
-        for metric in metrics:
-            if metric.recorded_at:
-                # Get ISO week
-                year, week, _ = metric.recorded_at.isocalendar()
-                week_key = f"{year}-W{week:02d}"
-                weekly_groups[week_key]["metrics"].append(metric)
+        # Days merge exactly into their ISO week
+        weekly_groups = defaultdict(_PeriodTotals)
+        for day, totals in self._daily_totals(metrics, tasks).items():
+            weekly_groups[_iso_week(day)].merge(totals)
 
-        for task in tasks:
-            if task.created_at:
-                year, week, _ = task.created_at.isocalendar()
-                week_key = f"{year}-W{week:02d}"
-                weekly_groups[week_key]["tasks"].append(task)
+        for bucket, stats in workflow_rollups:
+            weekly_groups[_iso_week(bucket.bucket_start)].workflows.merge(stats)
 
-        # Calculate weekly aggregates
         weekly_aggregates = []
-        for week, data in sorted(weekly_groups.items()):
-            week_metrics = data["metrics"]
-            week_tasks = data["tasks"]
-
-            # Calculate averages for the week
-            if week_metrics:
-                avg_cpu = np.mean([m.cpu_usage_percentage for m in week_metrics])
-                avg_memory = np.mean([m.memory_usage_percentage for m in week_metrics])
-                avg_load = np.mean([m.system_load_percentage for m in week_metrics])
-                avg_success_rate = np.mean(
-                    [m.overall_success_rate for m in week_metrics]
-                )
-                uptime = np.mean([m.uptime_percentage for m in week_metrics])
-            else:
-                avg_cpu = avg_memory = avg_load = avg_success_rate = uptime = 0
-
-            # Task statistics
-            completed_tasks = len([t for t in week_tasks if t.status == "completed"])
-            failed_tasks = len([t for t in week_tasks if t.status == "failed"])
-            total_tasks = len(week_tasks)
-
-            weekly_aggregates.append(
-                {
-                    "week": week,
-                    "system_metrics": {
-                        "avg_cpu_usage": avg_cpu,
-                        "avg_memory_usage": avg_memory,
-                        "avg_system_load": avg_load,
-                        "avg_success_rate": avg_success_rate,
-                        "avg_uptime": uptime,
-                    },
-                    "task_metrics": {
-                        "total_tasks": total_tasks,
-                        "completed_tasks": completed_tasks,
-                        "failed_tasks": failed_tasks,
-                        "completion_rate": (
-                            (completed_tasks / total_tasks * 100)
-                            if total_tasks > 0
-                            else 0
-                        ),
-                    },
-                }
-            )
+        for week, totals in sorted(weekly_groups.items()):
+            summary = totals.summary()
+            summary["system_metrics"]["avg_uptime"] = totals.mean("uptime_percentage")
+            weekly_aggregates.append({"week": week, **summary})
 
         return weekly_aggregates
 
@@ -541,12 +663,15 @@ class DataAggregator(BaseAnalyzer):
                 period_trends = {}
 
                 for metric_name, window in windows.items():
-                    if len(window.data_points) >= 10:  # Need sufficient data
-                        values = list(window.data_points)
-
+                    point_count = len(window.data_points)
+                    if point_count >= 10:  # Need sufficient data
                         # Simple trend analysis
-                        recent_values = values[-5:]  # Last 5 points
-                        earlier_values = values[:5]  # First 5 points
+                        recent_values = list(
+                            islice(reversed(window.data_points), 5)
+                        )  # Last 5 points
+                        earlier_values = list(
+                            islice(window.data_points, 5)
+                        )  # First 5 points
 
                         if len(recent_values) >= 3 and len(earlier_values) >= 3:
                             recent_avg = np.mean(recent_values)
@@ -567,7 +692,7 @@ class DataAggregator(BaseAnalyzer):
                                 "trend": trend,
                                 "change_percentage": change_pct,
                                 "confidence": min(
-                                    len(values) / 20, 1.0
+                                    point_count / 20, 1.0
                                 ),  # More data = higher confidence
                             }
 
@@ -606,6 +731,21 @@ class DataAggregator(BaseAnalyzer):
             return self.metric_windows[period][metric_name].get_stats()
         return {}
 
+    def get_merged_metric_stats(
+        self, metric_names: List[str], period: str = "5min"
+    ) -> Dict[str, Any]:
+        """
+        Combined statistics over several metric windows of one period,
+        e.g. the per-agent windows of the same metric
+        """
+        windows = self.metric_windows.get(period, {})
+        merged = None
+        for metric_name in metric_names:
+            if metric_name in windows:
+                stats = windows[metric_name].stats()
+                merged = stats if merged is None else merged.merge(stats)
+        return merged.to_dict() if merged is not None else {}
+
     def get_metric_history(
         self, metric_name: str, minutes: int = 60
     ) -> List[Tuple[datetime, float]]:
@@ -652,30 +792,3 @@ class DataAggregator(BaseAnalyzer):
             select(SystemMetrics).order_by(desc(SystemMetrics.recorded_at)).limit(1)
         )
         return result.scalar_one_or_none()
-
-    async def _get_historical_system_metrics(
-        self, db: AsyncSession, start_time: datetime, end_time: datetime
-    ) -> List[SystemMetrics]:
-        """Get historical system metrics"""
-        result = await db.execute(
-            select(SystemMetrics)
-            .where(
-                and_(
-                    SystemMetrics.recorded_at >= start_time,
-                    SystemMetrics.recorded_at <= end_time,
-                )
-            )
-            .order_by(SystemMetrics.recorded_at)
-        )
-        return result.scalars().all()
-
-    async def _get_historical_tasks(
-        self, db: AsyncSession, start_time: datetime, end_time: datetime
-    ) -> List[Task]:
-        """Get historical tasks"""
-        result = await db.execute(
-            select(Task)
-            .where(and_(Task.created_at >= start_time, Task.created_at <= end_time))
-            .order_by(Task.created_at)
-        )
-        return result.scalars().all()
\ No newline at end of file
@@ -3,6 +3,7 @@ Trend Analysis Module for SubForge Analytics
 Advanced time series analysis and pattern detection
 """
 
+import asyncio
 import logging
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
@@ -14,12 +15,15 @@ import pandas as pd
 from scipy import stats
 from scipy.signal import find_peaks
 from sklearn.preprocessing import StandardScaler
-from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...app.models.system_metrics import SystemMetrics
-from ...app.models.task import Task
 from ..models.base_analyzer import BaseAnalyzer
+from ..utils.data_access import (
+    SYSTEM_METRICS_HISTORY,
+    TASK_HISTORY,
+    analytics_data,
+    bucket_totals,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -105,6 +109,9 @@ class TrendAnalyzer(BaseAnalyzer):
     Detects trends, seasonality, anomalies, and patterns in time series data
     """
 
+    # The statistics only need the collected time series
+    supports_offloading = True
+
     def __init__(self):
         super().__init__()
         self.scaler = StandardScaler()
@@ -116,6 +123,24 @@ class TrendAnalyzer(BaseAnalyzer):
 
         # Get time series data
         time_series_data = await self._collect_time_series_data(db)
+        return await self._analyze_time_series(time_series_data)
+
+    async def fetch_inputs(
+        self, db: AsyncSession, **kwargs
+    ) -> Dict[str, pd.DataFrame]:
+        return await self._collect_time_series_data(db)
+
+    @classmethod
+    def compute_from_inputs(
+        cls, inputs: Dict[str, pd.DataFrame], **kwargs
+    ) -> Dict[str, Any]:
+        # The analysis steps never await I/O, so a private loop just drives them
+        return asyncio.run(cls()._analyze_time_series(inputs))
+
+    async def _analyze_time_series(
+        self, time_series_data: Dict[str, pd.DataFrame]
+    ) -> Dict[str, Any]:
+        """Trends, seasonality, patterns and forecasts of the collected series"""
 
         # Analyze trends for each metric
         trend_results = await self._analyze_all_trends(time_series_data)
@@ -147,91 +172,47 @@ class TrendAnalyzer(BaseAnalyzer):
         Returns dictionary of metric_name -> DataFrame with timestamp and value columns
         """
 
-        # Get data for last 30 days
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(days=30)
-
+        window = timedelta(days=30)
         time_series = {}
 
         # System metrics time series
-        system_metrics_query = (
-            select(SystemMetrics)
-            .where(
-                and_(
-                    SystemMetrics.recorded_at >= start_time,
-                    SystemMetrics.recorded_at <= end_time,
-                )
-            )
-            .order_by(SystemMetrics.recorded_at)
-        )
+        metrics = await analytics_data.load(db, SYSTEM_METRICS_HISTORY, window)
+        timestamps = metrics["recorded_at"].astype("datetime64[ns]")
+        metrics_to_analyze = [
+            ("system_load", "system_load_percentage"),
+            ("cpu_usage", "cpu_usage_percentage"),
+            ("memory_usage", "memory_usage_percentage"),
+            ("success_rate", "overall_success_rate"),
+            ("response_time", "avg_response_time_ms"),
+            ("active_agents", "active_agents"),
+            ("error_rate", "error_rate_percentage"),
+        ]
 
-        result = await db.execute(system_metrics_query)
-        system_metrics = result.scalars().all()
-
-        if system_metrics:
-            # Extract different metrics
-            metrics_to_analyze = [
-                ("system_load", "system_load_percentage"),
-                ("cpu_usage", "cpu_usage_percentage"),
-                ("memory_usage", "memory_usage_percentage"),
-                ("success_rate", "overall_success_rate"),
-                ("response_time", "avg_response_time_ms"),
-                ("active_agents", "active_agents"),
-                ("error_rate", "error_rate_percentage"),
-            ]
-
-            for metric_name, attribute in metrics_to_analyze:
-                data = []
-                for metric in system_metrics:
-                    if hasattr(metric, attribute) and metric.recorded_at:
-                        value = getattr(metric, attribute)
-                        if value is not None:
-                            data.append(
-                                {"timestamp": metric.recorded_at, "value": float(value)}
-                            )
+        for metric_name, column in metrics_to_analyze:
+            values = metrics[column]
+            present = ~np.isnan(values) & ~np.isnat(timestamps)
+            if present.any():
+                # Rows arrive ordered by recorded_at
+                time_series[metric_name] = pd.DataFrame(
+                    {"timestamp": timestamps[present], "value": values[present]}
+                )
 
-                if data:
-                    df = pd.DataFrame(data)
-                    df["timestamp"] = pd.to_datetime(df["timestamp"])
-                    df = df.sort_values("timestamp").reset_index(drop=True)
-                    time_series[metric_name] = df
-
-        # Task completion rate time series
-        tasks_query = (
-            select(Task)
-            .where(and_(Task.created_at >= start_time, Task.created_at <= end_time))
-            .order_by(Task.created_at)
+        # Task completion rate time series, grouped by hour
+        tasks = await analytics_data.load(db, TASK_HISTORY, window)
+        hours, counts, totals = bucket_totals(
+            tasks["created_at"],
+            "h",
+            completed=tasks["status"] == "completed",
         )
 
-        result = await db.execute(tasks_query)
-        tasks = result.scalars().all()
-
-        if tasks:
-            # Group tasks by hour and calculate completion rate
-            task_data = []
-            current_hour = start_time.replace(minute=0, second=0, microsecond=0)
-
-            while current_hour <= end_time:
-                next_hour = current_hour + timedelta(hours=1)
-
-                hour_tasks = [
-                    t for t in tasks if current_hour <= t.created_at < next_hour
-                ]
-
-                if hour_tasks:
-                    completed = len([t for t in hour_tasks if t.status == "completed"])
-                    completion_rate = (completed / len(hour_tasks)) * 100
-
-                    task_data.append(
-                        {"timestamp": current_hour, "value": completion_rate}
-                    )
-
-                current_hour = next_hour
-
-            if task_data:
-                df = pd.DataFrame(task_data)
-                df["timestamp"] = pd.to_datetime(df["timestamp"])
-                time_series["task_completion_rate"] = df
+        if len(hours):
+            completed, _ = totals["completed"]
+            time_series["task_completion_rate"] = pd.DataFrame(
+                {
+                    "timestamp": hours.astype("datetime64[ns]"),
+                    "value": completed / counts * 100,
+                }
+            )
 
         return time_series
 
@@ -3,6 +3,7 @@ Analytics Services Module
 Service orchestration and coordination for SubForge analytics
 """
 
+from .analysis_executor import AnalysisExecutor
 from .analytics_service import AnalyticsService
 
-__all__ = ["AnalyticsService"]
\ No newline at end of file
+__all__ = ["AnalysisExecutor", "AnalyticsService"]
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Analysis Executor for SubForge Dashboard
+Runs CPU-bound analyzer work in a process pool, with per-component timeouts
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _compute_in_worker(analyzer_cls, inputs: Any, kwargs: Dict[str, Any]):
+    """Worker entry point; module level so it pickles by reference"""
+    return analyzer_cls.compute_from_inputs(inputs, **kwargs)
+
+
+class AnalysisExecutor:
+    """
+    Execution layer for analyzers
+
+    Analyzers that declare their data needs (``supports_offloading``) have
+    their inputs fetched on the event loop with the caller's session and the
+    computation itself, ``compute_from_inputs``, run in a process pool, so
+    pandas/scipy/sklearn work never blocks the loop. Other analyzers run on
+    the loop as before. ``gather`` runs a set of components concurrently,
+    bounds each by its own timeout and reports every component's status, so
+    one slow or failing analyzer yields a partial report instead of none.
+
+    Workers are started with ``spawn`` (forking a process that runs an event
+    loop and threads is unsafe) and created lazily on first use. A timed-out
+    computation keeps its worker busy until it finishes; the pool replaces
+    workers that crash.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        default_timeout: float = 120.0,
+        timeouts: Optional[Dict[str, float]] = None,
+    ):
+        self.max_workers = max_workers or max(
+            1, min(4, multiprocessing.cpu_count() - 1)
+        )
+        self.default_timeout = default_timeout
+        self.timeouts = dict(timeouts or {})
+        self.logger = logger
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {"offloaded": 0, "inline": 0, "timeouts": 0, "errors": 0}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def run(self, analyzer, db, **kwargs) -> Dict[str, Any]:
+        """Run one analyzer, offloading its computation when it supports it"""
+        if not analyzer.supports_offloading:
+            self.stats["inline"] += 1
+            return await analyzer.analyze(db, **kwargs)
+
+        inputs = await analyzer.fetch_inputs(db, **kwargs)
+        self.stats["offloaded"] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._get_pool(), _compute_in_worker, type(analyzer), inputs, kwargs
+            )
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next run
+            self._pool = None
+            raise
+
+    async def gather(
+        self, components: List[Tuple[str, Callable[[], Awaitable[Any]]]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Run named components concurrently, each within its timeout
+
+        Returns component name -> {"component", "status", "result",
+        "duration_seconds"[, "error"]}, where status is "success", "error" or
+        "timeout" and result is {} unless the component succeeded.
+        """
+        results = await asyncio.gather(
+            *[self._run_component(name, factory) for name, factory in components]
+        )
+        return {result["component"]: result for result in results}
+
+    def timeout_for(self, name: str) -> float:
+        return self.timeouts.get(name, self.default_timeout)
+
+    async def _run_component(
+        self, name: str, factory: Callable[[], Awaitable[Any]]
+    ) -> Dict[str, Any]:
+        started = time.monotonic()
+        outcome = {"component": name, "status": "success", "result": {}}
+        try:
+            outcome["result"] = await asyncio.wait_for(
+                factory(), timeout=self.timeout_for(name)
+            )
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            self.logger.error(
+                f"{name} did not finish within {self.timeout_for(name):.0f}s"
+            )
+            outcome.update(status="timeout", error="timed out")
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.logger.error(f"Error in {name}: {e}")
+            outcome.update(status="error", error=str(e))
+        outcome["duration_seconds"] = round(time.monotonic() - started, 3)
+        return outcome
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "max_workers": self.max_workers,
+            "pool_started": self._pool is not None,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -7,37 +7,59 @@ import asyncio
 import json
 import logging
 import pickle
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..models.model_registry import ModelRegistry
 from ..models.optimization_engine import OptimizationEngine
 from ..models.performance_analyzer import PerformanceAnalyzer
 from ..models.predictive_models import SystemLoadPredictor, TaskDurationPredictor
 from ..processors.data_aggregator import DataAggregator
 from ..processors.insight_generator import InsightGenerator
 from ..processors.trend_analyzer import TrendAnalyzer
+from ..utils.data_access import data_watermark
+from ..utils.result_cache import analytics_cache
+from .analysis_executor import AnalysisExecutor
 
 logger = logging.getLogger(__name__)
 
 
+def _is_complete_report(report: Dict[str, Any]) -> bool:
+    """Whether a report may be cached: non-empty and no component missing"""
+    return bool(report) and not report.get("analysis_metadata", {}).get("partial")
+
+
 class AnalyticsService:
     """
     Central analytics service that orchestrates all analytics components
     """
 
-    def __init__(self, storage_path: Optional[str] = None):
+    def __init__(
+        self,
+        storage_path: Optional[str] = None,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+    ):
         self.storage_path = (
             Path(storage_path) if storage_path else Path("analytics_data")
         )
         self.storage_path.mkdir(exist_ok=True)
 
+        # Gives each concurrently running analyzer its own session (an
+        # AsyncSession cannot be shared between tasks); bind it to the
+        # analytics pool so analysis load stays off the request pool
+        self.session_factory = session_factory
+
+        # Trained predictive models survive restarts through the registry
+        self.model_registry = ModelRegistry(self.storage_path / "models")
+
         # Initialize analytics components
         self.performance_analyzer = PerformanceAnalyzer()
-        self.task_duration_predictor = TaskDurationPredictor()
-        self.system_load_predictor = SystemLoadPredictor()
+        self.task_duration_predictor = TaskDurationPredictor(self.model_registry)
+        self.system_load_predictor = SystemLoadPredictor(self.model_registry)
         self.optimization_engine = OptimizationEngine()
         self.data_aggregator = DataAggregator()
         self.trend_analyzer = TrendAnalyzer()
@@ -45,18 +67,36 @@ class AnalyticsService:
 
         # Service state
         self.last_analysis_run = {}
-        self.analysis_cache = {}
+        # Service-level results share the analyzers' cache under one namespace
+        self.cache = analytics_cache
+        self.cache_namespace = self.__class__.__name__
         self.background_tasks = []
 
         # Configuration
         self.config = {
             "cache_ttl_minutes": 30,
             "auto_analysis_interval_minutes": 60,
+            "model_update_interval_minutes": 15,
             "enable_background_analysis": True,
             "enable_predictive_models": True,
             "storage_enabled": True,
+            # Per-component limits for run_comprehensive_analysis
+            "analysis_timeout_seconds": 120,
+            "analysis_timeouts": {
+                "trend_analysis": 180,
+                "task_duration_prediction": 300,
+                "system_load_prediction": 300,
+            },
+            "analysis_workers": None,
         }
 
+        # Offloads CPU-bound analyzer work to worker processes
+        self.executor = AnalysisExecutor(
+            max_workers=self.config["analysis_workers"],
+            default_timeout=self.config["analysis_timeout_seconds"],
+            timeouts=self.config["analysis_timeouts"],
+        )
+
         self.logger = logging.getLogger(__name__)
 
     async def initialize(self):
@@ -67,6 +107,9 @@ class AnalyticsService:
             # Load any cached data
             await self._load_cached_data()
 
+            # Load persisted predictive models
+            await self._load_models()
+
             # Start background tasks if enabled
             if self.config["enable_background_analysis"]:
                 await self._start_background_tasks()
@@ -93,6 +136,8 @@ class AnalyticsService:
             # Save current state
             await self._save_cached_data()
 
+            self.executor.shutdown()
+
             self.logger.info("✅ Analytics Service shutdown complete")
 
         except Exception as e:
@@ -121,146 +166,137 @@ class AnalyticsService:
             self.logger.info(
                 f"Starting comprehensive analysis (time_range: {time_range_hours}h)"
             )
-            start_time = datetime.utcnow()
 
-            # Check cache first
+            # Reused until it expires or new data is written
+            watermark = await data_watermark(db)
             cache_key = f"comprehensive_{time_range_hours}_{include_predictions}_{include_optimization}"
-            cached_result = self._get_from_cache(cache_key)
-            if cached_result:
-                self.logger.info("Returning cached comprehensive analysis")
-                return cached_result
-
-            # Run all analytics in parallel for efficiency
-            analysis_tasks = []
-
-            # Core analytics
-            analysis_tasks.append(
-                self._run_with_error_handling(
-                    "performance_analysis",
-                    self.performance_analyzer.analyze(
-                        db, time_range_hours=time_range_hours
-                    ),
-                )
+            return await self._cached(
+                cache_key,
+                lambda: self._build_comprehensive_report(
+                    db,
+                    include_predictions,
+                    include_optimization,
+                    time_range_hours,
+                    watermark,
+                ),
+                watermark,
             )
 
-            analysis_tasks.append(
-                self._run_with_error_handling(
-                    "data_aggregation",
-                    self.data_aggregator.analyze(db, time_range_hours=time_range_hours),
-                )
-            )
+        except Exception as e:
+            self.logger.error(f"❌ Error in comprehensive analysis: {e}")
+            return {
+                "error": str(e),
+                "analysis_metadata": {
+                    "generated_at": datetime.utcnow().isoformat(),
+                    "status": "failed",
+                },
+            }
 
-            analysis_tasks.append(
-                self._run_with_error_handling(
-                    "trend_analysis",
-                    self.trend_analyzer.analyze(db, time_range_hours=time_range_hours),
-                )
-            )
+    async def _build_comprehensive_report(
+        self,
+        db: AsyncSession,
+        include_predictions: bool,
+        include_optimization: bool,
+        time_range_hours: int,
+        watermark: Hashable,
+    ) -> Dict[str, Any]:
+        """Run every analyzer concurrently and compile their results"""
+        start_time = datetime.utcnow()
+
+        # (name, analyzer) pairs, run concurrently through the executor
+        components = [
+            ("performance_analysis", self.performance_analyzer),
+            ("data_aggregation", self.data_aggregator),
+            ("trend_analysis", self.trend_analyzer),
+            ("insight_generation", self.insight_generator),
+        ]
+
+        # Predictive analytics (if enabled)
+        if include_predictions and self.config["enable_predictive_models"]:
+            components += [
+                ("task_duration_prediction", self.task_duration_predictor),
+                ("system_load_prediction", self.system_load_predictor),
+            ]
 
-            analysis_tasks.append(
-                self._run_with_error_handling(
-                    "insight_generation",
-                    self.insight_generator.analyze(
-                        db, time_range_hours=time_range_hours
+        # Optimization analysis (if enabled)
+        if include_optimization:
+            components.append(("optimization_analysis", self.optimization_engine))
+
+        # Each component has its own timeout; failures leave a partial report
+        results = await self.executor.gather(
+            [
+                (
+                    name,
+                    partial(
+                        self._analyze,
+                        analyzer,
+                        db,
+                        watermark=watermark,
+                        time_range_hours=time_range_hours,
                     ),
                 )
-            )
-
-            # Predictive analytics (if enabled)
-            if include_predictions and self.config["enable_predictive_models"]:
-                analysis_tasks.append(
-                    self._run_with_error_handling(
-                        "task_duration_prediction",
-                        self.task_duration_predictor.analyze(
-                            db, time_range_hours=time_range_hours
-                        ),
-                    )
-                )
-
-                analysis_tasks.append(
-                    self._run_with_error_handling(
-                        "system_load_prediction",
-                        self.system_load_predictor.analyze(
-                            db, time_range_hours=time_range_hours
-                        ),
-                    )
-                )
-
-            # Optimization analysis (if enabled)
-            if include_optimization:
-                analysis_tasks.append(
-                    self._run_with_error_handling(
-                        "optimization_analysis",
-                        self.optimization_engine.analyze(
-                            db, time_range_hours=time_range_hours
-                        ),
-                    )
-                )
+                for name, analyzer in components
+            ]
+        )
 
-            # Wait for all analyses to complete
-            results = await asyncio.gather(*analysis_tasks)
+        def result_of(name: str) -> Dict[str, Any]:
+            return results.get(name, {}).get("result", {})
 
-            # Compile comprehensive report
-            comprehensive_report = {
-                "analysis_metadata": {
-                    "generated_at": datetime.utcnow().isoformat(),
-                    "time_range_hours": time_range_hours,
-                    "analysis_duration_seconds": (
-                        datetime.utcnow() - start_time
-                    ).total_seconds(),
-                    "components_analyzed": len(analysis_tasks),
-                },
-                "performance_analysis": results[0].get("result", {}),
-                "data_aggregation": results[1].get("result", {}),
-                "trend_analysis": results[2].get("result", {}),
-                "insights": results[3].get("result", {}),
-                "predictions": {},
-                "optimization": {},
-                "executive_summary": {},
+        component_status = {
+            name: {
+                key: outcome[key]
+                for key in ("status", "duration_seconds", "error")
+                if key in outcome
             }
+            for name, outcome in results.items()
+        }
 
-            # Add predictive results
-            if include_predictions and len(results) > 4:
-                comprehensive_report["predictions"] = {
-                    "task_duration": results[4].get("result", {}),
-                    "system_load": (
-                        results[5].get("result", {}) if len(results) > 5 else {}
-                    ),
-                }
+        # Compile comprehensive report
+        comprehensive_report = {
+            "analysis_metadata": {
+                "generated_at": datetime.utcnow().isoformat(),
+                "time_range_hours": time_range_hours,
+                "analysis_duration_seconds": (
+                    datetime.utcnow() - start_time
+                ).total_seconds(),
+                "components_analyzed": len(components),
+                "component_status": component_status,
+                "partial": any(
+                    outcome["status"] != "success" for outcome in results.values()
+                ),
+            },
+            "performance_analysis": result_of("performance_analysis"),
+            "data_aggregation": result_of("data_aggregation"),
+            "trend_analysis": result_of("trend_analysis"),
+            "insights": result_of("insight_generation"),
+            "predictions": {},
+            "optimization": {},
+            "executive_summary": {},
+        }
 
-            # Add optimization results
-            if include_optimization:
-                optimization_index = 6 if include_predictions else 4
-                if len(results) > optimization_index:
-                    comprehensive_report["optimization"] = results[
-                        optimization_index
-                    ].get("result", {})
-
-            # Generate executive summary
-            comprehensive_report["executive_summary"] = (
-                await self._generate_executive_summary(comprehensive_report)
-            )
+        # Add predictive results
+        if "task_duration_prediction" in results:
+            comprehensive_report["predictions"] = {
+                "task_duration": result_of("task_duration_prediction"),
+                "system_load": result_of("system_load_prediction"),
+            }
 
-            # Cache the result
-            self._set_cache(cache_key, comprehensive_report)
+        # Add optimization results
+        if "optimization_analysis" in results:
+            comprehensive_report["optimization"] = result_of("optimization_analysis")
 
-            # Update last analysis timestamp
-            self.last_analysis_run["comprehensive"] = datetime.utcnow()
+        # Generate executive summary
+        comprehensive_report["executive_summary"] = (
+            await self._generate_executive_summary(comprehensive_report)
+        )
 
-            self.logger.info(
-                f"✅ Comprehensive analysis completed in {(datetime.utcnow() - start_time).total_seconds():.2f}s"
-            )
-            return comprehensive_report
+        # Update last analysis timestamp
+        self.last_analysis_run["comprehensive"] = datetime.utcnow()
 
-        except Exception as e:
-            self.logger.error(f"❌ Error in comprehensive analysis: {e}")
-            return {
-                "error": str(e),
-                "analysis_metadata": {
-                    "generated_at": datetime.utcnow().isoformat(),
-                    "status": "failed",
-                },
-            }
+        self.logger.info(
+            f"✅ Comprehensive analysis completed in {(datetime.utcnow() - start_time).total_seconds():.2f}s"
+        )
+        return comprehensive_report
 
     async def run_performance_analysis(
         self,
@@ -270,17 +306,11 @@ class AnalyticsService:
     ) -> Dict[str, Any]:
         """Run focused performance analysis"""
 
-        cache_key = f"performance_{agent_id}_{time_range_hours}"
-        cached_result = self._get_from_cache(cache_key)
-        if cached_result:
-            return cached_result
-
         try:
-            result = await self.performance_analyzer.analyze(
+            result = await self.performance_analyzer.analyze_cached(
                 db, agent_id=agent_id, time_range_hours=time_range_hours
             )
 
-            self._set_cache(cache_key, result)
             self.last_analysis_run["performance"] = datetime.utcnow()
 
             return result
@@ -299,23 +329,24 @@ class AnalyticsService:
         if not self.config["enable_predictive_models"]:
             return {"error": "Predictive models are disabled"}
 
-        cache_key = f"predictive_{prediction_type}"
-        cached_result = self._get_from_cache(cache_key)
-        if cached_result:
-            return cached_result
-
         try:
             results = {}
+            watermark = await data_watermark(db)
 
             if prediction_type in ["task_duration", "both"]:
-                results["task_duration"] = await self.task_duration_predictor.analyze(
-                    db
+                results["task_duration"] = (
+                    await self.task_duration_predictor.analyze_cached(
+                        db, watermark=watermark
+                    )
                 )
 
             if prediction_type in ["system_load", "both"]:
-                results["system_load"] = await self.system_load_predictor.analyze(db)
+                results["system_load"] = (
+                    await self.system_load_predictor.analyze_cached(
+                        db, watermark=watermark
+                    )
+                )
 
-            self._set_cache(cache_key, results)
             self.last_analysis_run["predictive"] = datetime.utcnow()
 
             return results
@@ -329,15 +360,9 @@ class AnalyticsService:
     ) -> Dict[str, Any]:
         """Run trend analysis for specific metrics"""
 
-        cache_key = f"trends_{','.join(metrics) if metrics else 'all'}"
-        cached_result = self._get_from_cache(cache_key)
-        if cached_result:
-            return cached_result
-
         try:
-            result = await self.trend_analyzer.analyze(db, metrics=metrics)
+            result = await self.trend_analyzer.analyze_cached(db, metrics=metrics)
 
-            self._set_cache(cache_key, result)
             self.last_analysis_run["trends"] = datetime.utcnow()
 
             return result
@@ -491,7 +516,20 @@ class AnalyticsService:
                 )
                 for key, timestamp in self.last_analysis_run.items()
             },
-            "cache_size": len(self.analysis_cache),
+            "models": {
+                predictor.registry_name: {
+                    "version": predictor.model_version,
+                    "training_watermark": (
+                        predictor.training_watermark.isoformat()
+                        if predictor.training_watermark
+                        else None
+                    ),
+                }
+                for predictor in self._predictors()
+            },
+            "cache_size": self.cache.size(self.cache_namespace),
+            "cache": self.cache.get_stats(),
+            "executor": self.executor.get_stats(),
             "background_tasks": len(self.background_tasks),
             "configuration": self.config,
         }
@@ -503,23 +541,27 @@ class AnalyticsService:
                 self.config[key] = value
                 self.logger.info(f"Updated config: {key} = {value}")
 
+        self.executor.default_timeout = self.config["analysis_timeout_seconds"]
+        self.executor.timeouts = dict(self.config["analysis_timeouts"])
+
     # Private helper methods
 
-    async def _run_with_error_handling(
-        self, component_name: str, coroutine
+    async def _analyze(
+        self,
+        analyzer,
+        db: AsyncSession,
+        watermark: Hashable = None,
+        **kwargs,
     ) -> Dict[str, Any]:
-        """Run analysis component with error handling"""
-        try:
-            result = await coroutine
-            return {"component": component_name, "status": "success", "result": result}
-        except Exception as e:
-            self.logger.error(f"Error in {component_name}: {e}")
-            return {
-                "component": component_name,
-                "status": "error",
-                "error": str(e),
-                "result": {},
-            }
+        """Run ``analyzer`` on its own pooled session when a factory is set"""
+        if self.session_factory is None:
+            return await analyzer.analyze_cached(
+                db, watermark=watermark, executor=self.executor, **kwargs
+            )
+        async with self.session_factory() as session:
+            return await analyzer.analyze_cached(
+                session, watermark=watermark, executor=self.executor, **kwargs
+            )
 
     async def _generate_executive_summary(
         self, analysis_data: Dict[str, Any]
@@ -669,21 +711,31 @@ class AnalyticsService:
 
         return opportunities
 
-    def _get_from_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
-        """Get result from cache if still valid"""
-        if cache_key in self.analysis_cache:
-            cached_data, timestamp = self.analysis_cache[cache_key]
-            if datetime.utcnow() - timestamp < timedelta(
-                minutes=self.config["cache_ttl_minutes"]
-            ):
-                return cached_data
-            else:
-                del self.analysis_cache[cache_key]
-        return None
-
-    def _set_cache(self, cache_key: str, data: Dict[str, Any]):
-        """Set data in cache"""
-        self.analysis_cache[cache_key] = (data, datetime.utcnow())
+    async def _cached(
+        self,
+        cache_key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        watermark: Hashable,
+    ) -> Dict[str, Any]:
+        """
+        Shared-cache lookup; concurrent misses run ``compute`` once
+
+        Partial reports, where a component failed or timed out, are returned
+        but not cached, so the next request retries the missing components
+        instead of serving the gap until the data changes.
+        """
+        return await self.cache.get_or_compute(
+            self.cache_namespace,
+            cache_key,
+            compute,
+            ttl=self.config["cache_ttl_minutes"] * 60,
+            watermark=watermark,
+            cacheable=_is_complete_report,
+        )
+
+    def notify_data_changed(self):
+        """Evict cached analyses as soon as new history rows are written"""
+        self.cache.notify_data_changed()
 
     async def _start_background_tasks(self):
         """Start background analytics tasks"""
@@ -695,6 +747,11 @@ class AnalyticsService:
         cache_cleanup_task = asyncio.create_task(self._cache_cleanup_loop())
         self.background_tasks.append(cache_cleanup_task)
 
+        # Incremental predictive model updates
+        if self.config["enable_predictive_models"]:
+            model_update_task = asyncio.create_task(self._model_update_loop())
+            self.background_tasks.append(model_update_task)
+
     async def _auto_analysis_loop(self):
         """Background task for automatic analysis"""
         while True:
@@ -709,6 +766,44 @@ class AnalyticsService:
             except Exception as e:
                 self.logger.error(f"Error in auto-analysis loop: {e}")
 
+    def _predictors(self) -> List[Any]:
+        return [self.task_duration_predictor, self.system_load_predictor]
+
+    async def _load_models(self):
+        """Restore persisted predictive models so predictions need no training"""
+        for predictor in self._predictors():
+            try:
+                await asyncio.to_thread(predictor.load_model)
+            except Exception as e:
+                self.logger.warning(
+                    f"Could not load {predictor.registry_name} model: {e}"
+                )
+
+    async def update_models(self, db: AsyncSession):
+        """Fold new history into the predictive models and persist them"""
+        for predictor in self._predictors():
+            await predictor.update_model(db)
+            # Predictions cached from the previous model are outdated
+            predictor.clear_cache()
+        self.last_analysis_run["model_update"] = datetime.utcnow()
+
+    async def _model_update_loop(self):
+        """Background task for incremental model updates"""
+        while True:
+            try:
+                await asyncio.sleep(self.config["model_update_interval_minutes"] * 60)
+                if self.session_factory is None:
+                    self.logger.info(
+                        "Model update interval reached (database session needed)"
+                    )
+                    continue
+                async with self.session_factory() as session:
+                    await self.update_models(session)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Error in model update loop: {e}")
+
     async def _cache_cleanup_loop(self):
         """Background task for cache cleanup"""
         while True:
@@ -716,22 +811,9 @@ class AnalyticsService:
                 await asyncio.sleep(300)  # Every 5 minutes
 
                 # Clean expired cache entries
-                current_time = datetime.utcnow()
-                ttl = timedelta(minutes=self.config["cache_ttl_minutes"])
-
-                expired_keys = [
-                    key
-                    for key, (_, timestamp) in self.analysis_cache.items()
-                    if current_time - timestamp > ttl
-                ]
-
-                for key in expired_keys:
-                    del self.analysis_cache[key]
-
-                if expired_keys:
-                    self.logger.info(
-                        f"Cleaned {len(expired_keys)} expired cache entries"
-                    )
+                expired = self.cache.purge_expired()
+                if expired:
+                    self.logger.info(f"Cleaned {expired} expired cache entries")
 
             except asyncio.CancelledError:
                 break
@@ -744,7 +826,7 @@ class AnalyticsService:
             cache_file = self.storage_path / "analytics_cache.pkl"
             if cache_file.exists():
                 with open(cache_file, "rb") as f:
-                    self.analysis_cache = pickle.load(f)
+                    self.cache.import_entries(self.cache_namespace, pickle.load(f))
                 self.logger.info("Loaded cached analytics data")
         except Exception as e:
             self.logger.warning(f"Could not load cached data: {e}")
@@ -755,7 +837,7 @@ class AnalyticsService:
             if self.config["storage_enabled"]:
                 cache_file = self.storage_path / "analytics_cache.pkl"
                 with open(cache_file, "wb") as f:
-                    pickle.dump(self.analysis_cache, f)
+                    pickle.dump(self.cache.export_entries(self.cache_namespace), f)
                 self.logger.info("Saved analytics cache to storage")
         except Exception as e:
             self.logger.warning(f"Could not save cached data: {e}")
@@ -3,5 +3,30 @@ Analytics Utils Module
 Utility functions and helpers for SubForge analytics
 """
 
-# Placeholder for future utility functions
-__all__ = []
\ No newline at end of file
+from .data_access import (
+    SYSTEM_METRICS_HISTORY,
+    TASK_HISTORY,
+    AnalyticsDataAccess,
+    ColumnFrame,
+    ColumnQuery,
+    analytics_data,
+    bucket_totals,
+    data_watermark,
+)
+from .result_cache import AnalyticsResultCache, analytics_cache
+from .streaming_stats import QuantileSketch, RunningMoments
+
+__all__ = [
+    "AnalyticsDataAccess",
+    "AnalyticsResultCache",
+    "ColumnFrame",
+    "ColumnQuery",
+    "QuantileSketch",
+    "RunningMoments",
+    "SYSTEM_METRICS_HISTORY",
+    "TASK_HISTORY",
+    "analytics_cache",
+    "analytics_data",
+    "bucket_totals",
+    "data_watermark",
+]
@@ -0,0 +1,287 @@
+"""
+Columnar data access for the analytics processors
+Loads only the columns an analysis needs, straight into NumPy arrays
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import sqltypes
+
+from ...app.models.agent import Agent
+from ...app.models.system_metrics import SystemMetrics
+from ...app.models.task import Task
+from ...app.models.workflow import Workflow
+
+logger = logging.getLogger(__name__)
+
+# Column name -> array, all of the same length, ordered by the time column
+ColumnFrame = Dict[str, np.ndarray]
+
+
+@dataclass(frozen=True)
+class ColumnQuery:
+    """A named set of columns of one table, selected over a trailing window"""
+
+    name: str
+    model: Any
+    time_column: str
+    columns: Tuple[str, ...]
+    # Changes whenever a row is inserted or updated; drives cache invalidation
+    version_column: str = "updated_at"
+
+    @property
+    def all_columns(self) -> Tuple[str, ...]:
+        return (self.time_column, *self.columns)
+
+
+SYSTEM_METRICS_HISTORY = ColumnQuery(
+    name="system_metrics_history",
+    model=SystemMetrics,
+    time_column="recorded_at",
+    columns=(
+        "system_load_percentage",
+        "cpu_usage_percentage",
+        "memory_usage_percentage",
+        "overall_success_rate",
+        "avg_response_time_ms",
+        "active_agents",
+        "error_rate_percentage",
+        "uptime_percentage",
+    ),
+)
+
+TASK_HISTORY = ColumnQuery(
+    name="task_history",
+    model=Task,
+    time_column="created_at",
+    columns=("status",),
+)
+
+
+def _datetime_array(values) -> np.ndarray:
+    """Naive UTC datetime64 array; None becomes NaT"""
+    return np.array(
+        [
+            (
+                value.astimezone(timezone.utc).replace(tzinfo=None)
+                if value is not None and value.tzinfo is not None
+                else value
+            )
+            for value in values
+        ],
+        dtype="datetime64[us]",
+    )
+
+
+def _column_array(column, values) -> np.ndarray:
+    """Convert one column of a result chunk to an array of a fitting dtype"""
+    if isinstance(column.type, sqltypes.DateTime):
+        return _datetime_array(values)
+    if isinstance(column.type, (sqltypes.Integer, sqltypes.Float, sqltypes.Numeric)):
+        # None becomes NaN
+        return np.array(values, dtype=np.float64)
+    return np.array(values, dtype=object)
+
+
+def empty_frame(query: ColumnQuery) -> ColumnFrame:
+    table = query.model.__table__
+    return {
+        name: _column_array(table.c[name], []) for name in query.all_columns
+    }
+
+
+def frame_length(frame: ColumnFrame) -> int:
+    return len(next(iter(frame.values()))) if frame else 0
+
+
+def bucket_totals(
+    timestamps: np.ndarray, unit: str, **columns: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+    """
+    Group rows into calendar buckets of ``unit`` ("h", "D", ...)
+
+    Returns the sorted bucket starts, the row count of each bucket and, for
+    every keyword column, its per-bucket sum and non-NaN count.
+    """
+    present = ~np.isnat(timestamps)
+    buckets, inverse = np.unique(
+        timestamps[present].astype(f"datetime64[{unit}]"), return_inverse=True
+    )
+    counts = np.bincount(inverse, minlength=len(buckets))
+    totals = {}
+    for name, values in columns.items():
+        values = np.asarray(values, dtype=np.float64)[present]
+        valid = ~np.isnan(values)
+        totals[name] = (
+            np.bincount(
+                inverse, weights=np.where(valid, values, 0.0), minlength=len(buckets)
+            ),
+            np.bincount(inverse, weights=valid, minlength=len(buckets)),
+        )
+    return buckets, counts, totals
+
+
+# Latest-change columns of every table the analyzers read
+_WATERMARK_COLUMNS = (
+    SystemMetrics.recorded_at,
+    Task.updated_at,
+    Agent.updated_at,
+    Workflow.updated_at,
+)
+
+
+async def data_watermark(db: AsyncSession) -> Tuple[Any, ...]:
+    """
+    Latest history row timestamps, read in one round trip
+
+    Any insert or update to the analyzed tables changes the tuple, so it
+    identifies the data an analysis result was computed from.
+    """
+    result = await db.execute(
+        select(
+            *[
+                select(func.max(column)).scalar_subquery()
+                for column in _WATERMARK_COLUMNS
+            ]
+        )
+    )
+    return tuple(result.one())
+
+
+@dataclass
+class _CachedFrame:
+    frame: ColumnFrame
+    start: datetime
+    watermark: Tuple[Any, ...]
+    loaded_at: float
+
+
+class AnalyticsDataAccess:
+    """
+    Shared loader for the analytics processors
+
+    ``load`` selects only a query's columns with a Core ``select()``, streams
+    the result in chunks of ``chunk_size`` rows and converts each chunk to
+    arrays, so no ORM objects are built and memory stays at one chunk of
+    Python tuples. Frames are cached per (query, window). A cached frame is
+    reused while the rows it covers are unchanged, checked by one aggregate
+    query on the row count and the latest ``version_column`` value; a newer
+    window start is served by slicing the cached arrays. Frames are also
+    reloaded after ``max_age`` seconds.
+
+    Cached arrays are shared between callers and must not be modified.
+    """
+
+    def __init__(
+        self, chunk_size: int = 5000, max_age: float = 300.0, max_entries: int = 16
+    ):
+        self.chunk_size = chunk_size
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.logger = logger
+        self._cache: Dict[Tuple[str, timedelta], _CachedFrame] = {}
+        self.stats = {"hits": 0, "misses": 0, "rows_loaded": 0}
+
+    async def load(
+        self,
+        db: AsyncSession,
+        query: ColumnQuery,
+        window: timedelta,
+        now: Optional[datetime] = None,
+    ) -> ColumnFrame:
+        """Rows of ``query`` whose time column falls in the trailing ``window``"""
+        start = (now or datetime.utcnow()) - window
+        key = (query.name, window)
+
+        cached = self._cache.get(key)
+        if cached is not None and start >= cached.start:
+            fresh = time.monotonic() - cached.loaded_at < self.max_age
+            if fresh and await self._watermark(db, query, cached.start) == (
+                cached.watermark
+            ):
+                self.stats["hits"] += 1
+                return self._slice(query, cached.frame, start)
+
+        self.stats["misses"] += 1
+        watermark = await self._watermark(db, query, start)
+        frame = await self._select(db, query, start)
+        self._store(key, _CachedFrame(frame, start, watermark, time.monotonic()))
+        return frame
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drop cached frames of one query, or all of them"""
+        for key in [key for key in self._cache if name is None or key[0] == name]:
+            del self._cache[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "entries": len(self._cache)}
+
+    async def _select(
+        self, db: AsyncSession, query: ColumnQuery, start: datetime
+    ) -> ColumnFrame:
+        table = query.model.__table__
+        columns = [table.c[name] for name in query.all_columns]
+        time_column = table.c[query.time_column]
+        statement = (
+            select(*columns)
+            .where(time_column >= start)
+            .order_by(time_column)
+            .execution_options(yield_per=self.chunk_size)
+        )
+
+        chunks = {column.name: [] for column in columns}
+        result = await db.stream(statement)
+        async for rows in result.partitions():
+            for column, values in zip(columns, zip(*rows)):
+                chunks[column.name].append(_column_array(column, values))
+
+        frame = {
+            column.name: (
+                np.concatenate(chunks[column.name])
+                if chunks[column.name]
+                else _column_array(column, [])
+            )
+            for column in columns
+        }
+        self.stats["rows_loaded"] += frame_length(frame)
+        return frame
+
+    async def _watermark(
+        self, db: AsyncSession, query: ColumnQuery, start: datetime
+    ) -> Tuple[Any, ...]:
+        table = query.model.__table__
+        version = table.c.get(query.version_column, table.c[query.time_column])
+        result = await db.execute(
+            select(func.count(), func.max(version)).where(
+                table.c[query.time_column] >= start
+            )
+        )
+        return tuple(result.one())
+
+    def _slice(
+        self, query: ColumnQuery, frame: ColumnFrame, start: datetime
+    ) -> ColumnFrame:
+        offset = np.searchsorted(
+            frame[query.time_column], np.datetime64(start, "us"), side="left"
+        )
+        if offset == 0:
+            return frame
+        return {name: values[offset:] for name, values in frame.items()}
+
+    def _store(self, key: Tuple[str, timedelta], entry: _CachedFrame):
+        self._cache.pop(key, None)
+        while len(self._cache) >= self.max_entries:
+            # Dicts keep insertion order, so the first key is the oldest load
+            del self._cache[next(iter(self._cache))]
+        self._cache[key] = entry
+
+
+# Global analytics data access instance
+analytics_data = AnalyticsDataAccess()
@@ -0,0 +1,200 @@
+"""
+Shared result cache for the analytics components
+Size-bounded LRU with per-namespace TTLs, single-flight computation and
+invalidation on the data watermark
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from ...app.utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    watermark: Hashable
+    expires_at: float
+
+
+class AnalyticsResultCache:
+    """
+    One cache shared by the analyzers and the analytics service
+
+    Entries are keyed by (namespace, key); each analyzer uses its own
+    namespace and TTL. Every entry records the data watermark (the latest
+    history row timestamps) it was computed from. As soon as a lookup sees a
+    newer watermark, or ``notify_data_changed`` is called on a write, all
+    entries computed from older data are evicted, so nothing is recomputed
+    while the data is unchanged and nothing stale survives new data. The
+    least recently used entries are dropped beyond ``max_entries``, and
+    concurrent misses for the same key share one computation.
+    """
+
+    def __init__(self, max_entries: int = 256, default_ttl: float = 1800.0):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.logger = logger
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._inflight = SingleFlight(on_coalesced=self._count_coalesced)
+        self._watermark: Hashable = None
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    async def get_or_compute(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        watermark: Hashable = None,
+        cacheable: Callable[[Any], bool] = bool,
+    ) -> Any:
+        """
+        Cached result of ``compute`` for (namespace, key) at ``watermark``
+
+        Results rejected by ``cacheable`` (by default the falsy ones) are
+        returned but not cached, so an empty or failed analysis is retried on
+        the next call.
+        """
+        self.observe_watermark(watermark)
+        cached = self.get(namespace, key, watermark)
+        if cached is not None:
+            return cached
+
+        async def compute_and_store():
+            result = await compute()
+            if cacheable(result):
+                self.set(namespace, key, result, ttl=ttl, watermark=watermark)
+            return result
+
+        self.stats["misses"] += 1
+        return await self._inflight.run(
+            ((namespace, key), watermark), compute_and_store
+        )
+
+    def get(self, namespace: str, key: str, watermark: Hashable = None) -> Any:
+        """Cached value, or None when missing, expired or from other data"""
+        cache_key = (namespace, key)
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time() or entry.watermark != watermark:
+            del self._entries[cache_key]
+            return None
+        self._entries.move_to_end(cache_key)
+        self.stats["hits"] += 1
+        return entry.value
+
+    def set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        watermark: Hashable = None,
+    ):
+        cache_key = (namespace, key)
+        self._entries.pop(cache_key, None)
+        self._entries[cache_key] = _CacheEntry(
+            value, watermark, time.time() + (self.default_ttl if ttl is None else ttl)
+        )
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def observe_watermark(self, watermark: Hashable):
+        """Evict entries computed from older data once a new watermark shows up"""
+        if watermark is None or watermark == self._watermark:
+            return
+        self._watermark = watermark
+        stale = [
+            cache_key
+            for cache_key, entry in self._entries.items()
+            if entry.watermark != watermark
+        ]
+        for cache_key in stale:
+            del self._entries[cache_key]
+        if stale:
+            self.stats["invalidations"] += len(stale)
+
+    def notify_data_changed(self):
+        """New history rows were written; drop every watermarked entry"""
+        self._watermark = None
+        self.invalidate()
+
+    def invalidate(self, namespace: Optional[str] = None):
+        """Drop the entries of one namespace, or all of them"""
+        stale = [
+            cache_key
+            for cache_key in self._entries
+            if namespace is None or cache_key[0] == namespace
+        ]
+        for cache_key in stale:
+            del self._entries[cache_key]
+        self.stats["invalidations"] += len(stale)
+
+    def purge_expired(self) -> int:
+        """Remove expired entries; returns how many were removed"""
+        now = time.time()
+        expired = [
+            cache_key
+            for cache_key, entry in self._entries.items()
+            if entry.expires_at <= now
+        ]
+        for cache_key in expired:
+            del self._entries[cache_key]
+        return len(expired)
+
+    def keys(self, namespace: Optional[str] = None):
+        return [
+            key for ns, key in self._entries if namespace is None or ns == namespace
+        ]
+
+    def size(self, namespace: Optional[str] = None) -> int:
+        return len(self.keys(namespace))
+
+    def export_entries(self, namespace: str) -> Dict[str, Tuple[Any, Hashable, float]]:
+        """Unexpired entries of ``namespace`` as key -> (value, watermark, expiry)"""
+        now = time.time()
+        return {
+            key: (entry.value, entry.watermark, entry.expires_at)
+            for (ns, key), entry in self._entries.items()
+            if ns == namespace and entry.expires_at > now
+        }
+
+    def import_entries(
+        self, namespace: str, entries: Dict[str, Tuple[Any, Hashable, float]]
+    ):
+        """Restore entries saved by ``export_entries``"""
+        now = time.time()
+        for key, (value, watermark, expires_at) in entries.items():
+            if expires_at > now:
+                self.set(namespace, key, value, expires_at - now, watermark)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+        }
+
+    def _count_coalesced(self, flight_key):
+        self.stats["coalesced"] += 1
+
+
+# Global analytics result cache instance
+analytics_cache = AnalyticsResultCache()
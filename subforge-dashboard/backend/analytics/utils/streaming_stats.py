@@ -0,0 +1,192 @@
+"""
+Streaming statistics for sliding metric windows
+Running moments and a log-bucketed quantile sketch that support removal and merging
+"""
+
+import math
+from typing import Dict, Iterable, List
+
+
+class RunningMoments:
+    """
+    Count, sum, mean and variance maintained with Welford's method
+
+    Values can be removed again in O(1), which lets a sliding window evict its
+    oldest point without rescanning, and two instances merge with Chan's
+    parallel formula.
+    """
+
+    __slots__ = ("count", "total", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value: float):
+        if self.count <= 1:
+            self.__init__()
+            return
+        self.count -= 1
+        self.total -= value
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        # Rounding can push the second moment slightly below zero
+        self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+
+    def copy(self) -> "RunningMoments":
+        copied = RunningMoments()
+        copied.count, copied.total = self.count, self.total
+        copied.mean, copied.m2 = self.mean, self.m2
+        return copied
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """New moments covering the values of both instances"""
+        merged = RunningMoments()
+        merged.count = self.count + other.count
+        if merged.count == 0:
+            return merged
+        delta = other.mean - self.mean
+        merged.total = self.total + other.total
+        merged.mean = self.mean + delta * other.count / merged.count
+        merged.m2 = (
+            self.m2 + other.m2 + delta * delta * self.count * other.count / merged.count
+        )
+        return merged
+
+    @property
+    def variance(self) -> float:
+        """Population variance, as ``np.var`` reports it"""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch with bounded relative error
+
+    Bucket boundaries grow geometrically (DDSketch style), so quantiles are
+    reported within ``relative_accuracy`` of the true value while memory is
+    proportional to the dynamic range of the values, not their number.
+    Negative values get their own buckets and magnitudes up to ``min_value``
+    count as zero. Because each value only increments a bucket counter it can
+    be removed again, and sketches with the same layout merge by adding counts.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _bucket(self, value: float):
+        magnitude = abs(value)
+        if magnitude <= self.min_value:
+            return None, 0
+        key = math.ceil(math.log(magnitude) / self._log_gamma)
+        return (self.positive if value > 0 else self.negative), key
+
+    def add(self, value: float):
+        self.count += 1
+        buckets, key = self._bucket(value)
+        if buckets is None:
+            self.zero_count += 1
+        else:
+            buckets[key] = buckets.get(key, 0) + 1
+
+    def remove(self, value: float):
+        """Undo one earlier ``add`` of ``value``"""
+        buckets, key = self._bucket(value)
+        if buckets is None:
+            if self.zero_count == 0:
+                return
+            self.zero_count -= 1
+        else:
+            remaining = buckets.get(key, 0) - 1
+            if remaining < 0:
+                return
+            if remaining:
+                buckets[key] = remaining
+            else:
+                # Keep the dicts proportional to the values still present
+                del buckets[key]
+        self.count -= 1
+
+    def copy(self) -> "QuantileSketch":
+        copied = QuantileSketch(self.relative_accuracy, self.min_value)
+        copied.positive = dict(self.positive)
+        copied.negative = dict(self.negative)
+        copied.zero_count = self.zero_count
+        copied.count = self.count
+        return copied
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """New sketch covering the values of both sketches"""
+        if (
+            other.relative_accuracy != self.relative_accuracy
+            or other.min_value != self.min_value
+        ):
+            raise ValueError("Cannot merge sketches with different bucket layouts")
+        merged = QuantileSketch(self.relative_accuracy, self.min_value)
+        for target, mine, theirs in (
+            (merged.positive, self.positive, other.positive),
+            (merged.negative, self.negative, other.negative),
+        ):
+            target.update(mine)
+            for key, count in theirs.items():
+                target[key] = target.get(key, 0) + count
+        merged.zero_count = self.zero_count + other.zero_count
+        merged.count = self.count + other.count
+        return merged
+
+    def _value(self, key: int) -> float:
+        # Midpoint of the bucket (gamma^(k-1), gamma^k] in relative terms
+        return 2 * self._gamma**key / (1 + self._gamma)
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        """Estimate several quantiles (0 <= q <= 1) in one pass over the buckets"""
+        qs = list(qs)
+        if self.count == 0:
+            return [0.0] * len(qs)
+
+        # Buckets from the most negative value up to the largest positive one
+        ordered = [
+            (-self._value(key), self.negative[key])
+            for key in sorted(self.negative, reverse=True)
+        ]
+        if self.zero_count:
+            ordered.append((0.0, self.zero_count))
+        ordered.extend(
+            (self._value(key), self.positive[key]) for key in sorted(self.positive)
+        )
+
+        results = {}
+        pending = sorted(range(len(qs)), key=lambda i: qs[i])
+        seen = 0
+        for value, count in ordered:
+            seen += count
+            while pending and seen > qs[pending[0]] * (self.count - 1):
+                results[pending.pop(0)] = value
+            if not pending:
+                break
+        for index in pending:
+            results[index] = ordered[-1][0]
+        return [results[index] for index in range(len(qs))]
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles([q])[0]
@@ -23,6 +23,7 @@ try:
     )
     from ..services.subforge_integration import subforge_integration
     from ..websocket.manager import websocket_manager
+    from ..websocket.workflow_topics import WORKFLOW_LIST_TOPIC, workflow_publisher
 except ImportError:
     # Fallback for direct execution
     from models.subforge_models import (
@@ -32,6 +33,7 @@ except ImportError:
     )
     from services.subforge_integration import subforge_integration
     from websocket.manager import websocket_manager
+    from websocket.workflow_topics import WORKFLOW_LIST_TOPIC, workflow_publisher
 
 logger = logging.getLogger(__name__)
 
@@ -443,6 +445,12 @@ async def stop_integration():
 async def subforge_websocket(websocket: WebSocket):
     """
     WebSocket endpoint for real-time SubForge updates
+
+    Connections start on the workflow list topic. ``subscribe_workflow``
+    returns a versioned snapshot; afterwards the client receives
+    ``subforge_workflow_delta`` patches against the last version it confirmed
+    with ``ack_workflow`` (or a fresh snapshot when it has fallen behind), and
+    can request a snapshot at any time with ``resync_workflow``.
     """
     client_info = {
         "host": websocket.client.host if websocket.client else "unknown",
@@ -451,6 +459,7 @@ async def subforge_websocket(websocket: WebSocket):
     }
 
     await websocket_manager.connect(websocket, client_info)
+    websocket_manager.subscribe(websocket, WORKFLOW_LIST_TOPIC)
 
     try:
         # Send initial data
@@ -481,22 +490,28 @@ async def subforge_websocket(websocket: WebSocket):
             elif message_type == "subscribe_workflow":
                 workflow_id = data.get("workflow_id")
                 if workflow_id:
-                    # Send specific workflow data
                     workflow = subforge_integration.get_workflow(workflow_id)
                     if workflow:
+                        version = workflow_publisher.subscribe(
+                            websocket, workflow_id, workflow.dict()
+                        )
+                        _, snapshot = workflow_publisher.current(workflow_id)
                         await websocket_manager.send_personal_message(
                             websocket,
                             {
                                 "type": "workflow_subscribed",
                                 "data": {
                                     "workflow_id": workflow_id,
-                                    "workflow": workflow.dict(),
+                                    "version": version,
+                                    "workflow": snapshot,
                                 },
                             },
                         )
 
             elif message_type == "unsubscribe_workflow":
                 workflow_id = data.get("workflow_id")
+                if workflow_id:
+                    workflow_publisher.unsubscribe(websocket, workflow_id)
                 await websocket_manager.send_personal_message(
                     websocket,
                     {
@@ -505,6 +520,23 @@ async def subforge_websocket(websocket: WebSocket):
                     },
                 )
 
+            elif message_type == "ack_workflow":
+                workflow_id = data.get("workflow_id")
+                version = data.get("version")
+                if workflow_id and isinstance(version, int):
+                    workflow_publisher.acknowledge(websocket, workflow_id, version)
+
+            elif message_type == "resync_workflow":
+                workflow_id = data.get("workflow_id")
+                if workflow_id:
+                    workflow_publisher.resync(websocket, workflow_id)
+
+            elif message_type == "subscribe_list":
+                websocket_manager.subscribe(websocket, WORKFLOW_LIST_TOPIC)
+
+            elif message_type == "unsubscribe_list":
+                websocket_manager.unsubscribe(websocket, WORKFLOW_LIST_TOPIC)
+
             else:
                 logger.info(
                     f"Received unhandled SubForge WebSocket message: {message_type}"
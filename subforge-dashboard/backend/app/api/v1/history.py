@@ -16,6 +16,7 @@ from ...models.database import (
     WorkflowHistory,
 )
 from ...services.persistence import persistence_service
+from ...services.rollups import rollup_service
 
 router = APIRouter(prefix="/history", tags=["History"])
 
@@ -24,7 +25,12 @@ router = APIRouter(prefix="/history", tags=["History"])
 async def get_workflow_history(
     db: AsyncSession = Depends(get_db),
     limit: int = Query(50, ge=1, le=1000, description="Number of records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page"
+    ),
+    offset: int = Query(
+        0, ge=0, description="Deprecated: number of records to skip, use cursor"
+    ),
     project_id: Optional[str] = Query(None, description="Filter by project ID"),
     status_filter: Optional[str] = Query(None, description="Filter by workflow status"),
     start_date: Optional[datetime] = Query(None, description="Start date filter"),
@@ -33,39 +39,65 @@ async def get_workflow_history(
     """
     Get workflow execution history with optional filtering
 
-    Returns paginated list of workflow history records
+    Returns a page of workflow history records, newest first. Pass the
+    returned ``next_cursor`` to fetch the following page; the total is only
+    counted for the first page.
     """
+    date_range = None
+    if start_date or end_date:
+        start = start_date or datetime.utcnow() - timedelta(days=30)
+        end = end_date or datetime.utcnow()
+        date_range = (start, end)
+
     try:
-        date_range = None
-        if start_date or end_date:
-            start = start_date or datetime.utcnow() - timedelta(days=30)
-            end = end_date or datetime.utcnow()
-            date_range = (start, end)
+        if offset and not cursor:
+            # Legacy OFFSET paging for existing clients
+            workflows, total_count = await persistence_service.get_workflow_history(
+                db,
+                project_id=project_id,
+                limit=limit,
+                offset=offset,
+                status_filter=status_filter,
+                date_range=date_range,
+            )
+            return {
+                "workflows": [workflow.to_dict() for workflow in workflows],
+                "pagination": {
+                    "limit": limit,
+                    "offset": offset,
+                    "total": total_count,
+                    "has_more": offset + limit < total_count,
+                    "next_cursor": None,
+                },
+            }
 
-        workflows, total_count = await persistence_service.get_workflow_history(
+        page = await persistence_service.get_workflow_history_page(
             db,
             project_id=project_id,
             limit=limit,
-            offset=offset,
+            cursor=cursor,
             status_filter=status_filter,
             date_range=date_range,
+            include_total=cursor is None,
         )
-
-        return {
-            "workflows": [workflow.to_dict() for workflow in workflows],
-            "pagination": {
-                "limit": limit,
-                "offset": offset,
-                "total": total_count,
-                "has_more": offset + limit < total_count,
-            },
-        }
-
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error retrieving workflow history: {str(e)}"
         )
 
+    return {
+        "workflows": [workflow.to_dict() for workflow in page.items],
+        "pagination": {
+            "limit": limit,
+            "offset": None,
+            "total": page.total,
+            "has_more": page.next_cursor is not None,
+            "next_cursor": page.next_cursor,
+        },
+    }
+
 
 @router.get("/workflows/{workflow_history_id}")
 async def get_workflow_history_detail(
@@ -192,6 +224,73 @@ async def get_analytics_summary(
         )
 
 
+@router.get("/rollups/{dimension}")
+async def get_metric_rollups(
+    dimension: str,
+    db: AsyncSession = Depends(get_db),
+    granularity: str = Query("hour", description="Bucket size: hour or day"),
+    value: Optional[str] = Query(
+        None, description="Agent ID or workflow type to restrict to"
+    ),
+    start_date: Optional[datetime] = Query(None, description="Start of the range"),
+    end_date: Optional[datetime] = Query(None, description="End of the range"),
+):
+    """
+    Get pre-aggregated hourly or daily statistics per agent or workflow type
+
+    Reads rollup buckets only, so cost depends on the number of buckets in
+    the range rather than on the number of history rows.
+    """
+    end = end_date or datetime.utcnow()
+    start = start_date or end - timedelta(days=7)
+    try:
+        series = await rollup_service.get_series(
+            db, dimension, start, end, granularity, value
+        )
+        totals = await rollup_service.get_totals(
+            db, dimension, start, end, granularity
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error retrieving metric rollups: {str(e)}"
+        )
+
+    if value is not None:
+        totals = {value: totals[value]} if value in totals else {}
+    return {
+        "dimension": dimension,
+        "granularity": granularity,
+        "range": {"start": start.isoformat(), "end": end.isoformat()},
+        "series": series,
+        "totals": totals,
+    }
+
+
+@router.post("/rollups/rebuild")
+async def rebuild_metric_rollups(
+    db: AsyncSession = Depends(get_db),
+    start_date: Optional[datetime] = Query(None, description="Start of the range"),
+    end_date: Optional[datetime] = Query(None, description="End of the range"),
+):
+    """
+    Recompute rollup buckets for a range from raw history
+    """
+    try:
+        end = end_date or datetime.utcnow()
+        start = start_date or end - timedelta(days=30)
+
+        result = await rollup_service.rebuild(db, start, end)
+
+        return {"message": "Rollup rebuild completed", **result}
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error rebuilding rollups: {str(e)}"
+        )
+
+
 @router.get("/phases")
 async def get_phase_history(
     db: AsyncSession = Depends(get_db),
@@ -10,6 +10,7 @@ from sqlalchemy import desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.config import settings
+from ...database.pools import pool_registry
 from ...database.session import get_db
 from ...models.agent import Agent
 from ...models.system_metrics import SystemMetrics
@@ -349,6 +350,17 @@ async def get_workflow_metrics(db: AsyncSession = Depends(get_db)):
     return metrics
 
 
+@router.get("/metrics/database")
+async def get_database_metrics():
+    """
+    Get connection pool metrics for the request and background pools
+    """
+    return {
+        "pools": pool_registry.get_stats(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
 @router.post("/maintenance/cleanup")
 async def cleanup_old_metrics(
     days_to_keep: int = 30, db: AsyncSession = Depends(get_db)
@@ -20,6 +20,7 @@ from fastapi import (
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
+from ...services.agent_index import agent_index
 from ...services.api_enhancement import (
     api_enhancement_service,
     get_current_user,
@@ -115,17 +116,17 @@ async def get_agent_from_cache_or_storage(agent_id: str) -> Optional[Agent]:
 
 
 async def cache_agent(agent: Agent):
-    """Cache agent data"""
-    await redis_service.hset("agents", agent.id, agent.dict())
+    """Cache agent data and update its list indexes in one transaction"""
+    await agent_index.add(agent.dict())
 
 
 async def invalidate_agent_cache(agent_id: Optional[str] = None):
     """Invalidate agent cache"""
     if agent_id:
-        await redis_service.hdel("agents", agent_id)
+        await agent_index.remove(agent_id)
     else:
         # Invalidate all agent cache
-        await redis_service.delete("agents")
+        await agent_index.clear()
 
 
 # API Endpoints
@@ -162,43 +163,26 @@ async def list_agents(
         if tags:
             filters.tags = [tag.strip() for tag in tags.split(",")]
 
-        # Get agents from cache/storage
-        all_agents_data = await redis_service.hgetall("agents")
-        agents = []
+        # Resolve the page from the secondary indexes, then fetch only its records
+        page_data, total_count = await agent_index.query(
+            sort_by=sort_by,
+            descending=sort_order == "desc",
+            skip=skip,
+            limit=limit,
+            status=filters.status,
+            type=filters.type,
+            tags=filters.tags,
+            search=search,
+        )
 
-        for agent_id, agent_data in all_agents_data.items():
+        paginated_agents = []
+        for agent_data in page_data:
             try:
-                agent = Agent(**agent_data)
-
-                # Apply filters
-                if filters.status and agent.status != filters.status:
-                    continue
-                if filters.type and agent.type != filters.type:
-                    continue
-                if filters.tags and not any(tag in agent.tags for tag in filters.tags):
-                    continue
-                if search and search.lower() not in agent.name.lower():
-                    continue
-
-                agents.append(agent)
-
+                paginated_agents.append(Agent(**agent_data))
             except Exception as e:
-                logger.warning(f"Error parsing agent data for {agent_id}: {e}")
-
-        # Sort agents
-        reverse_sort = sort_order == "desc"
-        if sort_by == "name":
-            agents.sort(key=lambda a: a.name.lower(), reverse=reverse_sort)
-        elif sort_by == "status":
-            agents.sort(key=lambda a: a.status, reverse=reverse_sort)
-        elif sort_by == "updated_at":
-            agents.sort(key=lambda a: a.updated_at, reverse=reverse_sort)
-        else:  # default to created_at
-            agents.sort(key=lambda a: a.created_at, reverse=reverse_sort)
-
-        # Apply pagination
-        total_count = len(agents)
-        paginated_agents = agents[skip : skip + limit]
+                logger.warning(
+                    f"Error parsing agent data for {agent_data.get('id')}: {e}"
+                )
 
         # Add pagination headers
         response_headers = {
@@ -271,7 +255,7 @@ async def create_agent(
         await cache_agent(agent)
 
         # Invalidate list cache
-        await api_enhancement_service.invalidate_cache("agents_list")
+        await api_enhancement_service.invalidate_cache(tags=["agents_list"])
 
         # Submit background task for agent initialization
         task_id = await background_task_service.submit_task(
@@ -337,8 +321,8 @@ async def update_agent(
         await cache_agent(agent)
 
         # Invalidate caches
-        await api_enhancement_service.invalidate_cache("agents_list")
-        await api_enhancement_service.invalidate_cache("agent_detail")
+        await api_enhancement_service.invalidate_cache(tags=["agents_list"])
+        await api_enhancement_service.invalidate_cache(tags=["agent_detail"])
 
         # Broadcast update
         await enhanced_websocket_manager.broadcast_to_all(
@@ -385,7 +369,7 @@ async def delete_agent(agent_id: str, current_user: dict = Depends(get_current_u
         await invalidate_agent_cache(agent_id)
 
         # Invalidate list cache
-        await api_enhancement_service.invalidate_cache("agents_list")
+        await api_enhancement_service.invalidate_cache(tags=["agents_list"])
 
         # Broadcast deletion
         await enhanced_websocket_manager.broadcast_to_all(
@@ -468,7 +452,7 @@ async def bulk_agent_operation(
                 )
 
         # Invalidate caches
-        await api_enhancement_service.invalidate_cache("agents_list")
+        await api_enhancement_service.invalidate_cache(tags=["agents_list"])
 
         # Broadcast bulk operation
         await enhanced_websocket_manager.broadcast_to_all(
@@ -544,7 +528,7 @@ async def upload_agent_configuration(
             agent.updated_at = datetime.utcnow()
 
             await cache_agent(agent)
-            await api_enhancement_service.invalidate_cache("agent_detail")
+            await api_enhancement_service.invalidate_cache(tags=["agent_detail"])
 
             # Submit background task for configuration processing
             task_id = await background_task_service.submit_task(
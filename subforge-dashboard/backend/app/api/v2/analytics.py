@@ -17,7 +17,7 @@ from ....analytics import (
     ReportGenerator,
     ReportType,
 )
-from ...database.session import get_db
+from ...database.session import BackgroundSessionLocal, get_background_db
 from ...utils.logging_config import get_logger
 
 router = APIRouter(tags=["analytics"])
@@ -32,7 +32,7 @@ async def get_analytics_service() -> AnalyticsService:
     """Get analytics service instance"""
     global analytics_service
     if analytics_service is None:
-        analytics_service = AnalyticsService()
+        analytics_service = AnalyticsService(session_factory=BackgroundSessionLocal)
         await analytics_service.initialize()
     return analytics_service
 
@@ -106,7 +106,7 @@ async def get_analytics_status(
 async def run_comprehensive_analysis(
     request: AnalysisRequest,
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_background_db),
     analytics: AnalyticsService = Depends(get_analytics_service),
 ) -> Dict[str, Any]:
     """Run comprehensive analytics analysis"""
@@ -137,7 +137,7 @@ async def run_comprehensive_analysis(
 @router.post("/analyze/performance")
 async def run_performance_analysis(
     request: AnalysisRequest,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_background_db),
     analytics: AnalyticsService = Depends(get_analytics_service),
 ) -> Dict[str, Any]:
     """Run focused performance analysis"""
@@ -164,7 +164,7 @@ async def run_predictive_analysis(
         default="both",
         description="Prediction type: task_duration, system_load, or both",
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_background_db),
     analytics: AnalyticsService = Depends(get_analytics_service),
 ) -> Dict[str, Any]:
     """Run predictive analysis"""
@@ -191,7 +191,7 @@ async def run_trend_analysis(
     metrics: Optional[List[str]] = Query(
         default=None, description="Specific metrics to analyze"
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_background_db),
     analytics: AnalyticsService = Depends(get_analytics_service),
 ) -> Dict[str, Any]:
     """Run trend analysis"""
@@ -286,7 +286,7 @@ async def get_metric_history(
 async def generate_report(
     request: ReportGenerationRequest,
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_background_db),
     report_gen: ReportGenerator = Depends(get_report_generator),
 ) -> Dict[str, Any]:
     """Generate analytics report"""
@@ -328,7 +328,7 @@ async def generate_executive_dashboard(
     time_range_days: int = Query(
         default=7, ge=1, le=30, description="Time range in days"
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_background_db),
     report_gen: ReportGenerator = Depends(get_report_generator),
 ) -> Dict[str, Any]:
     """Generate executive dashboard report"""
@@ -350,7 +350,7 @@ async def generate_executive_dashboard(
 @router.post("/reports/daily")
 async def generate_daily_report(
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_background_db),
     analytics: AnalyticsService = Depends(get_analytics_service),
 ) -> Dict[str, Any]:
     """Generate daily analytics report"""
@@ -371,7 +371,7 @@ async def generate_daily_report(
 @router.post("/reports/weekly")
 async def generate_weekly_report(
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_background_db),
     analytics: AnalyticsService = Depends(get_analytics_service),
 ) -> Dict[str, Any]:
     """Generate weekly analytics report"""
@@ -392,7 +392,7 @@ async def generate_weekly_report(
 @router.post("/reports/scheduled")
 async def generate_scheduled_reports(
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_background_db),
     report_gen: ReportGenerator = Depends(get_report_generator),
 ) -> Dict[str, Any]:
     """Generate all scheduled reports (daily, weekly, monthly)"""
@@ -537,7 +537,7 @@ async def startup_analytics():
     """Initialize analytics service on startup"""
     try:
         global analytics_service
-        analytics_service = AnalyticsService()
+        analytics_service = AnalyticsService(session_factory=BackgroundSessionLocal)
         await analytics_service.initialize()
         logger.info("✅ Analytics API initialized successfully")
     except Exception as e:
@@ -17,12 +17,13 @@ from fastapi import (
     Depends,
     File,
     Form,
+    Header,
     HTTPException,
     Query,
     UploadFile,
     status,
 )
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from ...core.config import settings
@@ -32,6 +33,7 @@ from ...services.api_enhancement import (
     require_auth,
 )
 from ...services.background_tasks import TaskPriority, background_task_service
+from ...services.file_storage import ContentStore, FileTooLargeError, parse_range
 from ...services.redis_service import redis_service
 
 logger = logging.getLogger(__name__)
@@ -50,6 +52,9 @@ ALLOWED_EXTENSIONS = {
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 MAX_FILES_PER_UPLOAD = 10
 
+# Uploaded content is stored once per SHA-256 under UPLOAD_DIR/blobs
+content_store = ContentStore(UPLOAD_DIR, redis_service)
+
 
 # Pydantic models
 class FileInfo(BaseModel):
@@ -65,6 +70,7 @@ class FileInfo(BaseModel):
     metadata: Dict[str, Any] = {}
     tags: List[str] = []
     checksum: str
+    content_hash: Optional[str] = None  # SHA-256 of the shared blob, if any
 
 
 class FileUploadResponse(BaseModel):
@@ -91,15 +97,6 @@ def ensure_upload_dir():
         (UPLOAD_DIR / subdir).mkdir(exist_ok=True)
 
 
-def calculate_file_checksum(file_path: Path) -> str:
-    """Calculate MD5 checksum of file"""
-    hash_md5 = hashlib.md5()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
-
-
 def get_file_type_from_extension(filename: str) -> str:
     """Determine file type category from extension"""
     extension = Path(filename).suffix.lower()
@@ -208,42 +205,39 @@ async def upload_files(
             extension = Path(file.filename).suffix
             unique_filename = f"{file_id}_{timestamp}{extension}"
 
-            # Save file
-            file_path = UPLOAD_DIR / file_type / unique_filename
-            content = await file.read()
-
-            with open(file_path, "wb") as f:
-                f.write(content)
-
-            # Get file info
-            file_size = len(content)
-            total_size += file_size
+            # Stream to the content store, hashing on the way
+            try:
+                blob = await content_store.save_stream(file, max_size=MAX_FILE_SIZE)
+            except FileTooLargeError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Invalid file '{file.filename}': {e}",
+                )
+            total_size += blob.size
 
             # Detect MIME type
             try:
-                mime_type = magic.from_file(str(file_path), mime=True)
+                mime_type = magic.from_buffer(blob.head, mime=True)
             except:
                 mime_type = (
                     mimetypes.guess_type(file.filename)[0] or "application/octet-stream"
                 )
 
-            # Calculate checksum
-            checksum = calculate_file_checksum(file_path)
-
             # Create file info
             file_info = FileInfo(
                 id=file_id,
                 filename=unique_filename,
                 original_filename=file.filename,
                 file_type=file_type,
-                file_size=file_size,
+                file_size=blob.size,
                 mime_type=mime_type,
-                upload_path=str(file_path.relative_to(settings.SUBFORGE_ROOT)),
+                upload_path=str(blob.path.relative_to(settings.SUBFORGE_ROOT)),
                 uploaded_by=current_user.get("id"),
                 uploaded_at=datetime.utcnow(),
                 metadata=file_metadata,
                 tags=file_tags,
-                checksum=checksum,
+                checksum=blob.digest,
+                content_hash=blob.digest,
             )
 
             # Save file info
@@ -289,7 +283,7 @@ async def upload_files(
 @router.get(
     "/", response_model=List[FileInfo], summary="List uploaded files with filtering"
 )
-@api_enhancement_service.cache_response(ttl=30)
+@api_enhancement_service.cache_response(ttl=30, tags=["files"])
 @api_enhancement_service.rate_limit(requests_per_minute=100)
 async def list_files(
     skip: int = Query(0, ge=0),
@@ -361,7 +355,7 @@ async def list_files(
 
 
 @router.get("/{file_id}", response_model=FileInfo, summary="Get file information")
-@api_enhancement_service.cache_response(ttl=300)
+@api_enhancement_service.cache_response(ttl=300, tags=["files"])
 @api_enhancement_service.rate_limit(requests_per_minute=200)
 async def get_file_details(file_id: str):
     """Get detailed information about a specific file"""
@@ -376,8 +370,12 @@ async def get_file_details(file_id: str):
 
 @router.get("/{file_id}/download", summary="Download a file")
 @api_enhancement_service.rate_limit(requests_per_minute=100)
-async def download_file(file_id: str, current_user: dict = Depends(get_current_user)):
-    """Download a specific file"""
+async def download_file(
+    file_id: str,
+    range: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user),
+):
+    """Download a specific file, or a single byte range of it"""
     try:
         file_info = await get_file_info(file_id)
         if not file_info:
@@ -393,13 +391,38 @@ async def download_file(file_id: str, current_user: dict = Depends(get_current_u
                 status_code=status.HTTP_404_NOT_FOUND, detail="File not found on disk"
             )
 
+        file_size = file_path.stat().st_size
+        try:
+            byte_range = parse_range(range, file_size)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{file_size}"},
+            )
+
+        start, end = byte_range or (0, file_size - 1)
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(end - start + 1),
+            "Content-Disposition": (
+                f'attachment; filename="{file_info.original_filename}"'
+            ),
+            "ETag": f'"{file_info.checksum}"',
+        }
+        status_code = status.HTTP_200_OK
+        if byte_range:
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+
         logger.info(
             f"File downloaded: {file_info.original_filename} by {current_user.get('id')}"
         )
 
-        return FileResponse(
-            path=str(file_path),
-            filename=file_info.original_filename,
+        return StreamingResponse(
+            content_store.iter_range(file_path, start, end),
+            status_code=status_code,
+            headers=headers,
             media_type=file_info.mime_type,
         )
 
@@ -437,10 +460,13 @@ async def delete_file(file_id: str, current_user: dict = Depends(get_current_use
                 detail="Permission denied. You can only delete your own files.",
             )
 
-        # Delete file from disk
-        file_path = settings.SUBFORGE_ROOT / file_info.upload_path
-        if file_path.exists():
-            file_path.unlink()
+        # Delete file from disk; shared blobs go with their last reference
+        if file_info.content_hash:
+            await content_store.release(file_info.content_hash)
+        else:
+            file_path = settings.SUBFORGE_ROOT / file_info.upload_path
+            if file_path.exists():
+                file_path.unlink()
 
         # Delete file info from Redis
         await redis_service.hdel("uploaded_files", file_id)
@@ -499,7 +525,7 @@ async def update_file_metadata(
         await save_file_info(file_info)
 
         # Invalidate cache
-        await api_enhancement_service.invalidate_cache("files")
+        await api_enhancement_service.invalidate_cache(tags=["files"])
 
         return file_info
 
@@ -623,7 +649,7 @@ async def validate_file_content(
 
 
 @router.get("/statistics", summary="Get file upload statistics")
-@api_enhancement_service.cache_response(ttl=300)
+@api_enhancement_service.cache_response(ttl=300, tags=["files"])
 @api_enhancement_service.rate_limit(requests_per_minute=60)
 async def get_file_statistics():
     """Get comprehensive file upload statistics"""
@@ -9,6 +9,7 @@ from typing import Any, Dict
 from fastapi import APIRouter, Query
 from pydantic import BaseModel
 
+from ...database.pools import pool_registry
 from ...services.api_enhancement import api_enhancement_service
 from ...websocket.enhanced_manager import enhanced_websocket_manager
 
@@ -30,6 +31,7 @@ class SystemMetrics(BaseModel):
     success_rate: float = 0.0
     uptime: float = 100.0
     error_rate: float = 0.0
+    database_pools: Dict[str, Any] = {}
 
 
 class SystemHealth(BaseModel):
@@ -58,6 +60,7 @@ async def get_system_metrics():
         success_rate=94.5,
         uptime=99.2,
         error_rate=1.2,
+        database_pools=pool_registry.get_stats(),
     )
 
 
@@ -33,13 +33,35 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: Optional[str] = None
     DATABASE_ECHO: bool = False
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    # API request traffic
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    # Analytics runs and background jobs, kept apart so they cannot starve requests
+    BACKGROUND_POOL_SIZE: int = 5
+    BACKGROUND_MAX_OVERFLOW: int = 5
+    BACKGROUND_POOL_TIMEOUT: float = 60.0
+
+    # History retention
+    HISTORY_PARTITIONS_AHEAD: int = 3  # future monthly partitions kept ready
+    HISTORY_ARCHIVE_DIR: Optional[str] = None  # gzip JSONL of dropped partitions
+    HISTORY_WRITE_BATCH_SIZE: int = 200  # executions per bulk upsert
+    HISTORY_WRITE_FLUSH_INTERVAL: float = 1.0  # seconds a partial batch may wait
+    HISTORY_WRITE_MAX_PENDING: int = 5000  # queued executions before submit blocks
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_EXPIRE: int = 300  # 5 minutes
+    REDIS_CODEC: str = "orjson"  # json | orjson | msgpack for dict/list values
+    REDIS_COMPRESS_MIN_SIZE: int = 1024  # zlib above this many bytes (0 disables)
 
     # WebSocket
     WEBSOCKET_PATH: str = "/ws"
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 256  # queued messages per connection
+    WEBSOCKET_SLOW_CONSUMER_POLICY: str = "coalesce"  # drop_oldest | coalesce | disconnect
+    WEBSOCKET_DELTA_HISTORY: int = 8  # workflow versions kept as delta bases
 
     # Authentication (for future use)
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
@@ -144,7 +166,7 @@ class TestingConfig(Settings):
     """Testing environment configuration"""
 
     DEBUG: bool = True
-    DATABASE_URL: str = "sqlite:///./test_subforge_dashboard.db"
+    DATABASE_URL: str = "sqlite:///:memory:"  # one shared in-memory database
     REDIS_URL: str = "redis://localhost:6379/1"  # Use different Redis DB for tests
 
 
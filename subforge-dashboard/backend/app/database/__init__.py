@@ -3,13 +3,27 @@ Database configuration and session management
 """
 
 from .base import Base
-from .session import AsyncSessionLocal, SessionLocal, async_engine, engine, get_db
+from .pools import pool_registry
+from .session import (
+    AsyncSessionLocal,
+    BackgroundSessionLocal,
+    SessionLocal,
+    async_engine,
+    background_engine,
+    engine,
+    get_background_db,
+    get_db,
+)
 
 __all__ = [
     "Base",
     "engine",
     "async_engine",
+    "background_engine",
     "SessionLocal",
     "AsyncSessionLocal",
+    "BackgroundSessionLocal",
     "get_db",
+    "get_background_db",
+    "pool_registry",
 ]
\ No newline at end of file
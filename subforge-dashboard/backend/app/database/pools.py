@@ -0,0 +1,150 @@
+"""
+Connection pool configuration and metrics
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+
+
+@dataclass
+class PoolSettings:
+    """Sizing and connection lifetime for one engine's pool"""
+
+    size: int = 10
+    max_overflow: int = 10
+    timeout: float = 30.0  # seconds a checkout may wait for a connection
+    recycle: int = 1800  # seconds before a connection is replaced
+    pre_ping: bool = True
+
+
+def is_memory_database(url: str) -> bool:
+    """Whether ``url`` points at an in-memory SQLite database"""
+    return url.startswith("sqlite") and (
+        url.endswith(":memory:") or url.endswith("://") or "mode=memory" in url
+    )
+
+
+class PoolMetrics:
+    """Checkout counts and wait times of one pool (thread safe)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        """Current pool occupancy plus the accumulated checkout figures"""
+        with self._lock:
+            stats = {
+                "pool": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (
+                    self.wait_seconds / self.checkouts * 1000 if self.checkouts else 0.0
+                ),
+                "max_wait_ms": self.max_wait_seconds * 1000,
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                # QueuePool counts overflow from -size until the pool is full
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+                timeout=pool.timeout(),
+            )
+        return stats
+
+
+class _MeasuredPool:
+    """Times how long each checkout waits for a free connection"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - started, timed_out)
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool; keep counting into it
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class MeasuredQueuePool(_MeasuredPool, QueuePool):
+    pass
+
+
+class MeasuredAsyncQueuePool(_MeasuredPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(
+    url: str, pool: PoolSettings, echo: bool = False, is_async: bool = False
+) -> Dict[str, Any]:
+    """Keyword arguments for create_engine/create_async_engine"""
+    if is_memory_database(url):
+        # Every connection to :memory: is a new empty database, so share one
+        return {
+            "echo": echo,
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False},
+        }
+    return {
+        "echo": echo,
+        "poolclass": MeasuredAsyncQueuePool if is_async else MeasuredQueuePool,
+        "pool_size": pool.size,
+        "max_overflow": pool.max_overflow,
+        "pool_timeout": pool.timeout,
+        "pool_recycle": pool.recycle,
+        "pool_pre_ping": pool.pre_ping,
+    }
+
+
+class PoolRegistry:
+    """Named engines whose pools are reported by the metrics endpoints"""
+
+    def __init__(self):
+        self._engines: Dict[str, Any] = {}
+
+    def register(self, name: str, engine) -> PoolMetrics:
+        metrics = PoolMetrics(name)
+        engine.pool.metrics = metrics
+        self._engines[name] = engine
+        return metrics
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        stats = {}
+        for name, engine in self._engines.items():
+            metrics = getattr(engine.pool, "metrics", None) or PoolMetrics(name)
+            stats[name] = metrics.snapshot(engine.pool)
+        return stats
+
+
+# Global pool registry instance
+pool_registry = PoolRegistry()
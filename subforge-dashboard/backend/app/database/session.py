@@ -9,23 +9,44 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from ..core.config import settings
+from .pools import PoolSettings, engine_options, is_memory_database, pool_registry
 
-# Synchronous engine and session
+request_pool = PoolSettings(
+    size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    timeout=settings.DATABASE_POOL_TIMEOUT,
+    recycle=settings.DATABASE_POOL_RECYCLE,
+    pre_ping=settings.DATABASE_POOL_PRE_PING,
+)
+background_pool = PoolSettings(
+    size=settings.BACKGROUND_POOL_SIZE,
+    max_overflow=settings.BACKGROUND_MAX_OVERFLOW,
+    timeout=settings.BACKGROUND_POOL_TIMEOUT,
+    recycle=settings.DATABASE_POOL_RECYCLE,
+    pre_ping=settings.DATABASE_POOL_PRE_PING,
+)
+
+# Synchronous engine and session (background jobs)
 engine = create_engine(
     settings.get_database_url(),
-    echo=settings.DATABASE_ECHO,
-    pool_pre_ping=True,
+    **engine_options(
+        settings.get_database_url(), background_pool, settings.DATABASE_ECHO
+    ),
 )
 
 SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine, class_=Session
 )
 
-# Asynchronous engine and session
+# Asynchronous engine and session for API requests
 async_engine = create_async_engine(
     settings.get_async_database_url(),
-    echo=settings.DATABASE_ECHO,
-    pool_pre_ping=True,
+    **engine_options(
+        settings.get_async_database_url(),
+        request_pool,
+        settings.DATABASE_ECHO,
+        is_async=True,
+    ),
 )
 
 AsyncSessionLocal = sessionmaker(
@@ -35,6 +56,33 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False,
 )
 
+# Asynchronous engine and session for analytics and background work. An
+# in-memory database exists only on its one connection, so it is shared.
+if is_memory_database(settings.get_async_database_url()):
+    background_engine = async_engine
+else:
+    background_engine = create_async_engine(
+        settings.get_async_database_url(),
+        **engine_options(
+            settings.get_async_database_url(),
+            background_pool,
+            settings.DATABASE_ECHO,
+            is_async=True,
+        ),
+    )
+
+BackgroundSessionLocal = sessionmaker(
+    bind=background_engine,
+    class_=AsyncSession,
+    autocommit=False,
+    autoflush=False,
+)
+
+pool_registry.register("request", async_engine)
+if background_engine is not async_engine:
+    pool_registry.register("background", background_engine)
+pool_registry.register("sync", engine)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -48,4 +96,19 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+async def get_background_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get a session from the analytics/background pool
+    """
+    async with BackgroundSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
@@ -17,10 +17,11 @@ from .api.v2 import api_v2_router
 
 # Import application modules
 from .core.config import settings
-from .database.base import Base
-from .database.session import async_engine
+from .database.session import AsyncSessionLocal, async_engine, background_engine
 from .services.analytics_integration import analytics_integration_service
 from .services.api_enhancement import api_enhancement_service
+from .services.history_partitions import create_tables, history_partitions
+from .services.history_writer import history_writer
 from .services.redis_service import redis_service
 from .utils.file_watcher import file_watcher
 from .utils.logging_config import get_logger, setup_logging
@@ -79,11 +80,20 @@ async def lifespan(app: FastAPI):
         # Initialize analytics integration service
         await analytics_integration_service.initialize()
 
-        # Create database tables
+        # Create database tables (history tables come from migrations on PostgreSQL)
         async with async_engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(create_tables)
         logger.info("✅ Database tables created/verified")
 
+        # Keep upcoming monthly history partitions ready (PostgreSQL only)
+        async with AsyncSessionLocal() as session:
+            await history_partitions.ensure_partitions(session)
+            await session.commit()
+
+        # Start batched history writes
+        await history_writer.initialize()
+        logger.info("✅ History write queue started")
+
         # Start file watcher
         if settings.ENABLE_FILE_WATCHER:
             file_watcher.start()
@@ -136,8 +146,13 @@ async def lifespan(app: FastAPI):
         await api_enhancement_service.shutdown()
         await redis_service.close()
 
+        # Write queued workflow history before the pool goes away
+        await history_writer.shutdown()
+        logger.info("✅ History write queue flushed")
+
         # Close database connections
         await async_engine.dispose()
+        await background_engine.dispose()
         logger.info("✅ Database connections closed")
 
     except Exception as e:
@@ -6,7 +6,9 @@ from .agent import Agent
 from .database import (
     AgentPerformanceMetrics,
     HandoffHistory,
+    MetricRollup,
     PhaseHistory,
+    WorkflowAgentAssociation,
     WorkflowHistory,
 )
 from .system_metrics import SystemMetrics
@@ -20,7 +22,9 @@ __all__ = [
     "Workflow",
     "SystemMetrics",
     "WorkflowHistory",
+    "WorkflowAgentAssociation",
     "PhaseHistory",
     "HandoffHistory",
     "AgentPerformanceMetrics",
+    "MetricRollup",
 ]
\ No newline at end of file
@@ -5,8 +5,7 @@ Agent model for SubForge dashboard
 import uuid
 from datetime import datetime
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, Float, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, String, Text, Uuid
 from sqlalchemy.sql import func
 
 from ..database.base import Base
@@ -19,14 +18,14 @@ class Agent(Base):
 
     __tablename__ = "agents"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     name = Column(String(255), nullable=False, index=True)
     agent_type = Column(String(100), nullable=False, index=True)
     status = Column(String(50), nullable=False, default="idle", index=True)
     description = Column(Text, nullable=True)
 
     # Current activity
-    current_task_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    current_task_id = Column(Uuid(as_uuid=True), nullable=True, index=True)
     current_task_title = Column(String(500), nullable=True)
 
     # Configuration
@@ -50,7 +49,10 @@ class Agent(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
-        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        index=True,
     )
 
     def __repr__(self) -> str:
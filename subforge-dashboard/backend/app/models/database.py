@@ -10,12 +10,13 @@ from sqlalchemy import (
     Column,
     DateTime,
     Float,
-    ForeignKey,
+    ForeignKeyConstraint,
     Index,
     Integer,
     String,
+    UniqueConstraint,
+    Uuid,
 )
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -25,12 +26,15 @@ from ..database.base import Base
 class WorkflowHistory(Base):
     """
     Historical record of workflow executions with complete lifecycle data
+
+    On PostgreSQL this table and its child history tables are partitioned by
+    month of ``started_at`` (see HistoryPartitionManager).
     """
 
     __tablename__ = "workflow_history"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    workflow_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    workflow_id = Column(Uuid(as_uuid=True), nullable=False, index=True)
 
     # Execution metadata
     execution_id = Column(
@@ -112,13 +116,34 @@ class WorkflowHistory(Base):
         back_populates="workflow_history",
         cascade="all, delete-orphan",
     )
+    agent_links = relationship(
+        "WorkflowAgentAssociation",
+        back_populates="workflow_history",
+        cascade="all, delete-orphan",
+    )
 
-    # Indexes for performance
+    # Indexes for performance; the (started_at, id) suffix matches the keyset
+    # ordering used for history pagination
     __table_args__ = (
-        Index("idx_workflow_history_status_time", "status", "started_at"),
-        Index("idx_workflow_history_project_time", "project_id", "started_at"),
+        Index("idx_workflow_history_time_id", "started_at", "id"),
+        Index("idx_workflow_history_status_time", "status", "started_at", "id"),
+        Index("idx_workflow_history_project_time", "project_id", "started_at", "id"),
+        Index(
+            "idx_workflow_history_project_status_time",
+            "project_id",
+            "status",
+            "started_at",
+            "id",
+        ),
         Index("idx_workflow_history_execution", "workflow_id", "execution_number"),
         Index("idx_workflow_history_duration", "duration_seconds"),
+        # Upsert target for batched writes; includes the partition key
+        Index(
+            "uq_workflow_history_execution", "execution_id", "started_at", unique=True
+        ),
+        # Target of the child history foreign keys, which carry the partition
+        # key; on PostgreSQL the partitioned primary key (id, started_at) is
+        UniqueConstraint("id", "started_at", name="uq_workflow_history_id_started_at"),
     )
 
     def __repr__(self) -> str:
@@ -180,6 +205,41 @@ class WorkflowHistory(Base):
         }
 
 
+class WorkflowAgentAssociation(Base):
+    """
+    Normalized link between a workflow execution and each agent assigned to it
+
+    Mirrors ``WorkflowHistory.assigned_agents`` so per-agent workflow counts
+    can be aggregated with an indexed join instead of scanning the JSON column.
+    """
+
+    __tablename__ = "workflow_agent_association"
+
+    workflow_history_id = Column(Uuid(as_uuid=True), primary_key=True)
+    agent_id = Column(String(255), primary_key=True)
+    agent_name = Column(String(255), nullable=True)
+    agent_type = Column(String(100), nullable=True)
+
+    # Copied from the workflow so agent/time lookups stay on this index
+    started_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Relationships
+    workflow_history = relationship("WorkflowHistory", back_populates="agent_links")
+
+    # Indexes for performance
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["workflow_history_id", "started_at"],
+            ["workflow_history.id", "workflow_history.started_at"],
+            ondelete="CASCADE",
+        ),
+        Index("idx_workflow_agent_agent_time", "agent_id", "started_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<WorkflowAgentAssociation(workflow_history_id={self.workflow_history_id}, agent_id='{self.agent_id}')>"
+
+
 class PhaseHistory(Base):
     """
     Historical record of individual workflow phases
@@ -187,13 +247,11 @@ class PhaseHistory(Base):
 
     __tablename__ = "phase_history"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    workflow_history_id = Column(
-        UUID(as_uuid=True),
-        ForeignKey("workflow_history.id"),
-        nullable=False,
-        index=True,
-    )
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    workflow_history_id = Column(Uuid(as_uuid=True), nullable=False, index=True)
+    # Parent workflow's start time: the monthly partition key on PostgreSQL,
+    # so a workflow and its children always live in the same month
+    workflow_started_at = Column(DateTime(timezone=True), nullable=False)
 
     # Phase identification
     phase_name = Column(String(255), nullable=False, index=True)
@@ -258,6 +316,11 @@ class PhaseHistory(Base):
 
     # Indexes for performance
     __table_args__ = (
+        ForeignKeyConstraint(
+            ["workflow_history_id", "workflow_started_at"],
+            ["workflow_history.id", "workflow_history.started_at"],
+            ondelete="CASCADE",
+        ),
         Index("idx_phase_history_workflow_order", "workflow_history_id", "phase_order"),
         Index("idx_phase_history_status_time", "status", "started_at"),
         Index("idx_phase_history_agent", "assigned_agent_id", "started_at"),
@@ -323,13 +386,11 @@ class HandoffHistory(Base):
 
     __tablename__ = "handoff_history"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    workflow_history_id = Column(
-        UUID(as_uuid=True),
-        ForeignKey("workflow_history.id"),
-        nullable=False,
-        index=True,
-    )
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    workflow_history_id = Column(Uuid(as_uuid=True), nullable=False, index=True)
+    # Parent workflow's start time: the monthly partition key on PostgreSQL,
+    # so a workflow and its children always live in the same month
+    workflow_started_at = Column(DateTime(timezone=True), nullable=False)
 
     # Handoff identification
     handoff_name = Column(String(255), nullable=False, index=True)
@@ -383,6 +444,11 @@ class HandoffHistory(Base):
 
     # Indexes for performance
     __table_args__ = (
+        ForeignKeyConstraint(
+            ["workflow_history_id", "workflow_started_at"],
+            ["workflow_history.id", "workflow_history.started_at"],
+            ondelete="CASCADE",
+        ),
         Index(
             "idx_handoff_history_workflow_time", "workflow_history_id", "initiated_at"
         ),
@@ -448,7 +514,7 @@ class AgentPerformanceMetrics(Base):
 
     __tablename__ = "agent_performance_metrics"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
 
     # Agent identification
     agent_id = Column(String(255), nullable=False, index=True)
@@ -679,4 +745,67 @@ class AgentPerformanceMetrics(Base):
         return (
             success_rates["overall_success_rate"] >= threshold
             and self.utilization_percentage >= 0.7
-        )
\ No newline at end of file
+        )
+
+
+class MetricRollup(Base):
+    """
+    Pre-aggregated workflow and phase statistics for one time bucket
+
+    One row per (granularity, dimension, dimension value, bucket start). The
+    stored moments (count, sum, sum of squares, min, max) and the duration
+    histogram are additive, so buckets can be updated incrementally and merged
+    into coarser periods without touching raw history.
+    """
+
+    __tablename__ = "metric_rollups"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+
+    # Bucket identification
+    granularity = Column(String(20), nullable=False)  # hour, day
+    dimension = Column(String(50), nullable=False)  # agent, workflow_type
+    dimension_value = Column(String(255), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+
+    # Execution outcomes
+    count = Column(Integer, nullable=False, default=0)
+    success_count = Column(Integer, nullable=False, default=0)
+    failure_count = Column(Integer, nullable=False, default=0)
+
+    # Task totals
+    total_tasks = Column(Integer, nullable=False, default=0)
+    completed_tasks = Column(Integer, nullable=False, default=0)
+    failed_tasks = Column(Integer, nullable=False, default=0)
+
+    # Duration moments (only executions with a known duration)
+    duration_count = Column(Integer, nullable=False, default=0)
+    duration_sum = Column(Float, nullable=False, default=0.0)
+    duration_sum_sq = Column(Float, nullable=False, default=0.0)
+    duration_min = Column(Float, nullable=True)
+    duration_max = Column(Float, nullable=True)
+    duration_histogram = Column(JSON, nullable=False, default=list)
+
+    # Quality moments
+    quality_count = Column(Integer, nullable=False, default=0)
+    quality_sum = Column(Float, nullable=False, default=0.0)
+
+    # Timestamps
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    # Indexes for performance
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity",
+            "dimension",
+            "dimension_value",
+            "bucket_start",
+            name="uq_metric_rollup_bucket",
+        ),
+        Index("idx_metric_rollup_range", "dimension", "granularity", "bucket_start"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<MetricRollup(granularity='{self.granularity}', {self.dimension}='{self.dimension_value}', bucket_start={self.bucket_start}, count={self.count})>"
@@ -247,6 +247,11 @@ class SubForgeIntegrationConfig(BaseModel):
     cleanup_after_days: int = 30
     enable_real_time_monitoring: bool = True
     websocket_broadcast: bool = True
+    event_coalesce_window: float = 0.5  # seconds of file events folded per workflow
+    event_workers: int = 4  # workflows processed concurrently
+    scan_index_file: str = "subforge_scan_index.json"  # persisted scan index
+    scan_workers: int = 4  # threads reading and parsing context files
+    scan_concurrency: int = 16  # stale workflows (re)loaded at once per scan
 
 
 class WorkflowSummary(BaseModel):
@@ -4,8 +4,7 @@ System metrics model for SubForge dashboard
 
 import uuid
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, Float, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, Integer, Uuid
 from sqlalchemy.sql import func
 
 from ..database.base import Base
@@ -18,7 +17,7 @@ class SystemMetrics(Base):
 
     __tablename__ = "system_metrics"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
 
     # Basic system stats
     total_agents = Column(Integer, nullable=False, default=0)
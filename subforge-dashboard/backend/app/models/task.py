@@ -14,8 +14,8 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    Uuid,
 )
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 
 from ..database.base import Base
@@ -28,7 +28,7 @@ class Task(Base):
 
     __tablename__ = "tasks"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     title = Column(String(500), nullable=False, index=True)
     description = Column(Text, nullable=True)
 
@@ -37,11 +37,11 @@ class Task(Base):
     priority = Column(String(20), nullable=False, default="medium", index=True)
 
     # Assignment
-    assigned_agent_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    assigned_agent_id = Column(Uuid(as_uuid=True), nullable=True, index=True)
     assigned_agent_name = Column(String(255), nullable=True)
 
     # Workflow association
-    workflow_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    workflow_id = Column(Uuid(as_uuid=True), nullable=True, index=True)
 
     # Task details
     task_type = Column(String(100), nullable=True, index=True)
@@ -76,7 +76,10 @@ class Task(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
-        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        index=True,
     )
     due_date = Column(DateTime(timezone=True), nullable=True)
 
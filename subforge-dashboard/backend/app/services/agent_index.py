@@ -0,0 +1,308 @@
+"""
+Redis secondary indexes for the cached agent records
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+from aioredis.exceptions import WatchError
+
+from .redis_service import RedisService, redis_service
+
+logger = logging.getLogger(__name__)
+
+SORT_FIELDS = ("created_at", "updated_at", "name", "status")
+LEX_SCORE_WIDTH = 7  # characters encoded in a lexical sort score
+
+
+def lex_score(text: str, width: int = LEX_SCORE_WIDTH) -> float:
+    """
+    Sortable float score for a string
+
+    Packs the first ``width`` lowercased characters at 7 bits each (49 bits,
+    exact in a double), so ZSET order matches ``sorted(key=str.lower)`` for
+    ASCII strings that differ within that prefix; longer ties fall back to
+    member (agent id) order.
+    """
+    score = 0
+    for char in text.lower()[:width].ljust(width, "\0"):
+        score = score * 128 + min(ord(char), 127)
+    return float(score)
+
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class AgentIndex:
+    """
+    Sorted-set and set indexes over the ``agents`` hash
+
+    - ``<prefix>:z:<field>`` sorted sets of agent ids for each sort field
+    - ``<prefix>:status:<value>``, ``:type:<value>``, ``:tag:<value>`` sets
+    - ``<prefix>:names`` hash of lowercased names for substring search
+    - ``<prefix>:member:<id>`` the filter sets an agent is currently in, so
+      an update can remove it from stale ones
+
+    Writes go through WATCH/MULTI on the agent's membership key, so the
+    record and all of its index entries change atomically. A listing page is
+    a ZINTERSTORE of the sort index with the filter sets followed by an HMGET
+    of just the page's records.
+    """
+
+    def __init__(
+        self,
+        redis: RedisService,
+        hash_key: str = "agents",
+        prefix: str = "agents:idx",
+    ):
+        self.redis = redis
+        self.hash_key = hash_key
+        self.prefix = prefix
+        self.ready_key = f"{prefix}:ready"
+        self.names_key = f"{prefix}:names"
+        self._ready = False
+
+    @property
+    def client(self):
+        return self.redis.redis_client
+
+    def sort_key(self, field: str) -> str:
+        return f"{self.prefix}:z:{field}"
+
+    def filter_key(self, kind: str, value: str) -> str:
+        return f"{self.prefix}:{kind}:{value}"
+
+    def member_key(self, agent_id: str) -> str:
+        return f"{self.prefix}:member:{agent_id}"
+
+    def _filter_keys(self, record: Dict[str, Any]) -> List[str]:
+        keys = [
+            self.filter_key("status", record.get("status", "")),
+            self.filter_key("type", record.get("type", "")),
+        ]
+        keys.extend(self.filter_key("tag", tag) for tag in record.get("tags") or [])
+        return keys
+
+    def _sort_scores(self, record: Dict[str, Any]) -> Dict[str, float]:
+        return {
+            "created_at": _timestamp(record.get("created_at")),
+            "updated_at": _timestamp(record.get("updated_at")),
+            "name": lex_score(record.get("name", "")),
+            "status": lex_score(record.get("status", "")),
+        }
+
+    def _queue_index(
+        self, pipe, agent_id: str, record: Dict[str, Any], stale: Iterable[str]
+    ):
+        """Queue the commands that (re)index one record on a MULTI pipeline"""
+        new_keys = self._filter_keys(record)
+        pipe.hset(self.hash_key, agent_id, json.dumps(record, default=str))
+        pipe.hset(self.names_key, agent_id, record.get("name", "").lower())
+        for field, score in self._sort_scores(record).items():
+            pipe.zadd(self.sort_key(field), {agent_id: score})
+        for key in set(stale) - set(new_keys):
+            pipe.srem(key, agent_id)
+        for key in new_keys:
+            pipe.sadd(key, agent_id)
+        pipe.delete(self.member_key(agent_id))
+        pipe.sadd(self.member_key(agent_id), *new_keys)
+
+    async def add(self, record: Dict[str, Any]):
+        """Store an agent record and update its index entries atomically"""
+        if not self.client:
+            return
+        agent_id = record["id"]
+        member_key = self.member_key(agent_id)
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(member_key)
+                    stale = await pipe.smembers(member_key)
+                    pipe.multi()
+                    self._queue_index(pipe, agent_id, record, stale)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    # Concurrent update of the same agent; re-read its memberships
+                    continue
+
+    async def remove(self, agent_id: str):
+        """Delete an agent record and all of its index entries atomically"""
+        if not self.client:
+            return
+        member_key = self.member_key(agent_id)
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(member_key)
+                    stale = await pipe.smembers(member_key)
+                    pipe.multi()
+                    pipe.hdel(self.hash_key, agent_id)
+                    pipe.hdel(self.names_key, agent_id)
+                    for field in SORT_FIELDS:
+                        pipe.zrem(self.sort_key(field), agent_id)
+                    for key in stale:
+                        pipe.srem(key, agent_id)
+                    pipe.delete(member_key)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue
+
+    async def clear(self):
+        """Delete the agents hash and every index key"""
+        if not self.client:
+            return
+        keys = [self.hash_key]
+        async for key in self.client.scan_iter(match=f"{self.prefix}:*"):
+            keys.append(key)
+        for start in range(0, len(keys), 500):
+            await self.client.delete(*keys[start : start + 500])
+        # An empty hash is trivially indexed
+        await self.client.set(self.ready_key, "1")
+        self._ready = True
+
+    async def ensure_built(self, batch_size: int = 500):
+        """Index records written before the indexes existed (once per deployment)"""
+        if self._ready or not self.client:
+            return
+        if await self.client.exists(self.ready_key):
+            self._ready = True
+            return
+
+        logger.info("Building agent secondary indexes")
+        batch: List[Tuple[str, Dict[str, Any]]] = []
+        indexed = 0
+        async for agent_id, raw in self.client.hscan_iter(self.hash_key):
+            try:
+                batch.append((agent_id, json.loads(raw)))
+            except (json.JSONDecodeError, TypeError):
+                logger.warning(f"Skipping unparseable agent record {agent_id}")
+                continue
+            if len(batch) >= batch_size:
+                indexed += await self._index_batch(batch)
+                batch = []
+        if batch:
+            indexed += await self._index_batch(batch)
+
+        await self.client.set(self.ready_key, "1")
+        self._ready = True
+        logger.info(f"Indexed {indexed} agents")
+
+    async def _index_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> int:
+        async with self.client.pipeline(transaction=True) as pipe:
+            for agent_id, record in batch:
+                self._queue_index(pipe, agent_id, record, ())
+            await pipe.execute()
+        return len(batch)
+
+    async def query(
+        self,
+        sort_by: str = "created_at",
+        descending: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+        status: Optional[str] = None,
+        type: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        search: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Return one page of agent records and the total number of matches
+
+        Tags match if the agent has any of them. ``search`` is a substring
+        match on the name, resolved against the small names hash instead of
+        the full records.
+        """
+        if not self.client:
+            return [], 0
+        await self.ensure_built()
+
+        if sort_by not in SORT_FIELDS:
+            sort_by = "created_at"
+        source = self.sort_key(sort_by)
+        temp_keys = []
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            weights = {source: 1}
+            if status:
+                weights[self.filter_key("status", status)] = 0
+            if type:
+                weights[self.filter_key("type", type)] = 0
+            if tags:
+                tag_keys = [self.filter_key("tag", tag) for tag in tags]
+                if len(tag_keys) == 1:
+                    weights[tag_keys[0]] = 0
+                else:
+                    union_key = f"{self.prefix}:tmp:{uuid4().hex}"
+                    temp_keys.append(union_key)
+                    pipe.sunionstore(union_key, tag_keys)
+                    weights[union_key] = 0
+
+            if len(weights) > 1:
+                # Filter sets score 1 with weight 0, so the sort score survives
+                ordered_key = f"{self.prefix}:tmp:{uuid4().hex}"
+                temp_keys.append(ordered_key)
+                pipe.zinterstore(ordered_key, weights, aggregate="SUM")
+            else:
+                ordered_key = source
+
+            pipe.zcard(ordered_key)
+            if search:
+                pipe.zrange(ordered_key, 0, -1, desc=descending)
+            else:
+                pipe.zrange(ordered_key, skip, skip + limit - 1, desc=descending)
+            if temp_keys:
+                pipe.delete(*temp_keys)
+            results = await pipe.execute()
+
+        # Replies before ZCARD belong to the SUNIONSTORE/ZINTERSTORE steps
+        offset = len(temp_keys)
+        total_count, ids = results[offset], results[offset + 1]
+
+        if search:
+            ids, total_count = await self._search(ids, search.lower(), skip, limit)
+
+        if not ids:
+            return [], total_count
+
+        raw_records = await self.client.hmget(self.hash_key, ids)
+        records = []
+        for agent_id, raw in zip(ids, raw_records):
+            if raw is None:
+                continue
+            try:
+                records.append(json.loads(raw))
+            except (json.JSONDecodeError, TypeError):
+                logger.warning(f"Error parsing agent data for {agent_id}")
+        return records, total_count
+
+    async def _search(
+        self, ordered_ids: List[str], needle: str, skip: int, limit: int
+    ) -> Tuple[List[str], int]:
+        if not ordered_ids:
+            return [], 0
+        names = await self.client.hmget(self.names_key, ordered_ids)
+        matches = [
+            agent_id
+            for agent_id, name in zip(ordered_ids, names)
+            if name is not None and needle in name
+        ]
+        return matches[skip : skip + limit], len(matches)
+
+
+# Global agent index over the shared Redis service
+agent_index = AgentIndex(redis_service)
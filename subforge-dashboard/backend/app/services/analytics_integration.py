@@ -11,7 +11,7 @@ from typing import Any, Dict, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...analytics import AnalyticsService, ReportGenerator
-from ..database.session import get_db
+from ..database.session import BackgroundSessionLocal
 from ..websocket.enhanced_manager import (
     MessageType,
     WebSocketMessage,
@@ -50,7 +50,9 @@ class AnalyticsIntegrationService:
             logger.info("Initializing Analytics Integration Service...")
 
             # Initialize analytics service
-            self.analytics_service = AnalyticsService()
+            self.analytics_service = AnalyticsService(
+                session_factory=BackgroundSessionLocal
+            )
             await self.analytics_service.initialize()
 
             # Initialize report generator
@@ -127,6 +129,9 @@ class AnalyticsIntegrationService:
             priority = task_data.get("priority", "medium")
 
             if self.analytics_service:
+                # A finished task is new history; drop analyses computed before it
+                self.analytics_service.notify_data_changed()
+
                 # Add task completion metrics
                 await self.analytics_service.add_metric_data_point(
                     "task_completion_time", duration
@@ -156,6 +161,8 @@ class AnalyticsIntegrationService:
             if not self.analytics_service:
                 return
 
+            self.analytics_service.notify_data_changed()
+
             # Extract and add system metrics
             metrics_map = {
                 "cpu_usage_percentage": "cpu_usage",
@@ -346,8 +353,8 @@ class AnalyticsIntegrationService:
             try:
                 await asyncio.sleep(self.config["analysis_interval"])
 
-                # Get database session
-                async with get_db().__anext__() as db:
+                # Analytics run on the background pool, not the request pool
+                async with BackgroundSessionLocal() as db:
                     await self.run_periodic_analysis(db)
                     await self.generate_and_broadcast_insights(db)
 
@@ -363,8 +370,7 @@ class AnalyticsIntegrationService:
             try:
                 await asyncio.sleep(self.config["report_interval"])
 
-                # Get database session
-                async with get_db().__anext__() as db:
+                async with BackgroundSessionLocal() as db:
                     await self.generate_scheduled_reports(db)
 
             except asyncio.CancelledError:
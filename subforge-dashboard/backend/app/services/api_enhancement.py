@@ -5,16 +5,21 @@ API enhancement service with rate limiting, caching, and advanced features
 import asyncio
 import hashlib
 import logging
+import math
+import time
 from datetime import datetime, timedelta
 from functools import wraps
 from typing import Any, Callable, Dict, List, Optional
 
 from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from ..utils.single_flight import SingleFlight
+from .rate_limiter import RateLimit, rate_limiter
 from .redis_service import redis_service
 
 logger = logging.getLogger(__name__)
@@ -67,6 +72,9 @@ class APIEnhancementService:
         self.metrics_buffer: List[APIMetrics] = []
         self.buffer_size = 100
         self._metrics_task: Optional[asyncio.Task] = None
+        self._inflight = SingleFlight(on_coalesced=self._count_coalesced)
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        self.cache_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0}
 
     async def initialize(self):
         """Initialize the API enhancement service"""
@@ -105,8 +113,20 @@ class APIEnhancementService:
         vary_by_user: bool = False,
         include_headers: List[str] = None,
         exclude_params: List[str] = None,
+        stale_ttl: int = 0,
+        tags: Optional[List[str]] = None,
     ):
-        """Decorator for caching API responses"""
+        """
+        Decorator for caching API responses
+
+        Entries are fresh for ``ttl`` seconds. With ``stale_ttl`` they keep
+        being served for that much longer while a single background refresh
+        runs (stale-while-revalidate). Concurrent misses for the same key wait
+        on one computation instead of each running the handler. Every entry is
+        registered under its prefix and ``tags`` (which may reference endpoint
+        arguments, e.g. ``"agent:{agent_id}"``) so that
+        ``invalidate_cache(tags=...)`` deletes exactly those keys.
+        """
 
         def decorator(func: Callable):
             @wraps(func)
@@ -131,21 +151,28 @@ class APIEnhancementService:
                     include_headers or [],
                     exclude_params or ["timestamp", "cache_bust"],
                 )
+                entry_tags = self._resolve_cache_tags(prefix, tags, kwargs)
 
-                # Try to get from cache
-                cached_response = await redis_service.get(cache_key)
-                if cached_response is not None:
-                    logger.debug(f"Cache hit for key: {cache_key}")
-                    return cached_response
-
-                # Execute function
-                result = await func(*args, **kwargs)
-
-                # Cache the result
-                await redis_service.set(cache_key, result, expire=ttl)
-                logger.debug(f"Cached response for key: {cache_key}")
+                async def compute():
+                    result = await func(*args, **kwargs)
+                    await self._store_cached(
+                        cache_key, result, ttl, stale_ttl, entry_tags
+                    )
+                    return result
 
-                return result
+                # Try to get from cache
+                entry = await redis_service.get(cache_key)
+                if isinstance(entry, dict) and entry.get("__cache__"):
+                    if time.time() < entry["fresh_until"]:
+                        self.cache_stats["hits"] += 1
+                        logger.debug(f"Cache hit for key: {cache_key}")
+                    else:
+                        self.cache_stats["stale_hits"] += 1
+                        self._refresh_in_background(cache_key, compute)
+                    return self._decode_cached(entry)
+
+                self.cache_stats["misses"] += 1
+                return await self._inflight.run(cache_key, compute)
 
             return wrapper
 
@@ -311,10 +338,33 @@ class APIEnhancementService:
             return {}
 
     async def invalidate_cache(
-        self, pattern: Optional[str] = None, prefix: str = "api_cache"
+        self,
+        pattern: Optional[str] = None,
+        prefix: str = "api_cache",
+        tags: Optional[List[str]] = None,
     ) -> int:
-        """Invalidate cached responses"""
+        """
+        Invalidate cached responses
+
+        With ``tags`` only the keys registered under those tags are deleted;
+        otherwise keys matching ``prefix:pattern`` are found with SCAN.
+        """
         try:
+            if tags:
+                invalidated_count = 0
+                for tag in tags:
+                    tag_key = self._cache_tag_key(tag)
+                    cache_keys = await redis_service.index_members(tag_key)
+                    for start in range(0, len(cache_keys), 500):
+                        invalidated_count += await redis_service.delete_many(
+                            *cache_keys[start : start + 500]
+                        )
+                    await redis_service.delete(tag_key)
+                logger.info(
+                    f"Invalidated {invalidated_count} cache entries with tags: {tags}"
+                )
+                return invalidated_count
+
             if pattern:
                 cache_pattern = f"{prefix}:{pattern}"
             else:
@@ -345,27 +395,102 @@ class APIEnhancementService:
                 limit_key = f"rate_limit:ip:{client_ip}"
                 identifier = client_ip
 
-            # Get current usage
-            minute_key = (
-                f"{limit_key}:minute:{datetime.utcnow().strftime('%Y%m%d%H%M')}"
+            limits = [RateLimit(60, 60), RateLimit(1000, 3600)]  # Default values
+            minute_remaining, hour_remaining = await rate_limiter.status(
+                limit_key, limits
             )
-            hour_key = f"{limit_key}:hour:{datetime.utcnow().strftime('%Y%m%d%H')}"
-
-            minute_count = await redis_service.get(minute_key) or 0
-            hour_count = await redis_service.get(hour_key) or 0
 
             return {
                 "identifier": identifier,
                 "type": "user" if per_user else "ip",
-                "current_minute_requests": minute_count,
-                "current_hour_requests": hour_count,
-                "limits": {"per_minute": 60, "per_hour": 1000},  # Default values
+                "current_minute_requests": limits[0].requests - minute_remaining,
+                "current_hour_requests": limits[1].requests - hour_remaining,
+                "limits": {"per_minute": 60, "per_hour": 1000},
             }
 
         except Exception as e:
             logger.error(f"Error getting rate limit status: {e}")
             return {}
 
+    def _resolve_cache_tags(
+        self, prefix: str, tags: Optional[List[str]], kwargs: Dict[str, Any]
+    ) -> List[str]:
+        resolved = [prefix]
+        for tag in tags or []:
+            try:
+                resolved.append(tag.format(**kwargs))
+            except (KeyError, IndexError):
+                logger.warning(f"Cache tag {tag} references a missing argument")
+        return resolved
+
+    def _cache_tag_key(self, tag: str) -> str:
+        return f"cache_tag:{tag}"
+
+    def _count_coalesced(self, cache_key: str):
+        self.cache_stats["coalesced"] += 1
+
+    def _refresh_in_background(self, cache_key: str, compute: Callable):
+        if cache_key in self._inflight or cache_key in self._refresh_tasks:
+            return
+
+        async def refresh():
+            try:
+                await self._inflight.run(cache_key, compute)
+            except Exception as e:
+                logger.warning(f"Background cache refresh failed for {cache_key}: {e}")
+
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks[cache_key] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(cache_key, None))
+
+    async def _store_cached(
+        self,
+        cache_key: str,
+        result: Any,
+        ttl: int,
+        stale_ttl: int,
+        tags: List[str],
+    ):
+        if isinstance(result, Response):
+            if result.status_code >= 400:
+                return
+            payload = {
+                "response": {
+                    "body": result.body.decode("utf-8"),
+                    "status_code": result.status_code,
+                    "media_type": result.media_type,
+                    "headers": {
+                        k: v
+                        for k, v in result.headers.items()
+                        if k.lower() != "content-length"
+                    },
+                }
+            }
+        else:
+            payload = {"value": jsonable_encoder(result)}
+
+        expire = ttl + stale_ttl
+        payload.update({"__cache__": 1, "fresh_until": time.time() + ttl})
+        async with redis_service.pipeline() as pipe:
+            pipe.set(cache_key, payload, expire=expire)
+            # Tag indexes outlive their longest entry and drop expired keys
+            pipe.add_to_index(
+                [self._cache_tag_key(tag) for tag in tags], cache_key, expire
+            )
+            await pipe.execute()
+        logger.debug(f"Cached response for key: {cache_key}")
+
+    def _decode_cached(self, entry: Dict[str, Any]) -> Any:
+        response = entry.get("response")
+        if response is None:
+            return entry.get("value")
+        return Response(
+            content=response["body"],
+            status_code=response["status_code"],
+            headers=response["headers"],
+            media_type=response["media_type"],
+        )
+
     async def _generate_cache_key(
         self,
         request: Request,
@@ -420,37 +545,21 @@ class APIEnhancementService:
     async def _check_rate_limits(
         self, limit_key: str, requests_per_minute: int, requests_per_hour: int
     ):
-        """Check if rate limits are exceeded"""
-        now = datetime.utcnow()
-
-        # Check minute limit
-        minute_key = f"{limit_key}:minute:{now.strftime('%Y%m%d%H%M')}"
-        minute_count = await redis_service.get(minute_key) or 0
-
-        if int(minute_count) >= requests_per_minute:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Rate limit exceeded: {requests_per_minute} requests per minute",
-                headers={"Retry-After": "60"},
-            )
-
-        # Check hour limit
-        hour_key = f"{limit_key}:hour:{now.strftime('%Y%m%d%H')}"
-        hour_count = await redis_service.get(hour_key) or 0
-
-        if int(hour_count) >= requests_per_hour:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Rate limit exceeded: {requests_per_hour} requests per hour",
-                headers={"Retry-After": "3600"},
-            )
-
-        # Increment counters
-        await redis_service.increment(minute_key)
-        await redis_service.expire(minute_key, 60)
+        """Count the request against the minute and hour limits, or reject it"""
+        result = await rate_limiter.hit(
+            limit_key,
+            [RateLimit(requests_per_minute, 60), RateLimit(requests_per_hour, 3600)],
+        )
+        if result.allowed:
+            return
 
-        await redis_service.increment(hour_key)
-        await redis_service.expire(hour_key, 3600)
+        limit = result.limit
+        period = "minute" if limit.period == 60 else "hour"
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Rate limit exceeded: {limit.requests} requests per {period}",
+            headers={"Retry-After": str(max(math.ceil(result.retry_after), 1))},
+        )
 
     async def _process_metrics_buffer(self):
         """Process metrics buffer periodically"""
@@ -0,0 +1,220 @@
+"""
+Content-addressed blob storage for uploaded files
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, NamedTuple, Optional, Tuple
+
+from .redis_service import RedisService
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+SNIFF_SIZE = 2048  # leading bytes kept for MIME detection
+
+
+class FileTooLargeError(ValueError):
+    """Raised when an upload stream exceeds the allowed size"""
+
+
+class StoredBlob(NamedTuple):
+    digest: str  # SHA-256 hex of the content
+    size: int
+    path: Path
+    head: bytes  # first SNIFF_SIZE bytes
+    deduplicated: bool  # identical content was already stored
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` range into inclusive (start, end)
+
+    Returns None when the header is absent or not a single byte range, so the
+    whole file is served; raises ValueError when the range is unsatisfiable.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes=") :].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start, end = max(size - int(end_text), 0), size - 1
+    except ValueError:
+        return None
+
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        raise ValueError(f"Range {header} not satisfiable for {size} bytes")
+    return start, end
+
+
+class ContentStore:
+    """
+    Stores file content once per SHA-256 digest
+
+    Uploads are streamed in chunks to a temporary file on the same file
+    system, hashing as they go; all disk work runs in a thread pool so the
+    event loop is never blocked by large files. The finished temp file is
+    atomically renamed to ``blobs/<aa>/<bb>/<digest>``, or discarded when that
+    blob already exists. A Redis counter per digest tracks how many file
+    records share the blob, and the blob is removed with its last reference.
+
+    An upload takes its reference before checking for the blob, and the last
+    release decrements and deletes the counter atomically, then moves the
+    blob aside before re-reading the counter. An upload that took a
+    reference in between either is seen by that re-check, which puts the
+    blob back, or no longer finds the blob and stores its own copy.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        redis: RedisService,
+        chunk_size: int = CHUNK_SIZE,
+        max_workers: int = 4,
+    ):
+        self.root = Path(root)
+        self.redis = redis
+        self.chunk_size = chunk_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="file-store"
+        )
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest[2:4] / digest
+
+    def _ref_key(self, digest: str) -> str:
+        return f"file_blob_refs:{digest}"
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _open_temp(self) -> Tuple[BinaryIO, str]:
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=".part")
+        return os.fdopen(fd, "wb"), tmp_path
+
+    @staticmethod
+    def _write_chunk(handle: BinaryIO, hasher, chunk: bytes):
+        hasher.update(chunk)
+        handle.write(chunk)
+
+    def _commit(self, handle: BinaryIO, tmp_path: str, digest: str) -> bool:
+        """Move the temp file into place; returns True if the blob existed"""
+        handle.flush()
+        os.fsync(handle.fileno())
+        handle.close()
+
+        target = self.blob_path(digest)
+        if target.exists():
+            os.unlink(tmp_path)
+            return True
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, target)
+        return False
+
+    @staticmethod
+    def _discard(handle: BinaryIO, tmp_path: str):
+        handle.close()
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+
+    async def save_stream(self, upload, max_size: Optional[int] = None) -> StoredBlob:
+        """
+        Store the content of an object with ``async read(n)`` (e.g. UploadFile)
+
+        Raises FileTooLargeError as soon as more than ``max_size`` bytes arrive.
+        """
+        handle, tmp_path = await self._run(self._open_temp)
+        hasher = hashlib.sha256()
+        size = 0
+        head = b""
+
+        try:
+            while True:
+                chunk = await upload.read(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise FileTooLargeError(
+                        f"Upload exceeds maximum allowed size of {max_size} bytes"
+                    )
+                if len(head) < SNIFF_SIZE:
+                    head += chunk[: SNIFF_SIZE - len(head)]
+                await self._run(self._write_chunk, handle, hasher, chunk)
+        except BaseException:
+            await self._run(self._discard, handle, tmp_path)
+            raise
+
+        digest = hasher.hexdigest()
+        # Take the reference before the existence check; see the class docs
+        await self.redis.increment(self._ref_key(digest))
+        try:
+            existed = await self._run(self._commit, handle, tmp_path, digest)
+        except BaseException:
+            await self.redis.decrement_and_delete(self._ref_key(digest))
+            await self._run(self._discard, handle, tmp_path)
+            raise
+
+        if existed:
+            logger.debug(f"Upload deduplicated against blob {digest}")
+        return StoredBlob(digest, size, self.blob_path(digest), head, existed)
+
+    async def release(self, digest: str):
+        """Drop one reference to a blob, deleting it with the last one"""
+        ref_key = self._ref_key(digest)
+        remaining = await self.redis.decrement_and_delete(ref_key)
+        if remaining is None or remaining > 0:
+            # Still shared, or Redis is unavailable: keeping a blob is safer
+            return
+
+        tombstone = await self._run(self._set_aside, digest)
+        if tombstone is None:
+            return
+        if await self.redis.get_counter(ref_key) == 0:
+            await self._run(tombstone.unlink)
+        else:
+            # Referenced again meanwhile (or Redis is unavailable): restore it
+            await self._run(os.replace, tombstone, self.blob_path(digest))
+
+    def _set_aside(self, digest: str) -> Optional[Path]:
+        """Rename a blob out of the way; returns its new path, if it existed"""
+        path = self.blob_path(digest)
+        tombstone = path.with_name(f"{digest}.{uuid.uuid4().hex}.deleting")
+        try:
+            os.rename(path, tombstone)
+        except FileNotFoundError:
+            return None
+        return tombstone
+
+    async def iter_range(
+        self, path: Path, start: int, end: int
+    ) -> AsyncIterator[bytes]:
+        """Yield bytes ``start``..``end`` (inclusive) of a file in chunks"""
+        handle = await self._run(open, path, "rb")
+        try:
+            await self._run(handle.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await self._run(handle.read, min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await self._run(handle.close)
@@ -0,0 +1,383 @@
+"""
+Monthly partitions and retention for workflow history
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..database.base import Base
+from ..models.database import (
+    AgentPerformanceMetrics,
+    HandoffHistory,
+    PhaseHistory,
+    WorkflowAgentAssociation,
+    WorkflowHistory,
+)
+
+logger = logging.getLogger(__name__)
+
+# (table, partition key) in drop order: tables referencing workflow_history
+# first. Children are keyed on their workflow's start so months line up.
+PARTITIONED_TABLES = (
+    ("workflow_agent_association", "started_at"),
+    ("handoff_history", "workflow_started_at"),
+    ("phase_history", "workflow_started_at"),
+    ("workflow_history", "started_at"),
+)
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month covered by a partition named by ``partition_name``"""
+    match = _PARTITION_SUFFIX.search(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def expired_months(months: Iterable[date], cutoff: datetime) -> List[date]:
+    """Months lying entirely before ``cutoff``, oldest first"""
+    limit = month_start(cutoff)
+    return sorted(month for month in set(months) if add_months(month, 1) <= limit)
+
+
+def create_tables(connection) -> None:
+    """
+    ``Base.metadata.create_all`` that leaves PostgreSQL history to migrations
+
+    Run with ``AsyncConnection.run_sync``. On PostgreSQL the history tables
+    must come from the ``20261018_120000`` migration: create_all would build
+    them unpartitioned with single-column foreign keys, and retention would
+    fall back to deleting rows. Startup fails if they have not been migrated.
+    """
+    tables = None
+    if connection.dialect.name == "postgresql":
+        history = {table for table, _ in PARTITIONED_TABLES}
+        missing = sorted(history - set(inspect(connection).get_table_names()))
+        if missing:
+            raise RuntimeError(
+                f"History tables {', '.join(missing)} do not exist; "
+                "run 'alembic upgrade head' before starting the dashboard"
+            )
+        tables = [t for t in Base.metadata.sorted_tables if t.name not in history]
+    Base.metadata.create_all(connection, tables=tables)
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+class HistoryPartitionManager:
+    """
+    Keeps monthly history partitions ready and expires them as a whole
+
+    On PostgreSQL the history tables are range partitioned by month (see the
+    ``20261018_120000`` migration), so retention detaches and drops whole
+    partitions instead of deleting rows, optionally exporting each one to a
+    gzip JSON-lines archive first. Retention is therefore month-granular: a
+    month is dropped once all of it is older than the cutoff.
+
+    Other databases (SQLite in development and tests) keep plain tables and
+    fall back to deleting expired rows in small committed batches, so no
+    single statement holds a long lock.
+    """
+
+    def __init__(
+        self,
+        archive_dir: Optional[str] = None,
+        months_ahead: int = 3,
+        batch_size: int = 1000,
+    ):
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+        self.months_ahead = months_ahead
+        self.batch_size = batch_size
+
+    async def is_partitioned(
+        self, session: AsyncSession, table: str = "workflow_history"
+    ) -> bool:
+        """Whether ``table`` is a native partitioned table"""
+        if session.get_bind().dialect.name != "postgresql":
+            return False
+        result = await session.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = :table"
+            ),
+            {"table": table},
+        )
+        return result.first() is not None
+
+    async def list_partitions(
+        self, session: AsyncSession, table: str
+    ) -> Dict[date, str]:
+        """Monthly partitions of ``table`` keyed by month (default excluded)"""
+        result = await session.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits i "
+                "JOIN pg_class parent ON parent.oid = i.inhparent "
+                "JOIN pg_class child ON child.oid = i.inhrelid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": table},
+        )
+        partitions = {}
+        for (name,) in result:
+            month = partition_month(name)
+            if month is not None:
+                partitions[month] = name
+        return partitions
+
+    async def ensure_partitions(
+        self, session: AsyncSession, now: Optional[datetime] = None
+    ) -> List[str]:
+        """Create the current and next ``months_ahead`` monthly partitions"""
+        if not await self.is_partitioned(session):
+            return []
+
+        first = month_start(now or datetime.utcnow())
+        created = []
+        # Parents before children so new FK targets exist
+        for table, _ in reversed(PARTITIONED_TABLES):
+            existing = await self.list_partitions(session, table)
+            for offset in range(self.months_ahead + 1):
+                month = add_months(first, offset)
+                if month in existing:
+                    continue
+                name = partition_name(table, month)
+                await session.execute(
+                    text(
+                        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+                        f"FOR VALUES FROM ({_bound(month)}) "
+                        f"TO ({_bound(add_months(month, 1))})"
+                    )
+                )
+                created.append(name)
+
+        if created:
+            logger.info(f"Created history partitions: {', '.join(created)}")
+        return created
+
+    async def apply_retention(
+        self,
+        session: AsyncSession,
+        retention_days: int,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Remove history older than ``retention_days``
+
+        Returns a summary with the dropped partitions, archive files and the
+        number of rows removed by batched deletes.
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+        summary: Dict[str, Any] = {
+            "mode": "batched_delete",
+            "cutoff": cutoff.isoformat(),
+            "partitions_dropped": [],
+            "archives": [],
+            "rows_archived": 0,
+            "workflow_history_deleted": 0,
+            "performance_metrics_deleted": 0,
+        }
+
+        if await self.is_partitioned(session):
+            summary["mode"] = "partitions"
+            await self.ensure_partitions(session, now)
+            await session.commit()
+
+            partitions = {
+                table: await self.list_partitions(session, table)
+                for table, _ in PARTITIONED_TABLES
+            }
+            months = [month for parts in partitions.values() for month in parts]
+            for month in expired_months(months, cutoff):
+                await self._drop_month(session, month, partitions, summary)
+                await session.commit()
+
+            # Only rows that fell outside every monthly partition remain
+            summary["workflow_history_deleted"] = await self._delete_default_rows(
+                session, cutoff
+            )
+        else:
+            summary["workflow_history_deleted"] = await self._delete_workflows(
+                session, cutoff
+            )
+
+        summary["performance_metrics_deleted"] = await self._delete_in_batches(
+            session,
+            AgentPerformanceMetrics,
+            AgentPerformanceMetrics.period_start < cutoff,
+        )
+
+        logger.info(
+            f"History retention before {cutoff}: "
+            f"{len(summary['partitions_dropped'])} partitions dropped, "
+            f"{summary['workflow_history_deleted']} workflows deleted"
+        )
+        return summary
+
+    async def _drop_month(
+        self,
+        session: AsyncSession,
+        month: date,
+        partitions: Dict[str, Dict[date, str]],
+        summary: Dict[str, Any],
+    ):
+        """Detach, optionally archive, and drop one month of every table"""
+        for table, _ in PARTITIONED_TABLES:
+            name = partitions[table].get(month)
+            if name is None:
+                continue
+            await session.execute(
+                text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+            )
+            if self.archive_dir is not None:
+                path, rows = await self._export_table(session, name)
+                summary["archives"].append(str(path))
+                summary["rows_archived"] += rows
+            await session.execute(text(f'DROP TABLE "{name}"'))
+            summary["partitions_dropped"].append(name)
+
+    async def _export_table(
+        self, session: AsyncSession, name: str
+    ) -> Tuple[Path, int]:
+        """Stream a detached partition into ``<archive_dir>/<name>.jsonl.gz``"""
+        await asyncio.to_thread(self.archive_dir.mkdir, parents=True, exist_ok=True)
+        path = self.archive_dir / f"{name}.jsonl.gz"
+        tmp_path = self.archive_dir / f"{name}.jsonl.gz.part"
+
+        handle = await asyncio.to_thread(gzip.open, tmp_path, "wt", encoding="utf-8")
+        rows = 0
+        try:
+            result = await session.stream(
+                text(f'SELECT * FROM "{name}"').execution_options(
+                    yield_per=self.batch_size
+                )
+            )
+            async for chunk in result.mappings().partitions(self.batch_size):
+                lines = "".join(
+                    json.dumps(dict(row), default=str) + "\n" for row in chunk
+                )
+                await asyncio.to_thread(handle.write, lines)
+                rows += len(chunk)
+            await asyncio.to_thread(handle.close)
+            await asyncio.to_thread(os.replace, tmp_path, path)
+        except BaseException:
+            handle.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        return path, rows
+
+    async def _delete_default_rows(
+        self, session: AsyncSession, cutoff: datetime
+    ) -> int:
+        """Batch-delete expired rows from the default workflow partition"""
+        exists = await session.execute(
+            text("SELECT to_regclass('workflow_history_default') IS NOT NULL")
+        )
+        if not exists.scalar():
+            return 0
+
+        deleted = 0
+        while True:
+            # Child rows go with their workflow via ON DELETE CASCADE
+            result = await session.execute(
+                text(
+                    'DELETE FROM "workflow_history_default" WHERE id IN ('
+                    'SELECT id FROM "workflow_history_default" '
+                    "WHERE started_at < :cutoff LIMIT :limit)"
+                ),
+                {"cutoff": cutoff, "limit": self.batch_size},
+            )
+            await session.commit()
+            deleted += result.rowcount
+            if result.rowcount < self.batch_size:
+                return deleted
+
+    async def _delete_workflows(self, session: AsyncSession, cutoff: datetime) -> int:
+        """Batch-delete expired workflows and their child rows"""
+        deleted = 0
+        while True:
+            ids = (
+                (
+                    await session.execute(
+                        select(WorkflowHistory.id)
+                        .where(WorkflowHistory.started_at < cutoff)
+                        .limit(self.batch_size)
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            if not ids:
+                return deleted
+
+            for model in (WorkflowAgentAssociation, HandoffHistory, PhaseHistory):
+                await session.execute(
+                    delete(model)
+                    .where(model.workflow_history_id.in_(ids))
+                    .execution_options(synchronize_session=False)
+                )
+            await session.execute(
+                delete(WorkflowHistory)
+                .where(WorkflowHistory.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+            deleted += len(ids)
+
+    async def _delete_in_batches(self, session: AsyncSession, model, condition) -> int:
+        deleted = 0
+        while True:
+            ids = (
+                (
+                    await session.execute(
+                        select(model.id).where(condition).limit(self.batch_size)
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            if not ids:
+                return deleted
+            await session.execute(
+                delete(model)
+                .where(model.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+            deleted += len(ids)
+
+
+# Global partition manager instance
+history_partitions = HistoryPartitionManager(
+    archive_dir=settings.HISTORY_ARCHIVE_DIR,
+    months_ahead=settings.HISTORY_PARTITIONS_AHEAD,
+)
@@ -0,0 +1,244 @@
+"""
+Batched write queue for workflow execution history
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..database.session import BackgroundSessionLocal
+from .persistence import persistence_service
+
+logger = logging.getLogger(__name__)
+
+# Queue markers: end the current batch now, or end it and stop the writer
+_FLUSH = object()
+_STOP = object()
+
+# An execution and the callback told whether it was written
+_Item = Tuple[Dict[str, Any], Optional[Callable[[bool], Any]]]
+
+
+class HistoryWriteQueue:
+    """
+    Collects workflow executions and writes them in bulk
+
+    ``submit`` enqueues an execution (the payload accepted by
+    ``PersistenceService.store_workflow_executions_bulk``) and returns once
+    it is queued; its ``on_written`` callback is called with the outcome
+    once the execution has been committed or has finally failed, so callers
+    that must not lose it act on that rather than on the return value. A
+    background task groups queued executions into batches of
+    up to ``batch_size``, waiting at most ``flush_interval`` seconds for a
+    batch to fill, and writes each batch with a few set-based statements in
+    one transaction. Hourly agent performance metrics are refreshed once per
+    agent per batch rather than once per phase.
+
+    The queue holds at most ``max_pending`` executions; beyond that
+    ``submit`` waits for the writer, so a slow database slows producers down
+    instead of growing memory. ``shutdown`` writes everything still queued.
+    When the writer is not running, ``submit`` writes synchronously.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_pending: int = 5000,
+    ):
+        self.session_factory = session_factory or BackgroundSessionLocal
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.logger = logger
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "submitted": 0,
+            "written": 0,
+            "batches": 0,
+            "failed": 0,
+            "retried_batches": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def initialize(self):
+        """Start the background writer"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+        self.logger.info("History write queue started")
+
+    async def shutdown(self):
+        """Write every queued execution, then stop the background writer"""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self.logger.info(
+            f"History write queue stopped after {self.stats['written']} executions"
+        )
+
+    async def submit(
+        self,
+        execution: Dict[str, Any],
+        on_written: Optional[Callable[[bool], Any]] = None,
+    ) -> bool:
+        """
+        Queue an execution for the next batch, waiting while the queue is full
+
+        ``on_written`` is called exactly once, with True after the batch
+        holding the execution committed and False when it could not be
+        written even on its own. Returns False only when the writer is not
+        running and writing the execution directly failed.
+        """
+        self.stats["submitted"] += 1
+        if not self.running:
+            return await self._write([(execution, on_written)]) == 1
+        await self._queue.put((execution, on_written))
+        return True
+
+    async def flush(self):
+        """Write the current partial batch and wait for everything submitted"""
+        if self.running:
+            await self._queue.put(_FLUSH)
+            await self._queue.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "running": self.running,
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            taken = 1
+            stopping = item is _STOP
+            batch = [] if item is _FLUSH or stopping else [item]
+
+            deadline = loop.time() + self.flush_interval
+            while batch and len(batch) < self.batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                taken += 1
+                if item is _FLUSH or item is _STOP:
+                    stopping = item is _STOP
+                    break
+                batch.append(item)
+
+            if batch:
+                await self._write(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+
+        # Anything that raced in behind the stop marker
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            self._queue.task_done()
+            if item is not _FLUSH and item is not _STOP:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.batch_size):
+            await self._write(remaining[start : start + self.batch_size])
+
+    async def _write(self, batch: List[_Item]) -> int:
+        """
+        Write a batch, retrying executions one by one if the batch fails
+
+        Reports each execution's outcome to its callback and returns the
+        number of executions written.
+        """
+        try:
+            await self._write_batch([execution for execution, _ in batch])
+            self._notify(batch, True)
+            return len(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                self.stats["failed"] += 1
+                self.logger.error(f"Error writing workflow execution: {e}")
+                self._notify(batch, False)
+                return 0
+            self.logger.warning(
+                f"Batched write of {len(batch)} executions failed, "
+                f"retrying individually: {e}"
+            )
+
+        self.stats["retried_batches"] += 1
+        written = 0
+        for item in batch:
+            try:
+                await self._write_batch([item[0]])
+                written += 1
+                self._notify([item], True)
+            except Exception as e:
+                self.stats["failed"] += 1
+                self.logger.error(f"Error writing workflow execution: {e}")
+                self._notify([item], False)
+        return written
+
+    def _notify(self, items: List[_Item], written: bool):
+        for _, on_written in items:
+            if on_written is None:
+                continue
+            try:
+                on_written(written)
+            except Exception as e:
+                self.logger.error(f"Error in history write callback: {e}")
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]):
+        async with self.session_factory() as session:
+            try:
+                summary = await persistence_service.store_workflow_executions_bulk(
+                    session, batch
+                )
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+            await self._store_agent_performance(session, summary["agent_ids"])
+
+    async def _store_agent_performance(self, session, agent_ids: List[str]):
+        """Refresh the current hour's performance metrics of each agent"""
+        if not agent_ids:
+            return
+        try:
+            period_start = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+            period_end = period_start + timedelta(hours=1)
+            for agent_id in agent_ids:
+                await persistence_service.calculate_and_store_agent_performance(
+                    session, agent_id, period_start, period_end, "hour"
+                )
+            await session.commit()
+        except Exception as e:
+            self.logger.error(f"Error storing agent performance metrics: {e}")
+
+
+# Global history write queue instance
+history_writer = HistoryWriteQueue(
+    batch_size=settings.HISTORY_WRITE_BATCH_SIZE,
+    flush_interval=settings.HISTORY_WRITE_FLUSH_INTERVAL,
+    max_pending=settings.HISTORY_WRITE_MAX_PENDING,
+)
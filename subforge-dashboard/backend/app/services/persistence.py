@@ -2,23 +2,69 @@
 Persistence service for storing SubForge workflow history and analytics data
 """
 
+import base64
+import json
 import logging
 import uuid
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
-from sqlalchemy import and_, desc, func, or_, select
+from sqlalchemy import and_, delete, desc, func, insert, or_, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.database import (
     AgentPerformanceMetrics,
     HandoffHistory,
     PhaseHistory,
+    WorkflowAgentAssociation,
     WorkflowHistory,
 )
+from .history_partitions import history_partitions
+from .rollups import rollup_service
 
 logger = logging.getLogger(__name__)
 
+# INSERT ... ON CONFLICT constructs for the dialects batched upserts run on
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Columns refreshed when a re-submitted execution hits its existing row
+_UPSERT_COLUMNS = [
+    column.name
+    for column in WorkflowHistory.__table__.columns
+    if column.name
+    not in ("id", "execution_id", "started_at", "created_at", "updated_at")
+]
+
+
+def _count_where(column, condition):
+    """COUNT(column) FILTER (WHERE condition)"""
+    return func.count(column).filter(condition)
+
+
+class HistoryPage(NamedTuple):
+    items: List[WorkflowHistory]
+    next_cursor: Optional[str]  # None on the last page
+    total: Optional[int]  # only when requested
+
+
+def encode_history_cursor(workflow: WorkflowHistory) -> str:
+    """Opaque cursor pointing just past ``workflow`` in history order"""
+    payload = json.dumps([workflow.started_at.isoformat(), str(workflow.id)])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Inverse of encode_history_cursor; raises ValueError for bad cursors"""
+    try:
+        started_at, history_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+        return datetime.fromisoformat(started_at), uuid.UUID(history_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid history cursor: {cursor!r}") from e
+
 
 class PersistenceService:
     """
@@ -46,47 +92,14 @@ class PersistenceService:
             WorkflowHistory: Created workflow history record
         """
         try:
-            # Create workflow history record
             workflow_history = WorkflowHistory(
-                workflow_id=workflow_data.get("workflow_id"),
-                execution_id=workflow_data.get("execution_id", str(uuid.uuid4())),
-                execution_number=workflow_data.get("execution_number", 1),
-                workflow_name=workflow_data.get("name", "Unknown Workflow"),
-                workflow_type=workflow_data.get("type", "default"),
-                project_id=workflow_data.get("project_id"),
-                project_name=workflow_data.get("project_name"),
-                status=workflow_data.get("status", "completed"),
-                final_result=workflow_data.get("final_result", "success"),
-                started_at=workflow_data.get("started_at", datetime.utcnow()),
-                completed_at=workflow_data.get("completed_at"),
-                duration_seconds=workflow_data.get("duration_seconds"),
-                total_phases=workflow_data.get("total_phases", 0),
-                completed_phases=workflow_data.get("completed_phases", 0),
-                failed_phases=workflow_data.get("failed_phases", 0),
-                skipped_phases=workflow_data.get("skipped_phases", 0),
-                total_tasks=workflow_data.get("total_tasks", 0),
-                completed_tasks=workflow_data.get("completed_tasks", 0),
-                failed_tasks=workflow_data.get("failed_tasks", 0),
-                success_rate=workflow_data.get("success_rate", 0.0),
-                quality_score=workflow_data.get("quality_score"),
-                efficiency_score=workflow_data.get("efficiency_score"),
-                configuration=workflow_data.get("configuration", {}),
-                parameters=workflow_data.get("parameters", {}),
-                environment_info=execution_metadata or {},
-                assigned_agents=workflow_data.get("assigned_agents", []),
-                agent_performance_summary=workflow_data.get(
-                    "agent_performance_summary", {}
-                ),
-                error_messages=workflow_data.get("error_messages", []),
-                warnings=workflow_data.get("warnings", []),
-                critical_issues=workflow_data.get("critical_issues", []),
-                resource_usage=workflow_data.get("resource_usage", {}),
-                triggered_by=workflow_data.get("triggered_by"),
-                trigger_event=workflow_data.get("trigger_event"),
+                **self._workflow_values(workflow_data, execution_metadata)
             )
+            workflow_history.agent_links = self._build_agent_links(workflow_history)
 
             session.add(workflow_history)
             await session.flush()
+            await rollup_service.record_workflow(session, workflow_history)
 
             self.logger.info(
                 f"Stored workflow execution history: {workflow_history.id}"
@@ -98,6 +111,137 @@ class PersistenceService:
             await session.rollback()
             raise
 
+    def _workflow_values(
+        self,
+        workflow_data: Dict[str, Any],
+        execution_metadata: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        """WorkflowHistory column values for an execution payload"""
+        return {
+            "workflow_id": workflow_data.get("workflow_id"),
+            "execution_id": workflow_data.get("execution_id", str(uuid.uuid4())),
+            "execution_number": workflow_data.get("execution_number", 1),
+            "workflow_name": workflow_data.get("name", "Unknown Workflow"),
+            "workflow_type": workflow_data.get("type", "default"),
+            "project_id": workflow_data.get("project_id"),
+            "project_name": workflow_data.get("project_name"),
+            "status": workflow_data.get("status", "completed"),
+            "final_result": workflow_data.get("final_result", "success"),
+            "started_at": workflow_data.get("started_at", datetime.utcnow()),
+            "completed_at": workflow_data.get("completed_at"),
+            "duration_seconds": workflow_data.get("duration_seconds"),
+            "total_phases": workflow_data.get("total_phases", 0),
+            "completed_phases": workflow_data.get("completed_phases", 0),
+            "failed_phases": workflow_data.get("failed_phases", 0),
+            "skipped_phases": workflow_data.get("skipped_phases", 0),
+            "total_tasks": workflow_data.get("total_tasks", 0),
+            "completed_tasks": workflow_data.get("completed_tasks", 0),
+            "failed_tasks": workflow_data.get("failed_tasks", 0),
+            "success_rate": workflow_data.get("success_rate", 0.0),
+            "quality_score": workflow_data.get("quality_score"),
+            "efficiency_score": workflow_data.get("efficiency_score"),
+            "configuration": workflow_data.get("configuration", {}),
+            "parameters": workflow_data.get("parameters", {}),
+            "environment_info": execution_metadata or {},
+            "assigned_agents": workflow_data.get("assigned_agents", []),
+            "agent_performance_summary": workflow_data.get(
+                "agent_performance_summary", {}
+            ),
+            "error_messages": workflow_data.get("error_messages", []),
+            "warnings": workflow_data.get("warnings", []),
+            "critical_issues": workflow_data.get("critical_issues", []),
+            "resource_usage": workflow_data.get("resource_usage", {}),
+            "triggered_by": workflow_data.get("triggered_by"),
+            "trigger_event": workflow_data.get("trigger_event"),
+        }
+
+    def _phase_values(self, phase_data: Dict[str, Any]) -> Dict[str, Any]:
+        """PhaseHistory column values, excluding the parent workflow keys"""
+        return {
+            "phase_name": phase_data.get("name", "Unknown Phase"),
+            "phase_type": phase_data.get("type", "default"),
+            "phase_order": phase_data.get("order", 0),
+            "status": phase_data.get("status", "completed"),
+            "result": phase_data.get("result", "success"),
+            "started_at": phase_data.get("started_at"),
+            "completed_at": phase_data.get("completed_at"),
+            "duration_seconds": phase_data.get("duration_seconds"),
+            "assigned_agent_id": phase_data.get("assigned_agent_id"),
+            "assigned_agent_name": phase_data.get("assigned_agent_name"),
+            "agent_utilization": phase_data.get("agent_utilization"),
+            "phase_config": phase_data.get("config", {}),
+            "input_parameters": phase_data.get("input_parameters", {}),
+            "output_results": phase_data.get("output_results", {}),
+            "quality_score": phase_data.get("quality_score"),
+            "performance_score": phase_data.get("performance_score"),
+            "total_tasks": phase_data.get("total_tasks", 0),
+            "completed_tasks": phase_data.get("completed_tasks", 0),
+            "failed_tasks": phase_data.get("failed_tasks", 0),
+            "dependencies": phase_data.get("dependencies", []),
+            "dependents": phase_data.get("dependents", []),
+            "error_messages": phase_data.get("error_messages", []),
+            "warnings": phase_data.get("warnings", []),
+            "resource_usage": phase_data.get("resource_usage", {}),
+        }
+
+    def _handoff_values(self, handoff_data: Dict[str, Any]) -> Dict[str, Any]:
+        """HandoffHistory column values, excluding the parent workflow keys"""
+        return {
+            "handoff_name": handoff_data.get("name", "Unknown Handoff"),
+            "handoff_type": handoff_data.get("type", "phase_to_phase"),
+            "source_phase_name": handoff_data.get("source_phase_name"),
+            "target_phase_name": handoff_data.get("target_phase_name"),
+            "source_agent_id": handoff_data.get("source_agent_id"),
+            "target_agent_id": handoff_data.get("target_agent_id"),
+            "status": handoff_data.get("status", "completed"),
+            "result": handoff_data.get("result", "success"),
+            "initiated_at": handoff_data.get("initiated_at", datetime.utcnow()),
+            "completed_at": handoff_data.get("completed_at"),
+            "duration_seconds": handoff_data.get("duration_seconds"),
+            "handoff_data": handoff_data.get("handoff_data", {}),
+            "validation_rules": handoff_data.get("validation_rules", {}),
+            "validation_results": handoff_data.get("validation_results", {}),
+            "data_quality_score": handoff_data.get("data_quality_score"),
+            "handoff_efficiency_score": handoff_data.get("handoff_efficiency_score"),
+            "error_messages": handoff_data.get("error_messages", []),
+            "warnings": handoff_data.get("warnings", []),
+            "validation_failures": handoff_data.get("validation_failures", []),
+            "context_info": handoff_data.get("context_info", {}),
+            "handoff_metadata": handoff_data.get("metadata", {}),
+        }
+
+    def _agent_link_values(self, assigned_agents: List[Any]) -> List[Dict[str, Any]]:
+        """One association value set per distinct agent in ``assigned_agents``"""
+        links = {}
+        for agent in assigned_agents or []:
+            agent_id = agent.get("id") if isinstance(agent, dict) else agent
+            if not agent_id or agent_id in links:
+                continue
+            links[agent_id] = {
+                "agent_id": str(agent_id),
+                "agent_name": agent.get("name") if isinstance(agent, dict) else None,
+                "agent_type": agent.get("type") if isinstance(agent, dict) else None,
+            }
+        return list(links.values())
+
+    def _build_agent_links(
+        self, workflow_history: WorkflowHistory
+    ) -> List[WorkflowAgentAssociation]:
+        """One association row per distinct agent in ``assigned_agents``"""
+        return [
+            WorkflowAgentAssociation(started_at=workflow_history.started_at, **values)
+            for values in self._agent_link_values(workflow_history.assigned_agents)
+        ]
+
+    async def _workflow_started_at(
+        self, session: AsyncSession, workflow_history_id: uuid.UUID
+    ) -> datetime:
+        """Partition key for child history rows (identity map hit normally)"""
+        workflow = await session.get(WorkflowHistory, workflow_history_id)
+        if workflow is None:
+            raise ValueError(f"Workflow history {workflow_history_id} not found")
+        return workflow.started_at
+
     async def store_phase_execution(
         self,
         session: AsyncSession,
@@ -118,34 +262,15 @@ class PersistenceService:
         try:
             phase_history = PhaseHistory(
                 workflow_history_id=workflow_history_id,
-                phase_name=phase_data.get("name", "Unknown Phase"),
-                phase_type=phase_data.get("type", "default"),
-                phase_order=phase_data.get("order", 0),
-                status=phase_data.get("status", "completed"),
-                result=phase_data.get("result", "success"),
-                started_at=phase_data.get("started_at"),
-                completed_at=phase_data.get("completed_at"),
-                duration_seconds=phase_data.get("duration_seconds"),
-                assigned_agent_id=phase_data.get("assigned_agent_id"),
-                assigned_agent_name=phase_data.get("assigned_agent_name"),
-                agent_utilization=phase_data.get("agent_utilization"),
-                phase_config=phase_data.get("config", {}),
-                input_parameters=phase_data.get("input_parameters", {}),
-                output_results=phase_data.get("output_results", {}),
-                quality_score=phase_data.get("quality_score"),
-                performance_score=phase_data.get("performance_score"),
-                total_tasks=phase_data.get("total_tasks", 0),
-                completed_tasks=phase_data.get("completed_tasks", 0),
-                failed_tasks=phase_data.get("failed_tasks", 0),
-                dependencies=phase_data.get("dependencies", []),
-                dependents=phase_data.get("dependents", []),
-                error_messages=phase_data.get("error_messages", []),
-                warnings=phase_data.get("warnings", []),
-                resource_usage=phase_data.get("resource_usage", {}),
+                workflow_started_at=await self._workflow_started_at(
+                    session, workflow_history_id
+                ),
+                **self._phase_values(phase_data),
             )
 
             session.add(phase_history)
             await session.flush()
+            await rollup_service.record_phase(session, phase_history)
 
             self.logger.info(f"Stored phase execution history: {phase_history.id}")
             return phase_history
@@ -175,27 +300,10 @@ class PersistenceService:
         try:
             handoff_history = HandoffHistory(
                 workflow_history_id=workflow_history_id,
-                handoff_name=handoff_data.get("name", "Unknown Handoff"),
-                handoff_type=handoff_data.get("type", "phase_to_phase"),
-                source_phase_name=handoff_data.get("source_phase_name"),
-                target_phase_name=handoff_data.get("target_phase_name"),
-                source_agent_id=handoff_data.get("source_agent_id"),
-                target_agent_id=handoff_data.get("target_agent_id"),
-                status=handoff_data.get("status", "completed"),
-                result=handoff_data.get("result", "success"),
-                initiated_at=handoff_data.get("initiated_at", datetime.utcnow()),
-                completed_at=handoff_data.get("completed_at"),
-                duration_seconds=handoff_data.get("duration_seconds"),
-                handoff_data=handoff_data.get("handoff_data", {}),
-                validation_rules=handoff_data.get("validation_rules", {}),
-                validation_results=handoff_data.get("validation_results", {}),
-                data_quality_score=handoff_data.get("data_quality_score"),
-                handoff_efficiency_score=handoff_data.get("handoff_efficiency_score"),
-                error_messages=handoff_data.get("error_messages", []),
-                warnings=handoff_data.get("warnings", []),
-                validation_failures=handoff_data.get("validation_failures", []),
-                context_info=handoff_data.get("context_info", {}),
-                handoff_metadata=handoff_data.get("metadata", {}),
+                workflow_started_at=await self._workflow_started_at(
+                    session, workflow_history_id
+                ),
+                **self._handoff_values(handoff_data),
             )
 
             session.add(handoff_history)
@@ -209,6 +317,133 @@ class PersistenceService:
             await session.rollback()
             raise
 
+    async def store_workflow_executions_bulk(
+        self, session: AsyncSession, executions: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Upsert a batch of workflow executions with set-based statements
+
+        Each execution is a dict with the ``workflow`` payload and optional
+        ``phases``, ``handoffs`` and ``metadata``, in the shapes accepted by
+        the single-row store methods. Workflows are upserted on
+        (execution_id, started_at), so re-submitting an execution refreshes
+        its row and replaces its phases and handoffs instead of duplicating
+        them. Rollups are recorded for newly inserted executions only. The
+        caller commits.
+
+        Args:
+            session: Database session
+            executions: Executions to store; later duplicates win
+
+        Returns:
+            Dict with inserted/updated/phases/handoffs counts and the ids of
+            the agents that ran the stored phases
+        """
+        dialect = session.get_bind().dialect.name
+        dialect_insert = _UPSERT_INSERTS.get(dialect)
+        if dialect_insert is None:
+            raise ValueError(f"Batched history upserts are not supported on {dialect}")
+
+        batch: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        for execution in executions:
+            values = self._workflow_values(
+                execution["workflow"], execution.get("metadata")
+            )
+            values["id"] = uuid.uuid4()
+            # One row per key per statement: ON CONFLICT cannot hit a row twice
+            batch[values["execution_id"]] = (values, execution)
+
+        summary: Dict[str, Any] = {
+            "inserted": 0,
+            "updated": 0,
+            "phases": 0,
+            "handoffs": 0,
+            "agent_ids": [],
+        }
+        if not batch:
+            return summary
+
+        table = WorkflowHistory.__table__
+        statement = dialect_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.execution_id, table.c.started_at],
+            set_={
+                **{name: statement.excluded[name] for name in _UPSERT_COLUMNS},
+                "updated_at": func.now(),
+            },
+        ).returning(table.c.id, table.c.execution_id)
+        result = await session.execute(
+            statement, [values for values, _ in batch.values()]
+        )
+        stored_ids = {row.execution_id: row.id for row in result}
+
+        # A stored id other than the one we generated means the row existed
+        updated_ids = []
+        for execution_id, (values, _) in batch.items():
+            if stored_ids[execution_id] != values["id"]:
+                values["id"] = stored_ids[execution_id]
+                updated_ids.append(values["id"])
+        if updated_ids:
+            for model in (WorkflowAgentAssociation, HandoffHistory, PhaseHistory):
+                await session.execute(
+                    delete(model)
+                    .where(model.workflow_history_id.in_(updated_ids))
+                    .execution_options(synchronize_session=False)
+                )
+
+        phase_rows, handoff_rows, link_rows = [], [], []
+        new_workflows, new_phases = [], []
+        for values, execution in batch.values():
+            parent = {
+                "workflow_history_id": values["id"],
+                "workflow_started_at": values["started_at"],
+            }
+            phases = [
+                {**parent, **self._phase_values(phase_data)}
+                for phase_data in execution.get("phases") or []
+            ]
+            phase_rows.extend(phases)
+            handoff_rows.extend(
+                {**parent, **self._handoff_values(handoff_data)}
+                for handoff_data in execution.get("handoffs") or []
+            )
+            link_rows.extend(
+                {
+                    "workflow_history_id": values["id"],
+                    "started_at": values["started_at"],
+                    **link,
+                }
+                for link in self._agent_link_values(values["assigned_agents"])
+            )
+            if values["id"] not in updated_ids:
+                new_workflows.append(SimpleNamespace(**values))
+                new_phases.extend(SimpleNamespace(**phase) for phase in phases)
+
+        for model, rows in (
+            (PhaseHistory, phase_rows),
+            (HandoffHistory, handoff_rows),
+            (WorkflowAgentAssociation, link_rows),
+        ):
+            if rows:
+                await session.execute(insert(model.__table__), rows)
+
+        await rollup_service.record_batch(session, new_workflows, new_phases)
+
+        summary.update(
+            inserted=len(batch) - len(updated_ids),
+            updated=len(updated_ids),
+            phases=len(phase_rows),
+            handoffs=len(handoff_rows),
+            agent_ids=sorted(
+                {row["assigned_agent_id"] for row in phase_rows} - {None}
+            ),
+        )
+        self.logger.info(
+            f"Stored {len(batch)} workflow executions in bulk "
+            f"({summary['updated']} updated)"
+        )
+        return summary
+
     async def calculate_and_store_agent_performance(
         self,
         session: AsyncSession,
@@ -231,19 +466,51 @@ class PersistenceService:
             AgentPerformanceMetrics: Created performance metrics record
         """
         try:
-            # Get agent data from phase history
-            phase_query = select(PhaseHistory).where(
+            # Aggregate phase history for the agent in the database
+            phase_query = select(
+                func.count(PhaseHistory.id).label("total_phases"),
+                _count_where(PhaseHistory.id, PhaseHistory.result == "success").label(
+                    "successful_phases"
+                ),
+                _count_where(PhaseHistory.id, PhaseHistory.result == "failure").label(
+                    "failed_phases"
+                ),
+                func.coalesce(func.sum(PhaseHistory.total_tasks), 0).label(
+                    "total_tasks"
+                ),
+                func.coalesce(func.sum(PhaseHistory.completed_tasks), 0).label(
+                    "successful_tasks"
+                ),
+                func.coalesce(func.sum(PhaseHistory.failed_tasks), 0).label(
+                    "failed_tasks"
+                ),
+                func.coalesce(func.sum(PhaseHistory.duration_seconds), 0.0).label(
+                    "total_active_time"
+                ),
+                func.avg(PhaseHistory.quality_score).label("avg_quality_score"),
+                func.avg(PhaseHistory.performance_score).label(
+                    "avg_performance_score"
+                ),
+                func.max(PhaseHistory.assigned_agent_name).label("agent_name"),
+            ).where(
                 and_(
                     PhaseHistory.assigned_agent_id == agent_id,
                     PhaseHistory.started_at >= period_start,
                     PhaseHistory.started_at <= period_end,
                 )
             )
-            phase_results = await session.execute(phase_query)
-            phases = phase_results.scalars().all()
-
-            # Get handoff data
-            handoff_query = select(HandoffHistory).where(
+            phases = (await session.execute(phase_query)).one()
+
+            # Aggregate handoffs where the agent was source or target
+            handoff_query = select(
+                _count_where(
+                    HandoffHistory.id, HandoffHistory.result == "success"
+                ).label("successful_handoffs"),
+                _count_where(
+                    HandoffHistory.id, HandoffHistory.result == "failure"
+                ).label("failed_handoffs"),
+                func.avg(HandoffHistory.duration_seconds).label("avg_handoff_duration"),
+            ).where(
                 and_(
                     or_(
                         HandoffHistory.source_agent_id == agent_id,
@@ -253,48 +520,37 @@ class PersistenceService:
                     HandoffHistory.initiated_at <= period_end,
                 )
             )
-            handoff_results = await session.execute(handoff_query)
-            handoffs = handoff_results.scalars().all()
-
-            # Get workflow data
-            workflow_query = select(WorkflowHistory).where(
-                and_(
-                    WorkflowHistory.started_at >= period_start,
-                    WorkflowHistory.started_at <= period_end,
+            handoffs = (await session.execute(handoff_query)).one()
+
+            # Aggregate workflows the agent was assigned to via the association
+            workflow_query = (
+                select(
+                    func.count(WorkflowHistory.id).label("total_workflows"),
+                    _count_where(
+                        WorkflowHistory.id, WorkflowHistory.final_result == "success"
+                    ).label("successful_workflows"),
+                    _count_where(
+                        WorkflowHistory.id, WorkflowHistory.final_result == "failure"
+                    ).label("failed_workflows"),
+                )
+                .select_from(WorkflowAgentAssociation)
+                .join(
+                    WorkflowHistory,
+                    WorkflowHistory.id == WorkflowAgentAssociation.workflow_history_id,
+                )
+                .where(
+                    and_(
+                        WorkflowAgentAssociation.agent_id == agent_id,
+                        WorkflowAgentAssociation.started_at >= period_start,
+                        WorkflowAgentAssociation.started_at <= period_end,
+                    )
                 )
             )
-            workflow_results = await session.execute(workflow_query)
-            workflows = workflow_results.scalars().all()
-
-            # Filter workflows where agent was involved
-            agent_workflows = [
-                w
-                for w in workflows
-                if any(agent.get("id") == agent_id for agent in w.assigned_agents)
-            ]
-
-            # Calculate metrics
-            total_workflows = len(agent_workflows)
-            successful_workflows = len(
-                [w for w in agent_workflows if w.final_result == "success"]
-            )
-            failed_workflows = len(
-                [w for w in agent_workflows if w.final_result == "failure"]
-            )
-
-            total_phases = len(phases)
-            successful_phases = len([p for p in phases if p.result == "success"])
-            failed_phases = len([p for p in phases if p.result == "failure"])
+            workflows = (await session.execute(workflow_query)).one()
 
-            # Calculate task metrics from phases
-            total_tasks = sum(p.total_tasks for p in phases)
-            successful_tasks = sum(p.completed_tasks for p in phases)
-            failed_tasks = sum(p.failed_tasks for p in phases)
-
-            # Calculate time metrics
-            total_active_time = sum(
-                p.duration_seconds for p in phases if p.duration_seconds is not None
-            )
+            total_phases = phases.total_phases
+            total_tasks = phases.total_tasks
+            total_active_time = float(phases.total_active_time)
 
             avg_task_duration = (
                 total_active_time / total_tasks if total_tasks > 0 else None
@@ -304,39 +560,6 @@ class PersistenceService:
                 total_active_time / total_phases if total_phases > 0 else None
             )
 
-            # Calculate quality metrics
-            quality_scores = [
-                p.quality_score for p in phases if p.quality_score is not None
-            ]
-            avg_quality_score = (
-                sum(quality_scores) / len(quality_scores) if quality_scores else None
-            )
-
-            performance_scores = [
-                p.performance_score for p in phases if p.performance_score is not None
-            ]
-            avg_performance_score = (
-                sum(performance_scores) / len(performance_scores)
-                if performance_scores
-                else None
-            )
-
-            # Calculate handoff metrics
-            source_handoffs = [h for h in handoffs if h.source_agent_id == agent_id]
-            target_handoffs = [h for h in handoffs if h.target_agent_id == agent_id]
-
-            successful_handoffs = len([h for h in handoffs if h.result == "success"])
-            failed_handoffs = len([h for h in handoffs if h.result == "failure"])
-
-            handoff_durations = [
-                h.duration_seconds for h in handoffs if h.duration_seconds is not None
-            ]
-            avg_handoff_duration = (
-                sum(handoff_durations) / len(handoff_durations)
-                if handoff_durations
-                else None
-            )
-
             # Calculate utilization (simplified - based on active time vs period duration)
             period_duration = (period_end - period_start).total_seconds()
             utilization_percentage = (
@@ -345,8 +568,7 @@ class PersistenceService:
                 else 0.0
             )
 
-            # Get agent name from phases (assuming it's consistent)
-            agent_name = phases[0].assigned_agent_name if phases else agent_id
+            agent_name = phases.agent_name or agent_id
 
             # Create performance metrics record
             performance_metrics = AgentPerformanceMetrics(
@@ -356,25 +578,25 @@ class PersistenceService:
                 period_start=period_start,
                 period_end=period_end,
                 period_type=period_type,
-                total_workflows=total_workflows,
-                successful_workflows=successful_workflows,
-                failed_workflows=failed_workflows,
+                total_workflows=workflows.total_workflows,
+                successful_workflows=workflows.successful_workflows,
+                failed_workflows=workflows.failed_workflows,
                 total_phases=total_phases,
-                successful_phases=successful_phases,
-                failed_phases=failed_phases,
+                successful_phases=phases.successful_phases,
+                failed_phases=phases.failed_phases,
                 total_tasks=total_tasks,
-                successful_tasks=successful_tasks,
-                failed_tasks=failed_tasks,
+                successful_tasks=phases.successful_tasks,
+                failed_tasks=phases.failed_tasks,
                 total_active_time_seconds=total_active_time,
                 average_task_duration_seconds=avg_task_duration,
                 average_phase_duration_seconds=avg_phase_duration,
-                average_quality_score=avg_quality_score,
-                average_performance_score=avg_performance_score,
+                average_quality_score=phases.avg_quality_score,
+                average_performance_score=phases.avg_performance_score,
                 utilization_percentage=utilization_percentage,
                 idle_time_seconds=max(0, period_duration - total_active_time),
-                successful_handoffs=successful_handoffs,
-                failed_handoffs=failed_handoffs,
-                average_handoff_time_seconds=avg_handoff_duration,
+                successful_handoffs=handoffs.successful_handoffs,
+                failed_handoffs=handoffs.failed_handoffs,
+                average_handoff_time_seconds=handoffs.avg_handoff_duration,
                 calculated_at=datetime.utcnow(),
             )
 
@@ -422,24 +644,18 @@ class PersistenceService:
             count_query = select(func.count(WorkflowHistory.id))
 
             # Apply filters
-            conditions = []
-            if workflow_id:
-                conditions.append(WorkflowHistory.workflow_id == workflow_id)
-            if project_id:
-                conditions.append(WorkflowHistory.project_id == project_id)
-            if status_filter:
-                conditions.append(WorkflowHistory.status == status_filter)
-            if date_range:
-                start_date, end_date = date_range
-                conditions.append(WorkflowHistory.started_at >= start_date)
-                conditions.append(WorkflowHistory.started_at <= end_date)
+            conditions = self._history_conditions(
+                workflow_id, project_id, status_filter, date_range
+            )
 
             if conditions:
                 query = query.where(and_(*conditions))
                 count_query = count_query.where(and_(*conditions))
 
             # Apply ordering, limit, and offset
-            query = query.order_by(desc(WorkflowHistory.started_at))
+            query = query.order_by(
+                desc(WorkflowHistory.started_at), desc(WorkflowHistory.id)
+            )
             query = query.offset(offset).limit(limit)
 
             # Execute queries
@@ -455,6 +671,101 @@ class PersistenceService:
             self.logger.error(f"Error getting workflow history: {str(e)}")
             raise
 
+    def _history_conditions(
+        self,
+        workflow_id: Optional[uuid.UUID],
+        project_id: Optional[str],
+        status_filter: Optional[str],
+        date_range: Optional[Tuple[datetime, datetime]],
+    ) -> list:
+        conditions = []
+        if workflow_id:
+            conditions.append(WorkflowHistory.workflow_id == workflow_id)
+        if project_id:
+            conditions.append(WorkflowHistory.project_id == project_id)
+        if status_filter:
+            conditions.append(WorkflowHistory.status == status_filter)
+        if date_range:
+            start_date, end_date = date_range
+            conditions.append(WorkflowHistory.started_at >= start_date)
+            conditions.append(WorkflowHistory.started_at <= end_date)
+        return conditions
+
+    async def get_workflow_history_page(
+        self,
+        session: AsyncSession,
+        workflow_id: Optional[uuid.UUID] = None,
+        project_id: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        status_filter: Optional[str] = None,
+        date_range: Optional[Tuple[datetime, datetime]] = None,
+        include_total: bool = False,
+    ) -> HistoryPage:
+        """
+        Get one page of workflow history using keyset pagination
+
+        Rows are ordered newest first by (started_at, id) and each page seeks
+        past the previous page's last row, so the cost of a page does not
+        grow with its depth and rows do not shift when new workflows land.
+
+        Args:
+            session: Database session
+            workflow_id: Filter by specific workflow ID
+            project_id: Filter by project ID
+            limit: Maximum number of records to return
+            cursor: ``next_cursor`` of the previous page, None for the first
+            status_filter: Filter by status
+            date_range: Filter by date range (start, end)
+            include_total: Also count all matching records
+
+        Returns:
+            HistoryPage: Records, cursor of the next page and optional total
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        conditions = self._history_conditions(
+            workflow_id, project_id, status_filter, date_range
+        )
+        filters = list(conditions)
+        if cursor:
+            started_at, history_id = decode_history_cursor(cursor)
+            filters.append(
+                tuple_(WorkflowHistory.started_at, WorkflowHistory.id)
+                < tuple_(started_at, history_id)
+            )
+
+        try:
+            query = (
+                select(WorkflowHistory)
+                .order_by(desc(WorkflowHistory.started_at), desc(WorkflowHistory.id))
+                .limit(limit + 1)
+            )
+            if filters:
+                query = query.where(and_(*filters))
+
+            result = await session.execute(query)
+            workflows = list(result.scalars().all())
+
+            next_cursor = None
+            if len(workflows) > limit:
+                workflows = workflows[:limit]
+                next_cursor = encode_history_cursor(workflows[-1])
+
+            total = None
+            if include_total:
+                count_query = select(func.count(WorkflowHistory.id))
+                if conditions:
+                    count_query = count_query.where(and_(*conditions))
+                total = (await session.execute(count_query)).scalar()
+
+            return HistoryPage(workflows, next_cursor, total)
+
+        except Exception as e:
+            self.logger.error(f"Error getting workflow history page: {str(e)}")
+            raise
+
     async def get_agent_performance_metrics(
         self,
         session: AsyncSession,
@@ -518,8 +829,22 @@ class PersistenceService:
             Dict[str, Any]: Analytics summary
         """
         try:
-            # Build base query
-            query = select(WorkflowHistory)
+            # Aggregate in the database; only one row comes back
+            query = select(
+                func.count(WorkflowHistory.id).label("total_workflows"),
+                _count_where(
+                    WorkflowHistory.id, WorkflowHistory.final_result == "success"
+                ).label("successful_workflows"),
+                func.avg(WorkflowHistory.duration_seconds).label("average_duration"),
+                func.coalesce(func.sum(WorkflowHistory.total_tasks), 0).label(
+                    "total_tasks"
+                ),
+                func.coalesce(func.sum(WorkflowHistory.completed_tasks), 0).label(
+                    "completed_tasks"
+                ),
+                func.avg(WorkflowHistory.quality_score).label("average_quality"),
+                func.avg(WorkflowHistory.efficiency_score).label("average_efficiency"),
+            )
 
             if date_range:
                 start_date, end_date = date_range
@@ -530,10 +855,9 @@ class PersistenceService:
                     )
                 )
 
-            result = await session.execute(query)
-            workflows = result.scalars().all()
+            summary = (await session.execute(query)).one()
 
-            if not workflows:
+            if not summary.total_workflows:
                 return {
                     "total_workflows": 0,
                     "success_rate": 0.0,
@@ -542,38 +866,14 @@ class PersistenceService:
                     "performance_summary": {},
                 }
 
-            # Calculate summary metrics
-            total_workflows = len(workflows)
-            successful_workflows = len(
-                [w for w in workflows if w.final_result == "success"]
-            )
-            success_rate = (
-                successful_workflows / total_workflows if total_workflows > 0 else 0.0
-            )
-
-            durations = [
-                w.duration_seconds for w in workflows if w.duration_seconds is not None
-            ]
-            average_duration = sum(durations) / len(durations) if durations else 0.0
-
-            total_tasks = sum(w.total_tasks for w in workflows)
-            completed_tasks = sum(w.completed_tasks for w in workflows)
-
-            quality_scores = [
-                w.quality_score for w in workflows if w.quality_score is not None
-            ]
-            average_quality = (
-                sum(quality_scores) / len(quality_scores) if quality_scores else 0.0
-            )
-
-            efficiency_scores = [
-                w.efficiency_score for w in workflows if w.efficiency_score is not None
-            ]
-            average_efficiency = (
-                sum(efficiency_scores) / len(efficiency_scores)
-                if efficiency_scores
-                else 0.0
-            )
+            total_workflows = summary.total_workflows
+            successful_workflows = summary.successful_workflows
+            success_rate = successful_workflows / total_workflows
+            average_duration = summary.average_duration or 0.0
+            total_tasks = summary.total_tasks
+            completed_tasks = summary.completed_tasks
+            average_quality = summary.average_quality or 0.0
+            average_efficiency = summary.average_efficiency or 0.0
 
             return {
                 "total_workflows": total_workflows,
@@ -598,52 +898,22 @@ class PersistenceService:
 
     async def cleanup_old_records(
         self, session: AsyncSession, retention_days: int = 90
-    ) -> Dict[str, int]:
+    ) -> Dict[str, Any]:
         """
         Clean up old historical records beyond retention period
 
+        Drops whole monthly partitions where history is partitioned and
+        deletes in small batches otherwise (see HistoryPartitionManager).
+
         Args:
             session: Database session
             retention_days: Number of days to retain
 
         Returns:
-            Dict[str, int]: Count of deleted records by type
+            Dict[str, Any]: Dropped partitions, archives and deleted counts
         """
         try:
-            cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
-
-            # Delete old workflow history (cascades to phases and handoffs)
-            workflow_query = select(WorkflowHistory).where(
-                WorkflowHistory.started_at < cutoff_date
-            )
-            workflow_result = await session.execute(workflow_query)
-            old_workflows = workflow_result.scalars().all()
-
-            workflow_count = len(old_workflows)
-            for workflow in old_workflows:
-                await session.delete(workflow)
-
-            # Delete old agent performance metrics
-            metrics_query = select(AgentPerformanceMetrics).where(
-                AgentPerformanceMetrics.period_start < cutoff_date
-            )
-            metrics_result = await session.execute(metrics_query)
-            old_metrics = metrics_result.scalars().all()
-
-            metrics_count = len(old_metrics)
-            for metric in old_metrics:
-                await session.delete(metric)
-
-            await session.commit()
-
-            self.logger.info(
-                f"Cleaned up {workflow_count} old workflow records and {metrics_count} old metric records"
-            )
-
-            return {
-                "workflow_history_deleted": workflow_count,
-                "performance_metrics_deleted": metrics_count,
-            }
+            return await history_partitions.apply_retention(session, retention_days)
 
         except Exception as e:
             self.logger.error(f"Error cleaning up old records: {str(e)}")
@@ -0,0 +1,178 @@
+"""
+Atomic GCRA rate limiter backed by a Redis script with an in-process fallback
+"""
+
+import logging
+import math
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .redis_service import RedisService, redis_service
+
+logger = logging.getLogger(__name__)
+
+# KEYS: one theoretical-arrival-time key per limit
+# ARGV: emission interval and period (ms) for each key, in the same order
+# Returns {allowed, violated limit (1-based), retry after ms, remaining}
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local new_tats = {}
+for i = 1, #KEYS do
+  local interval = tonumber(ARGV[2 * i - 1])
+  local period = tonumber(ARGV[2 * i])
+  local tat = tonumber(redis.call('GET', KEYS[i]) or now)
+  if tat < now then tat = now end
+  local new_tat = tat + interval
+  if new_tat - now > period then
+    return {0, i, new_tat - period - now, 0}
+  end
+  new_tats[i] = new_tat
+end
+local remaining = -1
+for i = 1, #KEYS do
+  local interval = tonumber(ARGV[2 * i - 1])
+  local period = tonumber(ARGV[2 * i])
+  redis.call('SET', KEYS[i], string.format('%.0f', new_tats[i]),
+             'PX', math.max(new_tats[i] - now, 1))
+  local left = math.floor((period - (new_tats[i] - now)) / interval)
+  if remaining < 0 or left < remaining then remaining = left end
+end
+return {1, 0, 0, remaining}
+"""
+
+
+class RateLimit(NamedTuple):
+    """``requests`` allowed per ``period`` seconds"""
+
+    requests: int
+    period: int
+
+    @property
+    def period_ms(self) -> int:
+        return self.period * 1000
+
+    @property
+    def interval_ms(self) -> int:
+        return max(math.ceil(self.period_ms / self.requests), 1)
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    retry_after: float  # seconds until the request would be allowed
+    remaining: int
+    limit: Optional[RateLimit] = None  # the limit that rejected the request
+
+
+class RateLimiter:
+    """
+    Generic cell rate algorithm over several limits at once
+
+    Each limit stores only a theoretical arrival time (TAT). A request is
+    allowed when advancing every TAT by the limit's emission interval keeps
+    it within one period of now, which permits a full burst of ``requests``
+    and then smooths to the sustained rate. All limits are checked and
+    advanced by one Redis script call, so a request costs a single round trip
+    and concurrent requests cannot both pass a check before incrementing.
+
+    When Redis is unavailable the same algorithm runs against a local dict,
+    which limits per process instead of globally.
+    """
+
+    def __init__(self, redis: RedisService, fallback_max_keys: int = 100000):
+        self.redis = redis
+        self.fallback_max_keys = fallback_max_keys
+        self._script = None
+        self._script_client = None
+        self._local_tats: Dict[str, float] = {}
+        self._using_fallback = False
+
+    async def hit(self, key: str, limits: Sequence[RateLimit]) -> RateLimitResult:
+        """Count one request against every limit for ``key``"""
+        keys = [f"{key}:gcra:{limit.period}" for limit in limits]
+        client = self.redis.redis_client
+        if client is not None:
+            try:
+                result = await self._run_script(client, keys, limits)
+                if self._using_fallback:
+                    logger.info("Redis rate limiting restored")
+                    self._using_fallback = False
+                return result
+            except Exception as e:
+                if not self._using_fallback:
+                    logger.warning(
+                        f"Redis rate limiting unavailable, limiting per process: {e}"
+                    )
+                    self._using_fallback = True
+
+        return self._hit_local(keys, limits, time.time() * 1000)
+
+    async def status(self, key: str, limits: Sequence[RateLimit]) -> List[int]:
+        """Requests still available right now under each limit (read-only)"""
+        keys = [f"{key}:gcra:{limit.period}" for limit in limits]
+        tats: List[Optional[float]] = [self._local_tats.get(k) for k in keys]
+        client = self.redis.redis_client
+        if client is not None and not self._using_fallback:
+            try:
+                values = await client.mget(keys)
+                tats = [float(v) if v is not None else None for v in values]
+            except Exception as e:
+                logger.warning(f"Error reading rate limit state for {key}: {e}")
+
+        now = time.time() * 1000
+        return [
+            int((limit.period_ms - max((tat or now) - now, 0)) // limit.interval_ms)
+            for tat, limit in zip(tats, limits)
+        ]
+
+    async def _run_script(
+        self, client, keys: List[str], limits: Sequence[RateLimit]
+    ) -> RateLimitResult:
+        if self._script is None or self._script_client is not client:
+            # EVALSHA with a transparent SCRIPT LOAD on NOSCRIPT
+            self._script = client.register_script(GCRA_SCRIPT)
+            self._script_client = client
+
+        args = []
+        for limit in limits:
+            args.extend((limit.interval_ms, limit.period_ms))
+        allowed, violated, retry_ms, remaining = await self._script(
+            keys=keys, args=args
+        )
+        return RateLimitResult(
+            allowed=bool(allowed),
+            retry_after=max(int(retry_ms), 0) / 1000,
+            remaining=int(remaining),
+            limit=limits[int(violated) - 1] if not allowed else None,
+        )
+
+    def _hit_local(
+        self, keys: List[str], limits: Sequence[RateLimit], now: float
+    ) -> RateLimitResult:
+        new_tats: List[Tuple[str, float]] = []
+        for key, limit in zip(keys, limits):
+            tat = max(self._local_tats.get(key, now), now)
+            new_tat = tat + limit.interval_ms
+            if new_tat - now > limit.period_ms:
+                return RateLimitResult(
+                    False, (new_tat - limit.period_ms - now) / 1000, 0, limit
+                )
+            new_tats.append((key, new_tat))
+
+        if len(self._local_tats) >= self.fallback_max_keys:
+            self._prune_local(now)
+
+        remaining = None
+        for (key, new_tat), limit in zip(new_tats, limits):
+            self._local_tats[key] = new_tat
+            left = int((limit.period_ms - (new_tat - now)) // limit.interval_ms)
+            remaining = left if remaining is None else min(remaining, left)
+        return RateLimitResult(True, 0.0, remaining or 0)
+
+    def _prune_local(self, now: float):
+        # A TAT in the past is equivalent to no entry at all
+        self._local_tats = {k: v for k, v in self._local_tats.items() if v > now}
+
+
+# Global rate limiter over the shared Redis service
+rate_limiter = RateLimiter(redis_service)
@@ -0,0 +1,126 @@
+"""
+Versioned value codec for structured data stored in Redis
+"""
+
+import json
+import logging
+import zlib
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional format
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# 0xC1 is never produced by msgpack and cannot start a UTF-8 string, so tagged
+# values are distinguishable from the plain JSON/text written by older code
+MAGIC = b"\xc1"
+FORMAT_VERSION = 1
+HEADER_SIZE = 4  # magic, format version, serializer id, compression flag
+
+SERIALIZER_JSON = b"j"
+SERIALIZER_MSGPACK = b"m"
+COMPRESSED = b"z"
+UNCOMPRESSED = b"-"
+
+
+def _default(obj: Any) -> Any:
+    # Same fallback as json.dumps(default=str) used throughout the backend
+    return str(obj)
+
+
+class RedisValueCodec:
+    """
+    Encodes dicts and lists for Redis, leaving scalars as plain strings
+
+    Encoded values start with a 4-byte header recording the format version,
+    the serializer (JSON via orjson when installed, or msgpack) and whether
+    the payload is zlib-compressed, so the serializer can be switched or the
+    format bumped without migrating existing keys. Values without the header
+    are decoded as JSON or text, exactly as they were written before.
+    """
+
+    def __init__(
+        self,
+        serializer: str = "orjson",
+        compress_min_size: int = 1024,
+        compress_level: int = 1,
+    ):
+        if serializer == "msgpack" and msgpack is None:
+            logger.warning("msgpack is not installed, encoding Redis values as JSON")
+            serializer = "orjson"
+        self.serializer = serializer
+        self.compress_min_size = compress_min_size
+        self.compress_level = compress_level
+
+    def encode(self, value: Any) -> Union[str, bytes, int, float]:
+        if isinstance(value, (str, bytes, int, float)):
+            return value
+
+        if self.serializer == "msgpack":
+            serializer_id = SERIALIZER_MSGPACK
+            payload = msgpack.packb(value, default=_default, use_bin_type=True)
+        else:
+            serializer_id = SERIALIZER_JSON
+            payload = self._dump_json(value)
+
+        flag = UNCOMPRESSED
+        if self.compress_min_size and len(payload) >= self.compress_min_size:
+            compressed = zlib.compress(payload, self.compress_level)
+            if len(compressed) < len(payload):
+                payload, flag = compressed, COMPRESSED
+
+        return MAGIC + bytes([FORMAT_VERSION]) + serializer_id + flag + payload
+
+    def decode(self, raw: Optional[Union[str, bytes]]) -> Any:
+        if raw is None:
+            return None
+
+        if isinstance(raw, bytes):
+            if raw[:1] == MAGIC and len(raw) >= HEADER_SIZE:
+                return self._decode_tagged(raw)
+            try:
+                raw = raw.decode("utf-8")
+            except UnicodeDecodeError:
+                return raw
+
+        try:
+            return json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            return raw
+
+    def _decode_tagged(self, raw: bytes) -> Any:
+        version = raw[1]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported Redis value format version {version}")
+
+        serializer_id = raw[2:3]
+        payload = raw[HEADER_SIZE:]
+        if raw[3:4] == COMPRESSED:
+            payload = zlib.decompress(payload)
+
+        if serializer_id == SERIALIZER_MSGPACK:
+            if msgpack is None:
+                raise ValueError("msgpack-encoded Redis value but msgpack is missing")
+            return msgpack.unpackb(payload, raw=False)
+        if orjson is not None:
+            return orjson.loads(payload)
+        return json.loads(payload)
+
+    def _dump_json(self, value: Any) -> bytes:
+        if orjson is not None and self.serializer == "orjson":
+            try:
+                return orjson.dumps(
+                    value, default=_default, option=orjson.OPT_NON_STR_KEYS
+                )
+            except TypeError:
+                # e.g. integers beyond 64 bits; the stdlib encoder handles them
+                pass
+        return json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
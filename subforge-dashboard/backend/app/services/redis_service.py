@@ -5,25 +5,145 @@ Redis service for caching, pub/sub, and session management
 import asyncio
 import json
 import logging
+import time
 from contextlib import asynccontextmanager
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
 
 import aioredis
 from aioredis.client import PubSub
 
 from ..core.config import settings
+from .redis_codec import RedisValueCodec
 
 logger = logging.getLogger(__name__)
 
+# DECRBY a counter and drop it once it reaches zero, as one atomic step
+_DECREMENT_AND_DELETE = """
+local remaining = redis.call('DECRBY', KEYS[1], ARGV[1])
+if remaining <= 0 then
+    redis.call('DEL', KEYS[1])
+end
+return remaining
+"""
+
+# Record ARGV[1] in each sorted-set index until ARGV[2] (unix time), drop
+# members that expired before ARGV[3] and only ever extend the index TTL
+_ADD_TO_INDEX = """
+local ttl = tonumber(ARGV[4])
+for _, index in ipairs(KEYS) do
+    redis.call('ZADD', index, 'GT', ARGV[2], ARGV[1])
+    redis.call('ZREMRANGEBYSCORE', index, '-inf', '(' .. ARGV[3])
+    if redis.call('TTL', index) < ttl then
+        redis.call('EXPIRE', index, ttl)
+    end
+end
+return #KEYS
+"""
+
+
+class RedisPipeline:
+    """
+    Queues commands and sends them in one round trip on ``execute``
+
+    Values are encoded with the service codec when queued and each reply is
+    decoded according to the command that produced it.
+    """
+
+    def __init__(self, pipe, codec: RedisValueCodec):
+        self._pipe = pipe
+        self._codec = codec
+        self._decoders: List[Callable[[Any], Any]] = []
+
+    def _queue(self, decoder: Callable[[Any], Any], command: str, *args, **kwargs):
+        if self._pipe is not None:
+            getattr(self._pipe, command)(*args, **kwargs)
+        self._decoders.append(decoder)
+        return self
+
+    def _decode_list(self, values: Optional[List[Any]]) -> List[Any]:
+        return [self._codec.decode(value) for value in values or []]
+
+    def set(self, key: str, value: Any, expire: Optional[int] = None):
+        return self._queue(
+            bool,
+            "set",
+            key,
+            self._codec.encode(value),
+            ex=expire or settings.REDIS_EXPIRE,
+        )
+
+    def get(self, key: str):
+        return self._queue(self._codec.decode, "get", key)
+
+    def delete(self, *keys: str):
+        return self._queue(lambda n: n or 0, "delete", *keys)
+
+    def expire(self, key: str, seconds: int):
+        return self._queue(bool, "expire", key, seconds)
+
+    def hset(self, name: str, key: str, value: Any):
+        return self._queue(bool, "hset", name, key, self._codec.encode(value))
+
+    def hget(self, name: str, key: str):
+        return self._queue(self._codec.decode, "hget", name, key)
+
+    def hmget(self, name: str, keys: List[str]):
+        return self._queue(self._decode_list, "hmget", name, keys)
+
+    def hdel(self, name: str, *keys: str):
+        return self._queue(lambda n: n or 0, "hdel", name, *keys)
+
+    def sadd(self, name: str, *values: str):
+        return self._queue(lambda n: n or 0, "sadd", name, *values)
+
+    def srem(self, name: str, *values: str):
+        return self._queue(lambda n: n or 0, "srem", name, *values)
+
+    def add_to_index(self, indexes: List[str], member: str, ttl: int):
+        """Record ``member`` in each index for ``ttl`` seconds"""
+        now = time.time()
+        return self._queue(
+            lambda n: n or 0,
+            "eval",
+            _ADD_TO_INDEX,
+            len(indexes),
+            *indexes,
+            member,
+            now + ttl,
+            now,
+            ttl,
+        )
+
+    async def execute(self) -> List[Any]:
+        """Send the queued commands; replies are decoded in queue order"""
+        decoders, self._decoders = self._decoders, []
+        replies: List[Any] = [None] * len(decoders)
+        if self._pipe is not None and decoders:
+            try:
+                replies = await self._pipe.execute()
+            except Exception as e:
+                logger.error(f"Error executing Redis pipeline: {e}")
+        return [decode(reply) for decode, reply in zip(decoders, replies)]
+
 
 class RedisService:
     """Redis service for caching and pub/sub operations"""
 
     def __init__(self):
         self.redis_client: Optional[aioredis.Redis] = None
+        # Same server without response decoding, for codec-encoded values
+        self.binary_client: Optional[aioredis.Redis] = None
         self.pubsub_client: Optional[PubSub] = None
         self.subscribers: Dict[str, List[callable]] = {}
         self._pubsub_task: Optional[asyncio.Task] = None
+        self.codec = RedisValueCodec(
+            serializer=settings.REDIS_CODEC,
+            compress_min_size=settings.REDIS_COMPRESS_MIN_SIZE,
+        )
+
+    @property
+    def value_client(self) -> Optional[aioredis.Redis]:
+        return self.binary_client or self.redis_client
 
     async def initialize(self):
         """Initialize Redis connection"""
@@ -32,6 +152,10 @@ class RedisService:
                 settings.REDIS_URL, decode_responses=True, max_connections=20
             )
 
+            self.binary_client = await aioredis.from_url(
+                settings.REDIS_URL, decode_responses=False, max_connections=20
+            )
+
             # Test connection
             await self.redis_client.ping()
             logger.info("✅ Redis service initialized")
@@ -60,6 +184,9 @@ class RedisService:
             if self.redis_client:
                 await self.redis_client.close()
 
+            if self.binary_client:
+                await self.binary_client.close()
+
             logger.info("✅ Redis service closed")
 
         except Exception as e:
@@ -73,15 +200,11 @@ class RedisService:
     ) -> bool:
         """Set a value in Redis with optional expiration"""
         try:
-            if not self.redis_client:
+            if not self.value_client:
                 return False
 
-            # Serialize complex types to JSON
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value, default=str)
-
-            result = await self.redis_client.set(
-                key, value, ex=expire or settings.REDIS_EXPIRE
+            result = await self.value_client.set(
+                key, self.codec.encode(value), ex=expire or settings.REDIS_EXPIRE
             )
             return result is True
 
@@ -92,23 +215,62 @@ class RedisService:
     async def get(self, key: str, default: Any = None) -> Any:
         """Get a value from Redis"""
         try:
-            if not self.redis_client:
+            if not self.value_client:
                 return default
 
-            value = await self.redis_client.get(key)
+            value = await self.value_client.get(key)
             if value is None:
                 return default
 
-            # Try to deserialize JSON
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+            return self.codec.decode(value)
 
         except Exception as e:
             logger.error(f"Error getting Redis key {key}: {e}")
             return default
 
+    async def mget(self, keys: List[str], default: Any = None) -> List[Any]:
+        """Get several values in one round trip, in the order of ``keys``"""
+        try:
+            if not self.value_client or not keys:
+                return [default] * len(keys)
+
+            values = await self.value_client.mget(keys)
+            return [
+                default if value is None else self.codec.decode(value)
+                for value in values
+            ]
+
+        except Exception as e:
+            logger.error(f"Error getting {len(keys)} Redis keys: {e}")
+            return [default] * len(keys)
+
+    async def mset(self, mapping: Dict[str, Any], expire: Optional[int] = None) -> bool:
+        """Set several values with expiration in one round trip"""
+        if not self.value_client or not mapping:
+            return False
+
+        async with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, expire=expire)
+            results = await pipe.execute()
+        return all(results)
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False) -> AsyncIterator[RedisPipeline]:
+        """
+        Batch commands into one round trip
+
+        ``async with redis_service.pipeline() as pipe`` then queue commands and
+        ``await pipe.execute()``. Without a connection commands are accepted and
+        execute returns empty replies, like the single-command methods.
+        """
+        if not self.value_client:
+            yield RedisPipeline(None, self.codec)
+            return
+
+        async with self.value_client.pipeline(transaction=transaction) as pipe:
+            yield RedisPipeline(pipe, self.codec)
+
     async def delete(self, key: str) -> bool:
         """Delete a key from Redis"""
         try:
@@ -122,6 +284,18 @@ class RedisService:
             logger.error(f"Error deleting Redis key {key}: {e}")
             return False
 
+    async def delete_many(self, *keys: str) -> int:
+        """Delete several keys in one command; returns how many existed"""
+        try:
+            if not self.redis_client or not keys:
+                return 0
+
+            return await self.redis_client.delete(*keys)
+
+        except Exception as e:
+            logger.error(f"Error deleting Redis keys: {e}")
+            return 0
+
     async def exists(self, key: str) -> bool:
         """Check if a key exists in Redis"""
         try:
@@ -148,6 +322,38 @@ class RedisService:
             logger.error(f"Error incrementing Redis key {key}: {e}")
             return None
 
+    async def decrement_and_delete(self, key: str, amount: int = 1) -> Optional[int]:
+        """
+        Decrement a counter, deleting it when it reaches zero
+
+        Runs as a Lua script, so no increment can land between the decrement
+        and the delete. Returns the remaining count, or None on failure.
+        """
+        try:
+            if not self.redis_client:
+                return None
+
+            return await self.redis_client.eval(
+                _DECREMENT_AND_DELETE, 1, key, amount
+            )
+
+        except Exception as e:
+            logger.error(f"Error decrementing Redis key {key}: {e}")
+            return None
+
+    async def get_counter(self, key: str) -> Optional[int]:
+        """Current value of a counter (0 when missing), or None on failure"""
+        try:
+            if not self.redis_client:
+                return None
+
+            value = await self.redis_client.get(key)
+            return int(value) if value is not None else 0
+
+        except Exception as e:
+            logger.error(f"Error reading Redis counter {key}: {e}")
+            return None
+
     async def expire(self, key: str, seconds: int) -> bool:
         """Set expiration time for a key"""
         try:
@@ -161,14 +367,18 @@ class RedisService:
             logger.error(f"Error setting expiration for Redis key {key}: {e}")
             return False
 
+    async def scan_iter(self, match: str = "*", count: int = 500) -> AsyncIterator[str]:
+        """Iterate over keys matching a pattern without blocking the server"""
+        if not self.redis_client:
+            return
+
+        async for key in self.redis_client.scan_iter(match=match, count=count):
+            yield key
+
     async def keys(self, pattern: str = "*") -> List[str]:
-        """Get keys matching a pattern"""
+        """Get keys matching a pattern (incrementally, via SCAN)"""
         try:
-            if not self.redis_client:
-                return []
-
-            keys = await self.redis_client.keys(pattern)
-            return keys
+            return [key async for key in self.scan_iter(pattern)]
 
         except Exception as e:
             logger.error(f"Error getting Redis keys with pattern {pattern}: {e}")
@@ -193,13 +403,10 @@ class RedisService:
     ) -> bool:
         """Set field in a hash"""
         try:
-            if not self.redis_client:
+            if not self.value_client:
                 return False
 
-            if isinstance(value, dict):
-                value = json.dumps(value, default=str)
-
-            result = await self.redis_client.hset(name, key, value)
+            result = await self.value_client.hset(name, key, self.codec.encode(value))
             return result >= 0
 
         except Exception as e:
@@ -209,39 +416,41 @@ class RedisService:
     async def hget(self, name: str, key: str) -> Any:
         """Get field from a hash"""
         try:
-            if not self.redis_client:
+            if not self.value_client:
                 return None
 
-            value = await self.redis_client.hget(name, key)
-            if value is None:
-                return None
-
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+            return self.codec.decode(await self.value_client.hget(name, key))
 
         except Exception as e:
             logger.error(f"Error getting hash field {name}:{key}: {e}")
             return None
 
+    async def hmget(self, name: str, keys: List[str]) -> List[Any]:
+        """Get several fields from a hash in one round trip"""
+        try:
+            if not self.value_client or not keys:
+                return [None] * len(keys)
+
+            values = await self.value_client.hmget(name, keys)
+            return [self.codec.decode(value) for value in values]
+
+        except Exception as e:
+            logger.error(f"Error getting {len(keys)} fields of hash {name}: {e}")
+            return [None] * len(keys)
+
     async def hgetall(self, name: str) -> Dict[str, Any]:
         """Get all fields from a hash"""
         try:
-            if not self.redis_client:
+            if not self.value_client:
                 return {}
 
-            hash_data = await self.redis_client.hgetall(name)
-
-            # Try to deserialize JSON values
-            result = {}
-            for key, value in hash_data.items():
-                try:
-                    result[key] = json.loads(value)
-                except (json.JSONDecodeError, TypeError):
-                    result[key] = value
-
-            return result
+            hash_data = await self.value_client.hgetall(name)
+            return {
+                key.decode("utf-8") if isinstance(key, bytes) else key: (
+                    self.codec.decode(value)
+                )
+                for key, value in hash_data.items()
+            }
 
         except Exception as e:
             logger.error(f"Error getting hash {name}: {e}")
@@ -264,17 +473,12 @@ class RedisService:
     async def lpush(self, name: str, *values: Union[str, dict]) -> Optional[int]:
         """Push values to the left of a list"""
         try:
-            if not self.redis_client:
+            if not self.value_client:
                 return None
 
-            serialized_values = []
-            for value in values:
-                if isinstance(value, dict):
-                    serialized_values.append(json.dumps(value, default=str))
-                else:
-                    serialized_values.append(str(value))
-
-            result = await self.redis_client.lpush(name, *serialized_values)
+            result = await self.value_client.lpush(
+                name, *(self.codec.encode(value) for value in values)
+            )
             return result
 
         except Exception as e:
@@ -284,17 +488,10 @@ class RedisService:
     async def rpop(self, name: str) -> Any:
         """Pop value from the right of a list"""
         try:
-            if not self.redis_client:
+            if not self.value_client:
                 return None
 
-            value = await self.redis_client.rpop(name)
-            if value is None:
-                return None
-
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+            return self.codec.decode(await self.value_client.rpop(name))
 
         except Exception as e:
             logger.error(f"Error popping from list {name}: {e}")
@@ -303,19 +500,11 @@ class RedisService:
     async def lrange(self, name: str, start: int = 0, end: int = -1) -> List[Any]:
         """Get a range of elements from a list"""
         try:
-            if not self.redis_client:
+            if not self.value_client:
                 return []
 
-            values = await self.redis_client.lrange(name, start, end)
-
-            result = []
-            for value in values:
-                try:
-                    result.append(json.loads(value))
-                except (json.JSONDecodeError, TypeError):
-                    result.append(value)
-
-            return result
+            values = await self.value_client.lrange(name, start, end)
+            return [self.codec.decode(value) for value in values]
 
         except Exception as e:
             logger.error(f"Error getting list range {name}: {e}")
@@ -387,6 +576,18 @@ class RedisService:
             logger.error(f"Error checking set membership {name}: {e}")
             return False
 
+    async def index_members(self, name: str) -> List[str]:
+        """Members of an index written by ``add_to_index`` that have not expired"""
+        try:
+            if not self.redis_client:
+                return []
+
+            return await self.redis_client.zrangebyscore(name, time.time(), "+inf")
+
+        except Exception as e:
+            logger.error(f"Error getting index members {name}: {e}")
+            return []
+
     # Pub/Sub operations
     async def publish(self, channel: str, message: Union[str, dict]) -> Optional[int]:
         """Publish a message to a channel"""
@@ -494,17 +695,26 @@ class RedisService:
         """Generate a cache key from parts"""
         return ":".join(str(part) for part in parts)
 
-    async def invalidate_pattern(self, pattern: str) -> int:
-        """Invalidate all keys matching a pattern"""
+    async def invalidate_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """Invalidate all keys matching a pattern
+
+        Uses incremental SCAN rather than KEYS so Redis is never blocked for
+        the whole keyspace walk, and deletes in batches as keys are found.
+        """
         try:
             if not self.redis_client:
                 return 0
 
-            keys = await self.keys(pattern)
-            if keys:
-                result = await self.redis_client.delete(*keys)
-                return result
-            return 0
+            deleted = 0
+            batch = []
+            async for key in self.scan_iter(pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += await self.redis_client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis_client.delete(*batch)
+            return deleted
 
         except Exception as e:
             logger.error(f"Error invalidating pattern {pattern}: {e}")
@@ -512,4 +722,4 @@ class RedisService:
 
 
 # Global Redis service instance
-redis_service = RedisService()
\ No newline at end of file
+redis_service = RedisService()
@@ -0,0 +1,518 @@
+"""
+Incremental hourly/daily rollups of workflow and phase history
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.database import MetricRollup, PhaseHistory, WorkflowHistory
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("hour", "day")
+DIMENSIONS = ("agent", "workflow_type")
+
+# Upper bounds (seconds) of the duration histogram; the last slot is overflow
+DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+STREAM_CHUNK_SIZE = 1000
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its hour or day bucket"""
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unsupported rollup granularity: {granularity}")
+
+
+def _empty_histogram() -> List[int]:
+    return [0] * (len(DURATION_BUCKETS) + 1)
+
+
+def _histogram_slot(duration: float) -> int:
+    for slot, upper in enumerate(DURATION_BUCKETS):
+        if duration <= upper:
+            return slot
+    return len(DURATION_BUCKETS)
+
+
+@dataclass
+class RollupStats:
+    """Additive statistics for one bucket, mirroring the MetricRollup columns"""
+
+    count: int = 0
+    success_count: int = 0
+    failure_count: int = 0
+    total_tasks: int = 0
+    completed_tasks: int = 0
+    failed_tasks: int = 0
+    duration_count: int = 0
+    duration_sum: float = 0.0
+    duration_sum_sq: float = 0.0
+    duration_min: Optional[float] = None
+    duration_max: Optional[float] = None
+    duration_histogram: List[int] = field(default_factory=_empty_histogram)
+    quality_count: int = 0
+    quality_sum: float = 0.0
+
+    def add(
+        self,
+        result: Optional[str],
+        duration: Optional[float],
+        quality: Optional[float],
+        total_tasks: Optional[int] = 0,
+        completed_tasks: Optional[int] = 0,
+        failed_tasks: Optional[int] = 0,
+    ):
+        """Record a single workflow or phase execution"""
+        self.count += 1
+        if result == "success":
+            self.success_count += 1
+        elif result == "failure":
+            self.failure_count += 1
+
+        self.total_tasks += total_tasks or 0
+        self.completed_tasks += completed_tasks or 0
+        self.failed_tasks += failed_tasks or 0
+
+        if duration is not None:
+            self.duration_count += 1
+            self.duration_sum += duration
+            self.duration_sum_sq += duration * duration
+            if self.duration_min is None or duration < self.duration_min:
+                self.duration_min = duration
+            if self.duration_max is None or duration > self.duration_max:
+                self.duration_max = duration
+            self.duration_histogram[_histogram_slot(duration)] += 1
+
+        if quality is not None:
+            self.quality_count += 1
+            self.quality_sum += quality
+
+    def merge(self, other: "RollupStats"):
+        """Fold another bucket's statistics into this one"""
+        for name in (
+            "count",
+            "success_count",
+            "failure_count",
+            "total_tasks",
+            "completed_tasks",
+            "failed_tasks",
+            "duration_count",
+            "duration_sum",
+            "duration_sum_sq",
+            "quality_count",
+            "quality_sum",
+        ):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+        if other.duration_min is not None:
+            self.duration_min = (
+                other.duration_min
+                if self.duration_min is None
+                else min(self.duration_min, other.duration_min)
+            )
+        if other.duration_max is not None:
+            self.duration_max = (
+                other.duration_max
+                if self.duration_max is None
+                else max(self.duration_max, other.duration_max)
+            )
+        self.duration_histogram = [
+            mine + theirs
+            for mine, theirs in zip(self.duration_histogram, other.duration_histogram)
+        ]
+
+    @classmethod
+    def from_row(cls, row: MetricRollup) -> "RollupStats":
+        stats = cls(**{f.name: getattr(row, f.name) for f in fields(cls)})
+        histogram = list(stats.duration_histogram or [])
+        # Tolerate rows written with a different number of buckets
+        stats.duration_histogram = (histogram + _empty_histogram())[
+            : len(DURATION_BUCKETS) + 1
+        ]
+        return stats
+
+    def apply_to(self, row: MetricRollup):
+        for f in fields(self):
+            value = getattr(self, f.name)
+            setattr(row, f.name, list(value) if isinstance(value, list) else value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a duration quantile by interpolating within histogram slots"""
+        if self.duration_count == 0:
+            return None
+        target = q * self.duration_count
+        seen = 0
+        for slot, bucket_count in enumerate(self.duration_histogram):
+            if bucket_count and seen + bucket_count >= target:
+                lower = DURATION_BUCKETS[slot - 1] if slot > 0 else 0.0
+                upper = (
+                    DURATION_BUCKETS[slot]
+                    if slot < len(DURATION_BUCKETS)
+                    else self.duration_max
+                )
+                lower = max(lower, self.duration_min)
+                upper = min(upper, self.duration_max)
+                fraction = (target - seen) / bucket_count
+                return lower + (upper - lower) * fraction
+            seen += bucket_count
+        return self.duration_max
+
+    def summary(self) -> Dict[str, Any]:
+        """Derived figures for API responses and analyzers"""
+        mean = std = None
+        if self.duration_count:
+            mean = self.duration_sum / self.duration_count
+            variance = self.duration_sum_sq / self.duration_count - mean * mean
+            std = math.sqrt(max(variance, 0.0))
+
+        return {
+            "count": self.count,
+            "successful": self.success_count,
+            "failed": self.failure_count,
+            "success_rate": self.success_count / self.count if self.count else 0.0,
+            "tasks": {
+                "total": self.total_tasks,
+                "completed": self.completed_tasks,
+                "failed": self.failed_tasks,
+                "completion_rate": (
+                    self.completed_tasks / self.total_tasks if self.total_tasks else 0.0
+                ),
+            },
+            "duration": {
+                "count": self.duration_count,
+                "total_seconds": self.duration_sum,
+                "mean_seconds": mean,
+                "std_seconds": std,
+                "min_seconds": self.duration_min,
+                "max_seconds": self.duration_max,
+                "p50_seconds": self.quantile(0.5),
+                "p95_seconds": self.quantile(0.95),
+                "histogram": {
+                    "bounds": list(DURATION_BUCKETS),
+                    "counts": list(self.duration_histogram),
+                },
+            },
+            "average_quality_score": (
+                self.quality_sum / self.quality_count if self.quality_count else None
+            ),
+        }
+
+
+RollupKey = Tuple[str, str, str, datetime]  # granularity, dimension, value, start
+
+
+def _key(dimension: str, value: str, granularity: str, started_at: datetime):
+    return (granularity, dimension, value, bucket_start(started_at, granularity))
+
+
+def _workflow_keys(workflow) -> List[RollupKey]:
+    if workflow.started_at is None:
+        return []
+    value = workflow.workflow_type or "default"
+    return [
+        _key("workflow_type", value, granularity, workflow.started_at)
+        for granularity in GRANULARITIES
+    ]
+
+
+def _phase_keys(phase) -> List[RollupKey]:
+    if phase.started_at is None or not phase.assigned_agent_id:
+        return []
+    return [
+        _key("agent", phase.assigned_agent_id, granularity, phase.started_at)
+        for granularity in GRANULARITIES
+    ]
+
+
+class RollupService:
+    """
+    Maintains MetricRollup buckets per agent and per workflow type
+
+    ``record_workflow``/``record_phase`` fold each new history row into its
+    hourly and daily buckets in the same transaction that writes the row, so
+    dashboards read a handful of bucket rows instead of re-scanning history.
+    ``rebuild`` recomputes a range from raw history for backfills and repairs.
+    """
+
+    def __init__(self):
+        self.logger = logger
+
+    async def record_workflow(self, session: AsyncSession, workflow: WorkflowHistory):
+        """Add a stored workflow execution to its workflow-type buckets"""
+        batch: Dict[RollupKey, RollupStats] = {}
+        for key in _workflow_keys(workflow):
+            self._accumulate(batch, key, workflow, workflow.final_result)
+        await self._apply(session, batch)
+
+    async def record_phase(self, session: AsyncSession, phase: PhaseHistory):
+        """Add a stored phase execution to its agent buckets"""
+        batch: Dict[RollupKey, RollupStats] = {}
+        for key in _phase_keys(phase):
+            self._accumulate(batch, key, phase, phase.result)
+        await self._apply(session, batch)
+
+    async def record_batch(
+        self,
+        session: AsyncSession,
+        workflows: Iterable[Any] = (),
+        phases: Iterable[Any] = (),
+    ):
+        """Add many stored rows at once, touching each bucket a single time"""
+        batch: Dict[RollupKey, RollupStats] = {}
+        for workflow in workflows:
+            for key in _workflow_keys(workflow):
+                self._accumulate(batch, key, workflow, workflow.final_result)
+        for phase in phases:
+            for key in _phase_keys(phase):
+                self._accumulate(batch, key, phase, phase.result)
+        await self._apply(session, batch)
+
+    async def _apply(
+        self, session: AsyncSession, batch: Dict[RollupKey, RollupStats]
+    ):
+        # Lock buckets in key order so concurrent batches cannot deadlock
+        for key, stats in sorted(batch.items()):
+            row = await self._locked_row(session, key)
+            if row is None:
+                row = await self._insert_row(session, key, stats)
+                if row is not None:
+                    continue
+                # Another writer created the bucket first; update theirs
+                row = await self._locked_row(session, key)
+
+            merged = RollupStats.from_row(row)
+            merged.merge(stats)
+            merged.apply_to(row)
+        await session.flush()
+
+    async def _locked_row(
+        self, session: AsyncSession, key: RollupKey
+    ) -> Optional[MetricRollup]:
+        granularity, dimension, value, start = key
+        result = await session.execute(
+            select(MetricRollup)
+            .where(
+                and_(
+                    MetricRollup.granularity == granularity,
+                    MetricRollup.dimension == dimension,
+                    MetricRollup.dimension_value == value,
+                    MetricRollup.bucket_start == start,
+                )
+            )
+            .with_for_update()
+        )
+        return result.scalar_one_or_none()
+
+    async def _insert_row(
+        self, session: AsyncSession, key: RollupKey, stats: RollupStats
+    ) -> Optional[MetricRollup]:
+        granularity, dimension, value, start = key
+        row = MetricRollup(
+            granularity=granularity,
+            dimension=dimension,
+            dimension_value=value,
+            bucket_start=start,
+        )
+        stats.apply_to(row)
+        try:
+            async with session.begin_nested():
+                session.add(row)
+        except IntegrityError:
+            return None
+        return row
+
+    async def rebuild(
+        self, session: AsyncSession, start: datetime, end: datetime
+    ) -> Dict[str, int]:
+        """
+        Recompute all buckets between ``start`` and ``end`` from raw history
+
+        The range is widened to whole days so hourly and daily buckets are
+        replaced consistently. History is streamed in chunks and only the
+        bucket accumulators are kept in memory.
+        """
+        start = bucket_start(start, "day")
+        day_end = bucket_start(end, "day")
+        if day_end < end or day_end <= start:
+            day_end += timedelta(days=1)
+        end = day_end
+
+        batch: Dict[RollupKey, RollupStats] = {}
+
+        workflow_rows = await session.stream(
+            select(
+                WorkflowHistory.workflow_type,
+                WorkflowHistory.started_at,
+                WorkflowHistory.final_result,
+                WorkflowHistory.duration_seconds,
+                WorkflowHistory.quality_score,
+                WorkflowHistory.total_tasks,
+                WorkflowHistory.completed_tasks,
+                WorkflowHistory.failed_tasks,
+            )
+            .where(
+                and_(
+                    WorkflowHistory.started_at >= start,
+                    WorkflowHistory.started_at < end,
+                )
+            )
+            .execution_options(yield_per=STREAM_CHUNK_SIZE)
+        )
+        workflows = 0
+        async for row in workflow_rows:
+            workflows += 1
+            for key in _workflow_keys(row):
+                self._accumulate(batch, key, row, row.final_result)
+
+        phase_rows = await session.stream(
+            select(
+                PhaseHistory.assigned_agent_id,
+                PhaseHistory.started_at,
+                PhaseHistory.result,
+                PhaseHistory.duration_seconds,
+                PhaseHistory.quality_score,
+                PhaseHistory.total_tasks,
+                PhaseHistory.completed_tasks,
+                PhaseHistory.failed_tasks,
+            )
+            .where(
+                and_(
+                    PhaseHistory.assigned_agent_id.isnot(None),
+                    PhaseHistory.started_at >= start,
+                    PhaseHistory.started_at < end,
+                )
+            )
+            .execution_options(yield_per=STREAM_CHUNK_SIZE)
+        )
+        phases = 0
+        async for row in phase_rows:
+            phases += 1
+            for key in _phase_keys(row):
+                self._accumulate(batch, key, row, row.result)
+
+        await session.execute(
+            delete(MetricRollup).where(
+                and_(
+                    MetricRollup.bucket_start >= start,
+                    MetricRollup.bucket_start < end,
+                )
+            )
+        )
+        for (granularity, dimension, value, bucket), stats in batch.items():
+            row = MetricRollup(
+                granularity=granularity,
+                dimension=dimension,
+                dimension_value=value,
+                bucket_start=bucket,
+            )
+            stats.apply_to(row)
+            session.add(row)
+        await session.flush()
+
+        self.logger.info(
+            f"Rebuilt {len(batch)} rollup buckets from {workflows} workflows "
+            f"and {phases} phases between {start} and {end}"
+        )
+        return {"buckets": len(batch), "workflows": workflows, "phases": phases}
+
+    @staticmethod
+    def _accumulate(
+        batch: Dict[RollupKey, RollupStats],
+        key: RollupKey,
+        row,
+        result: Optional[str],
+    ):
+        stats = batch.get(key)
+        if stats is None:
+            stats = batch[key] = RollupStats()
+        stats.add(
+            result,
+            row.duration_seconds,
+            row.quality_score,
+            row.total_tasks,
+            row.completed_tasks,
+            row.failed_tasks,
+        )
+
+    async def get_buckets(
+        self,
+        session: AsyncSession,
+        dimension: str,
+        start: datetime,
+        end: datetime,
+        granularity: str = "hour",
+        dimension_value: Optional[str] = None,
+    ) -> List[Tuple[MetricRollup, RollupStats]]:
+        """Bucket rows in ``[start, end)`` ordered by time"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported rollup granularity: {granularity}")
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unsupported rollup dimension: {dimension}")
+
+        conditions = [
+            MetricRollup.granularity == granularity,
+            MetricRollup.dimension == dimension,
+            MetricRollup.bucket_start >= start,
+            MetricRollup.bucket_start < end,
+        ]
+        if dimension_value is not None:
+            conditions.append(MetricRollup.dimension_value == dimension_value)
+
+        result = await session.execute(
+            select(MetricRollup)
+            .where(and_(*conditions))
+            .order_by(MetricRollup.bucket_start, MetricRollup.dimension_value)
+        )
+        return [(row, RollupStats.from_row(row)) for row in result.scalars().all()]
+
+    async def get_series(
+        self,
+        session: AsyncSession,
+        dimension: str,
+        start: datetime,
+        end: datetime,
+        granularity: str = "hour",
+        dimension_value: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Per-bucket summaries, merging all dimension values per bucket"""
+        merged: Dict[datetime, RollupStats] = {}
+        for row, stats in await self.get_buckets(
+            session, dimension, start, end, granularity, dimension_value
+        ):
+            merged.setdefault(row.bucket_start, RollupStats()).merge(stats)
+
+        return [
+            {"bucket_start": bucket.isoformat(), **stats.summary()}
+            for bucket, stats in sorted(merged.items())
+        ]
+
+    async def get_totals(
+        self,
+        session: AsyncSession,
+        dimension: str,
+        start: datetime,
+        end: datetime,
+        granularity: str = "day",
+    ) -> Dict[str, Dict[str, Any]]:
+        """Summaries per dimension value over the whole range"""
+        merged: Dict[str, RollupStats] = {}
+        for row, stats in await self.get_buckets(
+            session, dimension, start, end, granularity
+        ):
+            merged.setdefault(row.dimension_value, RollupStats()).merge(stats)
+        return {value: stats.summary() for value, stats in sorted(merged.items())}
+
+
+# Global rollup service instance
+rollup_service = RollupService()
@@ -3,18 +3,21 @@ SubForge Integration Service for monitoring and integrating with SubForge workfl
 """
 
 import asyncio
+import hashlib
 import json
 import logging
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 
 try:
     from ..core.config import settings
-    from ..database.session import get_db
     from ..models.subforge_models import (
         AgentActivity,
         EventType,
@@ -29,12 +32,14 @@ try:
         WorkflowStatus,
         WorkflowSummary,
     )
+    from ..utils.event_bridge import CoalescingEventBridge
     from ..websocket.manager import websocket_manager
-    from .persistence import persistence_service
+    from ..websocket.workflow_topics import WORKFLOW_LIST_TOPIC, workflow_publisher
+    from .history_writer import history_writer
 except ImportError:
     # Fallback for direct execution
     from core.config import settings
-    from database.session import get_db
+    from history_writer import history_writer
     from models.subforge_models import (
         AgentActivity,
         EventType,
@@ -49,54 +54,45 @@ except ImportError:
         WorkflowStatus,
         WorkflowSummary,
     )
-    from persistence import persistence_service
+    from utils.event_bridge import CoalescingEventBridge
     from websocket.manager import websocket_manager
+    from websocket.workflow_topics import WORKFLOW_LIST_TOPIC, workflow_publisher
 
 logger = logging.getLogger(__name__)
 
+SCAN_INDEX_VERSION = 1
+
 
 class SubForgeFileHandler(FileSystemEventHandler):
-    """File system event handler for SubForge directory monitoring"""
+    """File system event handler for SubForge directory monitoring
+
+    Runs on the watchdog observer thread, so it only filters events and hands
+    them to the service's event bridge.
+    """
 
-    def __init__(self, integration_service):
-        self.integration_service = integration_service
+    def __init__(self, event_bridge: CoalescingEventBridge):
+        self.event_bridge = event_bridge
         super().__init__()
 
     def on_modified(self, event: FileSystemEvent):
         """Handle file modification events"""
         if not event.is_directory and self._is_relevant_file(event.src_path):
-            asyncio.create_task(
-                self.integration_service.handle_file_event(
-                    EventType.MODIFIED, event.src_path
-                )
-            )
+            self.event_bridge.submit(EventType.MODIFIED, event.src_path)
 
     def on_created(self, event: FileSystemEvent):
         """Handle file creation events"""
         if not event.is_directory and self._is_relevant_file(event.src_path):
-            asyncio.create_task(
-                self.integration_service.handle_file_event(
-                    EventType.CREATED, event.src_path
-                )
-            )
+            self.event_bridge.submit(EventType.CREATED, event.src_path)
 
     def on_deleted(self, event: FileSystemEvent):
         """Handle file deletion events"""
         if not event.is_directory and self._is_relevant_file(event.src_path):
-            asyncio.create_task(
-                self.integration_service.handle_file_event(
-                    EventType.DELETED, event.src_path
-                )
-            )
+            self.event_bridge.submit(EventType.DELETED, event.src_path)
 
     def on_moved(self, event: FileSystemEvent):
         """Handle file move events"""
         if not event.is_directory and self._is_relevant_file(event.dest_path):
-            asyncio.create_task(
-                self.integration_service.handle_file_event(
-                    EventType.MOVED, event.dest_path
-                )
-            )
+            self.event_bridge.submit(EventType.MOVED, event.dest_path)
 
     def _is_relevant_file(self, file_path: str) -> bool:
         """Check if file is relevant for monitoring"""
@@ -119,11 +115,34 @@ class SubForgeIntegrationService:
         self.monitoring_task: Optional[asyncio.Task] = None
         self._last_scan: Optional[datetime] = None
         self._active_workflows: Set[str] = set()
+        self.event_bridge = CoalescingEventBridge(
+            self.handle_workflow_events,
+            self._event_key,
+            window=self.config.event_coalesce_window,
+            max_workers=self.config.event_workers,
+        )
 
         # Initialize base paths
         self.project_root = settings.SUBFORGE_ROOT
         self.subforge_dir = self.project_root / self.config.subforge_dir
 
+        # workflow_id -> {"mtime_ns", "size", "sha256"} of the last loaded
+        # context file; persisted so restarts skip re-persisting old runs.
+        # A relative path lives under the SubForge root, not the working dir
+        self.scan_index_path = Path(self.config.scan_index_file).expanduser()
+        if not self.scan_index_path.is_absolute():
+            self.scan_index_path = self.project_root / self.scan_index_path
+        self._scan_index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._scan_index_dirty = False
+        self._scan_executor = ThreadPoolExecutor(
+            max_workers=self.config.scan_workers, thread_name_prefix="subforge-scan"
+        )
+        # Serializes scans and file events for the same workflow; a lock lives
+        # only while some caller holds a reference to it
+        self._workflow_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+
         logger.info(
             f"SubForge integration initialized. Monitoring: {self.subforge_dir}"
         )
@@ -155,6 +174,9 @@ class SubForgeIntegrationService:
                 self.observer.stop()
                 self.observer.join(timeout=5.0)
                 self.observer = None
+            self.event_bridge.stop()
+
+            await self._flush_scan_index()
 
             # Cancel monitoring task
             if self.monitoring_task:
@@ -177,8 +199,9 @@ class SubForgeIntegrationService:
             return
 
         try:
+            self.event_bridge.start()
             self.observer = Observer()
-            event_handler = SubForgeFileHandler(self)
+            event_handler = SubForgeFileHandler(self.event_bridge)
             self.observer.schedule(
                 event_handler, str(self.subforge_dir), recursive=True
             )
@@ -204,6 +227,50 @@ class SubForgeIntegrationService:
                 logger.error(f"Error in periodic monitoring: {e}")
                 await asyncio.sleep(60)  # Wait before retrying
 
+    def _event_key(self, file_path: str) -> Optional[str]:
+        """Coalesce file events per workflow directory"""
+        return self._extract_workflow_id(Path(file_path))
+
+    async def handle_workflow_events(
+        self, workflow_id: str, events: Dict[str, EventType]
+    ):
+        """
+        Handle a coalesced batch of file events for one workflow
+
+        ``events`` maps each touched path to its latest event type, so the
+        workflow context is re-parsed at most once however many times it was
+        rewritten during the window.
+        """
+        context_file = None
+        fs_events = []
+        for file_path, event_type in events.items():
+            file_path_obj = Path(file_path)
+            fs_event = FSEvent(
+                event_type=event_type,
+                file_path=str(file_path_obj),
+                timestamp=datetime.utcnow(),
+                workflow_id=workflow_id,
+                is_workflow_file=file_path_obj.name == "workflow_context.json",
+            )
+            if fs_event.is_workflow_file and event_type in [
+                EventType.CREATED,
+                EventType.MODIFIED,
+                EventType.MOVED,
+            ]:
+                context_file = file_path_obj
+            fs_events.append(fs_event)
+
+        if context_file is not None:
+            await self._process_workflow_file(workflow_id, context_file)
+
+        if self.config.websocket_broadcast:
+            for fs_event in fs_events:
+                await self._broadcast_file_event(fs_event)
+
+        logger.debug(
+            f"Processed {len(events)} coalesced file events for {workflow_id}"
+        )
+
     async def handle_file_event(self, event_type: EventType, file_path: str):
         """Handle file system events"""
         try:
@@ -239,51 +306,78 @@ class SubForgeIntegrationService:
             logger.error(f"Error handling file event {event_type} - {file_path}: {e}")
 
     async def scan_workflows(self) -> List[str]:
-        """Scan SubForge directory for workflows"""
+        """
+        Scan SubForge directory for workflows
+
+        Only context files whose mtime or size differ from the scan index are
+        read, and only those whose content hash changed are re-parsed. Reads
+        and parsing run in the scan thread pool; the scan ends with a single
+        list update if anything was added, changed or removed.
+        """
         if not self.subforge_dir.exists():
             logger.warning(f"SubForge directory not found: {self.subforge_dir}")
             return []
 
-        discovered_workflows = []
-
         try:
-            # Find all workflow directories
-            for workflow_dir in self.subforge_dir.iterdir():
-                if workflow_dir.is_dir() and workflow_dir.name.startswith("subforge_"):
-                    workflow_context_file = workflow_dir / "workflow_context.json"
-
-                    if workflow_context_file.exists():
-                        workflow_id = workflow_dir.name
-                        discovered_workflows.append(workflow_id)
-
-                        # Process if not already loaded or if file is newer
-                        should_reload = (
-                            workflow_id not in self.workflows
-                            or workflow_context_file.stat().st_mtime
-                            > self._last_scan.timestamp()
-                            if self._last_scan
-                            else True
-                        )
+            loop = asyncio.get_running_loop()
+            scan_index = await self._get_scan_index()
+            found = await loop.run_in_executor(
+                self._scan_executor, self._stat_workflow_dirs
+            )
+
+            stale = []
+            for workflow_id, (file_path, mtime_ns, size) in found.items():
+                entry = scan_index.get(workflow_id)
+                if (
+                    workflow_id in self.workflows
+                    and entry is not None
+                    and entry.get("mtime_ns") == mtime_ns
+                    and entry.get("size") == size
+                ):
+                    continue
+                stale.append((workflow_id, file_path))
+
+            # Bounded: the first scan after a restart can find thousands stale
+            semaphore = asyncio.Semaphore(self.config.scan_concurrency)
+
+            async def process(workflow_id: str, file_path: str) -> bool:
+                async with semaphore:
+                    return await self._process_workflow_file(
+                        workflow_id, Path(file_path), announce=False
+                    )
+
+            results = await asyncio.gather(
+                *(process(workflow_id, file_path) for workflow_id, file_path in stale)
+            )
+            changed_count = sum(1 for changed in results if changed)
 
-                        if should_reload:
-                            await self._process_workflow_file(
-                                workflow_id, workflow_context_file
-                            )
+            discovered_workflows = list(found)
 
             # Update active workflows
             self._active_workflows = set(discovered_workflows)
             self._last_scan = datetime.utcnow()
 
             # Remove workflows that no longer exist
-            removed_workflows = set(self.workflows.keys()) - self._active_workflows
+            removed_workflows = (
+                set(self.workflows.keys()) | set(scan_index.keys())
+            ) - self._active_workflows
             for workflow_id in removed_workflows:
-                self.workflows.pop(workflow_id, None)
-                logger.info(f"Removed workflow: {workflow_id}")
+                if self.workflows.pop(workflow_id, None) is not None:
+                    logger.info(f"Removed workflow: {workflow_id}")
+                scan_index.pop(workflow_id, None)
+                workflow_publisher.forget(workflow_id)
+                self._scan_index_dirty = True
 
-            logger.info(f"Scanned {len(discovered_workflows)} SubForge workflows")
+            logger.info(
+                f"Scanned {len(discovered_workflows)} SubForge workflows "
+                f"({len(stale)} stale, {changed_count} changed, "
+                f"{len(removed_workflows)} removed)"
+            )
 
-            # Broadcast workflow update
-            if self.config.websocket_broadcast and discovered_workflows:
+            await self._flush_scan_index()
+
+            # One batched list update per scan
+            if self.config.websocket_broadcast and (changed_count or removed_workflows):
                 await self._broadcast_workflow_list_update()
 
             return discovered_workflows
@@ -292,39 +386,180 @@ class SubForgeIntegrationService:
             logger.error(f"Error scanning workflows: {e}")
             return []
 
-    async def _process_workflow_file(self, workflow_id: str, file_path: Path):
-        """Process a workflow context file"""
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+    def _stat_workflow_dirs(self) -> Dict[str, Tuple[str, int, int]]:
+        """Stat every workflow context file (runs in the scan thread pool)"""
+        found = {}
+        with os.scandir(self.subforge_dir) as entries:
+            for entry in entries:
+                if not entry.name.startswith("subforge_") or not entry.is_dir():
+                    continue
+                context_file = os.path.join(entry.path, "workflow_context.json")
+                try:
+                    stat = os.stat(context_file)
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+                found[entry.name] = (context_file, stat.st_mtime_ns, stat.st_size)
+        return found
+
+    def _read_workflow_file(
+        self, workflow_id: str, file_path: str, known_digest: Optional[str]
+    ) -> Tuple[Dict[str, Any], Optional[WorkflowContext]]:
+        """
+        Read, hash and parse a context file (runs in the scan thread pool)
 
-            # Parse and validate workflow context
-            workflow_context = self._parse_workflow_context(workflow_id, data)
+        Returns the new index entry and the parsed context, or ``None`` for
+        the context when the content hash equals ``known_digest``.
+        """
+        with open(file_path, "rb") as f:
+            raw = f.read()
+            stat = os.fstat(f.fileno())
+
+        entry = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": hashlib.sha256(raw).hexdigest(),
+        }
+        if entry["sha256"] == known_digest:
+            return entry, None
+
+        workflow_context = self._parse_workflow_context(workflow_id, json.loads(raw))
+        workflow_context.update_metrics()
+        return entry, workflow_context
+
+    def _workflow_lock(self, workflow_id: str) -> asyncio.Lock:
+        lock = self._workflow_locks.get(workflow_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._workflow_locks[workflow_id] = lock
+        return lock
+
+    async def _process_workflow_file(
+        self, workflow_id: str, file_path: Path, announce: bool = True
+    ) -> bool:
+        """
+        Process a workflow context file
 
-            # Store workflow
+        Returns True if the workflow was (re)loaded. With ``announce=False``
+        the list topic is left to the caller, which batches summaries. Calls
+        for the same workflow (a scan and the event bridge) run one at a time,
+        so a slower stale read cannot overwrite a newer context or digest.
+        """
+        async with self._workflow_lock(workflow_id):
+            return await self._load_workflow_file(workflow_id, file_path, announce)
+
+    async def _load_workflow_file(
+        self, workflow_id: str, file_path: Path, announce: bool
+    ) -> bool:
+        try:
+            scan_index = await self._get_scan_index()
+            previous = scan_index.get(workflow_id)
             was_new = workflow_id not in self.workflows
-            self.workflows[workflow_id] = workflow_context
+            known_digest = None if was_new or previous is None else previous["sha256"]
+
+            loop = asyncio.get_running_loop()
+            entry, workflow_context = await loop.run_in_executor(
+                self._scan_executor,
+                self._read_workflow_file,
+                workflow_id,
+                str(file_path),
+                known_digest,
+            )
+            if workflow_context is None:
+                # Touched but identical to what is already loaded
+                scan_index[workflow_id] = entry
+                self._scan_index_dirty = True
+                return False
 
-            # Update workflow metrics
-            workflow_context.update_metrics()
+            # Store workflow
+            self.workflows[workflow_id] = workflow_context
 
             logger.info(
                 f"{'Loaded new' if was_new else 'Updated'} workflow: {workflow_id}"
             )
 
-            # Persist workflow data if completed or failed
-            if workflow_context.status in [
+            # Content seen before a restart was already persisted
+            already_persisted = (
+                previous is not None and previous["sha256"] == entry["sha256"]
+            )
+
+            # Persist workflow data if completed or failed. The new digest is
+            # only recorded once the execution has been committed, so a
+            # failed write is retried on the next scan or after a restart
+            needs_persisting = not already_persisted and workflow_context.status in [
                 WorkflowStatus.COMPLETED,
                 WorkflowStatus.FAILED,
-            ]:
-                await self.persist_workflow_execution(workflow_context)
+            ]
+
+            def record_digest(written: bool = True):
+                # A newer version loaded meanwhile records its own digest
+                if written and self.workflows.get(workflow_id) is workflow_context:
+                    scan_index[workflow_id] = entry
+                    self._scan_index_dirty = True
+
+            if needs_persisting:
+                await self.persist_workflow_execution(
+                    workflow_context, on_written=record_digest
+                )
+            else:
+                record_digest()
 
             # Broadcast workflow update
             if self.config.websocket_broadcast:
-                await self._broadcast_workflow_update(workflow_context, is_new=was_new)
+                await self._broadcast_workflow_update(
+                    workflow_context, is_new=was_new, include_summary=announce
+                )
+
+            return True
 
         except Exception as e:
             logger.error(f"Error processing workflow file {file_path}: {e}")
+            return False
+
+    async def _get_scan_index(self) -> Dict[str, Dict[str, Any]]:
+        """Load the persisted scan index on first use"""
+        if self._scan_index is None:
+            loop = asyncio.get_running_loop()
+            loaded = await loop.run_in_executor(
+                self._scan_executor, self._load_scan_index
+            )
+            # Another coroutine may have loaded it while we were waiting
+            if self._scan_index is None:
+                self._scan_index = loaded
+        return self._scan_index
+
+    def _load_scan_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.scan_index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == SCAN_INDEX_VERSION:
+                return data.get("entries", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(
+                f"Ignoring unreadable scan index {self.scan_index_path}: {e}"
+            )
+        return {}
+
+    def _save_scan_index(self, entries: Dict[str, Dict[str, Any]]):
+        temp_path = self.scan_index_path.with_name(self.scan_index_path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": SCAN_INDEX_VERSION, "entries": entries}, f)
+        os.replace(temp_path, self.scan_index_path)
+
+    async def _flush_scan_index(self):
+        """Write the scan index if it changed since the last flush"""
+        if not self._scan_index_dirty or self._scan_index is None:
+            return
+        self._scan_index_dirty = False
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self._scan_executor, self._save_scan_index, dict(self._scan_index)
+            )
+        except Exception as e:
+            self._scan_index_dirty = True
+            logger.error(f"Error saving scan index: {e}")
 
     def _parse_workflow_context(
         self, workflow_id: str, data: Dict[str, Any]
@@ -458,6 +693,7 @@ class SubForgeIntegrationService:
         for workflow_id, workflow in list(self.workflows.items()):
             if workflow.created_at and workflow.created_at < cutoff_date:
                 self.workflows.pop(workflow_id, None)
+                workflow_publisher.forget(workflow_id)
                 cleaned_count += 1
 
         if cleaned_count > 0:
@@ -467,43 +703,61 @@ class SubForgeIntegrationService:
         """Broadcast file system event via WebSocket"""
         try:
             await websocket_manager.broadcast_json(
-                {"type": "subforge_file_event", "data": event.dict()}
+                {"type": "subforge_file_event", "data": event.dict()},
+                coalesce_key=f"file_event:{event.file_path}",
             )
         except Exception as e:
             logger.error(f"Error broadcasting file event: {e}")
 
     async def _broadcast_workflow_update(
-        self, workflow: WorkflowContext, is_new: bool = False
+        self,
+        workflow: WorkflowContext,
+        is_new: bool = False,
+        include_summary: bool = True,
     ):
-        """Broadcast workflow update via WebSocket"""
+        """
+        Publish a workflow update via WebSocket
+
+        Subscribers of the workflow get a delta (or snapshot) from the topic
+        publisher; the list topic only gets the workflow's summary.
+        """
         try:
-            await websocket_manager.broadcast_json(
+            await workflow_publisher.publish(
+                workflow.project_id, workflow.dict(), is_new=is_new
+            )
+            if not include_summary:
+                return
+            await websocket_manager.publish_json(
+                WORKFLOW_LIST_TOPIC,
                 {
                     "type": "subforge_workflow_update",
                     "data": {
                         "workflow_id": workflow.project_id,
-                        "workflow": workflow.dict(),
+                        "summary": self._create_workflow_summary(workflow).dict(),
                         "is_new": is_new,
                     },
-                }
+                },
+                coalesce_key=f"workflow_summary:{workflow.project_id}",
             )
         except Exception as e:
             logger.error(f"Error broadcasting workflow update: {e}")
 
     async def _broadcast_workflow_list_update(self):
-        """Broadcast workflow list update via WebSocket"""
+        """Publish workflow list update to list topic subscribers"""
         try:
             workflow_summaries = [
                 self._create_workflow_summary(w) for w in self.workflows.values()
             ]
-            await websocket_manager.broadcast_json(
+            await websocket_manager.publish_json(
+                WORKFLOW_LIST_TOPIC,
                 {
                     "type": "subforge_workflow_list_update",
                     "data": {
                         "workflows": [w.dict() for w in workflow_summaries],
                         "total_count": len(workflow_summaries),
                     },
-                }
+                },
+                coalesce_key="workflow_list",
             )
         except Exception as e:
             logger.error(f"Error broadcasting workflow list update: {e}")
@@ -576,169 +830,182 @@ class SubForgeIntegrationService:
             recent_activities=recent_activities,
         )
 
-    async def persist_workflow_execution(self, workflow: WorkflowContext):
+    async def persist_workflow_execution(
+        self,
+        workflow: WorkflowContext,
+        on_written: Optional[Callable[[bool], Any]] = None,
+    ) -> bool:
         """
         Persist workflow execution data to database for historical tracking
 
         Args:
             workflow: WorkflowContext to persist
+            on_written: Called with the outcome once the execution has been
+                committed or has failed (see ``HistoryWriteQueue.submit``)
+
+        Returns:
+            True once the history writer has accepted the execution
         """
         try:
-            async for db_session in get_db():
-                # Prepare workflow data for persistence
-                workflow_data = {
-                    "workflow_id": workflow.project_id,
-                    "execution_id": f"{workflow.project_id}_{datetime.utcnow().isoformat()}",
-                    "execution_number": 1,  # Could be calculated based on existing records
-                    "name": (
-                        workflow.user_request[:255]
-                        if workflow.user_request
-                        else "Unknown Workflow"
+            # Prepare workflow data for persistence
+            workflow_data = {
+                "workflow_id": workflow.project_id,
+                "execution_id": self._execution_id(workflow),
+                "execution_number": 1,  # Could be calculated based on existing records
+                "name": (
+                    workflow.user_request[:255]
+                    if workflow.user_request
+                    else "Unknown Workflow"
+                ),
+                "type": "subforge_workflow",
+                "project_id": workflow.project_id,
+                "project_name": (
+                    workflow.project_path.split("/")[-1]
+                    if workflow.project_path
+                    else workflow.project_id
+                ),
+                "status": workflow.status.value.lower(),
+                "final_result": self._determine_final_result(workflow),
+                "started_at": workflow.created_at or datetime.utcnow(),
+                "completed_at": (
+                    workflow.updated_at
+                    if workflow.status
+                    in [WorkflowStatus.COMPLETED, WorkflowStatus.FAILED]
+                    else None
+                ),
+                "duration_seconds": self._calculate_workflow_duration(workflow),
+                "total_phases": workflow.total_phases,
+                "completed_phases": workflow.completed_phases,
+                "failed_phases": workflow.failed_phases,
+                "skipped_phases": 0,  # Calculate if available
+                "total_tasks": len(workflow.tasks) if workflow.tasks else 0,
+                "completed_tasks": (
+                    len([t for t in workflow.tasks if t.status == "completed"])
+                    if workflow.tasks
+                    else 0
+                ),
+                "failed_tasks": (
+                    len([t for t in workflow.tasks if t.status == "failed"])
+                    if workflow.tasks
+                    else 0
+                ),
+                "success_rate": workflow.progress_percentage or 0.0,
+                "quality_score": self._calculate_quality_score(workflow),
+                "efficiency_score": self._calculate_efficiency_score(workflow),
+                "configuration": workflow.to_dict().get("configuration", {}),
+                "parameters": workflow.to_dict().get("parameters", {}),
+                "assigned_agents": self._extract_agent_list(workflow),
+                "agent_performance_summary": self._calculate_agent_performance_summary(
+                    workflow
+                ),
+                "error_messages": self._extract_error_messages(workflow),
+                "warnings": self._extract_warnings(workflow),
+                "critical_issues": self._extract_critical_issues(workflow),
+                "resource_usage": self._extract_resource_usage(workflow),
+                "triggered_by": "subforge_system",
+                "trigger_event": {
+                    "source": "file_system_monitor",
+                    "timestamp": datetime.utcnow().isoformat(),
+                },
+            }
+
+            # Phase history
+            phases = []
+            for phase_name, phase_result in workflow.phase_results.items():
+                phase_data = {
+                    "name": phase_name,
+                    "type": "subforge_phase",
+                    "order": self._get_phase_order(phase_name, workflow),
+                    "status": phase_result.status or "unknown",
+                    "result": (
+                        "success"
+                        if phase_result.status == "completed"
+                        else (
+                            "failure"
+                            if phase_result.status == "failed"
+                            else "pending"
+                        )
+                    ),
+                    "started_at": phase_result.start_time,
+                    "completed_at": phase_result.end_time,
+                    "duration_seconds": phase_result.duration,
+                    "assigned_agent_id": f"{phase_name}_agent",
+                    "assigned_agent_name": f"{phase_name.title()} Agent",
+                    "agent_utilization": (
+                        100.0 if phase_result.status == "completed" else None
+                    ),
+                    "config": {"phase_name": phase_name},
+                    "input_parameters": phase_result.inputs or {},
+                    "output_results": phase_result.outputs or {},
+                    "quality_score": self._calculate_phase_quality_score(
+                        phase_result
                     ),
-                    "type": "subforge_workflow",
-                    "project_id": workflow.project_id,
-                    "project_name": (
-                        workflow.project_path.split("/")[-1]
-                        if workflow.project_path
-                        else workflow.project_id
+                    "performance_score": self._calculate_phase_performance_score(
+                        phase_result
                     ),
-                    "status": workflow.status.value.lower(),
-                    "final_result": self._determine_final_result(workflow),
-                    "started_at": workflow.created_at or datetime.utcnow(),
-                    "completed_at": (
-                        workflow.updated_at
-                        if workflow.status
-                        in [WorkflowStatus.COMPLETED, WorkflowStatus.FAILED]
-                        else None
+                    "total_tasks": (
+                        len([t for t in workflow.tasks if t.phase == phase_name])
+                        if workflow.tasks
+                        else 0
                     ),
-                    "duration_seconds": self._calculate_workflow_duration(workflow),
-                    "total_phases": workflow.total_phases,
-                    "completed_phases": workflow.completed_phases,
-                    "failed_phases": workflow.failed_phases,
-                    "skipped_phases": 0,  # Calculate if available
-                    "total_tasks": len(workflow.tasks) if workflow.tasks else 0,
                     "completed_tasks": (
-                        len([t for t in workflow.tasks if t.status == "completed"])
+                        len(
+                            [
+                                t
+                                for t in workflow.tasks
+                                if t.phase == phase_name and t.status == "completed"
+                            ]
+                        )
                         if workflow.tasks
                         else 0
                     ),
                     "failed_tasks": (
-                        len([t for t in workflow.tasks if t.status == "failed"])
+                        len(
+                            [
+                                t
+                                for t in workflow.tasks
+                                if t.phase == phase_name and t.status == "failed"
+                            ]
+                        )
                         if workflow.tasks
                         else 0
                     ),
-                    "success_rate": workflow.progress_percentage or 0.0,
-                    "quality_score": self._calculate_quality_score(workflow),
-                    "efficiency_score": self._calculate_efficiency_score(workflow),
-                    "configuration": workflow.to_dict().get("configuration", {}),
-                    "parameters": workflow.to_dict().get("parameters", {}),
-                    "assigned_agents": self._extract_agent_list(workflow),
-                    "agent_performance_summary": self._calculate_agent_performance_summary(
-                        workflow
+                    "dependencies": self._get_phase_dependencies(
+                        phase_name, workflow
                     ),
-                    "error_messages": self._extract_error_messages(workflow),
-                    "warnings": self._extract_warnings(workflow),
-                    "critical_issues": self._extract_critical_issues(workflow),
-                    "resource_usage": self._extract_resource_usage(workflow),
-                    "triggered_by": "subforge_system",
-                    "trigger_event": {
-                        "source": "file_system_monitor",
-                        "timestamp": datetime.utcnow().isoformat(),
-                    },
+                    "dependents": self._get_phase_dependents(phase_name, workflow),
+                    "error_messages": phase_result.errors or [],
+                    "warnings": phase_result.warnings or [],
+                    "resource_usage": {},
                 }
 
-                # Store workflow history
-                workflow_history = await persistence_service.store_workflow_execution(
-                    db_session, workflow_data
-                )
-
-                # Store phase history
-                for phase_name, phase_result in workflow.phase_results.items():
-                    phase_data = {
-                        "name": phase_name,
-                        "type": "subforge_phase",
-                        "order": self._get_phase_order(phase_name, workflow),
-                        "status": phase_result.status or "unknown",
-                        "result": (
-                            "success"
-                            if phase_result.status == "completed"
-                            else (
-                                "failure"
-                                if phase_result.status == "failed"
-                                else "pending"
-                            )
-                        ),
-                        "started_at": phase_result.start_time,
-                        "completed_at": phase_result.end_time,
-                        "duration_seconds": phase_result.duration,
-                        "assigned_agent_id": f"{phase_name}_agent",
-                        "assigned_agent_name": f"{phase_name.title()} Agent",
-                        "agent_utilization": (
-                            100.0 if phase_result.status == "completed" else None
-                        ),
-                        "config": {"phase_name": phase_name},
-                        "input_parameters": phase_result.inputs or {},
-                        "output_results": phase_result.outputs or {},
-                        "quality_score": self._calculate_phase_quality_score(
-                            phase_result
-                        ),
-                        "performance_score": self._calculate_phase_performance_score(
-                            phase_result
-                        ),
-                        "total_tasks": (
-                            len([t for t in workflow.tasks if t.phase == phase_name])
-                            if workflow.tasks
-                            else 0
-                        ),
-                        "completed_tasks": (
-                            len(
-                                [
-                                    t
-                                    for t in workflow.tasks
-                                    if t.phase == phase_name and t.status == "completed"
-                                ]
-                            )
-                            if workflow.tasks
-                            else 0
-                        ),
-                        "failed_tasks": (
-                            len(
-                                [
-                                    t
-                                    for t in workflow.tasks
-                                    if t.phase == phase_name and t.status == "failed"
-                                ]
-                            )
-                            if workflow.tasks
-                            else 0
-                        ),
-                        "dependencies": self._get_phase_dependencies(
-                            phase_name, workflow
-                        ),
-                        "dependents": self._get_phase_dependents(phase_name, workflow),
-                        "error_messages": phase_result.errors or [],
-                        "warnings": phase_result.warnings or [],
-                        "resource_usage": {},
-                    }
-
-                    await persistence_service.store_phase_execution(
-                        db_session, workflow_history.id, phase_data
-                    )
-
-                # Store handoff history (if handoffs are tracked)
-                handoffs = self._extract_handoffs(workflow)
-                for handoff_data in handoffs:
-                    await persistence_service.store_handoff_execution(
-                        db_session, workflow_history.id, handoff_data
-                    )
-
-                # Calculate and store agent performance metrics
-                await self._store_agent_performance_metrics(db_session, workflow)
+                phases.append(phase_data)
 
-                logger.info(f"Persisted workflow execution: {workflow_history.id}")
+            # Written in a batch with its phases, handoffs (if tracked) and
+            # the agents' hourly performance metrics
+            accepted = await history_writer.submit(
+                {
+                    "workflow": workflow_data,
+                    "phases": phases,
+                    "handoffs": self._extract_handoffs(workflow),
+                },
+                on_written=on_written,
+            )
+            if accepted:
+                logger.info(
+                    f"Queued workflow execution: {workflow_data['execution_id']}"
+                )
+            return accepted
 
         except Exception as e:
             logger.error(f"Error persisting workflow execution: {e}")
+            return False
+
+    def _execution_id(self, workflow: WorkflowContext) -> str:
+        """Stable per workflow state, so persisting a state again upserts it"""
+        changed_at = workflow.updated_at or workflow.created_at
+        suffix = changed_at.isoformat() if changed_at else datetime.utcnow().isoformat()
+        return f"{workflow.project_id}_{workflow.status.value.lower()}_{suffix}"
 
     def _determine_final_result(self, workflow: WorkflowContext) -> str:
         """Determine final result of workflow"""
@@ -976,27 +1243,6 @@ class SubForgeIntegrationService:
 
         return handoffs
 
-    async def _store_agent_performance_metrics(
-        self, session, workflow: WorkflowContext
-    ):
-        """Store agent performance metrics for workflow agents"""
-        try:
-            # Calculate metrics for each agent involved
-            for phase_name, phase_result in workflow.phase_results.items():
-                agent_id = f"{phase_name}_agent"
-
-                # Use current hour as the period
-                now = datetime.utcnow()
-                period_start = now.replace(minute=0, second=0, microsecond=0)
-                period_end = period_start + timedelta(hours=1)
-
-                await persistence_service.calculate_and_store_agent_performance(
-                    session, agent_id, period_start, period_end, "hour"
-                )
-
-        except Exception as e:
-            logger.error(f"Error storing agent performance metrics: {e}")
-
 
 # Global integration service instance
 subforge_integration = SubForgeIntegrationService()
\ No newline at end of file
@@ -2,7 +2,9 @@
 Utility modules for SubForge Dashboard Backend
 """
 
+from .event_bridge import CoalescingEventBridge
 from .file_watcher import FileWatcher
 from .logging_config import setup_logging
+from .single_flight import SingleFlight
 
-__all__ = ["FileWatcher", "setup_logging"]
\ No newline at end of file
+__all__ = ["CoalescingEventBridge", "FileWatcher", "SingleFlight", "setup_logging"]
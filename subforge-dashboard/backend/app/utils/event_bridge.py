@@ -0,0 +1,151 @@
+"""
+Thread-safe bridge from watchdog observer threads to the asyncio event loop
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# (coalesce key, {path: last event type}) -> processing coroutine
+BatchHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class CoalescingEventBridge:
+    """
+    Hands file system events from watchdog threads to the event loop
+
+    ``submit`` may be called from any thread; it only schedules work on the
+    loop with ``call_soon_threadsafe``. Events are grouped by ``key_func``
+    (e.g. the workflow directory) and the first event for a key opens a
+    window of ``window`` seconds; everything arriving for that key inside the
+    window is folded into one batch keeping the last event per path. Batches
+    are processed by at most ``max_workers`` worker tasks and a key is never
+    processed concurrently with itself, so a storm of rewrites to one
+    workflow costs one handler call per window.
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler,
+        key_func: Callable[[str], Optional[str]],
+        window: float = 0.5,
+        max_workers: int = 4,
+    ):
+        self.handler = handler
+        self.key_func = key_func
+        self.window = window
+        self.max_workers = max(max_workers, 1)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._queued: Set[str] = set()
+        self._running: Set[str] = set()
+
+        self.events_received = 0
+        self.events_coalesced = 0
+        self.batches_processed = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop is not None
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Bind to the running loop and start the workers (call from the loop)"""
+        if self._loop is not None:
+            return
+        self._loop = loop or asyncio.get_running_loop()
+        self._ready = asyncio.Queue()
+        self._workers = [
+            self._loop.create_task(self._worker()) for _ in range(self.max_workers)
+        ]
+
+    def stop(self):
+        """Cancel pending windows and workers; unprocessed events are dropped"""
+        for timer in self._timers.values():
+            timer.cancel()
+        for worker in self._workers:
+            worker.cancel()
+        self._timers.clear()
+        self._pending.clear()
+        self._queued.clear()
+        self._workers = []
+        self._loop = None
+
+    def submit(self, event_type: Any, path: str):
+        """Queue an event from any thread"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._add_event, event_type, path)
+        except RuntimeError:
+            # Loop closed between the check and the call during shutdown
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "events_received": self.events_received,
+            "events_coalesced": self.events_coalesced,
+            "batches_processed": self.batches_processed,
+            "pending_keys": len(self._pending),
+            "running_keys": len(self._running),
+        }
+
+    def _add_event(self, event_type: Any, path: str):
+        if self._loop is None:
+            return
+        key = self.key_func(path)
+        if key is None:
+            return
+
+        self.events_received += 1
+        batch = self._pending.setdefault(key, {})
+        if path in batch:
+            self.events_coalesced += 1
+            # Re-insert so the batch keeps the order of the latest events
+            del batch[path]
+        batch[path] = event_type
+
+        if key not in self._timers and key not in self._queued:
+            self._schedule(key)
+
+    def _schedule(self, key: str):
+        self._timers[key] = self._loop.call_later(self.window, self._window_closed, key)
+
+    def _window_closed(self, key: str):
+        self._timers.pop(key, None)
+        if key in self._running or key in self._queued:
+            # The worker reschedules leftovers when the current batch finishes
+            return
+        self._queued.add(key)
+        self._ready.put_nowait(key)
+
+    async def _worker(self):
+        while True:
+            key = await self._ready.get()
+            self._queued.discard(key)
+            batch = self._pending.pop(key, None)
+            if not batch:
+                continue
+
+            self._running.add(key)
+            try:
+                await self.handler(key, batch)
+                self.batches_processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error processing file events for {key}: {e}")
+            finally:
+                self._running.discard(key)
+                if (
+                    self._loop is not None
+                    and key in self._pending
+                    and key not in self._timers
+                ):
+                    self._schedule(key)
@@ -2,16 +2,16 @@
 File watcher for monitoring SubForge directory changes
 """
 
-import asyncio
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 
 from ..core.config import settings
 from ..websocket.manager import websocket_manager
+from .event_bridge import CoalescingEventBridge
 
 logger = logging.getLogger(__name__)
 
@@ -19,53 +19,54 @@ logger = logging.getLogger(__name__)
 class SubForgeFileHandler(FileSystemEventHandler):
     """
     File system event handler for SubForge files
+
+    Watchdog calls the ``on_*`` methods from its observer thread; events are
+    handed to a coalescing bridge on the event loop so bursts of writes in a
+    directory are broadcast once per debounce window.
     """
 
     def __init__(self, debounce_seconds: float = 1.0):
         super().__init__()
         self.debounce_seconds = debounce_seconds
-        self._pending_events = {}
+        self.event_bridge = CoalescingEventBridge(
+            self._broadcast_batch,
+            self._event_key,
+            window=debounce_seconds,
+        )
 
     def on_modified(self, event: FileSystemEvent):
         """Handle file modification events"""
         if not event.is_directory:
-            self._schedule_event_broadcast("file_modified", event)
+            self.event_bridge.submit("file_modified", event.src_path)
 
     def on_created(self, event: FileSystemEvent):
         """Handle file creation events"""
         if not event.is_directory:
-            self._schedule_event_broadcast("file_created", event)
+            self.event_bridge.submit("file_created", event.src_path)
 
     def on_deleted(self, event: FileSystemEvent):
         """Handle file deletion events"""
         if not event.is_directory:
-            self._schedule_event_broadcast("file_deleted", event)
+            self.event_bridge.submit("file_deleted", event.src_path)
 
     def on_moved(self, event: FileSystemEvent):
         """Handle file move events"""
         if not event.is_directory:
-            self._schedule_event_broadcast("file_moved", event)
-
-    def _schedule_event_broadcast(self, event_type: str, event: FileSystemEvent):
-        """Schedule event broadcast with debouncing"""
-        file_path = event.src_path
+            self.event_bridge.submit("file_moved", event.src_path)
 
-        # Cancel existing timer for this file
-        if file_path in self._pending_events:
-            self._pending_events[file_path].cancel()
+    def _event_key(self, file_path: str) -> str:
+        """Coalesce events per containing directory"""
+        return str(Path(file_path).parent)
 
-        # Schedule new broadcast
-        loop = asyncio.get_event_loop()
-        timer = loop.call_later(
-            self.debounce_seconds,
-            lambda: asyncio.create_task(self._broadcast_event(event_type, event)),
-        )
-        self._pending_events[file_path] = timer
+    async def _broadcast_batch(self, directory: str, events: Dict[str, str]):
+        """Broadcast the latest event of each file touched in a window"""
+        for file_path, event_type in events.items():
+            await self._broadcast_event(event_type, file_path)
 
-    async def _broadcast_event(self, event_type: str, event: FileSystemEvent):
+    async def _broadcast_event(self, event_type: str, src_path: str):
         """Broadcast file system event via WebSocket"""
         try:
-            file_path = Path(event.src_path)
+            file_path = Path(src_path)
             relative_path = file_path.relative_to(Path.cwd())
 
             # Determine file category
@@ -83,11 +84,9 @@ class SubForgeFileHandler(FileSystemEventHandler):
                 },
             }
 
-            await websocket_manager.broadcast_json(event_data)
-
-            # Clean up pending event
-            if event.src_path in self._pending_events:
-                del self._pending_events[event.src_path]
+            await websocket_manager.broadcast_json(
+                event_data, coalesce_key=f"file_system_event:{file_path}"
+            )
 
             logger.debug(f"Broadcasted {event_type} event for {relative_path}")
 
@@ -135,6 +134,7 @@ class FileWatcher:
 
     def __init__(self):
         self.observer: Optional[Observer] = None
+        self.event_handler: Optional[SubForgeFileHandler] = None
         self.is_running = False
         self.watched_paths = []
 
@@ -153,6 +153,9 @@ class FileWatcher:
             event_handler = SubForgeFileHandler(
                 debounce_seconds=settings.WATCHER_DEBOUNCE_SECONDS
             )
+            # Must run on the event loop so events can be handed back to it
+            event_handler.event_bridge.start()
+            self.event_handler = event_handler
 
             # Watch SubForge directories
             paths_to_watch = [
@@ -191,6 +194,9 @@ class FileWatcher:
         try:
             self.observer.stop()
             self.observer.join(timeout=5.0)
+            if self.event_handler:
+                self.event_handler.event_bridge.stop()
+                self.event_handler = None
             self.is_running = False
             self.watched_paths.clear()
             logger.info("File watcher stopped")
@@ -204,6 +210,11 @@ class FileWatcher:
             "is_running": self.is_running,
             "watched_paths": self.watched_paths,
             "observer_alive": self.observer.is_alive() if self.observer else False,
+            "events": (
+                self.event_handler.event_bridge.get_stats()
+                if self.event_handler
+                else {}
+            ),
         }
 
 
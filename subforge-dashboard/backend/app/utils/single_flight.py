@@ -0,0 +1,57 @@
+"""
+Per-key deduplication of concurrent async computations
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """
+    Runs one computation per key at a time
+
+    While a computation for a key is in flight, further callers for that key
+    await its outcome instead of starting their own; ``on_coalesced`` is
+    called for each of them. If the leading caller is cancelled, waiting
+    callers compute for themselves rather than inheriting the cancellation.
+    """
+
+    def __init__(self, on_coalesced: Optional[Callable[[Hashable], None]] = None):
+        self.on_coalesced = on_coalesced
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of ``compute``, shared with concurrent callers for ``key``"""
+        future = self._inflight.get(key)
+        if future is not None:
+            if self.on_coalesced is not None:
+                self.on_coalesced(key)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leading caller was cancelled; compute for ourselves
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await compute()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unshared failure is not reported as unhandled
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
@@ -15,6 +15,7 @@ from fastapi import WebSocket
 from pydantic import BaseModel
 
 from ..core.config import settings
+from .send_queue import ConnectionSender, SlowConsumerPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +99,7 @@ class EnhancedConnectionManager:
         # Core connection management
         self.active_connections: Dict[str, WebSocket] = {}
         self.connection_info: Dict[str, ConnectionInfo] = {}
+        self.senders: Dict[str, ConnectionSender] = {}  # connection_id -> send queue
 
         # Room management
         self.rooms: Dict[str, Set[str]] = defaultdict(
@@ -168,6 +170,12 @@ class EnhancedConnectionManager:
 
             # Store connection
             self.active_connections[connection_id] = websocket
+            self.senders[connection_id] = ConnectionSender(
+                websocket,
+                max_queue=settings.WEBSOCKET_SEND_QUEUE_SIZE,
+                policy=SlowConsumerPolicy(settings.WEBSOCKET_SLOW_CONSUMER_POLICY),
+                on_failure=lambda: self.disconnect(connection_id),
+            )
 
             # Create connection info
             info = ConnectionInfo(
@@ -201,6 +209,9 @@ class EnhancedConnectionManager:
             logger.error(f"Error connecting WebSocket: {e}")
             if connection_id in self.active_connections:
                 del self.active_connections[connection_id]
+            sender = self.senders.pop(connection_id, None)
+            if sender:
+                sender.close()
             raise
 
     async def disconnect(self, connection_id: str):
@@ -228,6 +239,9 @@ class EnhancedConnectionManager:
                 )
 
             # Clean up
+            sender = self.senders.pop(connection_id, None)
+            if sender:
+                sender.close()
             websocket = self.active_connections.pop(connection_id, None)
             if websocket:
                 try:
@@ -380,32 +394,38 @@ class EnhancedConnectionManager:
             )
             return False
 
+    def _serialize(self, message: WebSocketMessage) -> str:
+        """Stamp a message and serialize it once for any number of recipients"""
+        if not message.timestamp:
+            message.timestamp = datetime.utcnow().isoformat()
+        if not message.message_id:
+            message.message_id = str(uuid.uuid4())
+        return message.json()
+
+    def _enqueue(
+        self, connection_id: str, payload: str, coalesce_key: Optional[str] = None
+    ) -> bool:
+        """Queue a serialized payload on a connection's send queue"""
+        sender = self.senders.get(connection_id)
+        if not sender or not sender.enqueue(payload, coalesce_key):
+            return False
+
+        # Update connection stats
+        info = self.connection_info.get(connection_id)
+        if info:
+            info.message_count += 1
+            info.last_activity = datetime.utcnow()
+        return True
+
     async def send_to_connection(
         self, connection_id: str, message: WebSocketMessage
     ) -> bool:
         """Send a message to a specific connection"""
-        websocket = self.active_connections.get(connection_id)
-        if not websocket:
+        if connection_id not in self.active_connections:
             return False
 
         try:
-            # Add message metadata
-            if not message.timestamp:
-                message.timestamp = datetime.utcnow().isoformat()
-            if not message.message_id:
-                message.message_id = str(uuid.uuid4())
-
-            # Send message
-            await websocket.send_json(message.dict())
-
-            # Update connection stats
-            if connection_id in self.connection_info:
-                info = self.connection_info[connection_id]
-                info.message_count += 1
-                info.last_activity = datetime.utcnow()
-
-            return True
-
+            return self._enqueue(connection_id, self._serialize(message))
         except Exception as e:
             logger.warning(f"Failed to send message to {connection_id}: {e}")
             await self.disconnect(connection_id)
@@ -426,52 +446,49 @@ class EnhancedConnectionManager:
         room_name: str,
         message: WebSocketMessage,
         exclude_connection: Optional[str] = None,
+        coalesce_key: Optional[str] = None,
     ) -> int:
         """Broadcast a message to all connections in a room"""
         if room_name not in self.rooms:
             return 0
 
         message.room = room_name
-        sent_count = 0
-        connections_to_remove = []
-
-        for connection_id in list(self.rooms[room_name]):
-            if connection_id == exclude_connection:
-                continue
-
-            success = await self.send_to_connection(connection_id, message)
-            if success:
-                sent_count += 1
-            else:
-                connections_to_remove.append(connection_id)
+        payload = self._serialize(message)
 
-        # Clean up failed connections
-        for connection_id in connections_to_remove:
-            await self.disconnect(connection_id)
-
-        return sent_count
+        return self._fan_out(
+            list(self.rooms[room_name]), payload, exclude_connection, coalesce_key
+        )
 
     async def broadcast_to_all(
-        self, message: WebSocketMessage, exclude_connection: Optional[str] = None
+        self,
+        message: WebSocketMessage,
+        exclude_connection: Optional[str] = None,
+        coalesce_key: Optional[str] = None,
     ) -> int:
         """Broadcast a message to all active connections"""
-        sent_count = 0
-        connections_to_remove = []
+        payload = self._serialize(message)
+
+        return self._fan_out(
+            list(self.active_connections.keys()),
+            payload,
+            exclude_connection,
+            coalesce_key,
+        )
 
-        for connection_id in list(self.active_connections.keys()):
+    def _fan_out(
+        self,
+        connection_ids: List[str],
+        payload: str,
+        exclude_connection: Optional[str],
+        coalesce_key: Optional[str],
+    ) -> int:
+        """Enqueue one serialized payload on each connection's send queue"""
+        sent_count = 0
+        for connection_id in connection_ids:
             if connection_id == exclude_connection:
                 continue
-
-            success = await self.send_to_connection(connection_id, message)
-            if success:
+            if self._enqueue(connection_id, payload, coalesce_key):
                 sent_count += 1
-            else:
-                connections_to_remove.append(connection_id)
-
-        # Clean up failed connections
-        for connection_id in connections_to_remove:
-            await self.disconnect(connection_id)
-
         return sent_count
 
     async def add_to_event_history(
@@ -585,6 +602,10 @@ class EnhancedConnectionManager:
             "message_queue_size": sum(
                 len(queue) for queue in self.message_queue.values()
             ),
+            "send_queue_size": sum(sender.pending for sender in self.senders.values()),
+            "dropped_messages": sum(
+                sender.dropped_count for sender in self.senders.values()
+            ),
         }
 
     async def _periodic_cleanup(self):
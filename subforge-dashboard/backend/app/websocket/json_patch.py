@@ -0,0 +1,88 @@
+"""
+Minimal JSON Patch (RFC 6902) diff/apply for WebSocket delta updates
+"""
+
+import copy
+from typing import Any, Dict, List
+
+Patch = List[Dict[str, Any]]
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> Patch:
+    """
+    Build the add/remove/replace operations that turn ``old`` into ``new``
+
+    Objects are diffed key by key and arrays element by element, so appending
+    to a list (the common case for activity logs) yields one ``add`` per new
+    element rather than a copy of the whole list.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: Patch = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(str(key))}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(str(key))}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(make_patch(old[key], value, child))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        common = min(len(old), len(new))
+        for index in range(common):
+            ops.extend(make_patch(old[index], new[index], f"{path}/{index}"))
+        for index in range(common, len(new)):
+            ops.append({"op": "add", "path": f"{path}/{index}", "value": new[index]})
+        # Remove from the tail so earlier indexes stay valid
+        for index in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+        return ops
+
+    if old == new and type(old) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def apply_patch(document: Any, patch: Patch) -> Any:
+    """Apply a patch produced by make_patch, returning a new document"""
+    result = copy.deepcopy(document)
+
+    for operation in patch:
+        path = operation["path"]
+        if path == "":
+            result = copy.deepcopy(operation["value"])
+            continue
+
+        tokens = [_unescape(token) for token in path.split("/")[1:]]
+        parent = result
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+
+        last = tokens[-1]
+        op = operation["op"]
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if op == "add":
+                parent.insert(index, copy.deepcopy(operation["value"]))
+            elif op == "remove":
+                del parent[index]
+            else:
+                parent[index] = copy.deepcopy(operation["value"])
+        else:
+            if op == "remove":
+                del parent[last]
+            else:
+                parent[last] = copy.deepcopy(operation["value"])
+
+    return result
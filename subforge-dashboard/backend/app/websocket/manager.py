@@ -6,10 +6,13 @@ import asyncio
 import json
 import logging
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from fastapi import WebSocket, WebSocketDisconnect
 
+from ..core.config import settings
+from .send_queue import ConnectionSender, SlowConsumerPolicy
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,6 +24,8 @@ class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
         self.connection_metadata: Dict[WebSocket, Dict[str, Any]] = {}
+        self.senders: Dict[WebSocket, ConnectionSender] = {}
+        self.topics: Dict[str, Set[WebSocket]] = {}
 
     async def connect(
         self, websocket: WebSocket, client_info: Optional[Dict[str, Any]] = None
@@ -31,6 +36,7 @@ class ConnectionManager:
         try:
             await websocket.accept()
             self.active_connections.append(websocket)
+            self.senders[websocket] = self._create_sender(websocket)
 
             # Store connection metadata
             metadata = {
@@ -38,6 +44,8 @@ class ConnectionManager:
                 "client_info": client_info or {},
                 "message_count": 0,
                 "last_activity": datetime.utcnow(),
+                "topics": set(),
+                "acked_versions": {},
             }
             self.connection_metadata[websocket] = metadata
 
@@ -63,6 +71,42 @@ class ConnectionManager:
             if websocket in self.active_connections:
                 self.active_connections.remove(websocket)
 
+    def _create_sender(self, websocket: WebSocket) -> ConnectionSender:
+        """
+        Create the bounded send queue and writer task for a connection
+        """
+
+        async def on_failure():
+            # Tell the client why before dropping it, so it can reconnect
+            try:
+                await websocket.close(code=1008)
+            except Exception as e:
+                logger.debug(f"WebSocket already closed: {e}")
+            self.disconnect(websocket)
+
+        return ConnectionSender(
+            websocket,
+            max_queue=settings.WEBSOCKET_SEND_QUEUE_SIZE,
+            policy=SlowConsumerPolicy(settings.WEBSOCKET_SLOW_CONSUMER_POLICY),
+            on_failure=on_failure,
+        )
+
+    def _enqueue(
+        self, websocket: WebSocket, payload: str, coalesce_key: Optional[str] = None
+    ) -> bool:
+        """
+        Queue a serialized payload for a connection and update its metadata
+        """
+        sender = self.senders.get(websocket)
+        if sender is None or not sender.enqueue(payload, coalesce_key):
+            return False
+
+        metadata = self.connection_metadata.get(websocket)
+        if metadata is not None:
+            metadata["message_count"] += 1
+            metadata["last_activity"] = datetime.utcnow()
+        return True
+
     def disconnect(self, websocket: WebSocket):
         """
         Remove a WebSocket connection
@@ -70,6 +114,12 @@ class ConnectionManager:
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
 
+        sender = self.senders.pop(websocket, None)
+        if sender is not None:
+            sender.close()
+
+        self.unsubscribe(websocket)
+
         if websocket in self.connection_metadata:
             metadata = self.connection_metadata.pop(websocket)
             duration = datetime.utcnow() - metadata["connected_at"]
@@ -94,21 +144,87 @@ class ConnectionManager:
                 "timestamp": datetime.utcnow().isoformat(),
             }
 
-            await websocket.send_json(message_with_timestamp)
-
-            # Update metadata
-            if websocket in self.connection_metadata:
-                self.connection_metadata[websocket]["message_count"] += 1
-                self.connection_metadata[websocket]["last_activity"] = datetime.utcnow()
+            # Goes through the connection's queue so it stays ordered with broadcasts
+            self._enqueue(websocket, json.dumps(message_with_timestamp, default=str))
 
         except Exception as e:
             logger.warning(f"Failed to send personal message: {e}")
             # Connection might be broken, remove it
             self.disconnect(websocket)
 
-    async def broadcast_json(self, message: Dict[str, Any]):
+    def send_text(
+        self, websocket: WebSocket, payload: str, coalesce_key: Optional[str] = None
+    ) -> bool:
+        """
+        Queue an already-serialized payload for a single connection
+        """
+        return self._enqueue(websocket, payload, coalesce_key)
+
+    def subscribe(self, websocket: WebSocket, topic: str):
+        """
+        Subscribe a connection to a topic
+        """
+        self.topics.setdefault(topic, set()).add(websocket)
+        metadata = self.connection_metadata.get(websocket)
+        if metadata is not None:
+            metadata.setdefault("topics", set()).add(topic)
+
+    def unsubscribe(self, websocket: WebSocket, topic: Optional[str] = None):
+        """
+        Unsubscribe a connection from a topic, or from every topic if none is given
+        """
+        metadata = self.connection_metadata.get(websocket, {})
+        subscribed = metadata.get("topics", set())
+        if topic is None:
+            topics = list(subscribed) or [
+                name for name, members in self.topics.items() if websocket in members
+            ]
+        else:
+            topics = [topic]
+
+        for name in topics:
+            members = self.topics.get(name)
+            if members is not None:
+                members.discard(websocket)
+                if not members:
+                    del self.topics[name]
+            subscribed.discard(name)
+
+    def get_subscribers(self, topic: str) -> List[WebSocket]:
+        """
+        Get the connections subscribed to a topic
+        """
+        return list(self.topics.get(topic, ()))
+
+    async def publish_json(
+        self,
+        topic: str,
+        message: Dict[str, Any],
+        coalesce_key: Optional[str] = None,
+    ):
+        """
+        Send a JSON message to the subscribers of a topic only
+        """
+        subscribers = self.topics.get(topic)
+        if not subscribers:
+            return
+
+        payload = json.dumps(
+            {**message, "timestamp": datetime.utcnow().isoformat()}, default=str
+        )
+        for connection in list(subscribers):
+            self._enqueue(connection, payload, coalesce_key)
+
+    async def broadcast_json(
+        self, message: Dict[str, Any], coalesce_key: Optional[str] = None
+    ):
         """
         Broadcast a JSON message to all connected clients
+
+        The message is serialized once and queued on every connection; slow
+        clients are handled by their own send queue instead of delaying others.
+        Messages sharing a ``coalesce_key`` may replace each other in the queue
+        of a client that has fallen behind.
         """
         if not self.active_connections:
             return
@@ -118,63 +234,33 @@ class ConnectionManager:
             "timestamp": datetime.utcnow().isoformat(),
             "broadcast_id": id(message),
         }
+        payload = json.dumps(message_with_timestamp, default=str)
 
-        # Create list copy to avoid modification during iteration
-        connections_copy = self.active_connections.copy()
-        disconnected_connections = []
-
-        for connection in connections_copy:
-            try:
-                await connection.send_json(message_with_timestamp)
-
-                # Update metadata
-                if connection in self.connection_metadata:
-                    self.connection_metadata[connection]["message_count"] += 1
-                    self.connection_metadata[connection][
-                        "last_activity"
-                    ] = datetime.utcnow()
+        await self.broadcast_text(payload, coalesce_key=coalesce_key)
 
-            except Exception as e:
-                logger.warning(f"Failed to broadcast to connection: {e}")
-                disconnected_connections.append(connection)
-
-        # Clean up disconnected connections
-        for connection in disconnected_connections:
-            self.disconnect(connection)
-
-        if disconnected_connections:
-            logger.info(
-                f"Cleaned up {len(disconnected_connections)} disconnected WebSocket connections"
-            )
-
-    async def broadcast_text(self, message: str):
+    async def broadcast_text(self, message: str, coalesce_key: Optional[str] = None):
         """
         Broadcast a text message to all connected clients
         """
         if not self.active_connections:
             return
 
-        connections_copy = self.active_connections.copy()
-        disconnected_connections = []
-
-        for connection in connections_copy:
-            try:
-                await connection.send_text(message)
-
-                # Update metadata
-                if connection in self.connection_metadata:
-                    self.connection_metadata[connection]["message_count"] += 1
-                    self.connection_metadata[connection][
-                        "last_activity"
-                    ] = datetime.utcnow()
-
-            except Exception as e:
-                logger.warning(f"Failed to broadcast text to connection: {e}")
-                disconnected_connections.append(connection)
+        # Create list copy to avoid modification during iteration
+        for connection in self.active_connections.copy():
+            self._enqueue(connection, message, coalesce_key)
 
-        # Clean up disconnected connections
-        for connection in disconnected_connections:
-            self.disconnect(connection)
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """
+        Get send queue depth and drop counts across connections
+        """
+        senders = list(self.senders.values())
+        return {
+            "connections": len(senders),
+            "queued_messages": sum(sender.pending for sender in senders),
+            "max_queue_depth": max((sender.pending for sender in senders), default=0),
+            "dropped_messages": sum(sender.dropped_count for sender in senders),
+            "topics": {topic: len(members) for topic, members in self.topics.items()},
+        }
 
     def get_connection_count(self) -> int:
         """
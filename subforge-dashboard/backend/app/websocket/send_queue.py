@@ -0,0 +1,111 @@
+"""
+Per-connection send queues for WebSocket fan-out
+"""
+
+import asyncio
+import logging
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SlowConsumerPolicy(str, Enum):
+    """What to do when a connection's send queue is full"""
+
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+class ConnectionSender:
+    """
+    Bounded outgoing queue for one WebSocket, drained by its own writer task
+
+    Broadcasters enqueue pre-serialized payloads and return immediately, so a
+    slow client only ever delays itself. When the queue is full the
+    configured slow-consumer policy decides what gives:
+
+    - ``DROP_OLDEST`` discards the oldest queued payload
+    - ``COALESCE`` replaces a queued payload with the same coalesce key
+      (e.g. the previous update for the same workflow), falling back to
+      dropping the oldest
+    - ``DISCONNECT`` closes the connection
+    """
+
+    def __init__(
+        self,
+        websocket: Any,
+        max_queue: int = 256,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.COALESCE,
+        on_failure: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.policy = policy
+        self.on_failure = on_failure
+
+        self._queue: Deque[Tuple[Optional[str], str]] = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.sent_count = 0
+        self.dropped_count = 0
+        self._task = asyncio.create_task(self._writer())
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, payload: str, coalesce_key: Optional[str] = None) -> bool:
+        """Queue a serialized payload; returns False if the connection is closing"""
+        if self._closed:
+            return False
+
+        if len(self._queue) >= self.max_queue:
+            if self.policy == SlowConsumerPolicy.DISCONNECT:
+                logger.warning("WebSocket send queue full, disconnecting slow consumer")
+                self._fail()
+                return False
+
+            if self.policy == SlowConsumerPolicy.COALESCE and coalesce_key is not None:
+                for index, (key, _) in enumerate(self._queue):
+                    if key == coalesce_key:
+                        self._queue[index] = (coalesce_key, payload)
+                        self.dropped_count += 1
+                        return True
+
+            self._queue.popleft()
+            self.dropped_count += 1
+
+        self._queue.append((coalesce_key, payload))
+        self._ready.set()
+        return True
+
+    def close(self):
+        """Stop the writer task and discard anything still queued"""
+        self._closed = True
+        self._queue.clear()
+        if not self._task.done():
+            self._task.cancel()
+
+    def _fail(self):
+        self.close()
+        if self.on_failure:
+            asyncio.create_task(self.on_failure())
+
+    async def _writer(self):
+        while True:
+            await self._ready.wait()
+            while self._queue:
+                _, payload = self._queue.popleft()
+                try:
+                    await self.websocket.send_text(payload)
+                    self.sent_count += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Failed to send to WebSocket connection: {e}")
+                    self._fail()
+                    return
+            self._ready.clear()
@@ -0,0 +1,218 @@
+"""
+Per-workflow WebSocket topics with versioned delta updates
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.config import settings
+from .json_patch import make_patch
+from .manager import ConnectionManager, websocket_manager
+
+logger = logging.getLogger(__name__)
+
+WORKFLOW_LIST_TOPIC = "list"
+
+
+def workflow_topic(workflow_id: str) -> str:
+    return f"workflow:{workflow_id}"
+
+
+class WorkflowTopicPublisher:
+    """
+    Publishes workflow snapshots to the subscribers of each workflow
+
+    Every distinct snapshot of a workflow gets a new version and the last
+    ``history_size`` versions are kept. A subscriber receives a JSON patch
+    against the newest version it has acknowledged (``ack_workflow``), or the
+    full snapshot if it has not acknowledged one yet or has fallen further
+    behind than the retained history. Clients should therefore keep each
+    version they receive until they have acknowledged a newer one.
+
+    Deltas are always computed from the acknowledged base, so a queued update
+    coalesced away by a slow connection's send queue is simply superseded by
+    the next one.
+    """
+
+    def __init__(self, manager: ConnectionManager, history_size: int = 8):
+        self.manager = manager
+        self.history_size = max(history_size, 1)
+        self._history: Dict[str, "OrderedDict[int, Dict[str, Any]]"] = {}
+        self._versions: Dict[str, int] = {}
+        self.snapshots_sent = 0
+        self.deltas_sent = 0
+
+    def record(self, workflow_id: str, snapshot: Dict[str, Any]) -> Tuple[int, bool]:
+        """
+        Store a snapshot as the workflow's newest version
+
+        Returns ``(version, changed)``; an identical snapshot keeps the
+        current version.
+        """
+        # Normalize through JSON so datetimes etc. compare the way clients see them
+        snapshot = json.loads(json.dumps(snapshot, default=str))
+
+        history = self._history.setdefault(workflow_id, OrderedDict())
+        current = self._versions.get(workflow_id)
+        if current is not None and history.get(current) == snapshot:
+            return current, False
+
+        version = (current or 0) + 1
+        self._versions[workflow_id] = version
+        history[version] = snapshot
+        while len(history) > self.history_size:
+            history.popitem(last=False)
+        return version, True
+
+    def current(self, workflow_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Newest (version, snapshot) for a workflow, if any"""
+        version = self._versions.get(workflow_id)
+        if version is None:
+            return None
+        return version, self._history[workflow_id][version]
+
+    def forget(self, workflow_id: str):
+        """Drop the version history of a removed workflow"""
+        self._history.pop(workflow_id, None)
+        self._versions.pop(workflow_id, None)
+
+    def subscribe(
+        self, websocket: Any, workflow_id: str, snapshot: Dict[str, Any]
+    ) -> int:
+        """Subscribe a connection to a workflow; returns the version to send it"""
+        self.manager.subscribe(websocket, workflow_topic(workflow_id))
+        self._acked_versions(websocket).pop(workflow_id, None)
+        version, _ = self.record(workflow_id, snapshot)
+        return version
+
+    def unsubscribe(self, websocket: Any, workflow_id: str):
+        self.manager.unsubscribe(websocket, workflow_topic(workflow_id))
+        self._acked_versions(websocket).pop(workflow_id, None)
+
+    def acknowledge(self, websocket: Any, workflow_id: str, version: int):
+        """Record that a client has applied ``version`` of a workflow"""
+        acked = self._acked_versions(websocket)
+        if version > acked.get(workflow_id, 0):
+            acked[workflow_id] = version
+
+    def resync(self, websocket: Any, workflow_id: str) -> bool:
+        """Send the full current snapshot to one client"""
+        current = self.current(workflow_id)
+        if current is None:
+            return False
+        self._acked_versions(websocket).pop(workflow_id, None)
+        version, snapshot = current
+        self.manager.send_text(
+            websocket,
+            self._snapshot_payload(workflow_id, version, snapshot, False),
+            coalesce_key=workflow_topic(workflow_id),
+        )
+        self.snapshots_sent += 1
+        return True
+
+    async def publish(
+        self, workflow_id: str, snapshot: Dict[str, Any], is_new: bool = False
+    ) -> int:
+        """
+        Record a new snapshot and send each subscriber a delta or full resync
+
+        Subscribers acknowledging the same base share one serialized payload.
+        Returns the version published.
+        """
+        version, changed = self.record(workflow_id, snapshot)
+        topic = workflow_topic(workflow_id)
+        subscribers = self.manager.get_subscribers(topic)
+        if not changed or not subscribers:
+            return version
+
+        history = self._history[workflow_id]
+        current = history[version]
+        payloads: Dict[Optional[int], Tuple[str, bool]] = {}
+
+        for websocket in subscribers:
+            base = self._acked_versions(websocket).get(workflow_id)
+            if base not in history or base == version:
+                base = None
+
+            if base not in payloads:
+                payloads[base] = self._build_payload(
+                    workflow_id, base, version, history, current, is_new
+                )
+            payload, is_delta = payloads[base]
+
+            if self.manager.send_text(websocket, payload, coalesce_key=topic):
+                if is_delta:
+                    self.deltas_sent += 1
+                else:
+                    self.snapshots_sent += 1
+
+        return version
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workflows": len(self._versions),
+            "snapshots_sent": self.snapshots_sent,
+            "deltas_sent": self.deltas_sent,
+        }
+
+    def _acked_versions(self, websocket: Any) -> Dict[str, int]:
+        metadata = self.manager.connection_metadata.get(websocket)
+        if metadata is None:
+            return {}
+        return metadata.setdefault("acked_versions", {})
+
+    def _build_payload(
+        self,
+        workflow_id: str,
+        base: Optional[int],
+        version: int,
+        history: "OrderedDict[int, Dict[str, Any]]",
+        current: Dict[str, Any],
+        is_new: bool,
+    ) -> Tuple[str, bool]:
+        """Serialized message for subscribers at ``base``, and whether it is a delta"""
+        snapshot_payload = self._snapshot_payload(workflow_id, version, current, is_new)
+        if base is None:
+            return snapshot_payload, False
+
+        delta_payload = json.dumps(
+            {
+                "type": "subforge_workflow_delta",
+                "data": {
+                    "workflow_id": workflow_id,
+                    "base_version": base,
+                    "version": version,
+                    "patch": make_patch(history[base], current),
+                },
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+        )
+        # A rewrite-heavy patch can outweigh the snapshot it replaces
+        if len(delta_payload) < len(snapshot_payload):
+            return delta_payload, True
+        return snapshot_payload, False
+
+    def _snapshot_payload(
+        self, workflow_id: str, version: int, snapshot: Dict[str, Any], is_new: bool
+    ) -> str:
+        return json.dumps(
+            {
+                "type": "subforge_workflow_snapshot",
+                "data": {
+                    "workflow_id": workflow_id,
+                    "version": version,
+                    "workflow": snapshot,
+                    "is_new": is_new,
+                },
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+        )
+
+
+# Global publisher for SubForge workflow topics
+workflow_publisher = WorkflowTopicPublisher(
+    websocket_manager, history_size=settings.WEBSOCKET_DELTA_HISTORY
+)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Backfill or rebuild metric rollup buckets from workflow history
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.database.session import AsyncSessionLocal, async_engine
+from app.services.rollups import rollup_service
+
+
+async def rebuild(start: datetime, end: datetime, chunk_days: int):
+    """Rebuild the range one chunk per transaction"""
+    totals = {"buckets": 0, "workflows": 0, "phases": 0}
+    # Whole days, so no day is rebuilt by two chunks
+    chunk_start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    try:
+        while chunk_start < end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days), end)
+            async with AsyncSessionLocal() as session:
+                result = await rollup_service.rebuild(session, chunk_start, chunk_end)
+                await session.commit()
+            for key, value in result.items():
+                totals[key] += value
+            print(
+                f"   {chunk_start.date()} .. {chunk_end.date()}: "
+                f"{result['buckets']} buckets"
+            )
+            chunk_start = chunk_end
+    finally:
+        await async_engine.dispose()
+    return totals
+
+
+def main():
+    """Main entry point for the rollup backfill"""
+    parser = argparse.ArgumentParser(
+        description="Rebuild SubForge metric rollups from workflow history"
+    )
+    parser.add_argument(
+        "--days", type=int, default=30, help="Rebuild this many days back from now"
+    )
+    parser.add_argument(
+        "--start", type=datetime.fromisoformat, default=None, help="Start (ISO date)"
+    )
+    parser.add_argument(
+        "--end", type=datetime.fromisoformat, default=None, help="End (ISO date)"
+    )
+    parser.add_argument(
+        "--chunk-days", type=int, default=7, help="Days rebuilt per transaction"
+    )
+
+    args = parser.parse_args()
+
+    end = args.end or datetime.utcnow()
+    start = args.start or end - timedelta(days=args.days)
+
+    print(f"🔁 Rebuilding metric rollups from {start} to {end}")
+    totals = asyncio.run(rebuild(start, end, max(args.chunk_days, 1)))
+    print(
+        f"✅ {totals['buckets']} buckets from {totals['workflows']} workflows "
+        f"and {totals['phases']} phases"
+    )
+
+
+if __name__ == "__main__":
+    main()
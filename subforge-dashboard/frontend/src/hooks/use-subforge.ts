@@ -1,7 +1,8 @@
 'use client'
 
-import { useState, useEffect, useCallback } from 'react'
+import { useState, useEffect, useCallback, useRef } from 'react'
 import { useWebSocket } from './use-websocket'
+import { applyPatch } from '@/utils/json-patch'
 import {
   WorkflowData,
   WorkflowSummary,
@@ -16,6 +17,8 @@ import {
 } from '@/types/subforge'
 
 const API_BASE_URL = 'http://localhost:8000/api/subforge'
+// Versions kept per workflow as delta bases (backend WEBSOCKET_DELTA_HISTORY)
+const MAX_WORKFLOW_VERSIONS = 8
 
 interface UseSubForgeState {
   workflows: WorkflowSummary[]
@@ -58,6 +61,13 @@ export function useSubForge(): UseSubForgeReturn {
 
   const { isConnected, data, sendMessage } = useWebSocket()
 
+  // Workflow versions received so far; deltas are patches against one of them
+  const workflowVersions = useRef<Record<string, Record<number, WorkflowData>>>({})
+  // sendMessage is recreated on every provider render; the message handler
+  // reads it through a ref so a new identity does not replay the last message
+  const sendMessageRef = useRef(sendMessage)
+  sendMessageRef.current = sendMessage
+
   // API utility function
   const apiCall = useCallback(async <T>(endpoint: string, options?: RequestInit): Promise<T | null> => {
     try {
@@ -177,8 +187,27 @@ export function useSubForge(): UseSubForgeReturn {
     if (isConnected) {
       sendMessage('unsubscribe_workflow', { workflow_id: workflowId })
     }
+    delete workflowVersions.current[workflowId]
   }, [isConnected, sendMessage])
 
+  // Show a workflow version, keep it as a delta base and acknowledge it
+  const applyWorkflowVersion = useCallback((workflowId: string, version: number, workflow: WorkflowData) => {
+    const versions = workflowVersions.current[workflowId] || {}
+    versions[version] = workflow
+    Object.keys(versions)
+      .map(Number)
+      .filter(kept => kept <= version - MAX_WORKFLOW_VERSIONS)
+      .forEach(kept => delete versions[kept])
+    workflowVersions.current[workflowId] = versions
+
+    setState(prev => ({
+      ...prev,
+      currentWorkflow: workflow,
+      recentActivities: workflow.agent_activities?.slice(-10) || []
+    }))
+    sendMessageRef.current('ack_workflow', { workflow_id: workflowId, version })
+  }, [])
+
   // Refresh all data
   const refreshData = useCallback(async () => {
     await Promise.all([
@@ -220,10 +249,29 @@ export function useSubForge(): UseSubForgeReturn {
 
       case 'workflow_event':
       case 'subforge_workflow_update':
+      case 'subforge_workflow_list_update':
         // Workflow updated, refresh workflows list
         fetchWorkflows()
         break
 
+      case 'subforge_workflow_snapshot':
+        // Full snapshot for a subscribed workflow
+        applyWorkflowVersion(message.data.workflow_id, message.data.version, message.data.workflow)
+        break
+
+      case 'subforge_workflow_delta': {
+        // Patch against a version we acknowledged earlier
+        const { workflow_id, base_version, version, patch } = message.data
+        const base = workflowVersions.current[workflow_id]?.[base_version]
+        if (base) {
+          applyWorkflowVersion(workflow_id, version, applyPatch(base, patch))
+        } else {
+          // Base no longer held; ask for a full snapshot instead
+          sendMessageRef.current('resync_workflow', { workflow_id })
+        }
+        break
+      }
+
       case 'subforge_scan_complete':
         // Scan completed, refresh data
         setState(prev => ({ ...prev, error: null }))
@@ -239,11 +287,7 @@ export function useSubForge(): UseSubForgeReturn {
 
       case 'workflow_subscribed':
         if (message.data.workflow) {
-          setState(prev => ({ 
-            ...prev, 
-            currentWorkflow: message.data.workflow,
-            recentActivities: message.data.workflow.agent_activities?.slice(-10) || []
-          }))
+          applyWorkflowVersion(message.data.workflow_id, message.data.version, message.data.workflow)
         }
         break
 
@@ -262,7 +306,7 @@ export function useSubForge(): UseSubForgeReturn {
       default:
         console.debug('Unhandled SubForge WebSocket message:', message.type)
     }
-  }, [data, fetchWorkflows])
+  }, [data, fetchWorkflows, applyWorkflowVersion])
 
   // Initial data fetch
   useEffect(() => {
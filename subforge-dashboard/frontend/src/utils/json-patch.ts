@@ -0,0 +1,54 @@
+/**
+ * Minimal JSON Patch (RFC 6902) apply for SubForge workflow deltas
+ * Mirrors backend/app/websocket/json_patch.py: add, remove and replace only
+ */
+
+export interface JsonPatchOperation {
+  op: 'add' | 'remove' | 'replace'
+  path: string
+  value?: any
+}
+
+const clone = <T>(value: T): T =>
+  value === undefined ? value : JSON.parse(JSON.stringify(value))
+
+const unescapeToken = (token: string): string =>
+  token.replace(/~1/g, '/').replace(/~0/g, '~')
+
+/**
+ * Apply a patch produced by the backend's make_patch, returning a new document
+ */
+export function applyPatch<T>(document: T, patch: JsonPatchOperation[]): T {
+  let result: any = clone(document)
+
+  for (const operation of patch) {
+    if (operation.path === '') {
+      result = clone(operation.value)
+      continue
+    }
+
+    const tokens = operation.path.split('/').slice(1).map(unescapeToken)
+    let parent = result
+    for (const token of tokens.slice(0, -1)) {
+      parent = Array.isArray(parent) ? parent[Number(token)] : parent[token]
+    }
+
+    const last = tokens[tokens.length - 1]
+    if (Array.isArray(parent)) {
+      const index = last === '-' ? parent.length : Number(last)
+      if (operation.op === 'add') {
+        parent.splice(index, 0, clone(operation.value))
+      } else if (operation.op === 'remove') {
+        parent.splice(index, 1)
+      } else {
+        parent[index] = clone(operation.value)
+      }
+    } else if (operation.op === 'remove') {
+      delete parent[last]
+    } else {
+      parent[last] = clone(operation.value)
+    }
+  }
+
+  return result
+}
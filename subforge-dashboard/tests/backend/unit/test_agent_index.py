@@ -0,0 +1,216 @@
+"""
+Unit tests for the Redis secondary indexes behind agent listing
+"""
+
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from app.services.agent_index import AgentIndex, lex_score
+
+
+class FakePipeline:
+    """Buffers commands after multi() and runs them on execute()"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.buffered = []
+        self.immediate = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def watch(self, *keys):
+        self.immediate = True
+
+    def multi(self):
+        self.immediate = False
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+        if self.immediate:
+            return command
+
+        def buffer(*args, **kwargs):
+            self.buffered.append((command, args, kwargs))
+            return self
+
+        return buffer
+
+    async def execute(self):
+        results = [await command(*a, **kw) for command, a, kw in self.buffered]
+        self.buffered = []
+        return results
+
+
+class FakeRedis:
+    """In-memory subset of the aioredis commands used by AgentIndex"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def set(self, key, value):
+        self.data[key] = value
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def hset(self, name, key, value):
+        self.data.setdefault(name, {})[key] = value
+
+    async def hdel(self, name, *keys):
+        return sum(self.data.get(name, {}).pop(k, None) is not None for k in keys)
+
+    async def hmget(self, name, keys):
+        return [self.data.get(name, {}).get(key) for key in keys]
+
+    async def hscan_iter(self, name):
+        for item in list(self.data.get(name, {}).items()):
+            yield item
+
+    async def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        for key in list(self.data):
+            if key.startswith(prefix):
+                yield key
+
+    async def sadd(self, name, *values):
+        self.data.setdefault(name, set()).update(values)
+
+    async def srem(self, name, *values):
+        self.data.get(name, set()).difference_update(values)
+
+    async def smembers(self, name):
+        return set(self.data.get(name, set()))
+
+    async def sunionstore(self, dest, keys):
+        self.data[dest] = set().union(*(self.data.get(k, set()) for k in keys))
+
+    async def zadd(self, name, mapping):
+        self.data.setdefault(name, {}).update(mapping)
+
+    async def zrem(self, name, *members):
+        for member in members:
+            self.data.get(name, {}).pop(member, None)
+
+    async def zinterstore(self, dest, weights, aggregate="SUM"):
+        sources = [
+            (self.data.get(key, {}), weight) for key, weight in weights.items()
+        ]
+        common = set.intersection(*(set(source) for source, _ in sources))
+        self.data[dest] = {
+            member: sum(
+                (source[member] if isinstance(source, dict) else 1) * weight
+                for source, weight in sources
+            )
+            for member in common
+        }
+
+    async def zcard(self, name):
+        return len(self.data.get(name, {}))
+
+    async def zrange(self, name, start, end, desc=False):
+        items = sorted(
+            self.data.get(name, {}).items(),
+            key=lambda kv: (kv[1], kv[0]),
+            reverse=desc,
+        )
+        members = [member for member, _ in items]
+        return members[start:] if end == -1 else members[start : end + 1]
+
+
+def _agent(i, status="active", type="backend", tags=(), name=None):
+    created = datetime(2024, 1, 1) + timedelta(minutes=i)
+    return {
+        "id": f"agent-{i:03d}",
+        "name": name or f"Agent {i:03d}",
+        "type": type,
+        "status": status,
+        "tags": list(tags),
+        "created_at": created.isoformat(),
+        "updated_at": created.isoformat(),
+    }
+
+
+@pytest.mark.unit
+class TestAgentIndex:
+    """Tests for index maintenance and indexed page queries"""
+
+    @pytest.fixture
+    def index(self):
+        return AgentIndex(SimpleNamespace(redis_client=FakeRedis()))
+
+    def test_lex_score_orders_like_lowercase_sort(self):
+        """Test packed name scores sort like str.lower within the prefix"""
+        names = ["beta", "Alpha", "alphabet", "alp", "Zeta", "gamma 2", "gamma 10"]
+        assert sorted(names, key=lex_score) == sorted(names, key=str.lower)
+
+    async def test_filtered_sorted_page(self, index):
+        """Test filters intersect with the sort index and only the page is fetched"""
+        for i in range(20):
+            status = "active" if i % 2 == 0 else "idle"
+            tags = ["gpu"] if i % 4 == 0 else ["cpu"]
+            await index.add(_agent(i, status=status, tags=tags))
+
+        records, total = await index.query(
+            sort_by="created_at", descending=True, skip=1, limit=2, status="active"
+        )
+        assert total == 10
+        assert [r["id"] for r in records] == ["agent-016", "agent-014"]
+
+        records, total = await index.query(
+            sort_by="created_at", descending=False, tags=["gpu"], limit=3
+        )
+        assert total == 5
+        assert [r["id"] for r in records] == ["agent-000", "agent-004", "agent-008"]
+
+        _, total = await index.query(tags=["gpu", "cpu"], status="idle")
+        assert total == 10
+
+    async def test_update_moves_agent_between_filter_sets(self, index):
+        """Test re-caching an agent removes it from stale filter sets"""
+        await index.add(_agent(1, status="active", tags=["a"]))
+        await index.add(_agent(1, status="stopped", tags=["b"]))
+
+        assert (await index.query(status="active"))[1] == 0
+        assert (await index.query(tags=["a"]))[1] == 0
+        records, total = await index.query(status="stopped", tags=["b"])
+        assert total == 1
+        assert records[0]["status"] == "stopped"
+
+    async def test_remove_and_search(self, index):
+        """Test removal drops all entries and search matches names only"""
+        await index.add(_agent(1, name="Frontend Builder"))
+        await index.add(_agent(2, name="Backend Builder"))
+        await index.add(_agent(3, name="Reviewer"))
+        await index.remove("agent-002")
+
+        records, total = await index.query(sort_by="name", descending=False)
+        assert total == 2
+        assert [r["name"] for r in records] == ["Frontend Builder", "Reviewer"]
+
+        records, total = await index.query(search="builder")
+        assert total == 1
+        assert records[0]["id"] == "agent-001"
+
+    async def test_builds_indexes_for_existing_records(self, index):
+        """Test records cached before the indexes existed are indexed once"""
+        client = index.client
+        for i in range(3):
+            await client.hset("agents", f"agent-{i:03d}", json.dumps(_agent(i)))
+
+        records, total = await index.query(sort_by="created_at", descending=True)
+
+        assert total == 3
+        assert records[0]["id"] == "agent-002"
+        assert await client.exists(index.ready_key)
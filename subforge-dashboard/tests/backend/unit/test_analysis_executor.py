@@ -0,0 +1,185 @@
+"""
+Unit tests for the analysis executor and partial comprehensive reports
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pandas as pd
+import pytest
+from backend.analytics.processors.trend_analyzer import TrendAnalyzer
+from backend.analytics.services import analytics_service
+from backend.analytics.services.analysis_executor import AnalysisExecutor
+from backend.analytics.services.analytics_service import AnalyticsService
+from backend.analytics.utils.result_cache import AnalyticsResultCache
+
+
+class _InlineAnalyzer:
+    supports_offloading = False
+
+    def __init__(self):
+        self.analyze = AsyncMock(return_value={"value": 1})
+
+
+class _BrokenPool(Executor):
+    def submit(self, fn, *args, **kwargs):
+        raise BrokenProcessPool("worker died")
+
+
+def _series(values):
+    timestamps = pd.date_range("2026-10-14", periods=len(values), freq="h")
+    return pd.DataFrame({"timestamp": timestamps, "value": np.asarray(values)})
+
+
+@pytest.mark.unit
+class TestAnalysisExecutor:
+    """Tests for inline and offloaded runs and per-component gathering"""
+
+    async def test_inline_analyzer_runs_on_the_loop(self):
+        """Test analyzers without offloading support are awaited directly"""
+        executor = AnalysisExecutor(max_workers=1)
+        analyzer = _InlineAnalyzer()
+
+        result = await executor.run(analyzer, "db", time_range_hours=24)
+
+        assert result == {"value": 1}
+        analyzer.analyze.assert_awaited_once_with("db", time_range_hours=24)
+        assert executor.get_stats()["inline"] == 1
+        assert not executor.get_stats()["pool_started"]
+
+    async def test_offloaded_analyzer_runs_in_a_worker(self):
+        """Test inputs are fetched here and computed in a worker process"""
+        executor = AnalysisExecutor(max_workers=1)
+        analyzer = TrendAnalyzer()
+        inputs = {"system_load": _series(np.arange(30, dtype=float))}
+        analyzer.fetch_inputs = AsyncMock(return_value=inputs)
+        try:
+            result = await executor.run(analyzer, "db", time_range_hours=24)
+        finally:
+            executor.shutdown()
+
+        analyzer.fetch_inputs.assert_awaited_once_with("db", time_range_hours=24)
+        assert [t["metric_name"] for t in result["trends"]] == ["system_load"]
+        assert result["forecasts"]["system_load"]["next_value_prediction"] == (
+            pytest.approx(30.0)
+        )
+        assert executor.stats["offloaded"] == 1
+        assert not executor.get_stats()["pool_started"]
+
+    async def test_broken_pool_is_replaced(self):
+        """Test a crashed pool is dropped so the next run starts a new one"""
+        executor = AnalysisExecutor(max_workers=1)
+        executor._pool = _BrokenPool()
+        analyzer = TrendAnalyzer()
+        analyzer.fetch_inputs = AsyncMock(return_value={})
+
+        with pytest.raises(BrokenProcessPool):
+            await executor.run(analyzer, "db")
+        assert executor._pool is None
+
+    async def test_gather_reports_each_component_status(self):
+        """Test success, error and timeout outcomes with per-component limits"""
+        executor = AnalysisExecutor(default_timeout=5, timeouts={"slow": 0.05})
+
+        async def ok():
+            return {"value": 1}
+
+        async def failing():
+            raise ValueError("bad input")
+
+        async def slow():
+            await asyncio.sleep(5)
+
+        results = await executor.gather(
+            [("ok", ok), ("failing", failing), ("slow", slow)]
+        )
+
+        assert {name: r["status"] for name, r in results.items()} == {
+            "ok": "success",
+            "failing": "error",
+            "slow": "timeout",
+        }
+        assert results["ok"]["result"] == {"value": 1}
+        assert results["failing"] == {
+            "component": "failing",
+            "status": "error",
+            "result": {},
+            "error": "bad input",
+            "duration_seconds": results["failing"]["duration_seconds"],
+        }
+        assert results["slow"]["result"] == {}
+        assert results["slow"]["duration_seconds"] < 1
+        assert executor.stats["errors"] == 1
+        assert executor.stats["timeouts"] == 1
+
+    async def test_components_run_concurrently(self):
+        """Test the total time is that of the slowest component, not the sum"""
+        executor = AnalysisExecutor(default_timeout=5)
+
+        async def nap():
+            await asyncio.sleep(0.2)
+            return {"done": True}
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await executor.gather([(f"c{i}", nap) for i in range(5)])
+
+        assert loop.time() - started < 0.6
+        assert all(r["status"] == "success" for r in results.values())
+
+    def test_timeout_for(self):
+        """Test named timeouts override the default"""
+        executor = AnalysisExecutor(default_timeout=30, timeouts={"trend": 90})
+        assert executor.timeout_for("trend") == 90
+        assert executor.timeout_for("other") == 30
+
+
+@pytest.mark.unit
+class TestComprehensiveReportCaching:
+    """Partial reports are served but never cached"""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        service = AnalyticsService(storage_path=str(tmp_path))
+        service.cache = AnalyticsResultCache()
+        monkeypatch.setattr(
+            analytics_service, "data_watermark", AsyncMock(return_value=("w1",))
+        )
+        return service
+
+    async def _run(self, service):
+        return await service.run_comprehensive_analysis(
+            None, include_predictions=False, include_optimization=False
+        )
+
+    async def test_partial_report_is_not_cached(self, service):
+        """Test a failed component makes the next request recompute"""
+        failures = {"trend_analysis"}
+        calls = []
+
+        async def analyze(analyzer, db, **kwargs):
+            name = type(analyzer).__name__
+            calls.append(name)
+            if name == "TrendAnalyzer" and failures:
+                failures.clear()
+                raise RuntimeError("trend failed")
+            return {"analyzer": name}
+
+        service._analyze = analyze
+
+        first = await self._run(service)
+        assert first["analysis_metadata"]["partial"]
+        assert first["trend_analysis"] == {}
+        assert service.cache.size() == 0
+
+        second = await self._run(service)
+        assert not second["analysis_metadata"]["partial"]
+        assert second["trend_analysis"] == {"analyzer": "TrendAnalyzer"}
+        assert service.cache.size() == 1
+
+        calls.clear()
+        assert await self._run(service) is second
+        assert calls == []
@@ -0,0 +1,323 @@
+"""
+Unit tests for the columnar analytics data access layer
+"""
+
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import pytest_asyncio
+from backend.analytics.processors.data_aggregator import DataAggregator
+from backend.analytics.utils.data_access import (
+    SYSTEM_METRICS_HISTORY,
+    TASK_HISTORY,
+    AnalyticsDataAccess,
+    bucket_totals,
+)
+from backend.app.database.base import Base
+from backend.app.models.system_metrics import SystemMetrics
+from backend.app.models.task import Task
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+METRIC_COLUMNS = (
+    "cpu_usage_percentage",
+    "memory_usage_percentage",
+    "system_load_percentage",
+    "overall_success_rate",
+    "uptime_percentage",
+)
+
+
+@pytest_asyncio.fixture
+async def history_db():
+    """In-memory database with the analytics history tables"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessions() as session:
+        yield session
+    await engine.dispose()
+
+
+async def _add_metrics(db, hours_ago, load=50.0):
+    for hours in hours_ago:
+        recorded_at = NOW - timedelta(hours=hours)
+        db.add(
+            SystemMetrics(
+                recorded_at=recorded_at,
+                updated_at=recorded_at,
+                system_load_percentage=load,
+            )
+        )
+    await db.commit()
+
+
+def _old_row_loop_aggregates(metrics, tasks):
+    """The per-row daily/weekly aggregation the vectorised version replaced"""
+    daily, weekly = defaultdict(lambda: ([], [])), defaultdict(lambda: ([], []))
+    for index, rows in enumerate((metrics, tasks)):
+        for row in rows:
+            timestamp = row.recorded_at if index == 0 else row.created_at
+            year, week, _ = timestamp.isocalendar()
+            daily[timestamp.date().isoformat()][index].append(row)
+            weekly[f"{year}-W{week:02d}"][index].append(row)
+
+    def summarize(group_metrics, group_tasks):
+        def mean(column):
+            if not group_metrics:
+                return 0
+            return np.mean([getattr(m, column) for m in group_metrics])
+
+        completed = len([t for t in group_tasks if t.status == "completed"])
+        failed = len([t for t in group_tasks if t.status == "failed"])
+        total = len(group_tasks)
+        return {
+            "system_metrics": {
+                "avg_cpu_usage": mean("cpu_usage_percentage"),
+                "avg_memory_usage": mean("memory_usage_percentage"),
+                "avg_system_load": mean("system_load_percentage"),
+                "avg_success_rate": mean("overall_success_rate"),
+                "avg_uptime": mean("uptime_percentage"),
+            },
+            "task_metrics": {
+                "total_tasks": total,
+                "completed_tasks": completed,
+                "failed_tasks": failed,
+                "completion_rate": (completed / total * 100) if total > 0 else 0,
+            },
+        }
+
+    return (
+        {key: summarize(*rows) for key, rows in daily.items()},
+        {key: summarize(*rows) for key, rows in weekly.items()},
+    )
+
+
+@pytest.mark.unit
+class TestBucketTotals:
+    """Tests for vectorised calendar bucketing"""
+
+    def test_counts_sums_and_nan_handling(self):
+        """Test per-bucket counts, sums and non-NaN counts; NaT rows are skipped"""
+        timestamps = np.array(
+            [
+                "2026-10-17T23:59",
+                "2026-10-18T00:00",
+                "NaT",
+                "2026-10-18T13:00",
+                "2026-10-16T08:00",
+            ],
+            dtype="datetime64[us]",
+        )
+        values = np.array([1.0, 2.0, 100.0, np.nan, 4.0])
+
+        buckets, counts, totals = bucket_totals(timestamps, "D", value=values)
+
+        assert buckets.astype(str).tolist() == [
+            "2026-10-16",
+            "2026-10-17",
+            "2026-10-18",
+        ]
+        assert counts.tolist() == [1, 1, 2]
+        sums, valid = totals["value"]
+        assert sums.tolist() == [4.0, 1.0, 2.0]
+        assert valid.tolist() == [1, 1, 1]
+
+    def test_empty_input(self):
+        """Test no rows yield no buckets"""
+        buckets, counts, totals = bucket_totals(
+            np.array([], dtype="datetime64[us]"), "h", value=np.array([])
+        )
+        assert len(buckets) == 0 and len(counts) == 0
+        assert len(totals["value"][0]) == 0
+
+
+@pytest.mark.unit
+class TestAnalyticsDataAccess:
+    """Tests for column loading, the frame cache and watermark revalidation"""
+
+    async def test_load_selects_window_in_time_order(self, history_db):
+        """Test only rows inside the window are returned, oldest first"""
+        await _add_metrics(history_db, [30, 5, 1, 12])
+        data = AnalyticsDataAccess(chunk_size=2)
+
+        frame = await data.load(
+            history_db, SYSTEM_METRICS_HISTORY, timedelta(hours=24), now=NOW
+        )
+
+        assert set(frame) == set(SYSTEM_METRICS_HISTORY.all_columns)
+        expected = [NOW - timedelta(hours=h) for h in (12, 5, 1)]
+        assert frame["recorded_at"].tolist() == expected
+        assert frame["system_load_percentage"].dtype == np.float64
+        assert data.stats["rows_loaded"] == 3
+
+    async def test_cache_hit_slices_narrower_window(self, history_db):
+        """Test a later window start is served from the cached frame"""
+        await _add_metrics(history_db, [30, 20, 5, 1])
+        data = AnalyticsDataAccess()
+        window = timedelta(hours=48)
+
+        await data.load(history_db, SYSTEM_METRICS_HISTORY, window, now=NOW)
+        later = await data.load(
+            history_db, SYSTEM_METRICS_HISTORY, window, now=NOW + timedelta(hours=25)
+        )
+
+        assert data.stats == {"hits": 1, "misses": 1, "rows_loaded": 4}
+        assert later["recorded_at"].tolist() == [
+            NOW - timedelta(hours=h) for h in (20, 5, 1)
+        ]
+
+    async def test_new_rows_invalidate_cached_frame(self, history_db):
+        """Test an insert inside the cached range changes the watermark"""
+        await _add_metrics(history_db, [5])
+        data = AnalyticsDataAccess()
+        window = timedelta(hours=24)
+        await data.load(history_db, SYSTEM_METRICS_HISTORY, window, now=NOW)
+
+        await _add_metrics(history_db, [2])
+        frame = await data.load(history_db, SYSTEM_METRICS_HISTORY, window, now=NOW)
+
+        assert data.stats["misses"] == 2
+        assert len(frame["recorded_at"]) == 2
+
+    async def test_updated_rows_invalidate_cached_frame(self, history_db):
+        """Test an update bumping the version column forces a reload"""
+        task = Task(title="t", status="pending", created_at=NOW - timedelta(hours=1))
+        task.updated_at = NOW - timedelta(hours=1)
+        history_db.add(task)
+        await history_db.commit()
+        data = AnalyticsDataAccess()
+        window = timedelta(hours=24)
+        await data.load(history_db, TASK_HISTORY, window, now=NOW)
+
+        task.status = "completed"
+        task.updated_at = NOW
+        await history_db.commit()
+        frame = await data.load(history_db, TASK_HISTORY, window, now=NOW)
+
+        assert data.stats["misses"] == 2
+        assert frame["status"].tolist() == ["completed"]
+
+    async def test_expired_frames_are_reloaded(self, history_db):
+        """Test frames older than max_age are not reused"""
+        await _add_metrics(history_db, [1])
+        data = AnalyticsDataAccess(max_age=0.0)
+        for _ in range(2):
+            await data.load(history_db, SYSTEM_METRICS_HISTORY, timedelta(hours=2))
+        assert data.stats["hits"] == 0
+
+    async def test_earlier_window_start_is_a_miss(self, history_db):
+        """Test a window reaching further back than the cached one reloads"""
+        await _add_metrics(history_db, [1])
+        data = AnalyticsDataAccess()
+        window = timedelta(hours=24)
+        await data.load(history_db, SYSTEM_METRICS_HISTORY, window, now=NOW)
+        await data.load(
+            history_db, SYSTEM_METRICS_HISTORY, window, now=NOW - timedelta(hours=1)
+        )
+        assert data.stats["misses"] == 2
+
+    def test_slice(self):
+        """Test _slice drops rows before the start and keeps a full frame as is"""
+        times = np.array(
+            ["2026-10-18T00:00", "2026-10-18T01:00", "2026-10-18T02:00"],
+            dtype="datetime64[us]",
+        )
+        frame = {"recorded_at": times, "value": np.array([1.0, 2.0, 3.0])}
+        data = AnalyticsDataAccess()
+
+        sliced = data._slice(
+            SYSTEM_METRICS_HISTORY, frame, datetime(2026, 10, 18, 1, 0)
+        )
+        assert sliced["value"].tolist() == [2.0, 3.0]
+        assert data._slice(SYSTEM_METRICS_HISTORY, frame, datetime(2026, 10, 17)) is (
+            frame
+        )
+        empty = data._slice(SYSTEM_METRICS_HISTORY, frame, datetime(2026, 10, 19))
+        assert len(empty["recorded_at"]) == 0
+
+    async def test_store_evicts_oldest_entry(self, history_db):
+        """Test the frame cache stays within max_entries"""
+        await _add_metrics(history_db, [1])
+        data = AnalyticsDataAccess(max_entries=2)
+        for hours in (2, 3, 4):
+            await data.load(
+                history_db, SYSTEM_METRICS_HISTORY, timedelta(hours=hours), now=NOW
+            )
+
+        assert data.get_stats()["entries"] == 2
+        windows = {window for _, window in data._cache}
+        assert windows == {timedelta(hours=3), timedelta(hours=4)}
+
+
+@pytest.mark.unit
+class TestVectorisedAggregation:
+    """The bucketed daily/weekly aggregates match the old row loop"""
+
+    def _history(self):
+        rng = random.Random(7)
+        start = datetime(2026, 9, 1)
+        metrics = [
+            SimpleNamespace(
+                recorded_at=start + timedelta(minutes=rng.randrange(60 * 24 * 30)),
+                **{column: rng.uniform(0, 100) for column in METRIC_COLUMNS},
+            )
+            for _ in range(500)
+        ]
+        tasks = [
+            SimpleNamespace(
+                created_at=start + timedelta(minutes=rng.randrange(60 * 24 * 35)),
+                status=rng.choice(["completed", "failed", "pending", "in_progress"]),
+            )
+            for _ in range(400)
+        ]
+        metric_frame = {
+            "recorded_at": np.array(
+                [m.recorded_at for m in metrics], dtype="datetime64[us]"
+            ),
+            **{
+                column: np.array([getattr(m, column) for m in metrics])
+                for column in METRIC_COLUMNS
+            },
+        }
+        task_frame = {
+            "created_at": np.array(
+                [t.created_at for t in tasks], dtype="datetime64[us]"
+            ),
+            "status": np.array([t.status for t in tasks], dtype=object),
+        }
+        return metrics, tasks, metric_frame, task_frame
+
+    def _assert_matches(self, actual, expected, with_uptime):
+        assert actual["task_metrics"] == pytest.approx(expected["task_metrics"])
+        system = dict(expected["system_metrics"])
+        if not with_uptime:
+            system.pop("avg_uptime")
+        assert actual["system_metrics"] == pytest.approx(system)
+
+    async def test_daily_and_weekly_match_row_loop(self):
+        """Test _aggregate_by_day/_aggregate_by_week against the old loop"""
+        metrics, tasks, metric_frame, task_frame = self._history()
+        expected_daily, expected_weekly = _old_row_loop_aggregates(metrics, tasks)
+        aggregator = DataAggregator()
+
+        daily = await aggregator._aggregate_by_day(metric_frame, task_frame)
+        weekly = await aggregator._aggregate_by_week(metric_frame, task_frame)
+
+        assert [d["date"] for d in daily] == sorted(expected_daily)
+        for entry in daily:
+            self._assert_matches(entry, expected_daily[entry["date"]], False)
+        assert [w["week"] for w in weekly] == sorted(expected_weekly)
+        for entry in weekly:
+            self._assert_matches(entry, expected_weekly[entry["week"]], True)
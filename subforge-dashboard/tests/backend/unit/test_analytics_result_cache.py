@@ -0,0 +1,209 @@
+"""
+Unit tests for the shared analytics result cache
+"""
+
+import asyncio
+
+import pytest
+from backend.analytics.utils import result_cache
+from backend.analytics.utils.result_cache import AnalyticsResultCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(result_cache.time, "time", clock.time)
+    return clock
+
+
+@pytest.mark.unit
+class TestAnalyticsResultCache:
+    """Tests for single-flight, LRU, watermark and TTL behaviour"""
+
+    async def test_concurrent_misses_share_one_computation(self):
+        """Test concurrent callers for one key run compute once"""
+        cache = AnalyticsResultCache()
+        calls = 0
+        release = asyncio.Event()
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"value": calls}
+
+        tasks = [
+            asyncio.create_task(cache.get_or_compute("trends", "7d", compute))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == 1
+        assert results == [{"value": 1}] * 5
+        assert cache.stats["coalesced"] == 4
+        assert cache.get_stats()["inflight"] == 0
+        assert await cache.get_or_compute("trends", "7d", compute) == {"value": 1}
+        assert cache.stats["hits"] == 1
+
+    async def test_shared_failure_is_raised_to_every_caller(self):
+        """Test waiters see the leader's exception and nothing is cached"""
+        cache = AnalyticsResultCache()
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            raise RuntimeError("boom")
+
+        tasks = [
+            asyncio.create_task(cache.get_or_compute("trends", "7d", compute))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert cache.size() == 0
+
+    async def test_cancelled_leader_lets_waiter_compute(self):
+        """Test a waiter computes itself when the leading caller is cancelled"""
+        cache = AnalyticsResultCache()
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(60)
+
+        async def fast():
+            return {"value": 2}
+
+        leader = asyncio.create_task(cache.get_or_compute("trends", "7d", slow))
+        await started.wait()
+        waiter = asyncio.create_task(cache.get_or_compute("trends", "7d", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await waiter == {"value": 2}
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    async def test_falsy_results_are_not_cached(self):
+        """Test empty results are returned but recomputed next time"""
+        cache = AnalyticsResultCache()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            return {}
+
+        for _ in range(2):
+            assert await cache.get_or_compute("trends", "7d", compute) == {}
+        assert calls == 2
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is dropped beyond max_entries"""
+        cache = AnalyticsResultCache(max_entries=2)
+        cache.set("ns", "a", 1)
+        cache.set("ns", "b", 2)
+        assert cache.get("ns", "a") == 1  # a is now the most recent
+        cache.set("ns", "c", 3)
+
+        assert cache.keys() == ["a", "c"]
+        assert cache.get("ns", "b") is None
+        assert cache.stats["evictions"] == 1
+
+    def test_new_watermark_evicts_older_entries(self):
+        """Test entries from older data are dropped once a new watermark appears"""
+        cache = AnalyticsResultCache()
+        cache.set("trends", "7d", 1, watermark=("t1",))
+        cache.set("insights", "all", 2, watermark=("t1",))
+        cache.observe_watermark(("t1",))
+        assert cache.size() == 2
+
+        cache.observe_watermark(("t2",))
+
+        assert cache.size() == 0
+        assert cache.stats["invalidations"] == 2
+
+    async def test_get_or_compute_recomputes_on_new_watermark(self):
+        """Test a lookup with newer data misses and replaces the entry"""
+        cache = AnalyticsResultCache()
+        values = iter([{"v": 1}, {"v": 2}])
+
+        async def compute():
+            return next(values)
+
+        assert await cache.get_or_compute("t", "k", compute, watermark=1) == {"v": 1}
+        assert await cache.get_or_compute("t", "k", compute, watermark=1) == {"v": 1}
+        assert await cache.get_or_compute("t", "k", compute, watermark=2) == {"v": 2}
+        assert cache.get("t", "k", watermark=1) is None
+
+    def test_notify_data_changed_drops_everything(self):
+        """Test a write notification clears every entry and the watermark"""
+        cache = AnalyticsResultCache()
+        cache.observe_watermark(1)
+        cache.set("a", "k", 1, watermark=1)
+        cache.set("b", "k", 2)
+
+        cache.notify_data_changed()
+
+        assert cache.size() == 0
+        assert cache._watermark is None
+
+    def test_invalidate_namespace(self):
+        """Test invalidating one namespace keeps the others"""
+        cache = AnalyticsResultCache()
+        cache.set("a", "k", 1)
+        cache.set("b", "k", 2)
+        cache.invalidate("a")
+        assert cache.size("a") == 0 and cache.size("b") == 1
+
+    def test_ttl_expiry(self, clock):
+        """Test entries expire after their TTL, per entry and by default"""
+        cache = AnalyticsResultCache(default_ttl=60)
+        cache.set("ns", "short", 1, ttl=10)
+        cache.set("ns", "default", 2)
+
+        clock.now += 30
+        assert cache.get("ns", "short") is None
+        assert cache.get("ns", "default") == 2
+
+        clock.now += 30
+        assert cache.get("ns", "default") is None
+
+    def test_purge_expired(self, clock):
+        """Test purge_expired removes only expired entries"""
+        cache = AnalyticsResultCache()
+        cache.set("ns", "old", 1, ttl=5)
+        cache.set("ns", "new", 2, ttl=50)
+        clock.now += 10
+
+        assert cache.purge_expired() == 1
+        assert cache.keys() == ["new"]
+
+    def test_export_import_round_trip(self, clock):
+        """Test exported entries keep their remaining TTL and watermark"""
+        cache = AnalyticsResultCache()
+        cache.set("ns", "k", {"v": 1}, ttl=100, watermark=7)
+        cache.set("ns", "gone", {"v": 2}, ttl=5)
+        clock.now += 10
+        exported = cache.export_entries("ns")
+
+        restored = AnalyticsResultCache()
+        restored.import_entries("ns", exported)
+
+        assert restored.keys() == ["k"]
+        assert restored.get("ns", "k", watermark=7) == {"v": 1}
+        clock.now += 95
+        assert restored.get("ns", "k", watermark=7) is None
@@ -0,0 +1,83 @@
+"""
+Unit tests for database connection pool configuration and metrics
+"""
+
+import pytest
+from app.database.pools import (
+    MeasuredQueuePool,
+    PoolRegistry,
+    PoolSettings,
+    engine_options,
+)
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import StaticPool
+
+
+def _engine(url, **pool):
+    return create_engine(url, **engine_options(url, PoolSettings(**pool)))
+
+
+@pytest.mark.unit
+class TestPoolConfiguration:
+    """Tests for engine options derived from pool settings"""
+
+    def test_file_database_gets_sized_measured_pool(self, tmp_path):
+        """Test size, overflow, timeout and recycle reach the pool"""
+        engine = _engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            size=3,
+            max_overflow=2,
+            timeout=5.0,
+            recycle=60,
+        )
+
+        assert isinstance(engine.pool, MeasuredQueuePool)
+        assert engine.pool.size() == 3
+        assert engine.pool.timeout() == 5.0
+        assert engine.pool._recycle == 60
+
+    def test_memory_database_shares_one_connection(self):
+        """Test in-memory SQLite keeps a single shared connection"""
+        engine = _engine("sqlite:///:memory:")
+
+        assert isinstance(engine.pool, StaticPool)
+
+
+@pytest.mark.unit
+class TestPoolMetrics:
+    """Tests for checkout accounting exposed by the metrics endpoints"""
+
+    def test_reports_checked_out_overflow_and_timeouts(self, tmp_path):
+        """Test occupancy and a timed-out checkout show up in the stats"""
+        engine = _engine(
+            f"sqlite:///{tmp_path / 'pool.db'}", size=1, max_overflow=1, timeout=0.05
+        )
+        registry = PoolRegistry()
+        registry.register("request", engine)
+
+        connections = [engine.connect(), engine.connect()]
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        busy = registry.get_stats()["request"]
+        for connection in connections:
+            connection.close()
+
+        assert busy["checked_out"] == 2
+        assert busy["overflow"] == 1
+        assert busy["timeouts"] == 1
+        assert busy["checkouts"] == 3
+        assert busy["max_wait_ms"] >= 50
+
+    def test_metrics_survive_dispose(self, tmp_path):
+        """Test counts continue on the pool that dispose() swaps in"""
+        engine = _engine(f"sqlite:///{tmp_path / 'pool.db'}")
+        registry = PoolRegistry()
+        registry.register("background", engine)
+
+        engine.connect().close()
+        engine.dispose()
+        engine.connect().close()
+
+        stats = registry.get_stats()["background"]
+        assert stats["checkouts"] == 2
+        assert stats["checked_out"] == 0
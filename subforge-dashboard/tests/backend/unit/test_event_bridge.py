@@ -0,0 +1,104 @@
+"""
+Unit tests for the coalescing watchdog event bridge
+"""
+
+import asyncio
+import threading
+
+import pytest
+from app.utils.event_bridge import CoalescingEventBridge
+
+
+def _workflow_key(path):
+    parts = path.split("/")
+    return parts[1] if len(parts) > 2 else None
+
+
+@pytest.mark.unit
+class TestCoalescingEventBridge:
+    """Tests for thread handoff, coalescing and per-key serialization"""
+
+    async def test_events_from_threads_are_coalesced_per_key(self):
+        """Test a burst from observer threads yields one batch per workflow"""
+        batches = []
+
+        async def handler(key, events):
+            batches.append((key, dict(events)))
+
+        bridge = CoalescingEventBridge(handler, _workflow_key, window=0.05)
+        bridge.start()
+
+        def storm(workflow):
+            for i in range(50):
+                bridge.submit("modified", f"root/{workflow}/workflow_context.json")
+            bridge.submit("created", f"root/{workflow}/notes.md")
+
+        threads = [
+            threading.Thread(target=storm, args=(f"wf{i}",)) for i in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        await asyncio.sleep(0.2)
+        bridge.stop()
+
+        assert sorted(key for key, _ in batches) == ["wf0", "wf1", "wf2"]
+        for key, events in batches:
+            assert events == {
+                f"root/{key}/workflow_context.json": "modified",
+                f"root/{key}/notes.md": "created",
+            }
+        assert bridge.events_received == 153
+        assert bridge.events_coalesced == 147
+
+    async def test_events_without_key_are_ignored(self):
+        """Test paths outside any workflow never reach the handler"""
+        calls = []
+
+        async def handler(key, events):
+            calls.append(key)
+
+        bridge = CoalescingEventBridge(handler, _workflow_key, window=0.01)
+        bridge.start()
+        bridge.submit("modified", "toplevel.json")
+        await asyncio.sleep(0.05)
+        bridge.stop()
+
+        assert calls == []
+
+    async def test_key_is_not_processed_concurrently(self):
+        """Test events arriving mid-batch are handled in a following batch"""
+        running = []
+        max_running = 0
+        batches = []
+        release = asyncio.Event()
+
+        async def handler(key, events):
+            nonlocal max_running
+            running.append(key)
+            max_running = max(max_running, len(running))
+            batches.append(dict(events))
+            if len(batches) == 1:
+                await release.wait()
+            running.remove(key)
+
+        bridge = CoalescingEventBridge(
+            handler, _workflow_key, window=0.01, max_workers=4
+        )
+        bridge.start()
+        bridge.submit("modified", "root/wf/a.json")
+        await asyncio.sleep(0.05)
+        bridge.submit("modified", "root/wf/b.json")
+        await asyncio.sleep(0.05)
+        assert len(batches) == 1
+
+        release.set()
+        await asyncio.sleep(0.05)
+        bridge.stop()
+
+        assert max_running == 1
+        assert batches == [
+            {"root/wf/a.json": "modified"},
+            {"root/wf/b.json": "modified"},
+        ]
@@ -0,0 +1,156 @@
+"""
+Unit tests for the content-addressed upload store
+"""
+
+import hashlib
+import io
+
+import pytest
+from app.services.file_storage import ContentStore, FileTooLargeError, parse_range
+
+
+class FakeUpload:
+    """Minimal async reader standing in for UploadFile"""
+
+    def __init__(self, content: bytes):
+        self._buffer = io.BytesIO(content)
+        self.reads = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        return self._buffer.read(size)
+
+
+class FakeCounters:
+    """The RedisService counter calls used for blob references"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def increment(self, key, amount=1):
+        self.data[key] = self.data.get(key, 0) + amount
+        return self.data[key]
+
+    async def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+    async def decrement_and_delete(self, key, amount=1):
+        remaining = self.data.get(key, 0) - amount
+        if remaining <= 0:
+            self.data.pop(key, None)
+        else:
+            self.data[key] = remaining
+        return remaining
+
+    async def get_counter(self, key):
+        return self.data.get(key, 0)
+
+
+class InterleavingCounters(FakeCounters):
+    """Runs a callback right after one counter call, like a racing request"""
+
+    def __init__(self, method):
+        super().__init__()
+        self.method = method
+        self.callback = None
+
+    async def _after(self, method, result):
+        if method == self.method and self.callback is not None:
+            callback, self.callback = self.callback, None
+            await callback()
+        return result
+
+    async def decrement_and_delete(self, key, amount=1):
+        result = await super().decrement_and_delete(key, amount)
+        return await self._after("decrement_and_delete", result)
+
+    async def get_counter(self, key):
+        return await self._after("get_counter", await super().get_counter(key))
+
+
+@pytest.mark.unit
+class TestContentStore:
+    """Tests for chunked hashing, deduplication, limits and ranged reads"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return ContentStore(tmp_path / "uploads", FakeCounters(), chunk_size=1024)
+
+    async def test_streams_in_chunks_and_hashes(self, store):
+        """Test content is read chunk by chunk and stored under its SHA-256"""
+        content = b"x" * 5000
+        upload = FakeUpload(content)
+
+        blob = await store.save_stream(upload)
+
+        assert upload.reads == 6  # five chunks and the empty read
+        assert blob.digest == hashlib.sha256(content).hexdigest()
+        assert blob.size == 5000
+        assert blob.path == store.blob_path(blob.digest)
+        assert blob.path.read_bytes() == content
+        assert not list((store.root / "tmp").iterdir())
+
+    async def test_identical_uploads_share_one_blob(self, store):
+        """Test a duplicate upload is deduplicated and reference counted"""
+        first = await store.save_stream(FakeUpload(b"same bundle"))
+        second = await store.save_stream(FakeUpload(b"same bundle"))
+
+        assert not first.deduplicated
+        assert second.deduplicated
+        assert first.path == second.path
+
+        await store.release(first.digest)
+        assert first.path.exists()
+        await store.release(second.digest)
+        assert not first.path.exists()
+
+    @pytest.mark.parametrize("method", ["decrement_and_delete", "get_counter"])
+    async def test_upload_racing_last_release_keeps_blob(self, tmp_path, method):
+        """Test an upload during the last release still finds its blob afterwards"""
+        counters = InterleavingCounters(method)
+        store = ContentStore(tmp_path / "uploads", counters, chunk_size=1024)
+        first = await store.save_stream(FakeUpload(b"racy bundle"))
+        uploaded = []
+
+        async def upload_again():
+            uploaded.append(await store.save_stream(FakeUpload(b"racy bundle")))
+
+        counters.callback = upload_again
+        await store.release(first.digest)
+
+        assert uploaded[0].path.read_bytes() == b"racy bundle"
+        assert counters.data[store._ref_key(first.digest)] == 1
+        assert [p.name for p in first.path.parent.iterdir()] == [first.digest]
+
+        await store.release(uploaded[0].digest)
+        assert not first.path.exists()
+        assert not list(first.path.parent.iterdir())
+
+    async def test_oversized_upload_is_discarded(self, store):
+        """Test exceeding the size limit aborts and removes the temp file"""
+        with pytest.raises(FileTooLargeError):
+            await store.save_stream(FakeUpload(b"y" * 4096), max_size=2048)
+
+        assert not list((store.root / "tmp").iterdir())
+        assert not (store.root / "blobs").exists()
+
+    async def test_iter_range(self, store):
+        """Test ranged reads return exactly the requested bytes"""
+        content = bytes(range(256)) * 20
+        blob = await store.save_stream(FakeUpload(content))
+
+        chunks = [c async for c in store.iter_range(blob.path, 1000, 3499)]
+
+        assert b"".join(chunks) == content[1000:3500]
+        assert max(len(c) for c in chunks) <= store.chunk_size
+
+    def test_parse_range(self):
+        """Test single byte ranges, suffix ranges and unsatisfiable ranges"""
+        assert parse_range(None, 100) is None
+        assert parse_range("bytes=0-9", 100) == (0, 9)
+        assert parse_range("bytes=90-", 100) == (90, 99)
+        assert parse_range("bytes=-10", 100) == (90, 99)
+        assert parse_range("bytes=50-500", 100) == (50, 99)
+        assert parse_range("bytes=0-1,5-6", 100) is None
+        with pytest.raises(ValueError):
+            parse_range("bytes=100-", 100)
@@ -0,0 +1,116 @@
+"""
+Unit tests for keyset pagination of workflow history
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from app.services.persistence import (
+    PersistenceService,
+    decode_history_cursor,
+    encode_history_cursor,
+)
+
+BASE_TIME = datetime(2025, 6, 1, 12, 0)
+
+
+async def _store(service, session, minutes, status="completed"):
+    return await service.store_workflow_execution(
+        session,
+        {
+            "workflow_id": uuid.uuid4(),
+            "name": f"workflow-{minutes}",
+            "status": status,
+            "started_at": BASE_TIME + timedelta(minutes=minutes),
+        },
+    )
+
+
+async def _all_pages(service, session, limit, **filters):
+    pages, cursor = [], None
+    while True:
+        page = await service.get_workflow_history_page(
+            session, limit=limit, cursor=cursor, **filters
+        )
+        pages.append(page)
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.unit
+class TestHistoryPagination:
+    """Tests for cursor pages over (started_at, id)"""
+
+    async def _seed(self, session):
+        service = PersistenceService()
+        # Several rows share a timestamp so the id tie-breaker matters
+        stored = [
+            await _store(service, session, minutes, status)
+            for minutes, status in [
+                (0, "completed"),
+                (1, "failed"),
+                (1, "completed"),
+                (1, "completed"),
+                (2, "failed"),
+                (3, "completed"),
+                (4, "completed"),
+            ]
+        ]
+        await session.commit()
+        return service, stored
+
+    async def test_pages_cover_every_row_once_in_order(self, test_session):
+        """Test walking the cursors returns each row once, newest first"""
+        service, stored = await self._seed(test_session)
+
+        pages = await _all_pages(service, test_session, limit=3)
+        rows = [row for page in pages for row in page.items]
+
+        assert [len(page.items) for page in pages] == [3, 3, 1]
+        assert sorted(row.id for row in rows) == sorted(row.id for row in stored)
+        keys = [(row.started_at, row.id) for row in rows]
+        assert keys == sorted(keys, reverse=True)
+
+    async def test_new_rows_do_not_shift_later_pages(self, test_session):
+        """Test a workflow landing mid-walk does not repeat or skip rows"""
+        service, stored = await self._seed(test_session)
+        first = await service.get_workflow_history_page(test_session, limit=3)
+
+        await _store(service, test_session, 10)
+        await test_session.commit()
+        second = await service.get_workflow_history_page(
+            test_session, limit=3, cursor=first.next_cursor
+        )
+
+        seen = {row.id for row in first.items}
+        assert not seen & {row.id for row in second.items}
+        assert second.items[0].started_at <= first.items[-1].started_at
+
+    async def test_filters_and_total(self, test_session):
+        """Test filters apply to pages and the total is counted on request"""
+        service, _ = await self._seed(test_session)
+
+        page = await service.get_workflow_history_page(
+            test_session, limit=10, status_filter="failed", include_total=True
+        )
+
+        assert page.total == 2
+        assert page.next_cursor is None
+        assert {row.status for row in page.items} == {"failed"}
+        assert (
+            await service.get_workflow_history_page(test_session, limit=10)
+        ).total is None
+
+    async def test_cursor_round_trip_and_rejection(self, test_session):
+        """Test cursors are opaque round-trips and garbage is rejected"""
+        service, stored = await self._seed(test_session)
+
+        started_at, history_id = decode_history_cursor(
+            encode_history_cursor(stored[0])
+        )
+
+        assert (started_at, history_id) == (stored[0].started_at, stored[0].id)
+        with pytest.raises(ValueError):
+            await service.get_workflow_history_page(test_session, cursor="not-a-cursor")
@@ -0,0 +1,184 @@
+"""
+Unit tests for monthly history partitions and retention
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from app.database.base import Base
+from app.models.database import (
+    AgentPerformanceMetrics,
+    HandoffHistory,
+    PhaseHistory,
+    WorkflowAgentAssociation,
+    WorkflowHistory,
+)
+from app.services import history_partitions
+from app.services.history_partitions import (
+    PARTITIONED_TABLES,
+    HistoryPartitionManager,
+    add_months,
+    create_tables,
+    expired_months,
+    partition_month,
+    partition_name,
+)
+from app.services.persistence import PersistenceService
+from sqlalchemy import func, select
+
+NOW = datetime(2025, 9, 15, 12, 0)
+HISTORY_TABLES = {table for table, _ in PARTITIONED_TABLES}
+
+
+async def _store(service, session, days_ago):
+    started = NOW - timedelta(days=days_ago)
+    workflow = await service.store_workflow_execution(
+        session,
+        {
+            "workflow_id": uuid.uuid4(),
+            "name": f"workflow-{days_ago}",
+            "started_at": started,
+            "assigned_agents": [{"id": "build_agent", "name": "Build"}],
+        },
+    )
+    await service.store_phase_execution(
+        session,
+        workflow.id,
+        {"name": "build", "started_at": started, "assigned_agent_id": "build_agent"},
+    )
+    return workflow
+
+
+async def _count(session, model):
+    return (await session.execute(select(func.count()).select_from(model))).scalar()
+
+
+@pytest.mark.unit
+class TestPartitionNaming:
+    """Tests for month arithmetic and partition names"""
+
+    def test_month_helpers(self):
+        """Test month stepping across years and name round trips"""
+        assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+        assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+
+        name = partition_name("workflow_history", date(2025, 3, 1))
+
+        assert name == "workflow_history_p202503"
+        assert partition_month(name) == date(2025, 3, 1)
+        assert partition_month("workflow_history_default") is None
+
+    def test_only_whole_months_before_cutoff_expire(self):
+        """Test the month containing the cutoff is kept"""
+        months = [date(2025, month, 1) for month in range(1, 7)]
+
+        expired = expired_months(months, datetime(2025, 4, 10))
+
+        assert expired == [date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)]
+
+
+@pytest.mark.unit
+class TestRetentionFallback:
+    """Tests for batched retention on databases without partitioning"""
+
+    async def test_deletes_expired_history_in_batches(self, test_session):
+        """Test old workflows go with their children and metrics"""
+        service = PersistenceService()
+        for days_ago in (200, 150, 120, 10, 1):
+            await _store(service, test_session, days_ago)
+        test_session.add(
+            AgentPerformanceMetrics(
+                agent_id="build_agent",
+                agent_name="Build",
+                period_start=NOW - timedelta(days=180),
+                period_end=NOW - timedelta(days=179),
+                period_type="day",
+            )
+        )
+        await test_session.commit()
+
+        manager = HistoryPartitionManager(batch_size=2)
+        summary = await manager.apply_retention(test_session, 90, now=NOW)
+
+        assert summary["mode"] == "batched_delete"
+        assert summary["partitions_dropped"] == []
+        assert summary["workflow_history_deleted"] == 3
+        assert summary["performance_metrics_deleted"] == 1
+        assert await _count(test_session, WorkflowHistory) == 2
+        assert await _count(test_session, PhaseHistory) == 2
+        assert await _count(test_session, WorkflowAgentAssociation) == 2
+
+    async def test_children_carry_workflow_start(self, test_session):
+        """Test phase rows store their workflow's partition key"""
+        workflow = await _store(PersistenceService(), test_session, 5)
+
+        phase = (await test_session.execute(select(PhaseHistory))).scalar_one()
+
+        assert phase.workflow_started_at == workflow.started_at
+
+
+@pytest.mark.unit
+class TestCreateTables:
+    """Startup table creation leaves PostgreSQL history to migrations"""
+
+    def test_child_foreign_keys_include_partition_key(self):
+        """Test children reference workflow_history on (id, started_at)"""
+        for model, key in (
+            (PhaseHistory, "workflow_started_at"),
+            (HandoffHistory, "workflow_started_at"),
+            (WorkflowAgentAssociation, "started_at"),
+        ):
+            (constraint,) = model.__table__.foreign_key_constraints
+            assert [c.name for c in constraint.columns] == ["workflow_history_id", key]
+            assert [e.target_fullname for e in constraint.elements] == [
+                "workflow_history.id",
+                "workflow_history.started_at",
+            ]
+            assert constraint.ondelete == "CASCADE"
+
+    def test_other_databases_create_every_table(self, monkeypatch):
+        """Test SQLite gets every table from the models"""
+        connection = MagicMock()
+        connection.dialect.name = "sqlite"
+        create_all = MagicMock()
+        monkeypatch.setattr(Base.metadata, "create_all", create_all)
+
+        create_tables(connection)
+
+        create_all.assert_called_once_with(connection, tables=None)
+
+    def test_postgresql_skips_history_tables(self, monkeypatch):
+        """Test migrated history tables are not recreated unpartitioned"""
+        connection = MagicMock()
+        connection.dialect.name = "postgresql"
+        create_all = MagicMock()
+        monkeypatch.setattr(Base.metadata, "create_all", create_all)
+        monkeypatch.setattr(
+            history_partitions,
+            "inspect",
+            lambda _: MagicMock(get_table_names=lambda: list(HISTORY_TABLES)),
+        )
+
+        create_tables(connection)
+
+        tables = {t.name for t in create_all.call_args.kwargs["tables"]}
+        assert tables.isdisjoint(HISTORY_TABLES)
+        assert "agent_performance_metrics" in tables
+
+    def test_postgresql_requires_migrated_history(self, monkeypatch):
+        """Test startup fails instead of creating plain history tables"""
+        connection = MagicMock()
+        connection.dialect.name = "postgresql"
+        create_all = MagicMock()
+        monkeypatch.setattr(Base.metadata, "create_all", create_all)
+        monkeypatch.setattr(
+            history_partitions,
+            "inspect",
+            lambda _: MagicMock(get_table_names=lambda: ["workflow_history"]),
+        )
+
+        with pytest.raises(RuntimeError, match="alembic upgrade head"):
+            create_tables(connection)
+        create_all.assert_not_called()
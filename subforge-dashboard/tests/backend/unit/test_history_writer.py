@@ -0,0 +1,193 @@
+"""
+Unit tests for batched workflow history writes
+"""
+
+import uuid
+from datetime import datetime
+
+import pytest
+from app.models.database import (
+    AgentPerformanceMetrics,
+    MetricRollup,
+    PhaseHistory,
+    WorkflowAgentAssociation,
+    WorkflowHistory,
+)
+from app.services.history_writer import HistoryWriteQueue
+from app.services.persistence import PersistenceService
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+STARTED = datetime(2025, 7, 1, 9, 0)
+
+
+def _execution(execution_id, phases=("build",), status="completed"):
+    return {
+        "workflow": {
+            "workflow_id": uuid.uuid4(),
+            "execution_id": execution_id,
+            "name": execution_id,
+            "status": status,
+            "started_at": STARTED,
+            "duration_seconds": 60.0,
+            "assigned_agents": [{"id": f"{name}_agent"} for name in phases],
+        },
+        "phases": [
+            {
+                "name": name,
+                "started_at": STARTED,
+                "duration_seconds": 30.0,
+                "assigned_agent_id": f"{name}_agent",
+            }
+            for name in phases
+        ],
+        "handoffs": [],
+    }
+
+
+async def _count(session, model, *conditions):
+    query = select(func.count()).select_from(model)
+    if conditions:
+        query = query.where(*conditions)
+    return (await session.execute(query)).scalar()
+
+
+async def _workflow_rollup_count(session):
+    result = await session.execute(
+        select(MetricRollup.count).where(
+            MetricRollup.dimension == "workflow_type",
+            MetricRollup.granularity == "day",
+        )
+    )
+    return result.scalar_one()
+
+
+@pytest.mark.unit
+class TestBulkUpsert:
+    """Tests for set-based storage of workflow executions"""
+
+    async def test_resubmitted_execution_is_updated_not_duplicated(
+        self, test_session
+    ):
+        """Test a second write of an execution replaces its row and children"""
+        service = PersistenceService()
+        first = await service.store_workflow_executions_bulk(
+            test_session, [_execution("run-1", phases=("build", "test"))]
+        )
+        await test_session.commit()
+
+        second = await service.store_workflow_executions_bulk(
+            test_session,
+            [_execution("run-1", phases=("deploy",), status="failed")],
+        )
+        await test_session.commit()
+
+        assert (first["inserted"], first["updated"]) == (1, 0)
+        assert (second["inserted"], second["updated"]) == (0, 1)
+        assert second["agent_ids"] == ["deploy_agent"]
+        stored = (await test_session.execute(select(WorkflowHistory))).scalar_one()
+        assert stored.status == "failed"
+        phases = (await test_session.execute(select(PhaseHistory))).scalars().all()
+        assert [phase.phase_name for phase in phases] == ["deploy"]
+        assert phases[0].workflow_history_id == stored.id
+        assert await _count(test_session, WorkflowAgentAssociation) == 1
+        # Rollups count the execution once
+        assert await _workflow_rollup_count(test_session) == 1
+
+    async def test_batch_keeps_last_duplicate(self, test_session):
+        """Test duplicates within one batch collapse to the latest payload"""
+        service = PersistenceService()
+
+        summary = await service.store_workflow_executions_bulk(
+            test_session,
+            [
+                _execution("run-1", status="running"),
+                _execution("run-2"),
+                _execution("run-1", status="completed"),
+            ],
+        )
+        await test_session.commit()
+
+        assert summary["inserted"] == 2
+        assert summary["phases"] == 2
+        statuses = (
+            await test_session.execute(
+                select(WorkflowHistory.status).where(
+                    WorkflowHistory.execution_id == "run-1"
+                )
+            )
+        ).scalars()
+        assert list(statuses) == ["completed"]
+        assert await _workflow_rollup_count(test_session) == 2
+
+
+@pytest.mark.unit
+class TestHistoryWriteQueue:
+    """Tests for the batching write queue"""
+
+    async def test_shutdown_writes_queued_executions_in_batches(self, test_engine):
+        """Test queued executions are written in batches before shutdown returns"""
+        sessions = async_sessionmaker(
+            test_engine, class_=AsyncSession, expire_on_commit=False
+        )
+        writer = HistoryWriteQueue(sessions, batch_size=2, flush_interval=60)
+        await writer.initialize()
+
+        for index in range(5):
+            await writer.submit(_execution(f"run-{index}"))
+        await writer.shutdown()
+
+        assert not writer.running
+        assert writer.stats["written"] == 5
+        assert writer.stats["batches"] == 3
+        async with sessions() as session:
+            assert await _count(session, WorkflowHistory) == 5
+            assert await _count(session, PhaseHistory) == 5
+            # One hourly metrics row per agent per batch, not per phase
+            assert await _count(session, AgentPerformanceMetrics) == 3
+
+    async def test_failed_batch_is_retried_per_execution(self, test_engine):
+        """Test one bad execution does not lose the rest of its batch"""
+        sessions = async_sessionmaker(
+            test_engine, class_=AsyncSession, expire_on_commit=False
+        )
+        writer = HistoryWriteQueue(sessions, batch_size=10, flush_interval=60)
+        await writer.initialize()
+
+        broken = _execution("run-broken")
+        broken["workflow"]["started_at"] = None  # violates NOT NULL
+        outcomes = {}
+        for execution in (_execution("run-1"), broken, _execution("run-2")):
+            execution_id = execution["workflow"]["execution_id"]
+            accepted = await writer.submit(
+                execution,
+                on_written=lambda written, key=execution_id: outcomes.update(
+                    {key: written}
+                ),
+            )
+            assert accepted
+        assert outcomes == {}
+        await writer.flush()
+
+        assert outcomes == {"run-1": True, "run-broken": False, "run-2": True}
+        assert writer.stats["retried_batches"] == 1
+        assert writer.stats["failed"] == 1
+        async with sessions() as session:
+            assert await _count(session, WorkflowHistory) == 2
+        await writer.shutdown()
+
+    async def test_submit_writes_directly_when_not_running(self, test_engine):
+        """Test submissions outside the app lifespan are not dropped"""
+        sessions = async_sessionmaker(
+            test_engine, class_=AsyncSession, expire_on_commit=False
+        )
+        writer = HistoryWriteQueue(sessions)
+
+        outcomes = []
+        assert await writer.submit(_execution("run-1"), outcomes.append) is True
+        assert outcomes == [True]
+
+        async with sessions() as session:
+            stored = (await session.execute(select(WorkflowHistory))).scalar_one()
+        assert stored.execution_id == "run-1"
+        assert writer.stats["written"] == 1
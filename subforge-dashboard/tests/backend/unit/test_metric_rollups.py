@@ -0,0 +1,155 @@
+"""
+Unit tests for the incremental hourly/daily metric rollups
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from app.models.database import MetricRollup
+from app.services.persistence import PersistenceService
+from app.services.rollups import DURATION_BUCKETS, RollupService, RollupStats
+from sqlalchemy import select
+
+DAY_START = datetime(2025, 3, 1, 0, 0)
+
+
+async def _store(service, session, started, result, duration, agent="build_agent"):
+    workflow = await service.store_workflow_execution(
+        session,
+        {
+            "workflow_id": uuid.uuid4(),
+            "name": "rollup-workflow",
+            "type": "subforge",
+            "final_result": result,
+            "started_at": started,
+            "duration_seconds": duration,
+            "total_tasks": 2,
+            "completed_tasks": 2 if result == "success" else 0,
+            "quality_score": 0.9,
+        },
+    )
+    await service.store_phase_execution(
+        session,
+        workflow.id,
+        {
+            "name": "build",
+            "result": result,
+            "started_at": started,
+            "duration_seconds": duration,
+            "assigned_agent_id": agent,
+            "total_tasks": 1,
+            "completed_tasks": 1 if result == "success" else 0,
+            "failed_tasks": 0 if result == "success" else 1,
+        },
+    )
+    return workflow
+
+
+def _snapshot(rows):
+    return sorted(
+        (
+            row.granularity,
+            row.dimension,
+            row.dimension_value,
+            row.bucket_start,
+            row.count,
+            row.success_count,
+            row.duration_sum,
+            row.duration_sum_sq,
+            tuple(row.duration_histogram),
+        )
+        for row in rows
+    )
+
+
+@pytest.mark.unit
+class TestRollupStats:
+    """Tests for the additive bucket statistics"""
+
+    def test_moments_and_histogram(self):
+        """Test mean, deviation, extremes and histogram slots"""
+        stats = RollupStats()
+        for duration in (2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0):
+            stats.add("success", duration, None)
+
+        summary = stats.summary()
+
+        assert summary["duration"]["mean_seconds"] == pytest.approx(5.0)
+        assert summary["duration"]["std_seconds"] == pytest.approx(2.0)
+        assert summary["duration"]["min_seconds"] == 2.0
+        assert summary["duration"]["max_seconds"] == 9.0
+        assert sum(stats.duration_histogram) == 8
+        assert len(stats.duration_histogram) == len(DURATION_BUCKETS) + 1
+        assert 2.0 <= stats.quantile(0.5) <= 5.0
+
+    def test_merge_equals_combined(self):
+        """Test merging two buckets matches adding every sample to one"""
+        left, right, combined = RollupStats(), RollupStats(), RollupStats()
+        for index, duration in enumerate([1.0, 30.0, 400.0, 5000.0, None]):
+            result = "success" if index % 2 else "failure"
+            (left if index < 2 else right).add(result, duration, 0.5, 3, 2, 1)
+            combined.add(result, duration, 0.5, 3, 2, 1)
+
+        left.merge(right)
+
+        assert left == combined
+
+
+@pytest.mark.unit
+class TestRollupService:
+    """Tests for incremental bucket maintenance and rebuilds"""
+
+    async def _seed(self, session):
+        service = PersistenceService()
+        await _store(service, session, DAY_START + timedelta(minutes=5), "success", 10)
+        await _store(service, session, DAY_START + timedelta(minutes=50), "failure", 20)
+        await _store(service, session, DAY_START + timedelta(hours=3), "success", 400)
+        await _store(
+            service, session, DAY_START + timedelta(hours=3), "success", 5, "qa_agent"
+        )
+        await session.commit()
+
+    async def test_writes_update_hourly_and_daily_buckets(self, test_session):
+        """Test storing history folds each row into its buckets"""
+        await self._seed(test_session)
+
+        series = await RollupService().get_series(
+            test_session, "workflow_type", DAY_START, DAY_START + timedelta(days=1)
+        )
+
+        assert [bucket["count"] for bucket in series] == [2, 2]
+        assert series[0]["successful"] == 1
+        assert series[0]["duration"]["mean_seconds"] == pytest.approx(15.0)
+
+        totals = await RollupService().get_totals(
+            test_session, "agent", DAY_START, DAY_START + timedelta(days=1)
+        )
+        assert totals["build_agent"]["count"] == 3
+        assert totals["build_agent"]["tasks"]["failed"] == 1
+        assert totals["qa_agent"]["duration"]["max_seconds"] == 5
+
+    async def test_rebuild_matches_incremental_buckets(self, test_session):
+        """Test a rebuild from raw history reproduces the incremental rows"""
+        await self._seed(test_session)
+        incremental = _snapshot(
+            (await test_session.execute(select(MetricRollup))).scalars().all()
+        )
+
+        result = await RollupService().rebuild(
+            test_session, DAY_START + timedelta(hours=2), DAY_START + timedelta(hours=4)
+        )
+        await test_session.commit()
+        rebuilt = _snapshot(
+            (await test_session.execute(select(MetricRollup))).scalars().all()
+        )
+
+        assert result == {"buckets": len(incremental), "workflows": 4, "phases": 4}
+        assert rebuilt == incremental
+
+    async def test_rejects_unknown_granularity(self, test_session):
+        """Test only hourly and daily buckets can be queried"""
+        with pytest.raises(ValueError):
+            await RollupService().get_buckets(
+                test_session, "agent", DAY_START, DAY_START, granularity="week"
+            )
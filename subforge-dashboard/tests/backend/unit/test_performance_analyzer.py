@@ -0,0 +1,186 @@
+"""
+Unit tests for PerformanceAnalyzer's offloadable computation
+"""
+
+import pickle
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from backend.analytics.models.performance_analyzer import PerformanceAnalyzer
+from backend.app.database.base import Base
+from backend.app.models.agent import Agent
+from backend.app.models.system_metrics import SystemMetrics
+from backend.app.models.task import Task
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+BUILDER = uuid.UUID("00000000-0000-0000-0000-000000000001")
+REVIEWER = uuid.UUID("00000000-0000-0000-0000-000000000002")
+
+
+@pytest_asyncio.fixture
+async def performance_db():
+    """Two agents, tasks spread over the last day and one metrics sample"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    now = datetime.utcnow()
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessions() as session:
+        session.add_all(
+            [
+                Agent(
+                    id=BUILDER,
+                    name="builder",
+                    agent_type="backend",
+                    status="active",
+                    success_rate=90.0,
+                    uptime_percentage=80.0,
+                ),
+                Agent(
+                    id=REVIEWER,
+                    name="reviewer",
+                    agent_type="qa",
+                    status="idle",
+                    success_rate=60.0,
+                    uptime_percentage=50.0,
+                ),
+            ]
+        )
+        # The builder completes more work every four hours
+        for hours_ago in range(2, 24, 4):
+            for _ in range((24 - hours_ago) // 4):
+                session.add(
+                    Task(
+                        title="build",
+                        status="completed",
+                        assigned_agent_id=BUILDER,
+                        actual_duration_minutes=30,
+                        quality_score=0.9,
+                        created_at=now - timedelta(hours=hours_ago),
+                    )
+                )
+        session.add_all(
+            [
+                Task(
+                    title="review",
+                    status=status,
+                    assigned_agent_id=REVIEWER,
+                    actual_duration_minutes=150,
+                    created_at=now - timedelta(hours=3),
+                )
+                for status in ("completed", "failed", "failed", "in_progress")
+            ]
+        )
+        # Outside the time range
+        session.add(
+            Task(
+                title="old",
+                status="completed",
+                assigned_agent_id=BUILDER,
+                created_at=now - timedelta(days=3),
+            )
+        )
+        session.add(
+            SystemMetrics(
+                recorded_at=now,
+                cpu_usage_percentage=40.0,
+                memory_usage_percentage=55.0,
+                system_load_percentage=85.0,
+                api_requests_per_minute=12.0,
+            )
+        )
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+def _comparable(report):
+    """Drop values derived from the clock at computation time"""
+    report["report_metadata"].pop("generated_at")
+    report.pop("next_analysis_scheduled")
+    summary = report["agent_summary"]
+    for metrics in (
+        report["detailed_agent_metrics"]
+        + summary["top_performers"]
+        + summary["needs_attention"]
+    ):
+        metrics.pop("uptime_hours")
+        metrics.pop("active_hours")
+        # Trend intervals end at the current time
+        metrics["trend_confidence"] = round(metrics["trend_confidence"], 6)
+    return report
+
+
+@pytest.mark.unit
+class TestPerformanceAnalyzer:
+    """The report is computed from three prefetched snapshots"""
+
+    async def test_report_from_snapshots(self, performance_db):
+        """Test per-agent and system metrics reflect the stored tasks"""
+        report = await PerformanceAnalyzer().analyze(performance_db)
+
+        agents = {m["agent_name"]: m for m in report["detailed_agent_metrics"]}
+        builder, reviewer = agents["builder"], agents["reviewer"]
+        assert builder["tasks_completed"] == 15
+        assert builder["success_rate"] == 100
+        assert builder["performance_trend"] == "improving"
+        assert reviewer["tasks_failed"] == 2
+        assert reviewer["tasks_in_progress"] == 1
+        assert reviewer["success_rate"] == pytest.approx(100 / 3)
+        assert report["agent_summary"]["top_performers"][0]["agent_name"] == "builder"
+
+        system = report["system_overview"]
+        assert system["total_tasks"] == 19
+        assert system["completed_tasks"] == 16
+        assert system["active_agents"] == 1
+        assert system["system_load"] == 85.0
+        assert [b["type"] for b in system["bottlenecks"]] == [
+            "agent_overload",
+            "high_failure_rate",
+        ]
+        assert "High system load detected" in (
+            report["insights_and_recommendations"]["alerts"]
+        )
+
+    async def test_offloaded_result_matches_inline(self, performance_db):
+        """Test pickled inputs give the worker the same report"""
+        analyzer = PerformanceAnalyzer()
+        inline = await analyzer.analyze(performance_db)
+
+        inputs = pickle.loads(pickle.dumps(await analyzer.fetch_inputs(performance_db)))
+        offloaded = PerformanceAnalyzer.compute_from_inputs(inputs)
+
+        assert PerformanceAnalyzer.supports_offloading
+        assert _comparable(offloaded) == _comparable(inline)
+
+    async def test_single_agent(self, performance_db):
+        """Test agent_id limits the snapshots to that agent"""
+        analyzer = PerformanceAnalyzer()
+        inputs = await analyzer.fetch_inputs(performance_db, agent_id=REVIEWER)
+
+        result = PerformanceAnalyzer.compute_from_inputs(inputs, agent_id=REVIEWER)
+
+        assert len(inputs["tasks"]) == 4
+        assert [m["agent_name"] for m in result["agent_metrics"]] == ["reviewer"]
+
+    async def test_queries_do_not_grow_with_agents(self, performance_db):
+        """Test one query each for agents, tasks and system metrics"""
+        execute = performance_db.execute
+        statements = []
+
+        async def counting_execute(statement, *args, **kwargs):
+            statements.append(statement)
+            return await execute(statement, *args, **kwargs)
+
+        performance_db.execute = counting_execute
+        await PerformanceAnalyzer().analyze(performance_db)
+
+        assert len(statements) == 3
@@ -0,0 +1,130 @@
+"""
+Unit tests for SQL-side aggregation in PersistenceService
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from app.models.database import WorkflowAgentAssociation
+from app.services.persistence import PersistenceService
+from sqlalchemy import select
+
+PERIOD_START = datetime(2025, 1, 1, 0, 0)
+
+
+async def _store_workflow(service, session, index, result, agents, duration):
+    started = PERIOD_START + timedelta(hours=index)
+    workflow = await service.store_workflow_execution(
+        session,
+        {
+            "workflow_id": uuid.uuid4(),
+            "name": f"workflow-{index}",
+            "final_result": result,
+            "started_at": started,
+            "duration_seconds": duration,
+            "total_tasks": 4,
+            "completed_tasks": 3 if result == "success" else 1,
+            "quality_score": 0.5 + index / 10,
+            "assigned_agents": [
+                {"id": agent, "name": agent.title(), "type": "subforge_phase_agent"}
+                for agent in agents
+            ],
+        },
+    )
+    for order, agent in enumerate(agents):
+        await service.store_phase_execution(
+            session,
+            workflow.id,
+            {
+                "name": f"phase-{order}",
+                "order": order,
+                "result": result,
+                "started_at": started,
+                "duration_seconds": 60.0,
+                "assigned_agent_id": agent,
+                "assigned_agent_name": agent.title(),
+                "total_tasks": 2,
+                "completed_tasks": 2 if result == "success" else 0,
+                "failed_tasks": 0 if result == "success" else 2,
+                "quality_score": 0.8,
+            },
+        )
+    return workflow
+
+
+@pytest.mark.unit
+class TestPersistenceAggregation:
+    """Tests for aggregate queries and the workflow/agent association"""
+
+    async def _seed(self, session):
+        service = PersistenceService()
+        await _store_workflow(
+            service, session, 0, "success", ["analysis_agent", "build_agent"], 100.0
+        )
+        await _store_workflow(service, session, 1, "success", ["build_agent"], 200.0)
+        await _store_workflow(service, session, 2, "failure", ["analysis_agent"], None)
+        await session.commit()
+        return service
+
+    async def test_agent_links_are_normalized(self, test_session):
+        """Test one association row is written per distinct assigned agent"""
+        service = PersistenceService()
+        await _store_workflow(
+            service, test_session, 0, "success", ["a", "b", "a"], 10.0
+        )
+
+        rows = (await test_session.execute(select(WorkflowAgentAssociation))).all()
+
+        assert sorted(row[0].agent_id for row in rows) == ["a", "b"]
+
+    async def test_workflow_analytics_summary(self, test_session):
+        """Test summary figures are computed by the aggregate query"""
+        service = await self._seed(test_session)
+
+        summary = await service.get_workflow_analytics_summary(test_session)
+
+        assert summary["total_workflows"] == 3
+        assert summary["successful_workflows"] == 2
+        assert summary["failed_workflows"] == 1
+        assert summary["success_rate"] == pytest.approx(2 / 3)
+        assert summary["average_duration_seconds"] == pytest.approx(150.0)
+        assert summary["total_tasks"] == 12
+        assert summary["completed_tasks"] == 7
+        assert summary["average_quality_score"] == pytest.approx(0.6)
+
+    async def test_empty_range_summary(self, test_session):
+        """Test an empty window keeps the previous empty-summary shape"""
+        service = await self._seed(test_session)
+        window = (datetime(2030, 1, 1), datetime(2030, 1, 2))
+
+        summary = await service.get_workflow_analytics_summary(test_session, window)
+
+        assert summary["total_workflows"] == 0
+        assert summary["performance_summary"] == {}
+
+    async def test_agent_performance_counts(self, test_session):
+        """Test per-agent workflow, phase and task totals over a period"""
+        service = await self._seed(test_session)
+
+        metrics = await service.calculate_and_store_agent_performance(
+            test_session,
+            "analysis_agent",
+            PERIOD_START,
+            PERIOD_START + timedelta(days=1),
+        )
+
+        assert metrics.agent_name == "Analysis_Agent"
+        assert metrics.total_workflows == 2
+        assert metrics.successful_workflows == 1
+        assert metrics.failed_workflows == 1
+        assert metrics.total_phases == 2
+        assert metrics.successful_phases == 1
+        assert metrics.total_tasks == 4
+        assert metrics.successful_tasks == 2
+        assert metrics.failed_tasks == 2
+        assert metrics.total_active_time_seconds == pytest.approx(120.0)
+        assert metrics.average_phase_duration_seconds == pytest.approx(60.0)
+        assert metrics.average_quality_score == pytest.approx(0.8)
+        assert metrics.successful_handoffs == 0
+        assert metrics.average_handoff_time_seconds is None
@@ -0,0 +1,328 @@
+"""
+Unit tests for the model registry and incremental predictor updates
+"""
+
+import json
+import pickle
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import pytest_asyncio
+from backend.analytics.models.model_registry import ModelRegistry
+from backend.analytics.models.predictive_models import (
+    IncrementalPredictor,
+    SystemLoadPredictor,
+    TaskDurationPredictor,
+    _extend_estimator,
+)
+from backend.analytics.services.analysis_executor import AnalysisExecutor
+from backend.app.database.base import Base
+from backend.app.models.agent import Agent
+from backend.app.models.system_metrics import SystemMetrics
+from backend.app.models.task import Task
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, SGDRegressor
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+START = datetime(2026, 10, 1)
+
+
+@pytest_asyncio.fixture
+async def history_db():
+    """In-memory database with the analytics history tables"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessions() as session:
+        yield session
+    await engine.dispose()
+
+
+async def _add_metrics(db, first_hour, count):
+    rng = random.Random(first_hour)
+    for hour in range(first_hour, first_hour + count):
+        cpu = rng.uniform(5, 95)
+        db.add(
+            SystemMetrics(
+                recorded_at=START + timedelta(hours=hour),
+                active_agents=rng.randrange(1, 10),
+                total_tasks=rng.randrange(0, 100),
+                pending_tasks=rng.randrange(0, 20),
+                cpu_usage_percentage=cpu,
+                memory_usage_percentage=rng.uniform(20, 80),
+                api_requests_per_minute=rng.uniform(0, 500),
+                system_load_percentage=cpu * 0.8 + rng.uniform(0, 10),
+            )
+        )
+    await db.commit()
+
+
+def _fitted(model):
+    rng = np.random.default_rng(0)
+    X, y = rng.random((40, 3)), rng.random(40)
+    model.fit(X, y)
+    return model, X, y
+
+
+@pytest.mark.unit
+class TestModelRegistry:
+    """Tests for versioned save, load and pruning"""
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """Test a saved bundle loads back with its version and watermark"""
+        registry = ModelRegistry(tmp_path)
+        model, X, _ = _fitted(LinearRegression())
+        watermark = datetime(2026, 10, 18, 12, 30)
+
+        saved = registry.save("load", {"model": model}, watermark, {"r2": 0.9})
+        loaded = registry.load_latest("load")
+
+        assert (saved.version, loaded.version) == (1, 1)
+        assert loaded.training_watermark == watermark
+        assert loaded.metadata == {"r2": 0.9}
+        assert loaded.trained_at == saved.trained_at
+        np.testing.assert_allclose(loaded.bundle["model"].predict(X), model.predict(X))
+
+    def test_versions_increase_and_old_ones_are_pruned(self, tmp_path):
+        """Test only the newest keep_versions artifacts stay on disk"""
+        registry = ModelRegistry(tmp_path, keep_versions=2)
+        for value in range(4):
+            registry.save("load", {"value": value}, None)
+
+        versions = [entry["version"] for entry in registry.list_versions("load")]
+        assert versions == [3, 4]
+        files = sorted(path.name for path in (tmp_path / "load").iterdir())
+        assert files == ["manifest.json", "v3.joblib", "v4.joblib"]
+        assert registry.load_latest("load").bundle == {"value": 3}
+
+    def test_unloadable_latest_falls_back_to_previous(self, tmp_path):
+        """Test a corrupt newest artifact does not hide the previous version"""
+        registry = ModelRegistry(tmp_path)
+        registry.save("load", {"value": 1}, None)
+        registry.save("load", {"value": 2}, None)
+        (tmp_path / "load" / "v2.joblib").write_bytes(b"not a pickle")
+
+        artifact = registry.load_latest("load")
+        assert (artifact.version, artifact.bundle) == (1, {"value": 1})
+
+    def test_missing_or_unreadable_manifest(self, tmp_path):
+        """Test no manifest means no model, and a broken one is ignored"""
+        registry = ModelRegistry(tmp_path)
+        assert registry.load_latest("load") is None
+
+        (tmp_path / "load").mkdir()
+        (tmp_path / "load" / "manifest.json").write_text("{broken")
+        assert registry.load_latest("load") is None
+        assert registry.save("load", {}, None).version == 1
+        assert json.loads((tmp_path / "load" / "manifest.json").read_text())
+
+
+@pytest.mark.unit
+class TestExtendEstimator:
+    """Tests for in-place incremental updates and the ensemble size cap"""
+
+    @pytest.mark.parametrize(
+        "model_class", [RandomForestRegressor, GradientBoostingRegressor]
+    )
+    def test_ensembles_grow_up_to_the_cap(self, model_class):
+        """Test warm starts add trees until max_estimators would be exceeded"""
+        model, X, y = _fitted(model_class(n_estimators=20, random_state=0))
+
+        assert _extend_estimator(model, X, y, 10, 40)
+        assert _extend_estimator(model, X, y, 10, 40)
+        assert model.n_estimators == 40
+        assert not _extend_estimator(model, X, y, 10, 40)
+        assert model.n_estimators == 40
+
+    def test_partial_fit_estimators_are_not_capped(self):
+        """Test estimators with partial_fit are updated directly"""
+        model, X, y = _fitted(SGDRegressor(random_state=0))
+        assert _extend_estimator(model, X, y, 10, 0)
+
+    def test_other_estimators_need_a_refit(self):
+        """Test estimators without an incremental path report False"""
+        model, X, y = _fitted(LinearRegression())
+        assert not _extend_estimator(model, X, y, 10, 1000)
+
+
+@pytest.mark.unit
+class TestIncrementalPredictor:
+    """Tests for update_model, persistence and the full refit fallback"""
+
+    def test_bundle_methods_are_abstract(self):
+        """Test a predictor without bundle methods cannot be instantiated"""
+
+        class Incomplete(IncrementalPredictor):
+            async def analyze(self, *args, **kwargs):
+                return {}
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    async def test_update_extends_then_refits_at_the_cap(self, history_db, tmp_path):
+        """Test new rows extend the model until the cap forces a full refit"""
+        registry = ModelRegistry(tmp_path, keep_versions=10)
+        predictor = SystemLoadPredictor(registry)
+        predictor.max_estimators = 120
+        await _add_metrics(history_db, 0, 60)
+
+        await predictor.train_model(history_db)
+        first_fit = predictor.last_full_fit
+        assert predictor.model.n_estimators == 100
+        assert predictor.training_watermark == START + timedelta(hours=59)
+        assert predictor.model_version == 1
+
+        # Too few new rows leave the model alone
+        await _add_metrics(history_db, 60, 5)
+        await predictor.update_model(history_db)
+        assert predictor.model_version == 1
+
+        await _add_metrics(history_db, 65, 10)
+        performance = await predictor.update_model(history_db)
+        assert performance is predictor.performance
+        assert predictor.model.n_estimators == 110
+        assert predictor.training_watermark == START + timedelta(hours=74)
+        assert predictor.last_full_fit == first_fit
+        assert predictor.model_version == 2
+
+        await _add_metrics(history_db, 75, 10)
+        await predictor.update_model(history_db)
+        assert predictor.model.n_estimators == 120
+        assert predictor.model_version == 3
+
+        # The next update would exceed max_estimators, so it refits
+        await _add_metrics(history_db, 85, 10)
+        await predictor.update_model(history_db)
+        assert predictor.model.n_estimators == 100
+        assert predictor.last_full_fit > first_fit
+        assert predictor.training_watermark == START + timedelta(hours=94)
+        assert predictor.model_version == 4
+
+        versions = registry.list_versions("system_load")
+        assert [v["metadata"]["update"] for v in versions] == [
+            "full",
+            "incremental",
+            "incremental",
+            "full",
+        ]
+
+    async def test_stale_full_fit_triggers_refit(self, history_db, tmp_path):
+        """Test update_model refits once full_refit_interval has passed"""
+        predictor = SystemLoadPredictor(ModelRegistry(tmp_path))
+        await _add_metrics(history_db, 0, 60)
+        await predictor.train_model(history_db)
+        predictor.last_full_fit -= predictor.full_refit_interval
+
+        await _add_metrics(history_db, 60, 10)
+        await predictor.update_model(history_db)
+
+        assert predictor.model.n_estimators == 100
+        assert datetime.utcnow() - predictor.last_full_fit < timedelta(minutes=1)
+
+    async def test_load_model_restores_persisted_state(self, history_db, tmp_path):
+        """Test a new predictor picks up the saved model and watermark"""
+        registry = ModelRegistry(tmp_path)
+        trained = SystemLoadPredictor(registry)
+        await _add_metrics(history_db, 0, 60)
+        await trained.train_model(history_db)
+
+        restored = SystemLoadPredictor(registry)
+        assert restored.load_model()
+
+        assert restored.model_trained
+        assert restored.model_version == trained.model_version
+        assert restored.training_watermark == trained.training_watermark
+        assert restored.last_full_fit == trained.last_full_fit
+        assert restored.performance == trained.performance
+        X = np.random.default_rng(1).random((5, len(trained.feature_columns)))
+        np.testing.assert_allclose(
+            restored.model.predict(restored.scaler.transform(X)),
+            trained.model.predict(trained.scaler.transform(X)),
+        )
+
+    def test_load_model_without_registry_or_artifact(self, tmp_path):
+        """Test load_model reports False when there is nothing to load"""
+        assert not SystemLoadPredictor().load_model()
+        assert not SystemLoadPredictor(ModelRegistry(tmp_path)).load_model()
+
+
+def _without_timestamps(predictions, key):
+    """Drop values derived from the clock at prediction time"""
+    return [{k: v for k, v in p.items() if k != key} for p in predictions]
+
+
+@pytest.mark.unit
+class TestOffloadedPrediction:
+    """Tests for predictions computed from pickled inputs in a worker"""
+
+    async def test_system_load_from_inputs_matches_inline(self, history_db):
+        """Test the restored bundle predicts the same load as the trained model"""
+        await _add_metrics(history_db, 0, 60)
+        predictor = SystemLoadPredictor()
+        inline = await predictor.analyze(history_db)
+
+        inputs = pickle.loads(pickle.dumps(await predictor.fetch_inputs(history_db)))
+        offloaded = SystemLoadPredictor.compute_from_inputs(inputs)
+
+        assert SystemLoadPredictor.supports_offloading
+        assert len(offloaded["load_predictions"]) == 24
+        assert _without_timestamps(
+            offloaded["load_predictions"], "timestamp"
+        ) == _without_timestamps(inline["load_predictions"], "timestamp")
+        assert (
+            offloaded["capacity_recommendations"] == inline["capacity_recommendations"]
+        )
+
+    async def test_task_durations_from_inputs_match_inline(self, history_db):
+        """Test pending tasks are predicted from the snapshot, not the session"""
+        agent_id = uuid.uuid4()
+        history_db.add(
+            Agent(id=agent_id, name="builder", agent_type="backend", status="active")
+        )
+        history_db.add_all(
+            [
+                Task(
+                    title=f"pending {i}",
+                    status="pending",
+                    assigned_agent_id=agent_id,
+                    complexity_score=i + 1,
+                )
+                for i in range(3)
+            ]
+        )
+        await history_db.commit()
+        predictor = TaskDurationPredictor()
+        inline = await predictor.analyze(history_db)
+
+        inputs = pickle.loads(pickle.dumps(await predictor.fetch_inputs(history_db)))
+        offloaded = TaskDurationPredictor.compute_from_inputs(inputs)
+
+        assert TaskDurationPredictor.supports_offloading
+        assert len(offloaded["predictions"]) == 3
+        assert {p["agent_name"] for p in offloaded["predictions"]} == {"builder"}
+        assert _without_timestamps(
+            offloaded["predictions"], "estimated_completion"
+        ) == _without_timestamps(inline["predictions"], "estimated_completion")
+        assert offloaded["model_performance"] == inline["model_performance"]
+
+    async def test_executor_runs_predictor_in_a_worker(self, history_db):
+        """Test AnalysisExecutor sends the predictor to the process pool"""
+        await _add_metrics(history_db, 0, 60)
+        executor = AnalysisExecutor(max_workers=1)
+        try:
+            result = await executor.run(SystemLoadPredictor(), history_db)
+        finally:
+            executor.shutdown()
+
+        assert executor.stats["offloaded"] == 1
+        assert len(result["load_predictions"]) == 24
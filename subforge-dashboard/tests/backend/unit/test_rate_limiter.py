@@ -0,0 +1,77 @@
+"""
+Unit tests for the GCRA rate limiter
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.services.rate_limiter import RateLimit, RateLimiter
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Tests for the in-process GCRA path and Redis script handling"""
+
+    @pytest.fixture
+    def limiter(self):
+        return RateLimiter(SimpleNamespace(redis_client=None))
+
+    def test_allows_full_burst_then_rejects(self, limiter):
+        """Test a limit of N allows N immediate requests and then waits"""
+        limits = [RateLimit(5, 60)]
+        results = [limiter._hit_local(["k"], limits, now=0.0) for _ in range(6)]
+
+        assert [r.allowed for r in results] == [True] * 5 + [False]
+        assert [r.remaining for r in results[:5]] == [4, 3, 2, 1, 0]
+        # One emission interval (60s / 5) until the next request fits
+        assert results[5].retry_after == pytest.approx(12.0)
+        assert results[5].limit == limits[0]
+
+        assert limiter._hit_local(["k"], limits, now=12000.0).allowed
+
+    def test_rejection_does_not_consume_other_limits(self, limiter):
+        """Test a request rejected by one limit leaves every limit untouched"""
+        limits = [RateLimit(100, 60), RateLimit(2, 3600)]
+        keys = ["k:60", "k:3600"]
+
+        assert limiter._hit_local(keys, limits, now=0.0).allowed
+        assert limiter._hit_local(keys, limits, now=0.0).allowed
+        before = dict(limiter._local_tats)
+
+        result = limiter._hit_local(keys, limits, now=0.0)
+
+        assert not result.allowed
+        assert result.limit.period == 3600
+        assert limiter._local_tats == before
+
+    async def test_falls_back_when_redis_fails(self):
+        """Test Redis errors switch to the in-process limiter"""
+        client = MagicMock()
+        client.register_script.return_value = AsyncMock(
+            side_effect=ConnectionError("down")
+        )
+        limiter = RateLimiter(SimpleNamespace(redis_client=client))
+
+        results = [await limiter.hit("ip:1", [RateLimit(2, 60)]) for _ in range(3)]
+
+        assert [r.allowed for r in results] == [True, True, False]
+        assert limiter._using_fallback
+
+    async def test_uses_single_script_call(self):
+        """Test each hit is one script invocation carrying every limit"""
+        script = AsyncMock(return_value=[1, 0, 0, 59])
+        client = MagicMock()
+        client.register_script.return_value = script
+        limiter = RateLimiter(SimpleNamespace(redis_client=client))
+
+        result = await limiter.hit(
+            "ip:1", [RateLimit(60, 60), RateLimit(1000, 3600)]
+        )
+
+        assert result.allowed and result.remaining == 59
+        script.assert_awaited_once_with(
+            keys=["ip:1:gcra:60", "ip:1:gcra:3600"],
+            args=[1000, 60000, 3600, 3600000],
+        )
+        client.register_script.assert_called_once()
@@ -0,0 +1,137 @@
+"""
+Unit tests for the Redis value codec and batched RedisService operations
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+from app.services.redis_codec import FORMAT_VERSION, MAGIC, RedisValueCodec
+from app.services.redis_service import RedisService
+
+
+class FakeBinaryRedis:
+    """Bytes-in, bytes-out subset of the aioredis commands"""
+
+    def __init__(self):
+        self.data = {}
+
+    @staticmethod
+    def _bytes(value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode("utf-8")
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = self._bytes(value)
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def hset(self, name, key, value):
+        self.data.setdefault(name, {})[key.encode()] = self._bytes(value)
+        return 1
+
+    async def hmget(self, name, keys):
+        fields = self.data.get(name, {})
+        return [fields.get(key.encode()) for key in keys]
+
+    async def hgetall(self, name):
+        return dict(self.data.get(name, {}))
+
+
+@pytest.mark.unit
+class TestRedisValueCodec:
+    """Tests for encoding, compression and reading values written before"""
+
+    @pytest.mark.parametrize("serializer", ["json", "orjson", "msgpack"])
+    def test_round_trip(self, serializer):
+        """Test structured values survive encode/decode with each serializer"""
+        if serializer == "msgpack":
+            pytest.importorskip("msgpack")
+        codec = RedisValueCodec(serializer=serializer)
+        value = {"id": "task-1", "progress": 0.5, "tags": ["a", "b"], "n": None}
+
+        encoded = codec.encode(value)
+
+        assert encoded[:2] == MAGIC + bytes([FORMAT_VERSION])
+        assert codec.decode(encoded) == value
+
+    def test_large_values_are_compressed(self):
+        """Test values above the threshold are stored zlib-compressed"""
+        codec = RedisValueCodec(compress_min_size=256)
+        value = {"log": ["same line of output"] * 200}
+
+        encoded = codec.encode(value)
+
+        assert encoded[3:4] == b"z"
+        assert len(encoded) < len(json.dumps(value))
+        assert codec.decode(encoded) == value
+        assert codec.encode({"small": 1})[3:4] == b"-"
+
+    def test_scalars_and_legacy_values(self):
+        """Test scalars stay plain and untagged JSON or text still decodes"""
+        codec = RedisValueCodec()
+
+        assert codec.encode("plain") == "plain"
+        assert codec.encode(42) == 42
+        assert codec.decode(b'{"legacy": true}') == {"legacy": True}
+        assert codec.decode('{"legacy": true}') == {"legacy": True}
+        assert codec.decode(b"not json") == "not json"
+        assert codec.decode(b"7") == 7
+
+    def test_non_json_types_fall_back_to_str(self):
+        """Test values json.dumps(default=str) accepted are still encodable"""
+        codec = RedisValueCodec(serializer="json")
+        created = datetime(2024, 1, 2, 3, 4, 5)
+
+        decoded = codec.decode(codec.encode({"created_at": created, 1: {1, 2}}))
+
+        assert decoded["created_at"] == str(created)
+        assert "1" in decoded
+
+    def test_unknown_format_version_is_rejected(self):
+        """Test a value from a newer format is not misread"""
+        codec = RedisValueCodec()
+        with pytest.raises(ValueError):
+            codec.decode(MAGIC + bytes([FORMAT_VERSION + 1]) + b"j-{}")
+
+
+@pytest.mark.unit
+class TestRedisServiceBatching:
+    """Tests for the batch APIs over the binary client"""
+
+    @pytest.fixture
+    def service(self):
+        service = RedisService()
+        service.binary_client = FakeBinaryRedis()
+        return service
+
+    async def test_mget_decodes_in_key_order(self, service):
+        """Test mget returns decoded values and defaults for missing keys"""
+        await service.set("a", {"value": 1})
+        await service.set("c", "text")
+
+        assert await service.mget(["a", "b", "c"], default=0) == [
+            {"value": 1},
+            0,
+            "text",
+        ]
+
+    async def test_hash_batch_reads(self, service):
+        """Test hmget and hgetall decode fields to str keys and values"""
+        await service.hset("tasks", "t1", {"status": "running"})
+        await service.hset("tasks", "t2", {"status": "done"})
+
+        assert await service.hmget("tasks", ["t2", "missing"]) == [
+            {"status": "done"},
+            None,
+        ]
+        assert await service.hgetall("tasks") == {
+            "t1": {"status": "running"},
+            "t2": {"status": "done"},
+        }
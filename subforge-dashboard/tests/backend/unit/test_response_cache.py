@@ -0,0 +1,222 @@
+"""
+Unit tests for the response cache decorator and tag invalidation
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import pytest
+from app.services.api_enhancement import APIEnhancementService
+from fastapi import Request
+
+
+class FakePipeline:
+    """Buffers calls and runs them against the fake service on execute()"""
+
+    def __init__(self, service):
+        self.service = service
+        self.buffered = []
+
+    def __getattr__(self, name):
+        def buffer(*args, **kwargs):
+            self.buffered.append((getattr(self.service, name), args, kwargs))
+            return self
+
+        return buffer
+
+    async def execute(self):
+        results = [await command(*a, **kw) for command, a, kw in self.buffered]
+        self.buffered = []
+        return results
+
+
+class FakeRedisService:
+    """In-memory subset of RedisService used by the response cache"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    async def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    async def set(self, key, value, expire=None):
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+    async def delete_many(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def add_to_index(self, indexes, member, ttl):
+        # Mirrors the Lua script: scores are expiry times, index TTLs only grow
+        now = time.time()
+        for name in indexes:
+            index = self.data.setdefault(name, {})
+            index[member] = max(index.get(member, 0), now + ttl)
+            for expired in [m for m, until in index.items() if until < now]:
+                del index[expired]
+            self.ttls[name] = max(self.ttls.get(name, 0), ttl)
+        return len(indexes)
+
+    async def index_members(self, name):
+        now = time.time()
+        return [m for m, until in self.data.get(name, {}).items() if until >= now]
+
+    @asynccontextmanager
+    async def pipeline(self):
+        yield FakePipeline(self)
+
+
+def _request(path="/api/v2/agents", query=b""):
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query,
+            "headers": [],
+        }
+    )
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """Tests for single-flight misses, stale-while-revalidate and tags"""
+
+    @pytest.fixture
+    def redis(self):
+        fake = FakeRedisService()
+        with patch("app.services.api_enhancement.redis_service", fake):
+            yield fake
+
+    async def test_concurrent_misses_run_handler_once(self, redis):
+        """Test simultaneous requests for a cold key share one computation"""
+        service = APIEnhancementService()
+        calls = 0
+
+        @service.cache_response(ttl=60, prefix="agents_list")
+        async def list_agents(request: Request):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"agents": calls}
+
+        results = await asyncio.gather(*(list_agents(_request()) for _ in range(10)))
+
+        assert calls == 1
+        assert results == [{"agents": 1}] * 10
+        assert service.cache_stats["coalesced"] == 9
+        assert await list_agents(_request()) == {"agents": 1}
+        assert service.cache_stats["hits"] == 1
+
+    async def test_failure_is_shared_and_not_cached(self, redis):
+        """Test waiters receive the leader's error and the next request retries"""
+        service = APIEnhancementService()
+        calls = 0
+
+        @service.cache_response(ttl=60)
+        async def flaky(request: Request):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            if calls == 1:
+                raise ValueError("backend down")
+            return {"ok": True}
+
+        results = await asyncio.gather(
+            flaky(_request()), flaky(_request()), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+        assert await flaky(_request()) == {"ok": True}
+        assert calls == 2
+
+    async def test_stale_entry_served_while_refreshing(self, redis):
+        """Test an expired entry is returned immediately and refreshed once"""
+        service = APIEnhancementService()
+        calls = 0
+
+        @service.cache_response(ttl=60, stale_ttl=300)
+        async def stats(request: Request):
+            nonlocal calls
+            calls += 1
+            return {"version": calls}
+
+        assert await stats(_request()) == {"version": 1}
+        (cache_key,) = [k for k in redis.data if not k.startswith("cache_tag:")]
+        redis.data[cache_key]["fresh_until"] = time.time() - 1
+
+        stale = await asyncio.gather(stats(_request()), stats(_request()))
+        assert stale == [{"version": 1}, {"version": 1}]
+        await asyncio.gather(*service._refresh_tasks.values())
+
+        assert calls == 2
+        assert await stats(_request()) == {"version": 2}
+
+    async def test_response_objects_round_trip(self, redis):
+        """Test Response results are cached as body, status and headers"""
+        from fastapi.responses import JSONResponse
+
+        service = APIEnhancementService()
+
+        @service.cache_response(ttl=60)
+        async def page(request: Request):
+            return JSONResponse(content={"data": [1, 2]}, headers={"X-Total": "2"})
+
+        await page(_request())
+        cached = await page(_request())
+
+        assert cached.body == b'{"data":[1,2]}'
+        assert cached.headers["x-total"] == "2"
+        assert cached.status_code == 200
+
+    async def test_tag_invalidation_deletes_only_tagged_keys(self, redis):
+        """Test invalidating a tag removes its entries and keeps the others"""
+        service = APIEnhancementService()
+
+        @service.cache_response(
+            ttl=60, prefix="agent_detail", tags=["agent:{agent_id}"]
+        )
+        async def get_agent(request: Request, agent_id: str):
+            return {"id": agent_id}
+
+        await get_agent(_request("/agents/a"), agent_id="a")
+        await get_agent(_request("/agents/b"), agent_id="b")
+        assert len(await redis.index_members("cache_tag:agent_detail")) == 2
+
+        assert await service.invalidate_cache(tags=["agent:a"]) == 1
+        assert await redis.index_members("cache_tag:agent:b")
+        assert "cache_tag:agent:a" not in redis.data
+
+        assert await service.invalidate_cache(tags=["agent_detail"]) == 1
+        assert not [k for k in redis.data if not k.startswith("cache_tag:")]
+
+    async def test_short_lived_entry_does_not_shorten_tag(self, redis):
+        """Test a tag lives as long as its longest entry and drops expired ones"""
+        service = APIEnhancementService()
+
+        @service.cache_response(ttl=600, prefix="reports", tags=["team:{team}"])
+        async def report(request: Request, team: str):
+            return {"team": team}
+
+        @service.cache_response(ttl=5, prefix="status", tags=["team:{team}"])
+        async def status(request: Request, team: str):
+            return {"ok": True}
+
+        await report(_request("/reports"), team="core")
+        await status(_request("/status"), team="core")
+        assert redis.ttls["cache_tag:team:core"] == 600
+
+        # The status entry expires; the report is still indexed
+        index = redis.data["cache_tag:team:core"]
+        (status_key,) = [k for k in index if k.startswith("status:")]
+        index[status_key] = time.time() - 1
+        del redis.data[status_key]
+        assert len(await redis.index_members("cache_tag:team:core")) == 1
+
+        assert await service.invalidate_cache(tags=["team:core"]) == 1
+        assert not [k for k in redis.data if k.startswith("reports:")]
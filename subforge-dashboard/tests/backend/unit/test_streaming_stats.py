@@ -0,0 +1,215 @@
+"""
+Unit tests for the streaming window statistics, checked against NumPy
+"""
+
+import random
+from collections import deque
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from backend.analytics.processors.data_aggregator import MetricWindow, WindowStats
+from backend.analytics.utils.streaming_stats import QuantileSketch, RunningMoments
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _expected_quantiles(values):
+    # The sketch reports the value at rank q * (n - 1), rounded down
+    return np.quantile(values, QUANTILES, method="lower")
+
+
+def _window(window_minutes=5, max_points=1000):
+    return MetricWindow(window_minutes, deque(), deque(), max_points=max_points)
+
+
+@pytest.mark.unit
+class TestRunningMoments:
+    """Tests for Welford moments with removal and merging"""
+
+    def test_sliding_removal_matches_numpy(self):
+        """Test add/remove over a sliding window keeps exact moments"""
+        rng = random.Random(1)
+        values = [rng.gauss(50, 20) for _ in range(3000)]
+        moments = RunningMoments()
+        for index, value in enumerate(values):
+            moments.add(value)
+            if index >= 100:
+                moments.remove(values[index - 100])
+            if index % 250 == 0 or index == len(values) - 1:
+                current = values[max(0, index - 99) : index + 1]
+                assert moments.count == len(current)
+                assert moments.mean == pytest.approx(np.mean(current))
+                assert moments.total == pytest.approx(np.sum(current))
+                assert moments.variance == pytest.approx(np.var(current))
+
+    def test_removing_last_value_resets(self):
+        """Test removing every value leaves empty moments"""
+        moments = RunningMoments()
+        moments.add(3.0)
+        moments.remove(3.0)
+        assert (moments.count, moments.mean, moments.variance) == (0, 0.0, 0.0)
+
+    def test_merge_matches_concatenation(self):
+        """Test Chan's merge equals the moments of both value sets"""
+        rng = np.random.default_rng(2)
+        left, right = rng.normal(10, 3, 400), rng.normal(-5, 8, 250)
+        a, b = RunningMoments(), RunningMoments()
+        for value in left:
+            a.add(value)
+        for value in right:
+            b.add(value)
+
+        merged = a.merge(b)
+        both = np.concatenate([left, right])
+        assert merged.count == len(both)
+        assert merged.mean == pytest.approx(np.mean(both))
+        assert merged.std == pytest.approx(np.std(both))
+        assert a.count == len(left)  # inputs untouched
+        assert a.merge(RunningMoments()).mean == pytest.approx(a.mean)
+
+
+@pytest.mark.unit
+class TestQuantileSketch:
+    """Tests for the log-bucketed quantile sketch"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Test estimates are within relative_accuracy of the exact quantiles"""
+        values = np.random.default_rng(3).lognormal(3, 1, 5000)
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        estimates = sketch.quantiles(QUANTILES)
+        assert estimates == pytest.approx(_expected_quantiles(values), rel=0.01)
+
+    def test_negative_and_zero_values(self):
+        """Test values of both signs and zeros are ordered correctly"""
+        values = np.array([-50.0, -2.0, 0.0, 0.0, 1.0, 30.0, 200.0])
+        sketch = QuantileSketch()
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.0, 0.3, 0.5, 1.0):
+            expected = np.quantile(values, q, method="lower")
+            assert sketch.quantile(q) == pytest.approx(expected, rel=0.01, abs=1e-9)
+
+    def test_removal_restores_the_remaining_sketch(self):
+        """Test removing values leaves the buckets of the values still present"""
+        values = np.random.default_rng(4).normal(0, 100, 2000)
+        full, remaining = QuantileSketch(), QuantileSketch()
+        for value in values:
+            full.add(value)
+        for value in values[:1200]:
+            full.remove(value)
+        for value in values[1200:]:
+            remaining.add(value)
+
+        assert full.count == remaining.count
+        assert full.positive == remaining.positive
+        assert full.negative == remaining.negative
+        assert full.zero_count == remaining.zero_count
+
+    def test_merge_matches_single_sketch(self):
+        """Test merged sketches equal one sketch over all values"""
+        values = np.random.default_rng(5).exponential(10, 3000)
+        left, right, single = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for index, value in enumerate(values):
+            (left if index % 3 else right).add(value)
+            single.add(value)
+
+        merged = left.merge(right)
+        assert merged.positive == single.positive
+        assert merged.quantiles(QUANTILES) == single.quantiles(QUANTILES)
+        assert left.count + right.count == merged.count
+
+    def test_merge_requires_same_layout(self):
+        """Test sketches with different bucket layouts refuse to merge"""
+        with pytest.raises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+@pytest.mark.unit
+class TestMetricWindow:
+    """Tests for MetricWindow statistics against NumPy over the held points"""
+
+    def _assert_stats(self, stats, values):
+        assert stats["count"] == len(values)
+        assert stats["avg"] == pytest.approx(np.mean(values))
+        assert stats["sum"] == pytest.approx(np.sum(values))
+        assert stats["std"] == pytest.approx(np.std(values), abs=1e-9)
+        assert stats["min"] == np.min(values)
+        assert stats["max"] == np.max(values)
+        assert [stats["p50"], stats["p95"], stats["p99"]] == pytest.approx(
+            _expected_quantiles(values), rel=0.01
+        )
+
+    def test_time_and_size_eviction_match_numpy(self):
+        """Test stats after time-based and max_points evictions"""
+        rng = random.Random(6)
+        window = _window(window_minutes=5, max_points=200)
+        start = datetime(2026, 10, 18)
+        for i in range(3000):
+            # Bursts and gaps exercise both eviction paths
+            offset = timedelta(seconds=i * rng.choice([0.5, 1, 30]))
+            window.add_point(rng.uniform(1, 1000), start + offset)
+            if i % 300 == 0 or i == 2999:
+                self._assert_stats(window.get_stats(), list(window.data_points))
+
+    def test_monotonic_min_max_follow_evictions(self):
+        """Test min/max update when the extreme point leaves the window"""
+        window = _window(max_points=3)
+        start = datetime(2026, 10, 18)
+        for i, value in enumerate([1.0, 9.0, 5.0, 6.0, 4.0, 7.0]):
+            window.add_point(value, start + timedelta(seconds=i))
+            held = list(window.data_points)
+            stats = window.get_stats()
+            assert (stats["min"], stats["max"]) == (min(held), max(held))
+
+    def test_initial_points_are_counted(self):
+        """Test points passed to the constructor are part of the statistics"""
+        start = datetime(2026, 10, 18)
+        window = MetricWindow(
+            5, deque([3.0, 1.0, 2.0]), deque(start + timedelta(seconds=i) for i in range(3))
+        )
+        self._assert_stats(window.get_stats(), [3.0, 1.0, 2.0])
+
+    def test_empty_window(self):
+        """Test an empty window reports zeros"""
+        assert _window().get_stats() == {
+            "count": 0,
+            "avg": 0,
+            "min": 0,
+            "max": 0,
+            "std": 0,
+        }
+
+    def test_merge_matches_union(self):
+        """Test merging two windows equals the statistics of all their points"""
+        rng = np.random.default_rng(7)
+        first, second = _window(), _window()
+        start = datetime(2026, 10, 18)
+        for i, value in enumerate(rng.normal(100, 15, 300)):
+            first.add_point(value, start + timedelta(seconds=i))
+        for i, value in enumerate(rng.normal(40, 5, 200)):
+            second.add_point(value, start + timedelta(seconds=i))
+
+        merged = first.merge(second).to_dict()
+        self._assert_stats(
+            merged, list(first.data_points) + list(second.data_points)
+        )
+
+    def test_merge_with_empty_window_returns_a_copy(self):
+        """Test merged stats do not change when the source window does"""
+        window, empty = _window(), _window()
+        start = datetime(2026, 10, 18)
+        for i in range(10):
+            window.add_point(float(i), start + timedelta(seconds=i))
+
+        for merged in (window.merge(empty), empty.merge(window)):
+            assert isinstance(merged, WindowStats)
+            before = merged.to_dict()
+            window.add_point(1000.0, start + timedelta(seconds=20))
+            assert merged.to_dict() == before
+            assert merged.moments is not window._moments
+            assert merged.sketch is not window._sketch
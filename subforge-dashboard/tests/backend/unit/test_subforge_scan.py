@@ -0,0 +1,236 @@
+"""
+Unit tests for incremental SubForge workflow scanning
+"""
+
+import asyncio
+import json
+import os
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.models.subforge_models import SubForgeIntegrationConfig
+from app.services.subforge_integration import SubForgeIntegrationService
+
+
+def _write_workflow(subforge_dir, workflow_id, status="active"):
+    workflow_dir = subforge_dir / workflow_id
+    workflow_dir.mkdir(parents=True, exist_ok=True)
+    context_file = workflow_dir / "workflow_context.json"
+    context_file.write_text(
+        json.dumps(
+            {
+                "project_id": workflow_id,
+                "user_request": f"Request for {workflow_id}",
+                "project_path": "/tmp/project",
+                "communication_dir": "/tmp/project/.subforge",
+                "status": status,
+            }
+        )
+    )
+    return context_file
+
+
+def _persist(outcome=True, accepted=True):
+    """persist_workflow_execution stand-in reporting ``outcome`` as written"""
+
+    async def persist(workflow, on_written=None):
+        if accepted and on_written is not None:
+            on_written(outcome)
+        return accepted
+
+    return AsyncMock(side_effect=persist)
+
+
+@pytest.mark.unit
+class TestIncrementalScan:
+    """Tests for the scan index, change detection and batched list updates"""
+
+    @pytest.fixture
+    def subforge_dir(self, tmp_path):
+        directory = tmp_path / ".subforge"
+        directory.mkdir()
+        return directory
+
+    def _service(self, tmp_path, subforge_dir):
+        config = SubForgeIntegrationConfig(
+            scan_index_file=str(tmp_path / "scan_index.json")
+        )
+        service = SubForgeIntegrationService(config)
+        service.subforge_dir = subforge_dir
+        service.persist_workflow_execution = _persist()
+        service._broadcast_workflow_update = AsyncMock()
+        service._broadcast_workflow_list_update = AsyncMock()
+        return service
+
+    async def test_unchanged_files_are_not_reparsed(self, tmp_path, subforge_dir):
+        """Test a second scan without changes parses nothing"""
+        for i in range(5):
+            _write_workflow(subforge_dir, f"subforge_{i}")
+        service = self._service(tmp_path, subforge_dir)
+
+        with patch.object(
+            service,
+            "_parse_workflow_context",
+            wraps=service._parse_workflow_context,
+        ) as parse:
+            assert len(await service.scan_workflows()) == 5
+            assert parse.call_count == 5
+
+            await service.scan_workflows()
+            assert parse.call_count == 5
+
+        # One batched list update for the scan that loaded workflows
+        assert service._broadcast_workflow_list_update.await_count == 1
+
+    async def test_touch_without_content_change_is_skipped(
+        self, tmp_path, subforge_dir
+    ):
+        """Test an mtime-only change is resolved by the content hash"""
+        context_file = _write_workflow(subforge_dir, "subforge_a")
+        service = self._service(tmp_path, subforge_dir)
+        await service.scan_workflows()
+
+        stat = context_file.stat()
+        os.utime(context_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        with patch.object(service, "_parse_workflow_context") as parse:
+            await service.scan_workflows()
+            parse.assert_not_called()
+
+    async def test_changed_and_removed_workflows(self, tmp_path, subforge_dir):
+        """Test modified files are reloaded and deleted directories dropped"""
+        _write_workflow(subforge_dir, "subforge_a")
+        _write_workflow(subforge_dir, "subforge_b")
+        service = self._service(tmp_path, subforge_dir)
+        await service.scan_workflows()
+
+        _write_workflow(subforge_dir, "subforge_a", status="completed")
+        (subforge_dir / "subforge_b" / "workflow_context.json").unlink()
+
+        discovered = await service.scan_workflows()
+
+        assert discovered == ["subforge_a"]
+        assert service.workflows["subforge_a"].status == "completed"
+        assert "subforge_b" not in service.workflows
+        service.persist_workflow_execution.assert_awaited_once()
+        assert service._broadcast_workflow_list_update.await_count == 2
+
+    async def test_index_survives_restart(self, tmp_path, subforge_dir):
+        """Test a restarted service does not re-persist finished workflows"""
+        _write_workflow(subforge_dir, "subforge_done", status="completed")
+        first = self._service(tmp_path, subforge_dir)
+        await first.scan_workflows()
+        first.persist_workflow_execution.assert_awaited_once()
+
+        restarted = self._service(tmp_path, subforge_dir)
+        await restarted.scan_workflows()
+
+        assert "subforge_done" in restarted.workflows
+        restarted.persist_workflow_execution.assert_not_awaited()
+
+    @pytest.mark.parametrize(
+        "failure", [_persist(accepted=False), _persist(outcome=False)]
+    )
+    async def test_failed_persistence_is_retried(
+        self, tmp_path, subforge_dir, failure
+    ):
+        """Test a digest is only recorded once the execution was written"""
+        _write_workflow(subforge_dir, "subforge_done", status="completed")
+        service = self._service(tmp_path, subforge_dir)
+        service.persist_workflow_execution = failure
+
+        await service.scan_workflows()
+        assert "subforge_done" not in service._scan_index
+
+        service.persist_workflow_execution = _persist()
+        await service.scan_workflows()
+        service.persist_workflow_execution.assert_awaited_once()
+        assert "subforge_done" in service._scan_index
+
+        restarted = self._service(tmp_path, subforge_dir)
+        await restarted.scan_workflows()
+        restarted.persist_workflow_execution.assert_not_awaited()
+
+    async def test_digest_waits_for_the_write(self, tmp_path, subforge_dir):
+        """Test a queued execution records its digest only once committed"""
+        _write_workflow(subforge_dir, "subforge_done", status="completed")
+        service = self._service(tmp_path, subforge_dir)
+        callbacks = []
+
+        async def queue(workflow, on_written=None):
+            callbacks.append(on_written)
+            return True
+
+        service.persist_workflow_execution = AsyncMock(side_effect=queue)
+        await service.scan_workflows()
+        assert "subforge_done" not in service._scan_index
+
+        callbacks[0](True)
+        assert "subforge_done" in service._scan_index
+        await service._flush_scan_index()
+        restarted = self._service(tmp_path, subforge_dir)
+        await restarted.scan_workflows()
+        restarted.persist_workflow_execution.assert_not_awaited()
+
+    async def test_scan_and_event_for_one_workflow_are_serialized(
+        self, tmp_path, subforge_dir
+    ):
+        """Test a slow stale read cannot overwrite a newer context"""
+        context_file = _write_workflow(subforge_dir, "subforge_a")
+        service = self._service(tmp_path, subforge_dir)
+        read = service._read_workflow_file
+        reads = []
+
+        def slow_first_read(*args):
+            result = read(*args)
+            reads.append(result[1].status)
+            if len(reads) == 1:
+                time.sleep(0.2)
+            return result
+
+        service._read_workflow_file = slow_first_read
+        scan = asyncio.create_task(service.scan_workflows())
+        while not reads:
+            await asyncio.sleep(0.01)
+        _write_workflow(subforge_dir, "subforge_a", status="completed")
+        await service._process_workflow_file("subforge_a", context_file)
+        await scan
+
+        assert reads == ["active", "completed"]
+        assert service.workflows["subforge_a"].status == "completed"
+        assert service._scan_index["subforge_a"]["size"] == context_file.stat().st_size
+
+    async def test_scan_bounds_concurrent_loads(self, tmp_path, subforge_dir):
+        """Test stale workflows are loaded at most scan_concurrency at a time"""
+        for i in range(10):
+            _write_workflow(subforge_dir, f"subforge_{i}")
+        service = self._service(tmp_path, subforge_dir)
+        service.config.scan_concurrency = 2
+        load = service._load_workflow_file
+        in_flight = []
+        peak = 0
+
+        async def tracked_load(*args):
+            nonlocal peak
+            in_flight.append(args[0])
+            peak = max(peak, len(in_flight))
+            try:
+                await asyncio.sleep(0.01)
+                return await load(*args)
+            finally:
+                in_flight.remove(args[0])
+
+        service._load_workflow_file = tracked_load
+        assert len(await service.scan_workflows()) == 10
+
+        assert peak == 2
+        assert len(service.workflows) == 10
+
+    def test_relative_index_path_resolves_under_subforge_root(self, tmp_path):
+        """Test the default scan index does not depend on the working directory"""
+        with patch("app.services.subforge_integration.settings") as settings:
+            settings.SUBFORGE_ROOT = tmp_path
+            service = SubForgeIntegrationService(SubForgeIntegrationConfig())
+
+        assert service.scan_index_path == tmp_path / "subforge_scan_index.json"
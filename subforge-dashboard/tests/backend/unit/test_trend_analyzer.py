@@ -0,0 +1,101 @@
+"""
+Unit tests for TrendAnalyzer's offloadable computation
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pandas as pd
+import pytest
+from backend.analytics.processors.trend_analyzer import (
+    SeasonalityType,
+    TrendAnalyzer,
+    TrendDirection,
+)
+
+
+def _series(values):
+    timestamps = pd.date_range("2026-10-14", periods=len(values), freq="h")
+    return pd.DataFrame({"timestamp": timestamps, "value": np.asarray(values)})
+
+
+@pytest.fixture
+def time_series():
+    """Hourly series with a trend, a daily cycle, an anomaly and a short one"""
+    rng = np.random.default_rng(11)
+    hours = np.arange(96)
+    memory = np.full(96, 40.0) + rng.normal(0, 0.5, 96)
+    memory[60] = 400.0
+    return {
+        "system_load": _series(20 + 0.5 * hours + rng.normal(0, 1, 96)),
+        "cpu_usage": _series(
+            50 + 20 * np.sin(2 * np.pi * hours / 24) + rng.normal(0, 8, 96)
+        ),
+        "memory_usage": _series(memory),
+        "error_rate": _series([1.0, 2.0, 1.0, 3.0, 2.0]),
+    }
+
+
+def _without_timestamps(result):
+    """Drop the per-run analysis timestamps so two runs compare equal"""
+    for trend in result["trends"]:
+        trend.pop("analysis_timestamp")
+    return result
+
+
+@pytest.mark.unit
+class TestComputeFromInputs:
+    """compute_from_inputs runs the whole analysis without a database"""
+
+    def test_trends_seasonality_patterns_and_forecasts(self, time_series):
+        """Test the result reflects the shapes built into the inputs"""
+        result = TrendAnalyzer.compute_from_inputs(time_series)
+
+        trends = {trend["metric_name"]: trend for trend in result["trends"]}
+        # Series with fewer than 10 points are not analyzed
+        assert set(trends) == {"system_load", "cpu_usage", "memory_usage"}
+        assert trends["system_load"]["direction"] == TrendDirection.INCREASING
+        assert trends["system_load"]["r_squared"] > 0.9
+
+        seasonality = {s["metric_name"]: s for s in result["seasonality"]}
+        assert seasonality["cpu_usage"]["seasonality_type"] == SeasonalityType.DAILY
+        assert seasonality["cpu_usage"]["period_hours"] == 24.0
+
+        anomalies = [
+            p["metadata"]["metric_name"]
+            for p in result["patterns"]
+            if p["pattern_type"] == "anomaly"
+        ]
+        assert anomalies == ["memory_usage"]
+
+        forecast = result["forecasts"]["system_load"]
+        assert forecast["method"] == "linear_regression"
+        assert forecast["next_value_prediction"] == pytest.approx(
+            20 + 0.5 * 96, rel=0.05
+        )
+        assert result["analysis_summary"]["total_metrics_analyzed"] == 3
+
+    def test_empty_inputs(self):
+        """Test no series yields an empty but complete result"""
+        result = TrendAnalyzer.compute_from_inputs({})
+
+        assert result["trends"] == []
+        assert result["seasonality"] == []
+        assert result["patterns"] == []
+        assert result["forecasts"] == {}
+        assert result["analysis_summary"]["total_metrics_analyzed"] == 0
+
+    async def test_matches_inline_analysis(self, time_series):
+        """Test the offloadable path returns what analyze returns"""
+        analyzer = TrendAnalyzer()
+        analyzer._collect_time_series_data = AsyncMock(return_value=time_series)
+
+        inline = await analyzer.analyze(db=None)
+        fetched = await analyzer.fetch_inputs(db=None)
+        # Drives its own event loop, so it runs off this one, as in a worker
+        offloaded = await asyncio.to_thread(
+            TrendAnalyzer.compute_from_inputs, fetched
+        )
+
+        assert _without_timestamps(offloaded) == _without_timestamps(inline)
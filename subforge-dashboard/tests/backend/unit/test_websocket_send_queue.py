@@ -0,0 +1,126 @@
+"""
+Unit tests for per-connection WebSocket send queues
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.websocket.manager import ConnectionManager
+from app.websocket.send_queue import ConnectionSender, SlowConsumerPolicy
+
+
+class SlowWebSocket:
+    """WebSocket stub whose sends never complete"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, payload):
+        self.sent.append(payload)
+        await asyncio.Event().wait()
+
+
+@pytest.mark.unit
+@pytest.mark.websocket
+class TestConnectionSender:
+    """Tests for ConnectionSender slow-consumer handling"""
+
+    async def test_messages_are_delivered_in_order(self):
+        """Test queued payloads are written in order by the writer task"""
+        websocket = MagicMock()
+        websocket.send_text = AsyncMock()
+        sender = ConnectionSender(websocket)
+
+        for i in range(5):
+            sender.enqueue(f"message-{i}")
+        await asyncio.sleep(0.01)
+
+        assert [c.args[0] for c in websocket.send_text.call_args_list] == [
+            f"message-{i}" for i in range(5)
+        ]
+        sender.close()
+
+    async def test_drop_oldest_bounds_queue(self):
+        """Test a stalled client never holds more than max_queue payloads"""
+        sender = ConnectionSender(
+            SlowWebSocket(), max_queue=2, policy=SlowConsumerPolicy.DROP_OLDEST
+        )
+        sender.enqueue("in-flight")
+        await asyncio.sleep(0)
+
+        for i in range(5):
+            sender.enqueue(f"message-{i}")
+
+        assert [payload for _, payload in sender._queue] == ["message-3", "message-4"]
+        assert sender.dropped_count == 3
+        sender.close()
+
+    async def test_coalesce_replaces_same_key(self):
+        """Test newer payloads replace queued ones with the same coalesce key"""
+        sender = ConnectionSender(
+            SlowWebSocket(), max_queue=2, policy=SlowConsumerPolicy.COALESCE
+        )
+        sender.enqueue("in-flight")
+        await asyncio.sleep(0)
+
+        sender.enqueue("workflow-v1", coalesce_key="workflow:a")
+        sender.enqueue("list-v1", coalesce_key="list")
+        sender.enqueue("workflow-v2", coalesce_key="workflow:a")
+
+        assert [payload for _, payload in sender._queue] == ["workflow-v2", "list-v1"]
+        sender.close()
+
+    async def test_disconnect_policy_calls_failure_hook(self):
+        """Test the disconnect policy closes the sender and reports failure"""
+        on_failure = AsyncMock()
+        sender = ConnectionSender(
+            SlowWebSocket(),
+            max_queue=1,
+            policy=SlowConsumerPolicy.DISCONNECT,
+            on_failure=on_failure,
+        )
+        sender.enqueue("in-flight")
+        await asyncio.sleep(0)
+        sender.enqueue("queued")
+
+        assert sender.enqueue("overflow") is False
+        await asyncio.sleep(0)
+        on_failure.assert_awaited_once()
+        assert sender.enqueue("after-close") is False
+
+
+@pytest.mark.unit
+@pytest.mark.websocket
+class TestConnectionManagerSlowConsumer:
+    """Tests for how ConnectionManager drops a failed connection"""
+
+    async def test_failed_sender_closes_socket(self):
+        """Test a failed sender closes the socket with 1008 and unregisters it"""
+        manager = ConnectionManager()
+        websocket = MagicMock()
+        websocket.accept = AsyncMock()
+        websocket.send_text = AsyncMock()
+        websocket.close = AsyncMock()
+        await manager.connect(websocket)
+
+        manager.senders[websocket]._fail()
+        await asyncio.sleep(0)
+
+        websocket.close.assert_awaited_once_with(code=1008)
+        assert websocket not in manager.active_connections
+        assert websocket not in manager.senders
+
+    async def test_failure_on_closed_socket_still_disconnects(self):
+        """Test a socket that cannot be closed any more is still unregistered"""
+        manager = ConnectionManager()
+        websocket = MagicMock()
+        websocket.accept = AsyncMock()
+        websocket.send_text = AsyncMock()
+        websocket.close = AsyncMock(side_effect=RuntimeError("already closed"))
+        await manager.connect(websocket)
+
+        manager.senders[websocket]._fail()
+        await asyncio.sleep(0)
+
+        assert websocket not in manager.active_connections
@@ -0,0 +1,143 @@
+"""
+Unit tests for workflow topic subscriptions and JSON patch deltas
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from app.websocket.json_patch import apply_patch, make_patch
+from app.websocket.workflow_topics import WorkflowTopicPublisher, workflow_topic
+
+
+class RecordingManager:
+    """ConnectionManager stand-in that records queued payloads per connection"""
+
+    def __init__(self):
+        self.topics = {}
+        self.connection_metadata = {}
+        self.sent = {}
+
+    def connect(self, websocket):
+        self.connection_metadata[websocket] = {"topics": set(), "acked_versions": {}}
+        self.sent[websocket] = []
+
+    def subscribe(self, websocket, topic):
+        self.topics.setdefault(topic, set()).add(websocket)
+
+    def unsubscribe(self, websocket, topic=None):
+        self.topics.get(topic, set()).discard(websocket)
+
+    def get_subscribers(self, topic):
+        return list(self.topics.get(topic, ()))
+
+    def send_text(self, websocket, payload, coalesce_key=None):
+        self.sent[websocket].append(json.loads(payload))
+        return True
+
+
+def _workflow(activities):
+    return {
+        "project_id": "subforge_1",
+        "status": "active",
+        "agent_activities": [{"id": i, "msg": f"step {i}"} for i in range(activities)],
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.websocket
+class TestJsonPatch:
+    """Tests for make_patch/apply_patch"""
+
+    def test_roundtrip(self):
+        """Test applying a patch reproduces the new document"""
+        old = {"a": 1, "b": {"c": [1, 2, 3]}, "gone": True, "x/y": 1}
+        new = {"a": 2, "b": {"c": [1, 5]}, "d": None, "x/y": 2}
+
+        assert apply_patch(old, make_patch(old, new)) == new
+
+    def test_list_append_is_incremental(self):
+        """Test appending to a list only adds the new elements"""
+        old = _workflow(100)
+        new = _workflow(101)
+
+        patch = make_patch(old, new)
+
+        assert patch == [
+            {
+                "op": "add",
+                "path": "/agent_activities/100",
+                "value": new["agent_activities"][100],
+            }
+        ]
+        assert apply_patch(old, patch) == new
+
+
+@pytest.mark.unit
+@pytest.mark.websocket
+class TestWorkflowTopicPublisher:
+    """Tests for topic routing, deltas and resync"""
+
+    @pytest.fixture
+    def manager(self):
+        return RecordingManager()
+
+    async def test_only_subscribers_receive_updates(self, manager):
+        """Test updates are routed to the workflow's topic only"""
+        subscriber, bystander = MagicMock(), MagicMock()
+        manager.connect(subscriber)
+        manager.connect(bystander)
+        publisher = WorkflowTopicPublisher(manager)
+
+        publisher.subscribe(subscriber, "subforge_1", _workflow(1))
+        await publisher.publish("subforge_1", _workflow(2))
+
+        assert len(manager.sent[subscriber]) == 1
+        assert manager.sent[bystander] == []
+        assert subscriber in manager.topics[workflow_topic("subforge_1")]
+
+    async def test_delta_against_acknowledged_version(self, manager):
+        """Test acknowledged clients get patches that rebuild the snapshot"""
+        websocket = MagicMock()
+        manager.connect(websocket)
+        publisher = WorkflowTopicPublisher(manager)
+
+        version = publisher.subscribe(websocket, "subforge_1", _workflow(50))
+        base = publisher.current("subforge_1")[1]
+        publisher.acknowledge(websocket, "subforge_1", version)
+
+        await publisher.publish("subforge_1", _workflow(51))
+        await publisher.publish("subforge_1", _workflow(52))
+
+        first, second = manager.sent[websocket]
+        assert first["type"] == second["type"] == "subforge_workflow_delta"
+        # Both deltas are against the acked base until the client acks again
+        assert second["data"]["base_version"] == version
+        assert apply_patch(base, second["data"]["patch"]) == _workflow(52)
+        assert publisher.deltas_sent == 2
+
+    async def test_unchanged_snapshot_is_not_published(self, manager):
+        """Test identical snapshots keep the version and send nothing"""
+        websocket = MagicMock()
+        manager.connect(websocket)
+        publisher = WorkflowTopicPublisher(manager)
+
+        version = publisher.subscribe(websocket, "subforge_1", _workflow(3))
+        assert await publisher.publish("subforge_1", _workflow(3)) == version
+        assert manager.sent[websocket] == []
+
+    async def test_lagging_client_gets_snapshot(self, manager):
+        """Test clients acked beyond the retained history resync with a snapshot"""
+        websocket = MagicMock()
+        manager.connect(websocket)
+        publisher = WorkflowTopicPublisher(manager, history_size=2)
+
+        version = publisher.subscribe(websocket, "subforge_1", _workflow(1))
+        publisher.acknowledge(websocket, "subforge_1", version)
+        for count in range(2, 6):
+            await publisher.publish("subforge_1", _workflow(count))
+
+        latest = manager.sent[websocket][-1]
+        assert latest["type"] == "subforge_workflow_snapshot"
+        assert latest["data"]["workflow"] == _workflow(5)
+        assert latest["data"]["version"] == 5
@@ -18,6 +18,8 @@ import pytest
 import pytest_asyncio
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+# The analytics package imports the app relatively, so it loads as backend.*
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from app.database.base import Base
 from app.database.session import get_db
@@ -16,6 +16,11 @@ from functools import wraps
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Set, Union
 import asyncio
+import atexit
+import queue
+import threading
+import time
+import weakref
 from concurrent.futures import ThreadPoolExecutor
 
 
@@ -233,62 +238,253 @@ class TokenStore:
                 self.logger.info(f"Cleaned up {len(expired)} expired tokens")
 
 
+class AuditLogWriter:
+    """
+    Background writer for security audit records
+
+    Records are queued by the caller and formatted, batched and written on a
+    dedicated thread. The queue is bounded; ``submit`` never blocks, so when
+    a stalled disk fills it, further records are counted in ``dropped`` and
+    discarded rather than stalling the event loop. A failed write or
+    rotation is logged and the writer keeps running, reopening its file on
+    the next batch.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        audit_file: Path,
+        structured: bool = False,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        flush_interval: float = 1.0,
+        batch_size: int = 256,
+        queue_size: int = 10000
+    ):
+        self.audit_file = Path(audit_file)
+        self.structured = structured
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.logger = logging.getLogger(__name__)
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._stream = open(self.audit_file, 'a', encoding='utf-8')
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="security-audit-writer", daemon=True
+        )
+        self._thread.start()
+        _open_audit_writers.add(self)
+
+    def submit(self, timestamp: datetime, level: str, event: str, fields: Dict[str, Any]):
+        """Queue a record without blocking; drops it when the queue is full"""
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait((timestamp, level, event, fields))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                self.logger.warning(
+                    f"Audit queue full, {self.dropped} records dropped so far"
+                )
+
+    def flush(self, timeout: Optional[float] = 30.0):
+        """Block until every record queued so far has been written, or timeout"""
+        if self._closed or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 30.0):
+        """Drain pending records and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        _open_audit_writers.discard(self)
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            self.logger.error("Audit writer did not drain its queue before close")
+            return
+        self._thread.join(timeout)
+
+    def _format(self, record) -> str:
+        timestamp, level, event, fields = record
+        if self.structured:
+            return json.dumps({
+                "timestamp": timestamp.isoformat(),
+                "level": level,
+                "event": event,
+                **fields
+            }, default=str)
+        details = ", ".join(f"{key.capitalize()}: {value}" for key, value in fields.items())
+        return f"{timestamp.strftime('%Y-%m-%d %H:%M:%S')} - {level} - {event} - {details}"
+
+    def _run(self):
+        batch: List[str] = []
+        waiters: List[threading.Event] = []
+        deadline = time.monotonic() + self.flush_interval
+        running = True
+
+        while running:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is self._STOP:
+                running = False
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None:
+                try:
+                    batch.append(self._format(item))
+                except Exception as e:
+                    self.logger.error(f"Dropping unformattable audit record: {e}")
+
+            if (
+                not running or waiters or len(batch) >= self.batch_size
+                or time.monotonic() >= deadline
+            ):
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    # The thread must survive, or flush() and close() would wait on it
+                    self.logger.error(f"Failed to write audit records: {e}")
+                batch = []
+                for waiter in waiters:
+                    waiter.set()
+                waiters = []
+                deadline = time.monotonic() + self.flush_interval
+
+        self._stream.close()
+
+    def _write_batch(self, lines: List[str]):
+        if not lines:
+            return
+        try:
+            if self._stream.closed:
+                self._stream = open(self.audit_file, 'a', encoding='utf-8')
+            self._stream.write("\n".join(lines) + "\n")
+            self._stream.flush()
+            if self.max_bytes and self._stream.tell() >= self.max_bytes:
+                self._rotate()
+        except (IOError, OSError) as e:
+            self.logger.error(f"Failed to write audit records: {e}")
+
+    def _rotate(self):
+        """Shift security_audit.log -> .1 -> .2 ... keeping backup_count files"""
+        try:
+            if self.backup_count > 0:
+                for index in range(self.backup_count - 1, 0, -1):
+                    source = self.audit_file.with_name(f"{self.audit_file.name}.{index}")
+                    if source.exists():
+                        source.replace(self.audit_file.with_name(f"{self.audit_file.name}.{index + 1}"))
+                self.audit_file.replace(self.audit_file.with_name(f"{self.audit_file.name}.1"))
+            else:
+                self.audit_file.unlink()
+        finally:
+            # Reopen even if a rename failed, so the next batch can be written
+            self._stream.close()
+            self._stream = open(self.audit_file, 'a', encoding='utf-8')
+
+
+# Writers still open at interpreter exit; one atexit hook drains them all
+_open_audit_writers: "weakref.WeakSet[AuditLogWriter]" = weakref.WeakSet()
+
+
+def _close_audit_writers():
+    for writer in list(_open_audit_writers):
+        writer.close(timeout=5.0)
+
+
+atexit.register(_close_audit_writers)
+
+
 class SecurityAuditLog:
     """Audit logging for security events"""
     
-    def __init__(self, log_path: Path):
+    def __init__(
+        self,
+        log_path: Path,
+        structured: bool = False,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        flush_interval: float = 1.0,
+        batch_size: int = 256,
+        queue_size: int = 10000
+    ):
         self.log_path = Path(log_path)
         self.log_path.mkdir(parents=True, exist_ok=True)
-        self.audit_file = self.log_path / "security_audit.log"
-        self.logger = logging.getLogger("security_audit")
+        self.structured = structured
+        self.audit_file = self.log_path / (
+            "security_audit.jsonl" if structured else "security_audit.log"
+        )
         
-        # Setup file handler for audit logs
-        handler = logging.FileHandler(self.audit_file)
-        formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
+        # Formatting and disk I/O happen on the writer thread, never on the event loop
+        self.writer = AuditLogWriter(
+            self.audit_file,
+            structured=structured,
+            max_bytes=max_bytes,
+            backup_count=backup_count,
+            flush_interval=flush_interval,
+            batch_size=batch_size,
+            queue_size=queue_size
         )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-        self.logger.setLevel(logging.INFO)
+    
+    def _record(self, level: str, event: str, **fields):
+        self.writer.submit(datetime.now(), level, event, fields)
+    
+    def flush(self, timeout: Optional[float] = 30.0):
+        """Wait until all queued audit records are on disk"""
+        self.writer.flush(timeout)
+    
+    def close(self):
+        """Flush pending records and stop the background writer"""
+        self.writer.close()
     
     def log_auth_success(self, agent_id: str, permission: str, resource: str):
         """Log successful authentication"""
-        self.logger.info(
-            f"AUTH_SUCCESS - Agent: {agent_id}, Permission: {permission}, Resource: {resource}"
+        self._record(
+            "INFO", "AUTH_SUCCESS", agent=agent_id, permission=permission, resource=resource
         )
     
     def log_auth_failure(self, agent_id: str, permission: str, resource: str, reason: str):
         """Log failed authentication attempt"""
-        self.logger.warning(
-            f"AUTH_FAILURE - Agent: {agent_id}, Permission: {permission}, "
-            f"Resource: {resource}, Reason: {reason}"
+        self._record(
+            "WARNING", "AUTH_FAILURE", agent=agent_id, permission=permission,
+            resource=resource, reason=reason
         )
     
     def log_token_created(self, agent_id: str, role: str, expires_at: Optional[datetime]):
         """Log token creation"""
         expiry = expires_at.isoformat() if expires_at else "never"
-        self.logger.info(
-            f"TOKEN_CREATED - Agent: {agent_id}, Role: {role}, Expires: {expiry}"
-        )
+        self._record("INFO", "TOKEN_CREATED", agent=agent_id, role=role, expires=expiry)
     
     def log_token_revoked(self, agent_id: str, token_preview: str):
         """Log token revocation"""
-        self.logger.info(
-            f"TOKEN_REVOKED - Agent: {agent_id}, Token: {token_preview}"
-        )
+        self._record("INFO", "TOKEN_REVOKED", agent=agent_id, token=token_preview)
     
     def log_permission_change(self, agent_id: str, old_role: str, new_role: str, admin_id: str):
         """Log permission changes"""
-        self.logger.info(
-            f"PERMISSION_CHANGE - Agent: {agent_id}, Old: {old_role}, "
-            f"New: {new_role}, Admin: {admin_id}"
+        self._record(
+            "INFO", "PERMISSION_CHANGE", agent=agent_id, old=old_role,
+            new=new_role, admin=admin_id
         )
     
     def log_suspicious_activity(self, agent_id: str, activity: str, details: str):
         """Log suspicious activities"""
-        self.logger.warning(
-            f"SUSPICIOUS_ACTIVITY - Agent: {agent_id}, Activity: {activity}, Details: {details}"
+        self._record(
+            "WARNING", "SUSPICIOUS_ACTIVITY", agent=agent_id, activity=activity, details=details
         )
 
 
@@ -512,6 +708,10 @@ class AuthenticationManager:
         
         return updated
     
+    def close(self):
+        """Flush and stop the background audit writer"""
+        self.audit_log.close()
+    
     def _is_locked_out(self, agent_id: str) -> bool:
         """Check if agent is locked out due to failed attempts"""
         if agent_id not in self.failed_attempts:
@@ -609,6 +809,7 @@ __all__ = [
     'Role',
     'TokenStore',
     'SecurityAuditLog',
+    'AuditLogWriter',
     'require_auth',
     'ROLE_PERMISSIONS'
 ]
\ No newline at end of file
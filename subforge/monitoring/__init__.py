@@ -3,7 +3,9 @@ SubForge Monitoring Module
 Provides real-time monitoring and analytics for agent workflows
 """
 
+from .execution_store import ExecutionStore
 from .metrics_collector import MetricsCollector
+from .streaming_stats import DecayedRate, DurationHistogram
 from .workflow_monitor import WorkflowMonitor
 
-__all__ = ["WorkflowMonitor", "MetricsCollector"]
\ No newline at end of file
+__all__ = ["WorkflowMonitor", "MetricsCollector", "ExecutionStore", "DurationHistogram", "DecayedRate"]
\ No newline at end of file
@@ -0,0 +1,414 @@
+"""
+Columnar Execution Store for SubForge
+Append-only, day-partitioned on-disk storage for finished execution records
+"""
+
+import functools
+import json
+import logging
+import shutil
+import threading
+import time
+from array import array
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; scans fall back to stdlib arrays
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionStore:
+    """
+    Columnar time-series store for execution records
+
+    Each UTC day is a segment directory holding one fixed-width binary file per
+    column. Strings (agent, task_type, status) are dictionary-encoded into a
+    shared ``dictionary.txt``; execution IDs are kept row-aligned in ``ids.txt``
+    and only read when records are materialized. Per-agent and per-task-type
+    aggregates are maintained incrementally in ``aggregates.json``.
+
+    ``append`` runs on the event loop while ``flush`` and ``prune`` may run in
+    an executor thread. Flushing swaps the buffers out under ``_lock`` and
+    writes only that snapshot, so rows appended during the write land in the
+    next flush; ``_write_lock`` keeps concurrent flushes from interleaving their
+    writes. Scans never flush: they read the flushed segments and the buffered
+    rows together while holding ``_write_lock``, so no row is seen twice or
+    missed while a flush is in progress.
+    """
+
+    # column name -> array typecode
+    COLUMNS: Dict[str, str] = {
+        "start": "d",
+        "duration": "d",
+        "agent": "I",
+        "task_type": "I",
+        "status": "I",
+        "parallel": "B",
+    }
+    RETENTION_DAYS = 90
+
+    def __init__(self, root: Path, retention_days: int = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.retention_days = retention_days or self.RETENTION_DAYS
+
+        self.dictionary_file = self.root / "dictionary.txt"
+        self.aggregates_file = self.root / "aggregates.json"
+
+        # String dictionary: id -> string and string -> id
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._persisted_strings = 0
+        self._load_dictionary()
+
+        # Rows appended since the last flush, grouped by segment
+        self._pending: Dict[str, Dict[str, array]] = {}
+        self._pending_ids: Dict[str, List[str]] = defaultdict(list)
+
+        # Loaded segment columns, invalidated when a segment is appended to
+        self._segment_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+        self.aggregates: Dict[str, Dict[str, Dict[str, float]]] = self._load_aggregates()
+        self._aggregates_dirty = False
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, execution: Dict[str, Any]):
+        """Buffer a finished execution record for the next flush"""
+        start = execution.get("start_time")
+        start = float(start) if start is not None else time.time()
+        duration = float(execution.get("duration", 0.0))
+        agent = execution.get("agent", "unknown")
+        task_type = execution.get("task_type", "unknown")
+        status = execution.get("status", "unknown")
+
+        segment = self._segment_for(start)
+        with self._lock:
+            columns = self._pending.get(segment)
+            if columns is None:
+                columns = {name: array(code) for name, code in self.COLUMNS.items()}
+                self._pending[segment] = columns
+
+            columns["start"].append(start)
+            columns["duration"].append(duration)
+            columns["agent"].append(self._encode(agent))
+            columns["task_type"].append(self._encode(task_type))
+            columns["status"].append(self._encode(status))
+            columns["parallel"].append(1 if execution.get("parallel") else 0)
+            self._pending_ids[segment].append(str(execution.get("id", "")).replace("\n", " "))
+
+            self._update_aggregate("agents", agent, start, duration, status)
+            self._update_aggregate("task_types", task_type, start, duration, status)
+
+    def flush(self):
+        """Append buffered rows to their segment files"""
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                pending_ids, self._pending_ids = self._pending_ids, defaultdict(list)
+                persisted = len(self._strings)
+                new_strings = self._strings[self._persisted_strings:persisted]
+                aggregates = json.dumps(self.aggregates) if self._aggregates_dirty else None
+                self._aggregates_dirty = False
+
+            # Strings first: the rows below reference their ids
+            if new_strings:
+                with open(self.dictionary_file, "a", encoding="utf-8") as f:
+                    for value in new_strings:
+                        f.write(value + "\n")
+            self._persisted_strings = persisted
+
+            for segment, columns in pending.items():
+                segment_dir = self.root / segment
+                segment_dir.mkdir(exist_ok=True)
+                for name, values in columns.items():
+                    with open(segment_dir / f"{name}.bin", "ab") as f:
+                        values.tofile(f)
+                with open(segment_dir / "ids.txt", "a", encoding="utf-8") as f:
+                    f.write("\n".join(pending_ids[segment]) + "\n")
+                self._segment_cache.pop(segment, None)
+
+            if aggregates is not None:
+                tmp_file = self.aggregates_file.with_suffix(".tmp")
+                with open(tmp_file, "w") as f:
+                    f.write(aggregates)
+                tmp_file.replace(self.aggregates_file)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def scan(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        agent: Optional[str] = None,
+        task_type: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return records whose start falls in [start_time, end_time) matching the filters"""
+        records: List[Dict[str, Any]] = []
+        for _, rows, columns, load_ids in self._matching_rows(start_time, end_time, agent, task_type, status):
+            if len(rows) == 0:
+                continue
+            ids = load_ids()
+            for row in rows:
+                records.append({
+                    "id": ids[row] if row < len(ids) else "",
+                    "agent": self._strings[columns["agent"][row]],
+                    "task_type": self._strings[columns["task_type"][row]],
+                    "start_time": float(columns["start"][row]),
+                    "duration": float(columns["duration"][row]),
+                    "status": self._strings[columns["status"][row]],
+                    "parallel": bool(columns["parallel"][row]),
+                })
+                if limit is not None and len(records) >= limit:
+                    return records
+        return records
+
+    def summarize(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        agent: Optional[str] = None,
+        task_type: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Count and duration statistics over a range without materializing records"""
+        count = 0
+        total_duration = 0.0
+        max_duration = 0.0
+        for _, rows, columns, _ in self._matching_rows(start_time, end_time, agent, task_type, status):
+            if len(rows) == 0:
+                continue
+            durations = columns["duration"]
+            if np is not None:
+                selected = durations[rows]
+                total_duration += float(selected.sum())
+                max_duration = max(max_duration, float(selected.max()))
+            else:
+                selected = [durations[row] for row in rows]
+                total_duration += sum(selected)
+                max_duration = max(max_duration, max(selected))
+            count += len(rows)
+
+        return {
+            "count": count,
+            "total_duration": total_duration,
+            "average_duration": total_duration / count if count else 0.0,
+            "max_duration": max_duration,
+        }
+
+    def get_aggregates(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """All-time per-agent and per-task-type aggregates"""
+        return self.aggregates
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """
+        Drop whole day segments older than the retention window
+
+        Blocks on file I/O; callers on the event loop run it in an executor.
+        """
+        self.flush()
+        cutoff = self._segment_for((now or time.time()) - self.retention_days * 86400)
+        removed = 0
+        with self._write_lock:
+            for segment in self._segments():
+                if segment < cutoff:
+                    shutil.rmtree(self.root / segment, ignore_errors=True)
+                    self._segment_cache.pop(segment, None)
+                    removed += 1
+        return removed
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _segment_for(timestamp: float) -> str:
+        return time.strftime("%Y%m%d", time.gmtime(timestamp))
+
+    def _segments(self) -> List[str]:
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir() and p.name.isdigit())
+
+    def _encode(self, value: str) -> int:
+        value = str(value).replace("\n", " ")
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+
+    def _load_dictionary(self):
+        if self.dictionary_file.exists():
+            with open(self.dictionary_file, "r", encoding="utf-8") as f:
+                self._strings = f.read().split("\n")[:-1]
+            self._string_ids = {value: i for i, value in enumerate(self._strings)}
+            self._persisted_strings = len(self._strings)
+
+    def _load_aggregates(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        if self.aggregates_file.exists():
+            try:
+                with open(self.aggregates_file, "r") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                logger.error(f"Failed to load execution aggregates: {e}")
+        return {"agents": {}, "task_types": {}}
+
+    def _update_aggregate(self, kind: str, key: str, start: float, duration: float, status: str):
+        entry = self.aggregates[kind].get(key)
+        if entry is None:
+            entry = {"count": 0, "completed": 0, "failed": 0, "total_duration": 0.0,
+                     "first_start": start, "last_start": start}
+            self.aggregates[kind][key] = entry
+        entry["count"] += 1
+        entry["total_duration"] += duration
+        if status == "completed":
+            entry["completed"] += 1
+        elif status == "failed":
+            entry["failed"] += 1
+        entry["first_start"] = min(entry["first_start"], start)
+        entry["last_start"] = max(entry["last_start"], start)
+        self._aggregates_dirty = True
+
+    def _load_segment(self, segment: str) -> Tuple[int, Dict[str, Any]]:
+        cached = self._segment_cache.get(segment)
+        if cached is not None:
+            return cached
+
+        segment_dir = self.root / segment
+        columns: Dict[str, Any] = {}
+        for name, code in self.COLUMNS.items():
+            path = segment_dir / f"{name}.bin"
+            if np is not None:
+                columns[name] = np.fromfile(path, dtype=np.dtype(code)) if path.exists() else np.array([], dtype=code)
+            else:
+                values = array(code)
+                if path.exists():
+                    with open(path, "rb") as f:
+                        values.frombytes(f.read())
+                columns[name] = values
+
+        # A crash between column writes can leave ragged columns; trust the shortest
+        rows = min(len(values) for values in columns.values())
+        loaded = (rows, columns)
+        self._segment_cache[segment] = loaded
+        return loaded
+
+    def _read_ids(self, segment: str) -> List[str]:
+        path = self.root / segment / "ids.txt"
+        if not path.exists():
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().split("\n")
+
+    def _row_ids(self, segment: str, flushed: int, buffered_ids: List[str]) -> List[str]:
+        """Row-aligned ids: the first ``flushed`` on disk, then the buffered ones"""
+        ids = self._read_ids(segment)[:flushed]
+        ids += [""] * (flushed - len(ids))
+        return ids + buffered_ids
+
+    def _snapshot(self, first: Optional[str], last: Optional[str]):
+        """
+        (segment, flushed rows, columns, buffered ids) for segments in [first, last]
+
+        Buffered rows are appended after the flushed ones, mirroring where the
+        next flush will write them. Built eagerly so ``_write_lock`` is not
+        held while callers consume the rows.
+        """
+        snapshot = []
+        with self._write_lock:
+            with self._lock:
+                pending = {
+                    segment: (
+                        {name: array(values.typecode, values) for name, values in columns.items()},
+                        list(self._pending_ids[segment]),
+                    )
+                    for segment, columns in self._pending.items()
+                    if not ((first and segment < first) or (last and segment > last))
+                }
+
+            for segment in sorted(set(self._segments()) | set(pending)):
+                if (first and segment < first) or (last and segment > last):
+                    continue
+                if (self.root / segment).is_dir():
+                    rows, columns = self._load_segment(segment)
+                else:
+                    rows, columns = 0, None
+
+                extra, extra_ids = pending.get(segment, (None, []))
+                if extra is not None:
+                    columns = self._concat(columns, rows, extra)
+                snapshot.append((segment, rows, columns, extra_ids))
+        return snapshot
+
+    def _concat(self, columns: Optional[Dict[str, Any]], rows: int, extra: Dict[str, array]) -> Dict[str, Any]:
+        """Flushed columns truncated to ``rows`` followed by buffered values"""
+        combined: Dict[str, Any] = {}
+        for name, code in self.COLUMNS.items():
+            if np is not None:
+                buffered = np.frombuffer(extra[name], dtype=np.dtype(code))
+                combined[name] = buffered if columns is None else np.concatenate((columns[name][:rows], buffered))
+            else:
+                values = array(code) if columns is None else array(code, columns[name][:rows])
+                values.extend(extra[name])
+                combined[name] = values
+        return combined
+
+    def _matching_rows(self, start_time, end_time, agent, task_type, status):
+        """Yield (segment, row indexes, columns, ids loader) for rows matching the filters"""
+        codes = {}
+        with self._lock:
+            for column, value in (("agent", agent), ("task_type", task_type), ("status", status)):
+                if value is not None:
+                    if value not in self._string_ids:
+                        return
+                    codes[column] = self._string_ids[value]
+
+        first = self._segment_for(start_time) if start_time is not None else None
+        last = self._segment_for(end_time) if end_time is not None else None
+
+        for segment, flushed, columns, buffered_ids in self._snapshot(first, last):
+            rows = flushed + len(buffered_ids)
+            if rows == 0:
+                continue
+            ids = functools.partial(self._row_ids, segment, flushed, buffered_ids)
+
+            if np is not None:
+                mask = np.ones(rows, dtype=bool)
+                starts = columns["start"][:rows]
+                if start_time is not None:
+                    mask &= starts >= start_time
+                if end_time is not None:
+                    mask &= starts < end_time
+                for column, code in codes.items():
+                    mask &= columns[column][:rows] == code
+                yield segment, np.nonzero(mask)[0], columns, ids
+            else:
+                starts = columns["start"]
+                selected = []
+                for row in range(rows):
+                    if start_time is not None and starts[row] < start_time:
+                        continue
+                    if end_time is not None and starts[row] >= end_time:
+                        continue
+                    if any(columns[column][row] != code for column, code in codes.items()):
+                        continue
+                    selected.append(row)
+                yield segment, selected, columns, ids
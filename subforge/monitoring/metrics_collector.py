@@ -12,11 +12,14 @@ from collections import deque, defaultdict
 from functools import lru_cache
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Deque, Optional, Set
+from typing import Any, Dict, List, Deque, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from asyncio import Queue, Semaphore, Task
 import logging
 
+from .execution_store import ExecutionStore
+from .streaming_stats import DecayedRate, DurationHistogram
+
 logger = logging.getLogger(__name__)
 
 
@@ -72,11 +75,12 @@ class MetricsCollector:
         self.last_flush_time = time.time()
         self.write_errors: Deque[Dict[str, Any]] = deque(maxlen=50)  # Track write errors
         
-        # Use deques for bounded collections
+        # Executions form a time-ordered ring: appended at the tail on start and
+        # evicted from the head, always together with their index entries
         self.current_session = {
             "session_id": f"session_{int(time.time())}",
             "start_time": time.time(),
-            "executions": deque(maxlen=self.max_executions),
+            "executions": deque(),
             "parallel_groups": deque(maxlen=self.max_groups),
             "token_total": 0,
         }
@@ -88,6 +92,7 @@ class MetricsCollector:
         self.status_index: Dict[str, Set[str]] = defaultdict(set)  # status -> set of execution_ids
         self.parallel_execution_index: Set[str] = set()  # Set of parallel execution_ids
         self.agent_duration_cache: Dict[str, float] = {}  # agent -> total duration (cached)
+        self._index_keys: Dict[str, Tuple[str, str]] = {}  # execution_id -> (agent, task_id) as indexed
         
         # Archive management
         self.archive_dir = self.metrics_dir / "archive"
@@ -98,6 +103,16 @@ class MetricsCollector:
         # Session history with bounded size
         self.session_history: Deque[Dict] = deque(maxlen=100)
         
+        # Streaming duration histograms and decayed rates, updated in O(1) per execution
+        self.agent_duration_histograms: Dict[str, DurationHistogram] = defaultdict(DurationHistogram)
+        self.task_type_duration_histograms: Dict[str, DurationHistogram] = defaultdict(DurationHistogram)
+        self.agent_throughput: Dict[str, DecayedRate] = defaultdict(DecayedRate)
+        self.agent_errors: Dict[str, DecayedRate] = defaultdict(DecayedRate)
+        
+        # Queryable columnar history of finished executions
+        self.execution_store = ExecutionStore(self.metrics_dir / "store")
+        self._prune_future: Optional[asyncio.Future] = None
+        
         # Initialize caches
         self._metrics_cache = None
         self._efficiency_cache = None
@@ -128,8 +143,11 @@ class MetricsCollector:
             "status": "running",
         }
         
-        # Deque automatically removes oldest when maxlen is reached
-        self.current_session["executions"].append(execution)
+        # Evict from the head of the ring so indexes never outlive their records
+        executions = self.current_session["executions"]
+        while len(executions) >= self.max_executions:
+            self._evict_execution(executions.popleft())
+        executions.append(execution)
         
         # Update O(1) indexes
         self.execution_index[execution_id] = execution
@@ -138,6 +156,7 @@ class MetricsCollector:
         self.status_index["running"].add(execution_id)
         if parallel:
             self.parallel_execution_index.add(execution_id)
+        self._index_keys[execution_id] = (agent, task_id)
         
         # Clear caches when data changes
         self._clear_caches()
@@ -170,6 +189,17 @@ class MetricsCollector:
         self.status_index["running"].discard(execution_id)
         self.status_index[status].add(execution_id)
         
+        # Update streaming sketches
+        agent = execution.get("agent", "unknown")
+        self.agent_duration_histograms[agent].record(execution["duration"])
+        self.task_type_duration_histograms[execution.get("task_type", "unknown")].record(execution["duration"])
+        self.agent_throughput[agent].add(1.0, execution["end_time"])
+        if status != "completed":
+            self.agent_errors[agent].add(1.0, execution["end_time"])
+        
+        # Persist the finished record to the columnar store (flushed on save)
+        self.execution_store.append(execution)
+        
         # Update agent duration cache if completed
         if status == "completed":
             agent = execution.get("agent", "unknown")
@@ -245,6 +275,11 @@ class MetricsCollector:
             "agent_utilization": {k: round(v, 2) for k, v in agent_times.items()},
             "token_usage": self.current_session.get("token_total", 0),
             "efficiency_score": round(self._calculate_efficiency_score(), 1),
+            "agent_latency": self.get_agent_latency(),
+            "task_type_latency": {
+                task_type: histogram.percentiles()
+                for task_type, histogram in self.task_type_duration_histograms.items()
+            },
             "memory_status": self._get_memory_status(),
         }
         
@@ -306,9 +341,13 @@ class MetricsCollector:
         session_file = self.metrics_dir / f"{self.current_session['session_id']}.json"
         essential_metrics = {k: v for k, v in metrics.items() 
                            if k != "agent_utilization" or len(str(v)) < 1000}
+        essential_metrics["duration_histograms"] = self._serialize_histograms()
         
         await self._async_write_file(session_file, essential_metrics)
         
+        # Flush buffered execution rows off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.execution_store.flush)
+        
         # Update aggregate metrics asynchronously
         await self._async_update_aggregate_metrics(metrics)
         
@@ -352,6 +391,58 @@ class MetricsCollector:
         # Save updated aggregate asynchronously
         await self._async_write_file(aggregate_file, aggregate)
 
+    def get_agent_latency(self, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Per-agent duration percentiles with decayed throughput and error rate"""
+        now = time.time() if now is None else now
+        latency = {}
+        for agent, histogram in self.agent_duration_histograms.items():
+            throughput = self.agent_throughput[agent].weight(now)
+            errors = self.agent_errors[agent].weight(now) if agent in self.agent_errors else 0.0
+            latency[agent] = {
+                **histogram.percentiles(),
+                "throughput_per_min": round(self.agent_throughput[agent].rate(now) * 60, 3),
+                "error_rate": round(errors / throughput, 3) if throughput else 0.0,
+            }
+        return latency
+    
+    def _serialize_histograms(self) -> Dict[str, Dict[str, Any]]:
+        """Histograms in a form that can be merged across sessions"""
+        return {
+            "agents": {k: h.to_dict() for k, h in self.agent_duration_histograms.items()},
+            "task_types": {k: h.to_dict() for k, h in self.task_type_duration_histograms.items()},
+        }
+    
+    def load_merged_histograms(self) -> Dict[str, Dict[str, DurationHistogram]]:
+        """Merge duration histograms from every saved and archived session on disk"""
+        merged: Dict[str, Dict[str, DurationHistogram]] = {"agents": {}, "task_types": {}}
+        
+        def merge(histograms: Dict[str, Any]):
+            for kind in merged:
+                for key, data in histograms.get(kind, {}).items():
+                    histogram = DurationHistogram.from_dict(data)
+                    if key in merged[kind]:
+                        merged[kind][key].merge(histogram)
+                    else:
+                        merged[kind][key] = histogram
+        
+        for session_file in self.metrics_dir.glob("session_*.json"):
+            try:
+                with open(session_file, "r") as f:
+                    merge(json.load(f).get("duration_histograms", {}))
+            except (json.JSONDecodeError, OSError):
+                continue
+        
+        # Sessions older than 12 hours have been moved into archive batches
+        for archive_file in self.archive_dir.glob("metrics_archive_*.json"):
+            try:
+                with open(archive_file, "r") as f:
+                    sessions = json.load(f).get("sessions", [])
+            except (json.JSONDecodeError, OSError):
+                continue
+            for session in sessions:
+                merge(session.get("duration_histograms", {}))
+        return merged
+    
     def get_performance_report(self) -> str:
         """Generate performance report with memory status"""
         metrics = self.calculate_metrics()
@@ -401,39 +492,23 @@ Total Executions: {metrics['total_executions']}
             current_time = time.time()
             cutoff_time = current_time - (self.MAX_SESSION_AGE_HOURS * 3600)
             
-            # Clean old execution records (keep only recent ones)
-            executions = list(self.current_session["executions"])
-            if executions:
-                # Remove completed executions older than 1 hour
-                one_hour_ago = current_time - 3600
-                recent_executions = [
-                    e for e in executions 
-                    if e.get("status") == "running" or e.get("start_time", 0) > one_hour_ago
-                ]
-                
-                # If we removed items, update the deque and indexes
-                if len(recent_executions) < len(executions):
-                    # Clean up indexes for removed executions
-                    removed_executions = [e for e in executions if e not in recent_executions]
-                    for exec in removed_executions:
-                        exec_id = exec.get("id")
-                        if exec_id:
-                            # Remove from all indexes
-                            self.execution_index.pop(exec_id, None)
-                            agent = exec.get("agent", "unknown")
-                            self.agent_executions_index[agent].discard(exec_id)
-                            task_id = exec.get("task_id")
-                            if task_id in self.task_execution_index:
-                                del self.task_execution_index[task_id]
-                            status = exec.get("status", "unknown")
-                            self.status_index[status].discard(exec_id)
-                            self.parallel_execution_index.discard(exec_id)
-                    
-                    self.current_session["executions"].clear()
-                    self.current_session["executions"].extend(recent_executions[-self.max_executions:])
-                    
-                    # Clear caches after cleanup
-                    self._clear_caches()
+            # Expire completed executions older than 1 hour from the head of the ring.
+            # Running executions are kept and restored to the head in their original order.
+            one_hour_ago = current_time - 3600
+            executions = self.current_session["executions"]
+            still_running = []
+            expired = 0
+            while executions and executions[0].get("start_time", 0) <= one_hour_ago:
+                execution = executions.popleft()
+                if execution.get("status") == "running":
+                    still_running.append(execution)
+                else:
+                    self._evict_execution(execution)
+                    expired += 1
+            executions.extendleft(reversed(still_running))
+            
+            if expired:
+                self._clear_caches()
             
             # Clean old session files
             for session_file in self.metrics_dir.glob("session_*.json"):
@@ -443,6 +518,9 @@ Total Executions: {metrics['total_executions']}
                 except Exception:
                     pass
             
+            # Drop columnar segments past the retention window off the event loop
+            self._schedule_prune(current_time)
+            
             # Force garbage collection
             gc.collect()
             
@@ -450,6 +528,24 @@ Total Executions: {metrics['total_executions']}
             # Silently handle cleanup errors to not disrupt operations
             pass
     
+    def _schedule_prune(self, now: float):
+        """Run ExecutionStore.prune (flush plus rmtree) in an executor thread"""
+        if self._prune_future is not None and not self._prune_future.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to block: prune inline
+            self.execution_store.prune(now)
+            return
+
+        def log_failure(future):
+            if not future.cancelled() and future.exception() is not None:
+                logger.error(f"Failed to prune execution store: {future.exception()}")
+
+        self._prune_future = loop.run_in_executor(None, self.execution_store.prune, now)
+        self._prune_future.add_done_callback(log_failure)
+    
     async def _async_archive_old_sessions(self):
         """Archive old session data to reduce memory usage using async I/O"""
         try:
@@ -492,6 +588,64 @@ Total Executions: {metrics['total_executions']}
         except Exception as e:
             logger.error(f"Error during session archival: {e}")
     
+    def _evict_execution(self, execution: Dict[str, Any]):
+        """Remove an execution popped from the ring from every index"""
+        exec_id = execution.get("id")
+        # A later execution may have reused the ID; only drop entries that are ours
+        if not exec_id or self.execution_index.get(exec_id) is not execution:
+            return
+        
+        del self.execution_index[exec_id]
+        agent, task_id = self._index_keys.pop(exec_id, (execution.get("agent"), execution.get("task_id")))
+        
+        agent_ids = self.agent_executions_index.get(agent)
+        if agent_ids is not None:
+            agent_ids.discard(exec_id)
+            if not agent_ids:
+                del self.agent_executions_index[agent]
+        
+        if self.task_execution_index.get(task_id) == exec_id:
+            del self.task_execution_index[task_id]
+        
+        status_ids = self.status_index.get(execution.get("status", "unknown"))
+        if status_ids is not None:
+            status_ids.discard(exec_id)
+            if not status_ids:
+                del self.status_index[execution.get("status", "unknown")]
+        
+        self.parallel_execution_index.discard(exec_id)
+    
+    def check_index_invariants(self) -> List[str]:
+        """Return a list of inconsistencies between the execution ring and its indexes"""
+        problems = []
+        executions = self.current_session["executions"]
+        ring_ids = {e["id"] for e in executions if self.execution_index.get(e["id"]) is e}
+        
+        if len(executions) > self.max_executions:
+            problems.append(f"ring holds {len(executions)} executions, limit is {self.max_executions}")
+        if set(self.execution_index) != ring_ids:
+            problems.append("execution_index does not match the execution ring")
+        
+        starts = [e.get("start_time", 0) for e in executions]
+        if any(a > b for a, b in zip(starts, starts[1:])):
+            problems.append("execution ring is not ordered by start_time")
+        
+        for agent, ids in self.agent_executions_index.items():
+            for exec_id in ids - ring_ids:
+                problems.append(f"agent index for {agent} references missing execution {exec_id}")
+        for status, ids in self.status_index.items():
+            for exec_id in ids:
+                execution = self.execution_index.get(exec_id)
+                if execution is None or execution.get("status") != status:
+                    problems.append(f"status index {status} is stale for execution {exec_id}")
+        for task_id, exec_id in self.task_execution_index.items():
+            if exec_id not in ring_ids:
+                problems.append(f"task index for {task_id} references missing execution {exec_id}")
+        for exec_id in self.parallel_execution_index - ring_ids:
+            problems.append(f"parallel index references missing execution {exec_id}")
+        
+        return problems
+    
     def _get_memory_status(self) -> Dict[str, Any]:
         """Get current memory usage status"""
         executions_count = len(self.current_session["executions"])
@@ -542,6 +696,28 @@ Total Executions: {metrics['total_executions']}
             return self.execution_index.get(execution_id)
         return None
     
+    def query_executions(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        agent: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Query finished executions across sessions, including rows not yet flushed"""
+        return self.execution_store.scan(
+            start_time=start_time, end_time=end_time, agent=agent, status=status, limit=limit
+        )
+    
+    def summarize_executions(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        agent: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Count/duration summary of stored executions for a time range and agent"""
+        return self.execution_store.summarize(start_time=start_time, end_time=end_time, agent=agent)
+    
     async def _async_write_file(self, file_path: Path, data: Dict[str, Any], retry_attempts: int = None):
         """Write file asynchronously with retry logic"""
         retry_attempts = retry_attempts or self.WRITE_RETRY_ATTEMPTS
@@ -604,6 +780,10 @@ Total Executions: {metrics['total_executions']}
             # Save final metrics
             await self.save_metrics()
             
+            # Let an in-flight retention prune finish before the loop goes away
+            if self._prune_future is not None and not self._prune_future.done():
+                await asyncio.wait([self._prune_future])
+            
             # Cancel the write processor task
             if self.write_task and not self.write_task.done():
                 self.write_task.cancel()
@@ -672,6 +852,20 @@ class PerformanceTracker:
                 }
             )
 
+        # Check tail latency per agent against the overall median
+        overall = DurationHistogram.merged(self.collector.agent_duration_histograms.values())
+        overall_p50 = overall.quantile(0.5)
+        for agent, latency in metrics.get("agent_latency", {}).items():
+            if latency["count"] >= 10 and overall_p50 > 0 and latency["p95"] > 5 * overall_p50:
+                bottlenecks.append(
+                    {
+                        "type": "slow_agent",
+                        "severity": "medium",
+                        "description": f"{agent} p95 duration {latency['p95']:.2f}s is over 5x the overall median",
+                        "suggestion": f"Split or cache work handled by {agent}",
+                    }
+                )
+
         # Check speedup
         if metrics["average_speedup"] < 1.5 and metrics["parallel_executions"] > 0:
             bottlenecks.append(
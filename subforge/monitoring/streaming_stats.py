@@ -0,0 +1,152 @@
+"""
+Streaming Statistics for SubForge Monitoring
+Mergeable duration histograms and exponentially-decayed rates with O(1) updates
+"""
+
+import math
+import time
+from typing import Any, Dict, Iterable, Optional
+
+
+class DurationHistogram:
+    """
+    Log-bucketed histogram with bounded relative error
+
+    Bucket boundaries grow geometrically (HDR/DDSketch style), so any quantile
+    is reported within ``relative_accuracy`` of the true value while memory
+    stays proportional to the dynamic range, not the number of samples.
+    Histograms with the same accuracy merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-3):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float):
+        """Add one observation"""
+        value = max(value, 0.0)
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= self.min_value:
+            self.zero_count += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0 <= q <= 1)"""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(k-1), gamma^k] in relative terms
+                value = 2 * self._gamma ** key / (1 + self._gamma)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def percentiles(self) -> Dict[str, float]:
+        """p50/p95/p99 plus count and mean"""
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": round(self.quantile(0.50), 3),
+            "p95": round(self.quantile(0.95), 3),
+            "p99": round(self.quantile(0.99), 3),
+            "max": round(self.max, 3),
+        }
+
+    def merge(self, other: "DurationHistogram"):
+        """Fold another histogram with the same accuracy into this one"""
+        if other.relative_accuracy != self.relative_accuracy or other.min_value != self.min_value:
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for storage alongside session metrics"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "min_value": self.min_value,
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DurationHistogram":
+        """Restore a histogram serialized with to_dict"""
+        histogram = cls(data["relative_accuracy"], data["min_value"])
+        histogram.buckets = {int(k): v for k, v in data["buckets"].items()}
+        histogram.zero_count = data["zero_count"]
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"] if data.get("min") is not None else math.inf
+        histogram.max = data["max"]
+        return histogram
+
+    @classmethod
+    def merged(cls, histograms: Iterable["DurationHistogram"]) -> "DurationHistogram":
+        """Merge several histograms into a new one"""
+        result = None
+        for histogram in histograms:
+            if result is None:
+                result = cls(histogram.relative_accuracy, histogram.min_value)
+            result.merge(histogram)
+        return result or cls()
+
+
+class DecayedRate:
+    """
+    Exponentially-decayed event counter
+
+    Each event contributes weight that halves every ``half_life`` seconds, so
+    ``rate()`` approximates recent events per second without keeping history.
+    """
+
+    def __init__(self, half_life: float = 300.0):
+        self.half_life = half_life
+        self._decay = math.log(2) / half_life
+        self.value = 0.0
+        self.last_update: Optional[float] = None
+
+    def _decayed(self, now: float) -> float:
+        if self.last_update is None:
+            return 0.0
+        return self.value * math.exp(-self._decay * max(now - self.last_update, 0.0))
+
+    def add(self, amount: float = 1.0, now: Optional[float] = None):
+        """Record ``amount`` events at ``now``"""
+        now = time.time() if now is None else now
+        self.value = self._decayed(now) + amount
+        self.last_update = now
+
+    def weight(self, now: Optional[float] = None) -> float:
+        """Decayed event count as of ``now``"""
+        return self._decayed(time.time() if now is None else now)
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """Recent events per second"""
+        return self.weight(now) * self._decay
@@ -8,7 +8,6 @@ import asyncio
 import aiofiles
 import json
 import time
-import gc
 from collections import deque
 from functools import lru_cache
 from pathlib import Path
@@ -187,6 +186,15 @@ class WorkflowExecution:
         }
 
 
+@dataclass
+class WorkflowIndexRefs:
+    """Reverse index entries owned by a single workflow"""
+    phase: str
+    status: WorkflowStatus
+    agents: Set[str] = field(default_factory=set)
+    execution_keys: Set[Tuple[str, str, str]] = field(default_factory=set)
+
+
 class WorkflowMonitor:
     """Real-time workflow monitoring with O(1) lookups and memory-efficient storage"""
     
@@ -232,6 +240,8 @@ class WorkflowMonitor:
         self.agent_task_index: Dict[str, Set[str]] = {}  # agent -> set of workflow IDs
         self.phase_index: Dict[str, Set[str]] = {}  # phase -> set of workflow IDs
         self.status_index: Dict[WorkflowStatus, Set[str]] = {}  # status -> set of workflow IDs
+        # Reverse indexes so a workflow's entries can be removed without scanning
+        self.workflow_refs: Dict[str, WorkflowIndexRefs] = {}  # workflow_id -> owned index entries
         
         # Initialize status index
         for status in WorkflowStatus:
@@ -292,6 +302,11 @@ class WorkflowMonitor:
             parallel_groups=[]
         )
         
+        # A restarted workflow ID replaces the previous run's index entries
+        previous = self.workflow_index.get(workflow_id)
+        if previous is not None:
+            self._remove_from_indexes(previous)
+        
         # Update all indexes for O(1) access
         self.active_workflows[workflow_id] = workflow
         self.workflow_index[workflow_id] = workflow
@@ -304,6 +319,10 @@ class WorkflowMonitor:
         # Update status index
         self.status_index[WorkflowStatus.RUNNING].add(workflow_id)
         
+        self.workflow_refs[workflow_id] = WorkflowIndexRefs(
+            phase="requirements", status=WorkflowStatus.RUNNING
+        )
+        
         self.total_workflows += 1
         
         # Trigger callbacks
@@ -331,6 +350,7 @@ class WorkflowMonitor:
         # Update status index
         self.status_index[old_status].discard(workflow_id)
         self.status_index[status].add(workflow_id)
+        self.workflow_refs[workflow_id].status = status
         
         # Update statistics
         if status == WorkflowStatus.COMPLETED:
@@ -340,7 +360,10 @@ class WorkflowMonitor:
             self.failed_workflows += 1
             self._trigger_event("workflow_failed", workflow, error_message)
         
-        # Move to completed workflows (deque automatically manages size)
+        # Move to completed workflows, dropping the oldest one's index entries at capacity
+        if len(self.completed_workflows) == self.completed_workflows.maxlen:
+            evicted = self.completed_workflows.popleft()
+            self._remove_from_indexes(evicted)
         self.completed_workflows.append(workflow)
         del self.active_workflows[workflow_id]
         
@@ -371,6 +394,7 @@ class WorkflowMonitor:
             if phase not in self.phase_index:
                 self.phase_index[phase] = set()
             self.phase_index[phase].add(workflow_id)
+            self.workflow_refs[workflow_id].phase = phase
             
             self._trigger_event("phase_changed", workflow_id, old_phase, phase)
             asyncio.create_task(self._async_save_workflow_state(workflow))
@@ -397,7 +421,12 @@ class WorkflowMonitor:
             # Remove oldest completed executions to make room
             completed_execs = [e for e in workflow.agent_executions if e.status in [AgentStatus.COMPLETED, AgentStatus.FAILED]]
             if completed_execs:
-                workflow.agent_executions.remove(completed_execs[0])
+                removed = completed_execs[0]
+                workflow.agent_executions.remove(removed)
+                removed_key = (workflow_id, removed.agent_name, removed.task_id)
+                if self.execution_index.get(removed_key) is removed:
+                    del self.execution_index[removed_key]
+                    self.workflow_refs[workflow_id].execution_keys.discard(removed_key)
         
         execution = AgentExecution(
             agent_name=agent_name,
@@ -421,6 +450,10 @@ class WorkflowMonitor:
             self.agent_task_index[agent_name] = set()
         self.agent_task_index[agent_name].add(workflow_id)
         
+        refs = self.workflow_refs[workflow_id]
+        refs.agents.add(agent_name)
+        refs.execution_keys.add((workflow_id, agent_name, task_id))
+        
         # Trigger callbacks
         self._trigger_event("agent_started", workflow_id, execution)
         
@@ -762,7 +795,14 @@ class WorkflowMonitor:
         # Archive old workflows before cleanup
         await self._archive_old_workflows()
         
-        # Clean old state files
+        # Directory scan and unlinks run in a worker thread to keep the loop responsive
+        loop = asyncio.get_running_loop()
+        cleaned_count = await loop.run_in_executor(None, self._remove_old_state_files, cutoff_time)
+        
+        logger.info(f"Cleaned {cleaned_count} old state files (older than {hours} hours)")
+    
+    def _remove_old_state_files(self, cutoff_time: float) -> int:
+        """Delete workflow state files last modified before cutoff_time"""
         cleaned_count = 0
         for state_file in self.monitoring_dir.glob("workflow_*.json"):
             try:
@@ -771,11 +811,36 @@ class WorkflowMonitor:
                     cleaned_count += 1
             except Exception as e:
                 logger.error(f"Failed to clean state file {state_file}: {e}")
+        return cleaned_count
+    
+    def _remove_from_indexes(self, workflow: WorkflowExecution):
+        """Remove exactly the index entries owned by this workflow run"""
+        workflow_id = workflow.workflow_id
+        if self.workflow_index.get(workflow_id) is not workflow:
+            # A later run with the same ID owns the entries now
+            return
+        del self.workflow_index[workflow_id]
+        refs = self.workflow_refs.pop(workflow_id, None)
+        if refs is None:
+            return
         
-        # Force garbage collection after cleanup
-        gc.collect()
+        phase_set = self.phase_index.get(refs.phase)
+        if phase_set is not None:
+            phase_set.discard(workflow_id)
+            if not phase_set:
+                del self.phase_index[refs.phase]
         
-        logger.info(f"Cleaned {cleaned_count} old state files (older than {hours} hours)")
+        self.status_index[refs.status].discard(workflow_id)
+        
+        for agent_name in refs.agents:
+            agent_set = self.agent_task_index.get(agent_name)
+            if agent_set is not None:
+                agent_set.discard(workflow_id)
+                if not agent_set:
+                    del self.agent_task_index[agent_name]
+        
+        for key in refs.execution_keys:
+            self.execution_index.pop(key, None)
     
     async def _auto_cleanup(self):
         """Automatic cleanup task that runs periodically"""
@@ -827,25 +892,15 @@ class WorkflowMonitor:
                 "workflows": [w.to_dict() for w in to_archive]
             }
             
-            # Use async I/O for archive writes
+            # Encode off the event loop, then write with async I/O
+            loop = asyncio.get_running_loop()
+            archive_json = await loop.run_in_executor(None, json.dumps, archive_data)
             async with aiofiles.open(archive_file, 'w') as f:
-                await f.write(json.dumps(archive_data))
+                await f.write(archive_json)
             
-            # Clean up indexes for archived workflows
+            # Clean up exactly the index entries owned by each archived workflow
             for workflow in to_archive:
-                workflow_id = workflow.workflow_id
-                # Remove from all indexes
-                self.workflow_index.pop(workflow_id, None)
-                for phase_set in self.phase_index.values():
-                    phase_set.discard(workflow_id)
-                for status_set in self.status_index.values():
-                    status_set.discard(workflow_id)
-                for agent_set in self.agent_task_index.values():
-                    agent_set.discard(workflow_id)
-                # Remove from execution index
-                keys_to_remove = [k for k in self.execution_index if k[0] == workflow_id]
-                for key in keys_to_remove:
-                    del self.execution_index[key]
+                self._remove_from_indexes(workflow)
             
             self.archived_count += len(to_archive)
             logger.info(f"Archived {len(to_archive)} workflows to {archive_file}")
@@ -853,9 +908,6 @@ class WorkflowMonitor:
             # Clear caches after archiving
             self._avg_duration_cache = None
             
-            # Force garbage collection after archiving
-            gc.collect()
-            
         except Exception as e:
             logger.error(f"Failed to archive workflows: {e}")
     
@@ -328,6 +328,7 @@ class TestAuthenticationSystem:
         
         # Revoke token
         await auth_manager.revoke_token(token.token)
+        auth_manager.audit_log.flush()
         
         # Check audit log exists
         audit_file = temp_workspace / "auth" / "audit" / "security_audit.log"
@@ -16,6 +16,8 @@ from unittest.mock import Mock, patch, AsyncMock, MagicMock
 import secrets
 import hmac
 import hashlib
+import threading
+import time
 
 # Import the authentication module
 import sys
@@ -23,7 +25,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from subforge.core.authentication import (
     AgentToken, TokenStore, AuthenticationManager,
     SecurityAuditLog, Permission, Role, require_auth,
-    ROLE_PERMISSIONS
+    ROLE_PERMISSIONS, _open_audit_writers
 )
 
 
@@ -560,6 +562,7 @@ class TestIntegration:
             await auth_manager.authorize(token, Permission.READ, "resource1")
             await auth_manager.authorize(token, Permission.ADMIN, "resource2")  # Should fail
             await auth_manager.revoke_token(token.token)
+            auth_manager.audit_log.flush()
             
             # Check audit log exists
             audit_file = Path(tmpdir) / "auth" / "audit" / "security_audit.log"
@@ -697,6 +700,7 @@ class TestSecurityAuditLog:
             audit_log.log_auth_failure("agent2", "WRITE", "resource2", "no_permission")
             audit_log.log_token_created("agent3", "SPECIALIST", None)
             audit_log.log_suspicious_activity("agent4", "brute_force", "5 attempts")
+            audit_log.flush()
             
             # Check log file exists and contains entries
             log_file = Path(tmpdir) / "security_audit.log"
@@ -709,6 +713,130 @@ class TestSecurityAuditLog:
                 assert "TOKEN_CREATED" in content
                 assert "SUSPICIOUS_ACTIVITY" in content
 
+    def test_audit_log_structured_format(self):
+        """Test JSON-lines audit output"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            audit_log = SecurityAuditLog(Path(tmpdir), structured=True)
+            audit_log.log_auth_success("agent1", "READ", "resource1")
+            audit_log.log_auth_failure("agent2", "WRITE", "resource2", "no_permission")
+            audit_log.close()
+            
+            log_file = Path(tmpdir) / "security_audit.jsonl"
+            records = [json.loads(line) for line in log_file.read_text().splitlines()]
+            
+            assert [r["event"] for r in records] == ["AUTH_SUCCESS", "AUTH_FAILURE"]
+            assert records[0]["agent"] == "agent1"
+            assert records[1]["level"] == "WARNING"
+            assert records[1]["reason"] == "no_permission"
+    
+    def test_audit_log_batches_until_flush(self):
+        """Test records are buffered off the caller's thread until flushed"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            audit_log = SecurityAuditLog(Path(tmpdir), flush_interval=60, batch_size=1000)
+            for i in range(10):
+                audit_log.log_auth_success(f"agent{i}", "READ", "resource")
+            
+            log_file = Path(tmpdir) / "security_audit.log"
+            assert log_file.read_text() == ""
+            
+            audit_log.flush()
+            assert len(log_file.read_text().splitlines()) == 10
+            audit_log.close()
+    
+    def test_audit_log_rotation(self):
+        """Test size-based rotation keeps backup_count files"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            audit_log = SecurityAuditLog(
+                Path(tmpdir), max_bytes=200, backup_count=2, batch_size=1
+            )
+            for i in range(20):
+                audit_log.log_auth_success(f"agent{i}", "READ", "resource")
+            audit_log.close()
+            
+            files = sorted(p.name for p in Path(tmpdir).iterdir())
+            assert files == ["security_audit.log", "security_audit.log.1", "security_audit.log.2"]
+            assert "agent19" in (Path(tmpdir) / "security_audit.log.1").read_text() + \
+                (Path(tmpdir) / "security_audit.log").read_text()
+
+
+    def test_failed_rotation_keeps_writer_alive(self):
+        """Test a rename error during rotation does not stop later writes"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            audit_log = SecurityAuditLog(
+                Path(tmpdir), max_bytes=200, backup_count=2, batch_size=1
+            )
+            real_replace = Path.replace
+            failures = []
+
+            def failing_replace(path, target):
+                if not failures:
+                    failures.append(path)
+                    raise OSError("disk full")
+                return real_replace(path, target)
+
+            with patch.object(Path, "replace", failing_replace):
+                for i in range(20):
+                    audit_log.log_auth_success(f"agent{i}", "READ", "resource")
+                audit_log.flush()
+
+            assert failures
+            assert audit_log.writer._thread.is_alive()
+            text = "".join(p.read_text() for p in Path(tmpdir).iterdir())
+            assert "agent19" in text
+            audit_log.close()
+
+    def test_writer_survives_unexpected_errors(self):
+        """Test an exception in a batch write does not kill the writer thread"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            audit_log = SecurityAuditLog(Path(tmpdir))
+            writer = audit_log.writer
+            with patch.object(writer, "_write_batch", side_effect=ValueError("boom")):
+                audit_log.log_auth_success("lost", "READ", "resource")
+                audit_log.flush(timeout=5)
+
+            audit_log.log_auth_success("kept", "READ", "resource")
+            audit_log.flush(timeout=5)
+
+            assert writer._thread.is_alive()
+            assert "kept" in (Path(tmpdir) / "security_audit.log").read_text()
+            audit_log.close()
+
+    def test_submit_drops_instead_of_blocking_when_full(self):
+        """Test a stalled writer makes submit drop records, not block"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            audit_log = SecurityAuditLog(Path(tmpdir), queue_size=5, batch_size=1)
+            writer = audit_log.writer
+            release = threading.Event()
+            real_write = writer._write_batch
+
+            def stalled_write(lines):
+                release.wait(10)
+                real_write(lines)
+
+            with patch.object(writer, "_write_batch", side_effect=stalled_write):
+                started = time.monotonic()
+                for i in range(50):
+                    audit_log.log_auth_success(f"agent{i}", "READ", "resource")
+                assert time.monotonic() - started < 1
+                assert writer.dropped >= 40
+                release.set()
+                audit_log.close()
+
+            assert not writer._thread.is_alive()
+
+    def test_writers_share_one_exit_hook(self):
+        """Test open writers are tracked for a single atexit hook"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch("atexit.register") as register:
+                first = SecurityAuditLog(Path(tmpdir) / "a")
+                second = SecurityAuditLog(Path(tmpdir) / "b")
+            register.assert_not_called()
+            assert {first.writer, second.writer} <= set(_open_audit_writers)
+
+            first.close()
+            second.close()
+            assert first.writer not in _open_audit_writers
+
 
 class TestCustomPermissions:
     """Test custom permissions and role modifications"""
@@ -9,7 +9,9 @@ Created: 2025-01-22 16:30:00 UTC-3
 
 import asyncio
 import json
+import os
 import tempfile
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
@@ -18,6 +20,7 @@ from unittest.mock import MagicMock, Mock, patch, mock_open
 
 import pytest
 
+from subforge.monitoring.execution_store import ExecutionStore
 from subforge.monitoring.metrics_collector import (
     ExecutionMetrics,
     MetricsCollector,
@@ -573,6 +576,112 @@ class TestMetricsCollector:
         assert "unknown" in result["agent_utilization"]
         assert result["agent_utilization"]["unknown"] == 5.0
 
+    @pytest.mark.asyncio
+    async def test_ring_eviction_keeps_indexes_consistent(self, temp_project_path):
+        """Test executions evicted at capacity are removed from every index"""
+        collector = MetricsCollector(temp_project_path, max_executions=5)
+
+        with patch("time.time", side_effect=[1000.0 + i for i in range(20)]):
+            ids = [collector.start_execution(f"task_{i}", f"agent_{i % 2}", "build") for i in range(8)]
+            collector.end_execution(ids[-1], "completed")
+
+        assert len(collector.current_session["executions"]) == 5
+        assert ids[0] not in collector.execution_index
+        assert collector.get_execution_by_task("task_0") is None
+        assert all(ids[0] not in s for s in collector.agent_executions_index.values())
+        assert collector.check_index_invariants() == []
+        await collector.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cleanup_expires_from_head(self, temp_project_path):
+        """Test cleanup pops expired executions and keeps running ones"""
+        metrics_collector = MetricsCollector(temp_project_path)
+        with patch("time.time", side_effect=[1000.0, 1001.0, 1002.0, 1003.0]):
+            running = metrics_collector.start_execution("old_running", "agent", "build")
+            done = metrics_collector.start_execution("old_done", "agent", "build", parallel=True)
+            metrics_collector.end_execution(done, "completed")
+            recent = metrics_collector.start_execution("recent", "agent", "build")
+
+        with patch("time.time", return_value=1002.5 + 3600):
+            metrics_collector._perform_cleanup()
+
+        remaining = [e["id"] for e in metrics_collector.current_session["executions"]]
+        assert remaining == [running, recent]
+        assert done not in metrics_collector.parallel_execution_index
+        assert "completed" not in metrics_collector.status_index
+        assert metrics_collector.check_index_invariants() == []
+        await metrics_collector.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_agent_latency_percentiles(self, temp_project_path):
+        """Test end_execution feeds per-agent and per-task-type histograms"""
+        metrics_collector = MetricsCollector(temp_project_path)
+        times = []
+        for i in range(1, 11):
+            times.extend([1000.0 * i, 1000.0 * i + i])
+        with patch("time.time", side_effect=times):
+            for i in range(1, 11):
+                exec_id = metrics_collector.start_execution(f"task_{i}", "agent_a", "build")
+                metrics_collector.end_execution(exec_id, "failed" if i == 10 else "completed")
+
+        latency = metrics_collector.get_agent_latency(now=10010.0)["agent_a"]
+        assert latency["count"] == 10
+        assert latency["p50"] == pytest.approx(5.0, rel=0.02)
+        assert latency["max"] == 10.0
+        assert 0 < latency["error_rate"] < 1
+        assert metrics_collector.calculate_metrics()["task_type_latency"]["build"]["count"] == 10
+        await metrics_collector.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_merged_histograms_include_archived_sessions(self, temp_project_path):
+        """Test histograms survive sessions being moved into archive batches"""
+        metrics_collector = MetricsCollector(temp_project_path)
+        exec_id = metrics_collector.start_execution("task", "agent_a", "build")
+        metrics_collector.end_execution(exec_id, "completed")
+        await metrics_collector.save_metrics()
+
+        session_file = metrics_collector.metrics_dir / f"{metrics_collector.current_session['session_id']}.json"
+        old = time.time() - 13 * 3600
+        for i in range(10):
+            copy = metrics_collector.metrics_dir / f"session_old_{i}.json"
+            copy.write_text(session_file.read_text())
+            os.utime(copy, (old, old))
+        await metrics_collector._async_archive_old_sessions()
+
+        assert len(list(metrics_collector.archive_dir.glob("metrics_archive_*.json"))) == 1
+        assert len(list(metrics_collector.metrics_dir.glob("session_*.json"))) == 1
+        merged = metrics_collector.load_merged_histograms()
+        assert merged["agents"]["agent_a"].count == 11
+        assert merged["task_types"]["build"].count == 11
+        await metrics_collector.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cleanup_prunes_store_off_the_loop(self, temp_project_path):
+        """Test retention runs in an executor thread and queries do not flush"""
+        metrics_collector = MetricsCollector(temp_project_path)
+        store = metrics_collector.execution_store
+        prune_threads = []
+        original_prune = store.prune
+
+        def prune(now=None):
+            prune_threads.append(threading.current_thread())
+            return original_prune(now)
+
+        exec_id = metrics_collector.start_execution("task", "agent_a", "build")
+        metrics_collector.end_execution(exec_id, "completed")
+        with patch.object(store, "prune", side_effect=prune), \
+                patch.object(store, "flush", wraps=store.flush) as flush:
+            assert metrics_collector.query_executions(agent="agent_a")[0]["agent"] == "agent_a"
+            assert metrics_collector.summarize_executions()["count"] == 1
+            flush.assert_not_called()
+
+            metrics_collector._perform_cleanup()
+            await metrics_collector._prune_future
+
+        assert prune_threads and prune_threads[0] is not threading.main_thread()
+        assert len(ExecutionStore(store.root).scan()) == 1
+        await metrics_collector.shutdown()
+
 
 class TestPerformanceTracker:
     """Test PerformanceTracker class"""
@@ -1622,6 +1731,52 @@ class TestWorkflowMonitor:
         parallelization = workflow_monitor._calculate_current_parallelization()
         assert parallelization == 0.0
 
+    @pytest.mark.asyncio
+    async def test_archive_removes_only_owned_index_entries(self, temp_project_path):
+        """Test archival drops exactly the archived workflows' index entries"""
+        monitor = WorkflowMonitor(temp_project_path)
+        for i in range(120):
+            workflow_id = f"wf_{i}"
+            monitor.start_workflow(workflow_id, "Archive test")
+            monitor.update_phase(workflow_id, "implementation")
+            monitor.start_agent_execution(workflow_id, f"@agent_{i % 3}", f"task_{i}", "work")
+            monitor.end_workflow(workflow_id, WorkflowStatus.COMPLETED)
+
+        await monitor._archive_old_workflows()
+
+        assert monitor.archived_count == 60
+        assert "wf_0" not in monitor.workflow_refs
+        assert ("wf_0", "@agent_0", "task_0") not in monitor.execution_index
+        assert "wf_0" not in monitor.status_index[WorkflowStatus.COMPLETED]
+        assert "wf_0" not in monitor.agent_task_index["@agent_0"]
+        assert ("wf_60", "@agent_0", "task_60") in monitor.execution_index
+        assert len(monitor.phase_index["implementation"]) == 60
+        assert set(monitor.workflow_index) == set(monitor.workflow_refs)
+        await monitor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_evicting_earlier_run_keeps_rerun_indexes(self, temp_project_path):
+        """Test evicting a finished run leaves the entries of a re-run with the same ID"""
+        monitor = WorkflowMonitor(temp_project_path, max_completed=2)
+        monitor.start_workflow("wf_dup", "First run")
+        monitor.end_workflow("wf_dup", WorkflowStatus.COMPLETED)
+
+        rerun = monitor.start_workflow("wf_dup", "Second run")
+        monitor.update_phase("wf_dup", "implementation")
+        monitor.start_agent_execution("wf_dup", "@agent", "task_1", "work")
+        for workflow_id in ("wf_a", "wf_b"):
+            monitor.start_workflow(workflow_id, "Filler")
+            monitor.end_workflow(workflow_id, WorkflowStatus.COMPLETED)
+
+        assert all(w.workflow_id != "wf_dup" for w in monitor.completed_workflows)
+        assert monitor.workflow_index["wf_dup"] is rerun
+        assert "wf_dup" in monitor.workflow_refs
+        assert "wf_dup" in monitor.status_index[WorkflowStatus.RUNNING]
+        assert "wf_dup" in monitor.phase_index["implementation"]
+        assert "wf_dup" in monitor.agent_task_index["@agent"]
+        assert ("wf_dup", "@agent", "task_1") in monitor.execution_index
+        await monitor.shutdown()
+
     @pytest.mark.asyncio
     async def test_cleanup_old_data(self, workflow_monitor):
         """Test cleanup_old_data method"""
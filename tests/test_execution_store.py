@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar ExecutionStore used by MetricsCollector
+"""
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from subforge.monitoring.execution_store import ExecutionStore
+
+
+def _record(i: int, start: float) -> dict:
+    return {
+        "id": f"task_{i}",
+        "agent": f"agent_{i % 3}",
+        "task_type": "analysis" if i % 2 else "build",
+        "start_time": start,
+        "duration": float(i),
+        "status": "failed" if i % 5 == 0 else "completed",
+        "parallel": bool(i % 2),
+    }
+
+
+class TestExecutionStore:
+    """Test ExecutionStore persistence, scans and retention"""
+
+    @pytest.fixture
+    def store_dir(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            yield Path(tmp_dir)
+
+    def test_roundtrip_after_reopen(self, store_dir):
+        """Rows flushed by one instance are readable by another"""
+        now = time.time()
+        store = ExecutionStore(store_dir)
+        for i in range(10):
+            store.append(_record(i, now - i))
+        store.flush()
+
+        reopened = ExecutionStore(store_dir)
+        records = reopened.scan()
+
+        assert len(records) == 10
+        first = next(r for r in records if r["id"] == "task_3")
+        assert first["agent"] == "agent_0"
+        assert first["task_type"] == "analysis"
+        assert first["duration"] == 3.0
+        assert first["parallel"] is True
+
+    def test_scan_filters_by_time_and_agent(self, store_dir):
+        """Time-range and agent filters select the matching rows only"""
+        now = time.time()
+        store = ExecutionStore(store_dir)
+        for i in range(30):
+            store.append(_record(i, now - i * 3600))
+
+        recent = store.scan(start_time=now - 10 * 3600 + 1)
+        assert {r["id"] for r in recent} == {f"task_{i}" for i in range(10)}
+
+        agent_rows = store.scan(agent="agent_1")
+        assert len(agent_rows) == 10
+        assert all(r["agent"] == "agent_1" for r in agent_rows)
+
+        assert store.scan(agent="missing") == []
+
+    def test_summarize(self, store_dir):
+        """Summaries aggregate durations without materializing records"""
+        now = time.time()
+        store = ExecutionStore(store_dir)
+        for i in range(1, 5):
+            store.append(_record(i, now))
+
+        summary = store.summarize()
+        assert summary["count"] == 4
+        assert summary["total_duration"] == 10.0
+        assert summary["average_duration"] == 2.5
+        assert summary["max_duration"] == 4.0
+
+    def test_incremental_aggregates(self, store_dir):
+        """Per-agent aggregates are maintained on append and persisted on flush"""
+        store = ExecutionStore(store_dir)
+        for i in range(6):
+            store.append(_record(i, time.time()))
+        store.flush()
+
+        aggregates = ExecutionStore(store_dir).get_aggregates()
+        agent_0 = aggregates["agents"]["agent_0"]
+        assert agent_0["count"] == 2
+        assert agent_0["failed"] == 1
+        assert agent_0["total_duration"] == 3.0
+        assert aggregates["task_types"]["build"]["count"] == 3
+
+    def test_prune_drops_expired_segments(self, store_dir):
+        """Retention removes whole day segments"""
+        now = time.time()
+        store = ExecutionStore(store_dir, retention_days=7)
+        store.append(_record(1, now - 30 * 86400))
+        store.append(_record(2, now))
+
+        assert store.prune(now) == 1
+        assert [r["id"] for r in store.scan()] == ["task_2"]
+
+    def test_flush_in_thread_while_appending(self, store_dir):
+        """Rows appended while another thread flushes are neither lost nor duplicated"""
+        now = time.time()
+        store = ExecutionStore(store_dir)
+        done = threading.Event()
+        errors = []
+
+        def flusher():
+            try:
+                while not done.is_set():
+                    store.flush()
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=flusher)
+        thread.start()
+        try:
+            for i in range(2000):
+                record = _record(i, now)
+                record["agent"] = f"agent_{i}"
+                store.append(record)
+        finally:
+            done.set()
+            thread.join()
+        store.flush()
+
+        assert errors == []
+        reopened = ExecutionStore(store_dir)
+        records = reopened.scan()
+        assert sorted(r["id"] for r in records) == sorted(f"task_{i}" for i in range(2000))
+        assert all(r["agent"] == f"agent_{r['id'][5:]}" for r in records)
+        assert len(reopened.get_aggregates()["agents"]) == 2000
+
+    def test_scan_reads_buffered_rows_without_flushing(self, store_dir):
+        """Scans combine flushed and buffered rows and leave the buffer alone"""
+        now = time.time()
+        store = ExecutionStore(store_dir)
+        for i in range(3):
+            store.append(_record(i, now))
+        store.flush()
+        for i in range(3, 6):
+            store.append(_record(i, now))
+
+        records = store.scan()
+        summary = store.summarize()
+
+        assert [r["id"] for r in records] == [f"task_{i}" for i in range(6)]
+        assert records[4]["agent"] == "agent_1"
+        assert summary["count"] == 6
+        assert summary["max_duration"] == 5.0
+        # Nothing was written by the reads
+        assert sum(len(ids) for ids in store._pending_ids.values()) == 3
+        assert len(ExecutionStore(store_dir).scan()) == 3
+
+        store.flush()
+        assert [r["id"] for r in store.scan()] == [f"task_{i}" for i in range(6)]
+
+    def test_scan_with_only_buffered_segments(self, store_dir):
+        """A day with no segment directory yet is still scanned from the buffer"""
+        now = time.time()
+        store = ExecutionStore(store_dir)
+        store.append(_record(1, now - 86400))
+        store.append(_record(2, now))
+
+        assert [r["id"] for r in store.scan(start_time=now - 1)] == ["task_2"]
+        assert store.summarize(agent="agent_1")["count"] == 1
+        assert not any(path.is_dir() for path in store_dir.iterdir())
+
+    def test_scan_during_flush_sees_each_row_once(self, store_dir):
+        """Rows mid-flush are neither missed nor double counted"""
+        now = time.time()
+        store = ExecutionStore(store_dir)
+        done = threading.Event()
+        errors = []
+
+        def flusher():
+            try:
+                while not done.is_set():
+                    store.flush()
+                    time.sleep(0.001)
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=flusher)
+        thread.start()
+        try:
+            for i in range(500):
+                store.append(_record(i, now))
+                if i % 50 == 0:
+                    assert store.summarize()["count"] == i + 1
+        finally:
+            done.set()
+            thread.join()
+
+        assert errors == []
+        assert store.summarize()["count"] == 500
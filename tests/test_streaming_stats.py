@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming duration histograms and decayed rates
+"""
+
+import json
+import random
+
+import pytest
+
+from subforge.monitoring.streaming_stats import DecayedRate, DurationHistogram
+
+
+class TestDurationHistogram:
+    """Test DurationHistogram accuracy, merging and serialization"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Quantiles stay within the configured relative error"""
+        rng = random.Random(42)
+        values = [rng.lognormvariate(0, 1.5) for _ in range(5000)]
+        histogram = DurationHistogram(relative_accuracy=0.01)
+        for value in values:
+            histogram.record(value)
+
+        ordered = sorted(values)
+        for q in (0.5, 0.95, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            assert histogram.quantile(q) == pytest.approx(exact, rel=0.02)
+
+    def test_empty_histogram(self):
+        """Empty histograms report zeros"""
+        histogram = DurationHistogram()
+        assert histogram.quantile(0.99) == 0.0
+        assert histogram.percentiles()["count"] == 0
+
+    def test_merge_matches_single_histogram(self):
+        """Merging per-session histograms equals recording everything once"""
+        combined = DurationHistogram()
+        first, second = DurationHistogram(), DurationHistogram()
+        for i in range(1, 201):
+            combined.record(i / 10)
+            (first if i % 2 else second).record(i / 10)
+
+        merged = DurationHistogram.merged([first, second])
+        assert merged.buckets == combined.buckets
+        assert merged.percentiles() == combined.percentiles()
+
+    def test_merge_rejects_different_layouts(self):
+        """Histograms with different accuracy cannot be merged"""
+        with pytest.raises(ValueError):
+            DurationHistogram(0.01).merge(DurationHistogram(0.05))
+
+    def test_serialization_roundtrip(self):
+        """to_dict/from_dict survive a JSON roundtrip"""
+        histogram = DurationHistogram()
+        for value in (0.0, 0.5, 2.0, 30.0):
+            histogram.record(value)
+
+        restored = DurationHistogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+        assert restored.percentiles() == histogram.percentiles()
+        assert restored.zero_count == 1
+
+
+class TestDecayedRate:
+    """Test DecayedRate decay behaviour"""
+
+    def test_weight_halves_each_half_life(self):
+        """An event's weight halves every half-life"""
+        rate = DecayedRate(half_life=60)
+        rate.add(8, now=0)
+        assert rate.weight(now=60) == pytest.approx(4)
+        assert rate.weight(now=120) == pytest.approx(2)
+
+    def test_rate_before_any_event(self):
+        """No events means zero rate"""
+        assert DecayedRate().rate(now=100) == 0.0